@@ -0,0 +1,53 @@
+-- Fold node_logs into entity_logs (single log store for route nodes/edges)
+
+ALTER TABLE entity_logs ADD COLUMN IF NOT EXISTS log_type VARCHAR(20) NOT NULL DEFAULT 'note';
+ALTER TABLE entity_logs ADD COLUMN IF NOT EXISTS source_ref TEXT;
+
+CREATE INDEX IF NOT EXISTS ix_entity_logs_entity
+ON entity_logs (entity_type, entity_id, created_at DESC);
+
+DO $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM information_schema.tables
+    WHERE table_schema = current_schema()
+      AND table_name = 'node_logs'
+      AND table_type = 'BASE TABLE'
+  ) THEN
+    ALTER TABLE node_logs ADD COLUMN IF NOT EXISTS log_type VARCHAR(20);
+    ALTER TABLE node_logs ADD COLUMN IF NOT EXISTS source_ref TEXT;
+    INSERT INTO entity_logs (
+      id, route_id, entity_type, entity_id, actor_type, actor_id,
+      content, log_type, source_ref, created_at, updated_at
+    )
+    SELECT
+      nl.id, rn.route_id, 'route_node', nl.node_id, nl.actor_type, nl.actor_id,
+      nl.content, COALESCE(nl.log_type, 'note'), nl.source_ref, nl.created_at, nl.created_at
+    FROM node_logs nl
+    JOIN route_nodes rn ON rn.id = nl.node_id
+    ON CONFLICT (id) DO UPDATE
+    SET log_type = EXCLUDED.log_type,
+        source_ref = EXCLUDED.source_ref;
+    IF to_regclass('node_logs_legacy') IS NULL THEN
+      ALTER TABLE node_logs RENAME TO node_logs_legacy;
+    ELSE
+      DROP TABLE node_logs;
+    END IF;
+  END IF;
+END $$;
+
+-- Read-only compatibility view for consumers still selecting from node_logs.
+CREATE OR REPLACE VIEW node_logs AS
+SELECT
+  id,
+  entity_id AS node_id,
+  actor_type,
+  actor_id,
+  content,
+  log_type,
+  source_ref,
+  created_at,
+  route_id,
+  updated_at
+FROM entity_logs
+WHERE entity_type = 'route_node';
@@ -0,0 +1,7 @@
+-- Composite link indexes for forward and reverse lookups / neighbor traversal
+
+CREATE INDEX IF NOT EXISTS ix_links_from
+ON links (from_type, from_id, relation, to_type, to_id);
+
+CREATE INDEX IF NOT EXISTS ix_links_to
+ON links (to_type, to_id, relation, from_type, from_id);
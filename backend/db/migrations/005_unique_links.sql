@@ -0,0 +1,71 @@
+-- Compact duplicate links and enforce one row per (from, to, relation) edge.
+-- The oldest row of each duplicate group survives; committed change actions that
+-- reference a removed duplicate are re-pointed at the survivor so undo stays consistent.
+
+CREATE TEMP TABLE link_dedupe_map AS
+SELECT duplicate_id, survivor_id
+FROM (
+  SELECT
+    id AS duplicate_id,
+    FIRST_VALUE(id) OVER (
+      PARTITION BY from_type, from_id, to_type, to_id, relation
+      ORDER BY created_at ASC, id ASC
+    ) AS survivor_id
+  FROM links
+) ranked
+WHERE duplicate_id <> survivor_id;
+
+UPDATE change_actions ca
+SET apply_result_json = (
+  ca.apply_result_json::jsonb
+  || jsonb_build_object('entity_id', m.survivor_id, 'created', false, 'deduplicated_from', m.duplicate_id)
+)::json
+FROM link_dedupe_map m
+WHERE ca.action_type IN ('link_entities', 'create_link')
+  AND ca.apply_result_json->>'entity_id' = m.duplicate_id;
+
+UPDATE change_actions ca
+SET apply_result_json = jsonb_set(ca.apply_result_json::jsonb, '{before,id}', to_jsonb(m.survivor_id))::json
+FROM link_dedupe_map m
+WHERE ca.action_type = 'delete_link'
+  AND ca.apply_result_json->'before'->>'id' = m.duplicate_id;
+
+UPDATE change_actions ca
+SET apply_result_json = jsonb_set(
+  ca.apply_result_json::jsonb,
+  '{before_links}',
+  COALESCE(
+    (
+      SELECT jsonb_agg(deduped.item)
+      FROM (
+        SELECT DISTINCT ON (COALESCE(m.survivor_id, elem->>'id'))
+          CASE
+            WHEN m.survivor_id IS NULL THEN elem
+            ELSE jsonb_set(elem, '{id}', to_jsonb(m.survivor_id))
+          END AS item
+        FROM jsonb_array_elements(ca.apply_result_json::jsonb->'before_links') elem
+        LEFT JOIN link_dedupe_map m ON m.duplicate_id = elem->>'id'
+      ) deduped
+    ),
+    '[]'::jsonb
+  )
+)::json
+WHERE ca.action_type = 'delete_knowledge'
+  AND jsonb_typeof(ca.apply_result_json::jsonb->'before_links') = 'array'
+  AND EXISTS (
+    SELECT 1
+    FROM jsonb_array_elements(ca.apply_result_json::jsonb->'before_links') elem
+    JOIN link_dedupe_map m ON m.duplicate_id = elem->>'id'
+  );
+
+DELETE FROM links l
+USING link_dedupe_map m
+WHERE l.id = m.duplicate_id;
+
+DROP TABLE link_dedupe_map;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_links_edge
+ON links (from_type, from_id, relation, to_type, to_id);
+
+-- uq_links_edge leads with (from_type, from_id) and supersedes the plain forward index.
+DROP INDEX IF EXISTS ix_links_from;
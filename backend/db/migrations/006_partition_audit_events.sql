@@ -0,0 +1,51 @@
+-- Monthly RANGE partitions for audit_events (Postgres).
+-- Partitions run from the oldest stored event up to two months ahead; anything
+-- outside that window lands in audit_events_default until its month is created.
+-- Old months are archived with: ALTER TABLE audit_events DETACH PARTITION audit_events_pYYYYMM;
+
+DO $$
+DECLARE
+  month_start DATE;
+  last_month DATE := (date_trunc('month', NOW() AT TIME ZONE 'UTC') + INTERVAL '2 months')::date;
+  is_plain BOOLEAN;
+BEGIN
+  SELECT c.relkind = 'r' INTO is_plain
+  FROM pg_class c
+  JOIN pg_namespace n ON n.oid = c.relnamespace
+  WHERE n.nspname = current_schema() AND c.relname = 'audit_events';
+
+  IF is_plain THEN
+    ALTER TABLE audit_events RENAME TO audit_events_unpartitioned;
+    ALTER INDEX IF EXISTS audit_events_pkey RENAME TO audit_events_unpartitioned_pkey;
+    CREATE TABLE audit_events (
+      LIKE audit_events_unpartitioned INCLUDING DEFAULTS,
+      PRIMARY KEY (id, occurred_at)
+    ) PARTITION BY RANGE (occurred_at);
+    SELECT COALESCE(date_trunc('month', MIN(occurred_at) AT TIME ZONE 'UTC')::date,
+                    date_trunc('month', NOW() AT TIME ZONE 'UTC')::date)
+      INTO month_start
+      FROM audit_events_unpartitioned;
+  ELSE
+    month_start := date_trunc('month', NOW() AT TIME ZONE 'UTC')::date;
+  END IF;
+
+  CREATE TABLE IF NOT EXISTS audit_events_default PARTITION OF audit_events DEFAULT;
+
+  WHILE month_start <= last_month LOOP
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_events FOR VALUES FROM (%L) TO (%L)',
+      'audit_events_p' || to_char(month_start, 'YYYYMM'),
+      month_start::text || ' 00:00:00+00',
+      (month_start + INTERVAL '1 month')::date::text || ' 00:00:00+00'
+    );
+    month_start := (month_start + INTERVAL '1 month')::date;
+  END LOOP;
+
+  IF is_plain THEN
+    INSERT INTO audit_events SELECT * FROM audit_events_unpartitioned;
+    DROP TABLE audit_events_unpartitioned;
+  END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS ix_audit_events_occurred_at ON audit_events (occurred_at);
+CREATE INDEX IF NOT EXISTS ix_audit_events_target ON audit_events (target_type, target_id, occurred_at);
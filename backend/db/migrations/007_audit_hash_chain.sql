@@ -0,0 +1,16 @@
+-- Hash-chained audit events.
+-- chain_seq is a gap-free counter reserved from audit_chain_heads at write time;
+-- chain_hash = sha256(previous chain_hash || canonical event JSON). Events written
+-- before this migration keep NULL chain columns and are skipped by the verifier.
+-- Verify with: python3 scripts/audit_verify.py [--since ISO] [--until ISO] [--workers N]
+
+ALTER TABLE audit_events ADD COLUMN IF NOT EXISTS chain_seq BIGINT;
+ALTER TABLE audit_events ADD COLUMN IF NOT EXISTS chain_hash VARCHAR(64);
+CREATE INDEX IF NOT EXISTS ix_audit_events_chain_seq ON audit_events (chain_seq);
+
+CREATE TABLE IF NOT EXISTS audit_chain_heads (
+  name VARCHAR(40) PRIMARY KEY,
+  last_seq BIGINT NOT NULL DEFAULT 0,
+  last_hash VARCHAR(64) NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
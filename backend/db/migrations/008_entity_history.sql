@@ -0,0 +1,32 @@
+-- Per-entity timeline index over audit_events.
+-- One row per audit event whose target is a concrete entity; commit_id/action_id point
+-- at the change-set commit (or revert commit) and change_action that produced it.
+
+CREATE TABLE IF NOT EXISTS entity_history (
+  audit_id VARCHAR(40) PRIMARY KEY,
+  entity_type VARCHAR(40) NOT NULL,
+  entity_id VARCHAR(40) NOT NULL,
+  occurred_at TIMESTAMPTZ NOT NULL,
+  action VARCHAR(80) NOT NULL,
+  commit_id VARCHAR(40),
+  action_id VARCHAR(40)
+);
+
+CREATE INDEX IF NOT EXISTS ix_entity_history_entity
+ON entity_history (entity_type, entity_id, occurred_at);
+
+INSERT INTO entity_history (audit_id, entity_type, entity_id, occurred_at, action, commit_id, action_id)
+SELECT
+  id,
+  CASE WHEN target_type = 'knowledge' THEN 'note' ELSE target_type END,
+  target_id,
+  occurred_at,
+  action,
+  COALESCE(metadata_json->>'revert_commit_id', metadata_json->>'commit_id'),
+  metadata_json->>'action_id'
+FROM audit_events
+WHERE target_type IN (
+  'task', 'note', 'knowledge', 'inbox', 'journal', 'idea', 'route',
+  'route_node', 'route_edge', 'node_log', 'link', 'topic', 'cycle'
+)
+ON CONFLICT (audit_id) DO NOTHING;
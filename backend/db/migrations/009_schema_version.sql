@@ -0,0 +1,10 @@
+-- Numbered runtime migrations.
+-- The backend now records applied steps here and only probes MAX(version) on boot;
+-- pending steps run once, inside one transaction, under pg_advisory_xact_lock.
+-- Apply manually with: python3 scripts/migrate.py up
+
+CREATE TABLE IF NOT EXISTS schema_version (
+  version INTEGER PRIMARY KEY,
+  name VARCHAR(80) NOT NULL,
+  applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
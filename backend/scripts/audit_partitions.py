@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+# Make `src` importable when running `python3 scripts/audit_partitions.py`.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from src.audit_partitions import (
+    DEFAULT_MONTHS_AHEAD,
+    detach_audit_partition,
+    ensure_audit_partitions,
+    list_audit_partitions,
+)
+from src.config import settings
+from src.db import build_engine
+
+
+def _parse_month(value: str) -> date:
+    try:
+        year, month = value.split("-", 1)
+        return date(int(year), int(month), 1)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}") from exc
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain monthly audit_events partitions.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ensure_parser = subparsers.add_parser("ensure", help="create partitions up to N months ahead (Postgres)")
+    ensure_parser.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD)
+
+    list_parser = subparsers.add_parser("list", help="list monthly partitions / SQLite archive files")
+    list_parser.add_argument("--archive-dir", type=Path, default=None)
+
+    detach_parser = subparsers.add_parser("detach", help="detach (Postgres) or archive (SQLite) the oldest month")
+    detach_parser.add_argument("month", type=_parse_month, help="YYYY-MM")
+    detach_parser.add_argument("--archive-dir", type=Path, default=None)
+
+    args = parser.parse_args(argv)
+    engine = build_engine(settings.database_url)
+
+    if args.command == "ensure":
+        with engine.begin() as conn:
+            created = ensure_audit_partitions(conn, months_ahead=args.months_ahead)
+        print(f"created_partitions={len(created)}")
+        for name in created:
+            print(name)
+        return 0
+
+    if args.command == "list":
+        with engine.connect() as conn:
+            for name in list_audit_partitions(conn, archive_dir=args.archive_dir):
+                print(name)
+        return 0
+
+    try:
+        name = detach_audit_partition(engine, args.month, archive_dir=args.archive_dir)
+    except ValueError as exc:
+        print(f"error={exc}", file=sys.stderr)
+        return 1
+    print(f"detached_partition={name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
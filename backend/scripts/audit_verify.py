@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Make `src` importable when running `python3 scripts/audit_verify.py`.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from src.audit_chain import verify_chain
+from src.config import settings
+
+
+def _parse_time(value: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"expected ISO timestamp, got {value!r}") from exc
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Verify the audit_events hash chain.")
+    parser.add_argument("--since", type=_parse_time, default=None, help="only events at/after this time")
+    parser.add_argument("--until", type=_parse_time, default=None, help="only events before this time")
+    parser.add_argument("--workers", type=int, default=1, help="parallel worker processes")
+    parser.add_argument("--batch-size", type=int, default=2000, help="rows fetched per round trip")
+    args = parser.parse_args(argv)
+
+    result = verify_chain(
+        settings.database_url,
+        since=args.since,
+        until=args.until,
+        workers=max(1, args.workers),
+        batch_size=max(1, args.batch_size),
+    )
+    print(f"range={result.first_seq}..{result.last_seq}")
+    print(f"checked={result.checked}")
+    print(f"anchored={str(result.anchored).lower()}")
+    if not result.ok:
+        print(f"broken_seq={result.broken_seq}", file=sys.stderr)
+        print(f"reason={result.reason}", file=sys.stderr)
+        return 1
+    print("ok=true")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter per sample so every import and engine build is cold.
+_CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import src.app as app_module
+t_import = time.perf_counter()
+app = app_module.app
+t_app = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app)
+assert client.get("/health").status_code == 200
+t_health = time.perf_counter()
+assert client.get("/api/v1/topics").status_code == 200
+t_db = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t_import - t0) * 1000,
+    "create_app_ms": (t_app - t_import) * 1000,
+    "first_health_ms": (t_health - t0) * 1000,
+    "first_db_request_ms": (t_db - t_health) * 1000,
+}))
+"""
+
+
+def _sample(env: dict[str, str]) -> dict[str, float]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_to_health_ms"] = (time.perf_counter() - started) * 1000 - result["first_db_request_ms"]
+    return result
+
+
+def _profile_imports(env: dict[str, str], top: int) -> list[tuple[str, int]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app; src.app.app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|", 2)
+        rows.append((name.strip(), int(cumulative)))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark backend cold start to the first /health response.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="defaults to the configured AFKMS database")
+    parser.add_argument("--profile-imports", type=int, default=0, metavar="N", help="print the N slowest imports")
+    parser.add_argument("--output", type=Path, default=None, help="write the summary as JSON for tracking")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    if args.database_url:
+        env["AFKMS_DATABASE_URL"] = args.database_url
+
+    samples = [_sample(env) for _ in range(max(1, args.runs))]
+    summary = {}
+    for key in samples[0]:
+        values = sorted(sample[key] for sample in samples)
+        summary[key] = {"median": round(statistics.median(values), 1), "max": round(values[-1], 1)}
+    for key, stats in summary.items():
+        print(f"{key}: median={stats['median']}ms max={stats['max']}ms")
+
+    if args.profile_imports:
+        print("slowest imports (cumulative us):")
+        for name, cumulative in _profile_imports(env, args.profile_imports):
+            print(f"  {cumulative:>9}  {name}")
+
+    if args.output:
+        args.output.write_text(json.dumps({"runs": len(samples), "summary": summary}, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse, PlainTextResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from src.middleware.auth import ApiKeyAuthMiddleware  # noqa: E402
+from src.middleware.error_handler import RequestIdMiddleware  # noqa: E402
+
+API_KEY = "bench-secret"
+
+
+# The BaseHTTPMiddleware implementations these replaced, kept here as the "before" baseline.
+class _LegacyRequestIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request.state.request_id = f"req_{uuid.uuid4().hex[:12]}"
+        return await call_next(request)
+
+
+class _LegacyApiKeyAuthMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, api_key: str):
+        super().__init__(app)
+        self.api_key = api_key
+
+    async def dispatch(self, request: Request, call_next):
+        if not getattr(request.state, "request_id", ""):
+            request.state.request_id = f"req_{uuid.uuid4().hex[:12]}"
+        if not request.url.path.startswith("/api/v1") or request.method == "OPTIONS":
+            return await call_next(request)
+        if request.headers.get("Authorization", "") != f"Bearer {self.api_key}":
+            return JSONResponse(status_code=401, content={"error": {"code": "UNAUTHORIZED"}})
+        return await call_next(request)
+
+
+def _build(stack: str):
+    async def ping(request: Request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/api/v1/ping", ping)])
+    if stack == "base_http":
+        app.add_middleware(_LegacyRequestIdMiddleware)
+        app.add_middleware(_LegacyApiKeyAuthMiddleware, api_key=API_KEY)
+    elif stack == "asgi":
+        app.add_middleware(RequestIdMiddleware)
+        app.add_middleware(ApiKeyAuthMiddleware, api_key=API_KEY)
+    return app
+
+
+async def _call(app) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/ping",
+        "raw_path": b"/api/v1/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {API_KEY}".encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"unexpected status {message['status']}")
+
+    await app(scope, receive, send)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+async def _measure(stack: str, requests: int, warmup: int) -> dict[str, float]:
+    app = _build(stack)
+    for _ in range(warmup):
+        await _call(app)
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await _call(app)
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    samples.sort()
+    return {
+        "p50_us": round(_percentile(samples, 50), 1),
+        "p99_us": round(_percentile(samples, 99), 1),
+        "mean_us": round(sum(samples) / len(samples), 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure per-request overhead of the request-id/auth middleware.")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=1000)
+    parser.add_argument("--output", type=Path, default=None, help="write the results as JSON for tracking")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for stack in ("none", "base_http", "asgi"):
+        results[stack] = asyncio.run(_measure(stack, max(1, args.requests), max(0, args.warmup)))
+        stats = results[stack]
+        print(f"{stack:>9}: p50={stats['p50_us']}us p99={stats['p99_us']}us mean={stats['mean_us']}us")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
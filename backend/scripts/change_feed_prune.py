@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Make `src` importable when running `python3 scripts/change_feed_prune.py`.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from src.change_feed import prune_change_feed
+from src.config import settings
+from src.db import build_engine, ensure_runtime_schema
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Delete change feed entries older than the retention window (run daily from cron)."
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=settings.change_feed_retention_days,
+        help="retention window in days (default: AFKMS_CHANGE_FEED_RETENTION_DAYS)",
+    )
+    args = parser.parse_args(argv)
+    if args.days < 1:
+        parser.error("--days must be >= 1")
+
+    engine = build_engine(settings.database_url)
+    ensure_runtime_schema(engine)
+    older_than = datetime.now(timezone.utc) - timedelta(days=args.days)
+    with engine.begin() as conn:
+        pruned = prune_change_feed(conn, older_than=older_than)
+    print(f"older_than={older_than.isoformat()}")
+    print(f"pruned={pruned}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -14,12 +14,12 @@ if str(BACKEND_DIR) not in sys.path:
 from src.config import settings
 from src.db import build_engine, build_session_local
 from src.models import (
+    EntityLog,
     Idea,
     InboxItem,
     Journal,
     JournalItem,
     Link,
-    NodeLog,
     Note,
     NoteSource,
     Route,
@@ -141,8 +141,11 @@ def main():
 
             if test_route_node_ids:
                 deleted_node_logs = (
-                    db.query(NodeLog)
-                    .filter(NodeLog.node_id.in_(sorted(test_route_node_ids)))
+                    db.query(EntityLog)
+                    .filter(
+                        EntityLog.entity_type == "route_node",
+                        EntityLog.entity_id.in_(sorted(test_route_node_ids)),
+                    )
                     .delete(synchronize_session=False)
                 )
 
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_PATHS = (
+    "/api/v1/context/bundle?intent=load",
+    "/api/v1/notes/search?page_size=20",
+    "/api/v1/audit/events?page_size=20",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(mode: str, port: int, env: dict[str, str]) -> subprocess.Popen:
+    env = dict(env, AFKMS_DB_ASYNC="true" if mode == "async" else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+def _wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not become ready")
+
+
+async def _client_loop(client: httpx.AsyncClient, paths: list[str], offset: int, stop_at: float, out: dict) -> None:
+    index = offset
+    while time.monotonic() < stop_at:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        out["latencies"].append((time.perf_counter() - started) * 1000)
+        if not ok:
+            out["errors"] += 1
+
+
+async def _drive(base_url: str, paths: list[str], concurrency: int, duration: float, headers: dict) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    out: dict = {"latencies": [], "errors": 0}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0, headers=headers) as client:
+        # One warm-up request per path so engine/schema setup is not counted.
+        for path in paths:
+            await client.get(path)
+        stop_at = time.monotonic() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(_client_loop(client, paths, i, stop_at, out) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies = sorted(out["latencies"])
+    count = len(latencies)
+
+    def pct(value: float) -> float:
+        return round(latencies[min(count - 1, int(value / 100 * count))], 1) if count else 0.0
+
+    return {
+        "requests": count,
+        "errors": out["errors"],
+        "rps": round(count / elapsed, 1),
+        "p50_ms": pct(50),
+        "p99_ms": pct(99),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare sync and async DB handlers under concurrent load.")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load per mode")
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--path", action="append", default=None, help="GET path to hit (repeatable)")
+    parser.add_argument("--database-url", default=None, help="defaults to the configured AFKMS database")
+    parser.add_argument("--output", type=Path, default=None, help="write the results as JSON for tracking")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    if args.database_url:
+        env["AFKMS_DATABASE_URL"] = args.database_url
+    headers = {}
+    if env.get("KMS_API_KEY"):
+        headers["Authorization"] = f"Bearer {env['KMS_API_KEY']}"
+    paths = args.path or list(DEFAULT_PATHS)
+    modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+
+    results = {}
+    for mode in modes:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = _start_server(mode, port, env)
+        try:
+            _wait_ready(base_url)
+            results[mode] = asyncio.run(_drive(base_url, paths, max(1, args.concurrency), args.duration, headers))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+        stats = results[mode]
+        print(
+            f"{mode:>5}: {stats['rps']} req/s p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms "
+            f"errors={stats['errors']}/{stats['requests']}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
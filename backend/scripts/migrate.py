@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Make `src` importable when running `python3 scripts/migrate.py`.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from src.config import settings
+from src.db import (
+    LATEST_SCHEMA_VERSION,
+    MIGRATIONS,
+    build_engine,
+    current_schema_version,
+    migrate_schema,
+    reapply_migration,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or apply numbered schema migrations.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="print the current and latest schema version")
+    subparsers.add_parser("up", help="apply pending migrations under the schema lock")
+    reapply_parser = subparsers.add_parser("reapply", help="re-run one (idempotent) migration")
+    reapply_parser.add_argument("version", type=int)
+
+    args = parser.parse_args(argv)
+    engine = build_engine(settings.database_url)
+
+    if args.command == "status":
+        with engine.connect() as conn:
+            current = current_schema_version(conn)
+        print(f"current_version={current}")
+        print(f"latest_version={LATEST_SCHEMA_VERSION}")
+        for version, name, _ in MIGRATIONS:
+            state = "applied" if version <= current else "pending"
+            print(f"{version:04d} {name} {state}")
+        return 0
+
+    if args.command == "up":
+        applied = migrate_schema(engine)
+        print(f"applied={','.join(str(version) for version in applied) or 'none'}")
+        return 0
+
+    try:
+        reapply_migration(engine, args.version)
+    except ValueError as exc:
+        print(f"error={exc}", file=sys.stderr)
+        return 1
+    print(f"reapplied={args.version}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
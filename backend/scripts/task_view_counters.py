@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Make `src` importable when running `python3 scripts/task_view_counters.py`.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.db import build_engine, ensure_runtime_schema
+from src.task_views import VIEWS, aggregate_summary, counter_summary, rebuild_counters, roll_over, utc_today
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Roll the task view counters over to today (run from cron just after 00:00 UTC)."
+    )
+    parser.add_argument("--force", action="store_true", help="rebuild even if already rolled over today")
+    parser.add_argument("--check", action="store_true", help="compare counters with a live count; exit 1 on drift")
+    args = parser.parse_args(argv)
+
+    engine = build_engine(settings.database_url)
+    ensure_runtime_schema(engine)
+    today = utc_today()
+    with engine.begin() as conn:
+        if args.force:
+            rebuild_counters(conn, today=today)
+            rebuilt = True
+        else:
+            rebuilt = roll_over(conn, today=today)
+    print(f"as_of={today.isoformat()}")
+    print(f"rebuilt={str(rebuilt).lower()}")
+    if not args.check:
+        return 0
+
+    with Session(engine) as db:
+        live = aggregate_summary(db, today=today)
+        counted = counter_summary(db)
+    drift = {view: counted[view] - live[view] for view in VIEWS if counted[view] != live[view]}
+    for view, delta in drift.items():
+        print(f"drift_{view}={delta:+d}", file=sys.stderr)
+    print(f"ok={str(not drift).lower()}")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
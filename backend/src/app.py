@@ -1,47 +1,182 @@
 from __future__ import annotations
 
+import importlib
+import threading
+from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.cache import cache_report, install_write_tracking
 from src.config import settings
-from src.db import Base, build_engine, build_session_local, ensure_runtime_schema, get_db
+from src.db import (
+    build_async_engine,
+    build_async_session_local,
+    build_engine,
+    build_session_local,
+    ensure_runtime_schema,
+    get_async_db,
+    get_db,
+)
+from src.db_metrics import DatabaseTelemetry, install_telemetry, telemetry_report
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from src.metrics import MetricsMiddleware, render_metrics
 from src.middleware.auth import ApiKeyAuthMiddleware
-from src.middleware.error_handler import RequestIdMiddleware, install_error_handlers
-from src.routes.audit import build_router as build_audit_router
-from src.routes.changes import build_router as build_changes_router
-from src.routes.context import build_router as build_context_router
-from src.routes.cycles import build_router as build_cycles_router
-from src.routes.ideas import build_router as build_ideas_router
-from src.routes.inbox import build_router as build_inbox_router
-from src.routes.journals import build_router as build_journals_router
-from src.routes.knowledge import build_router as build_knowledge_router
-from src.routes.links import build_router as build_links_router
-from src.routes.notes import build_router as build_notes_router
-from src.routes.routes import build_router as build_routes_router
-from src.routes.tasks import build_router as build_tasks_router
-from src.routes.topics import build_router as build_topics_router
-
-
-def _build_runtime(database_url: str):
-    engine = build_engine(database_url)
-    session_local = build_session_local(engine)
-    Base.metadata.create_all(bind=engine)
-    ensure_runtime_schema(engine)
-    return engine, session_local
+from src.middleware.error_handler import REQUEST_ID_HEADER, RequestIdMiddleware, install_error_handlers
+
+# Routers (and the schemas/services they pull in) are imported inside create_app, and the
+# module-level `app` is only built when first accessed, so `import src.app` stays cheap.
+_ROUTER_MODULES = (
+    "tasks",
+    "topics",
+    "cycles",
+    "journals",
+    "knowledge",
+    "inbox",
+    "notes",
+    "links",
+    "ideas",
+    "routes",
+    "changes",
+    "context",
+    "audit",
+    # Registered last: the generic /api/v1/{entity}/{id}/history path must not shadow domain routes.
+    "history",
+)
+# Routers whose read-heavy endpoints have async handlers when AFKMS_DB_ASYNC is on.
+_ASYNC_READ_ROUTERS = {"notes", "routes", "context", "audit"}
+
+
+class Runtime:
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self._lock = threading.Lock()
+        self._engine = None
+        self._session_local = None
+        self._async_engine = None
+        self._async_session_local = None
+        self.telemetry = DatabaseTelemetry()
+        self.async_telemetry = DatabaseTelemetry()
+
+    @property
+    def ready(self) -> bool:
+        return self._engine is not None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine = build_engine(self.database_url)
+                    ensure_runtime_schema(engine)
+                    install_telemetry(engine, self.telemetry)
+                    install_write_tracking(engine)
+                    self._session_local = build_session_local(engine)
+                    self._engine = engine
+        return self._engine
+
+    @property
+    def session_local(self):
+        if self._session_local is None:
+            self.engine
+        return self._session_local
+
+    @property
+    def async_session_local(self):
+        if self._async_session_local is None:
+            # The schema check runs once on the sync engine before any async session is handed out.
+            self.engine
+            with self._lock:
+                if self._async_session_local is None:
+                    self._async_engine = build_async_engine(self.database_url)
+                    install_telemetry(self._async_engine, self.async_telemetry)
+                    install_write_tracking(self._async_engine)
+                    self._async_session_local = build_async_session_local(self._async_engine)
+        return self._async_session_local
+
+    def engines(self) -> list[tuple[str, object, DatabaseTelemetry]]:
+        # Only what has been built so far; reporting never opens the database.
+        built = []
+        if self._engine is not None:
+            built.append(("sync", self._engine, self.telemetry))
+        if self._async_engine is not None:
+            built.append(("async", self._async_engine, self.async_telemetry))
+        return built
+
+    def details(self) -> dict:
+        if not self.ready:
+            return {"ready": False}
+        details = {"ready": True, "dialect": self._engine.dialect.name}
+        for kind, engine, telemetry in self.engines():
+            details[kind] = telemetry_report(engine, telemetry)
+        return details
+
+
+_runtimes: dict[str, Runtime] = {}
+_runtimes_lock = threading.Lock()
+
+
+def get_runtime(database_url: str) -> Runtime:
+    with _runtimes_lock:
+        runtime = _runtimes.get(database_url)
+        if runtime is None:
+            runtime = Runtime(database_url)
+            _runtimes[database_url] = runtime
+        return runtime
+
+
+def _build_audit_writer(engine, spool_path: Optional[Path]):
+    from src.services.audit_writer import BufferedAuditWriter, register_audit_writer
+
+    writer = BufferedAuditWriter(
+        engine,
+        batch_size=settings.audit_batch_size,
+        flush_interval_ms=settings.audit_flush_ms,
+        spool_path=spool_path,
+    )
+    register_audit_writer(engine, writer)
+    return writer
 
 
 def create_app(
-    database_url: Optional[str] = None, require_auth: bool = False, api_key: Optional[str] = None
+    database_url: Optional[str] = None,
+    require_auth: bool = False,
+    api_key: Optional[str] = None,
+    audit_mode: Optional[str] = None,
+    audit_spool_path: Optional[Path] = None,
+    db_async: Optional[bool] = None,
+    query_debug: Optional[bool] = None,
 ) -> FastAPI:
-    runtime_db_url = database_url or settings.database_url
-    _, session_local = _build_runtime(runtime_db_url)
+    runtime = get_runtime(database_url or settings.database_url)
+    use_async = settings.db_async if db_async is None else db_async
+    resolved_audit_mode = (audit_mode or settings.audit_mode).strip().lower()
+    if resolved_audit_mode not in {"sync", "buffered"}:
+        raise ValueError(
+            f"unsupported AFKMS_AUDIT_MODE value: {resolved_audit_mode!r}; expected 'sync' or 'buffered'"
+        )
 
     def get_db_dep():
-        yield from get_db(session_local)
+        # The engine and schema check are built on the first request that needs a session.
+        yield from get_db(runtime.session_local)
+
+    async def get_async_db_dep():
+        async for db in get_async_db(runtime.async_session_local):
+            yield db
 
     app = FastAPI(title="MemLineage Backend")
+    app.state.runtime = runtime
+    app.state.audit_writer = None
+    # The runtime is shared per URL, so the most recent create_app call decides the audit mode.
+    from src.services.audit_writer import unregister_audit_writer
+
+    if resolved_audit_mode == "buffered":
+        engine = runtime.engine
+        writer = _build_audit_writer(engine, audit_spool_path or settings.audit_spool_file)
+        app.state.audit_writer = writer
+        app.add_event_handler("shutdown", lambda: unregister_audit_writer(engine))
+    elif runtime.ready:
+        unregister_audit_writer(runtime.engine)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=[
@@ -53,6 +188,7 @@ def create_app(
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[REQUEST_ID_HEADER],
     )
     app.add_middleware(RequestIdMiddleware)
     if require_auth:
@@ -60,26 +196,44 @@ def create_app(
         if not resolved_api_key:
             raise RuntimeError("KMS_API_KEY must be set when AFKMS_REQUIRE_AUTH=true")
         app.add_middleware(ApiKeyAuthMiddleware, api_key=resolved_api_key)
+    # Outermost, so rejected and failed requests are timed too.
+    app.add_middleware(
+        MetricsMiddleware,
+        query_debug=settings.query_debug if query_debug is None else query_debug,
+        repeat_threshold=settings.query_repeat_threshold,
+    )
     install_error_handlers(app)
-    app.include_router(build_tasks_router(get_db_dep))
-    app.include_router(build_topics_router(get_db_dep))
-    app.include_router(build_cycles_router(get_db_dep))
-    app.include_router(build_journals_router(get_db_dep))
-    app.include_router(build_knowledge_router(get_db_dep))
-    app.include_router(build_inbox_router(get_db_dep))
-    app.include_router(build_notes_router(get_db_dep))
-    app.include_router(build_links_router(get_db_dep))
-    app.include_router(build_ideas_router(get_db_dep))
-    app.include_router(build_routes_router(get_db_dep))
-    app.include_router(build_changes_router(get_db_dep))
-    app.include_router(build_context_router(get_db_dep))
-    app.include_router(build_audit_router(get_db_dep))
+    for name in _ROUTER_MODULES:
+        module = importlib.import_module(f"src.routes.{name}")
+        if use_async and name in _ASYNC_READ_ROUTERS:
+            app.include_router(module.build_router(get_db_dep, get_async_db_dep=get_async_db_dep))
+        else:
+            app.include_router(module.build_router(get_db_dep))
 
     @app.get("/health")
     def health():
         return {"ok": True}
 
+    @app.get("/health/details")
+    def health_details():
+        # Reports on whatever the runtime has built so far; it never opens the database itself.
+        return {"ok": True, "database": runtime.details(), "caches": cache_report()}
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(render_metrics(runtime), media_type=METRICS_CONTENT_TYPE)
+
     return app
 
 
-app = create_app(require_auth=settings.require_auth, api_key=settings.kms_api_key)
+_default_app: Optional[FastAPI] = None
+
+
+def __getattr__(name: str):
+    # `uvicorn src.app:app` resolves this on first access instead of at import time.
+    global _default_app
+    if name == "app":
+        if _default_app is None:
+            _default_app = create_app(require_auth=settings.require_auth, api_key=settings.kms_api_key)
+        return _default_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
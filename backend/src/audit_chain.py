@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import func, inspect, insert, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from src.db import build_engine
+from src.models import (
+    AuditEvent,
+    Cycle,
+    EntityLog,
+    Idea,
+    InboxItem,
+    Journal,
+    Link,
+    Note,
+    Route,
+    RouteEdge,
+    RouteNode,
+    Task,
+    Topic,
+)
+
+# Every audit event carries chain_seq (a gap-free counter reserved from the
+# audit_chain_heads row) and chain_hash = sha256(previous chain_hash + event digest).
+# after_hash is a content hash of the target row as of the event; before_hash is the
+# previous event's after_hash for the same target, so neither requires rescanning tables.
+
+CHAIN_NAME = "audit_events"
+GENESIS_HASH = "0" * 64
+
+TARGET_MODELS = {
+    "task": Task,
+    "note": Note,
+    "knowledge": Note,
+    "inbox": InboxItem,
+    "journal": Journal,
+    "idea": Idea,
+    "route": Route,
+    "route_node": RouteNode,
+    "route_edge": RouteEdge,
+    "node_log": EntityLog,
+    "link": Link,
+    "topic": Topic,
+    "cycle": Cycle,
+}
+
+CHAINED_FIELDS = (
+    "id",
+    "chain_seq",
+    "occurred_at",
+    "actor_type",
+    "actor_id",
+    "tool",
+    "action",
+    "target_type",
+    "target_id",
+    "source_refs_json",
+    "before_hash",
+    "after_hash",
+    "metadata_json",
+)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"unsupported value in audit hash: {type(value).__name__}")
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_normalize).encode(
+        "utf-8"
+    )
+
+
+def content_hash(state: dict) -> str:
+    return hashlib.sha256(_canonical(state)).hexdigest()
+
+
+def target_state_hash(db: Session, target_type: str, target_id: str) -> Optional[str]:
+    model = TARGET_MODELS.get(target_type)
+    if model is None:
+        return None
+    entity = db.get(model, target_id)
+    if entity is None:
+        return None
+    state = {attr.key: getattr(entity, attr.key) for attr in inspect(entity).mapper.column_attrs}
+    return content_hash(state)
+
+
+def chain_hash(previous_hash: str, row: Any) -> str:
+    if isinstance(row, dict):
+        payload = {name: row.get(name) for name in CHAINED_FIELDS}
+    else:
+        payload = {name: getattr(row, name) for name in CHAINED_FIELDS}
+    digest = hashlib.sha256(previous_hash.encode("ascii"))
+    digest.update(_canonical(payload))
+    return digest.hexdigest()
+
+
+def reserve_sequence(conn, count: int) -> tuple[int, str]:
+    params = {"name": CHAIN_NAME, "count": count}
+    bump = text("UPDATE audit_chain_heads SET last_seq = last_seq + :count WHERE name = :name")
+    # The UPDATE takes the row lock first, so concurrent writers queue here instead of forking the chain.
+    if conn.execute(bump, params).rowcount == 0:
+        conn.execute(
+            text(
+                """
+                INSERT INTO audit_chain_heads (name, last_seq, last_hash)
+                VALUES (:name, 0, :genesis)
+                ON CONFLICT (name) DO NOTHING
+                """
+            ),
+            {"name": CHAIN_NAME, "genesis": GENESIS_HASH},
+        )
+        conn.execute(bump, params)
+    last_seq, last_hash = conn.execute(
+        text("SELECT last_seq, last_hash FROM audit_chain_heads WHERE name = :name"), {"name": CHAIN_NAME}
+    ).one()
+    return last_seq - count + 1, last_hash
+
+
+def _previous_after_hashes(conn, keys: list[tuple[str, str]]) -> dict[tuple[str, str], Optional[str]]:
+    # Latest chained after_hash per target, for every target of a batch in one statement.
+    if not keys:
+        return {}
+    ranked = (
+        select(
+            AuditEvent.target_type,
+            AuditEvent.target_id,
+            AuditEvent.after_hash,
+            func.row_number()
+            .over(
+                partition_by=(AuditEvent.target_type, AuditEvent.target_id),
+                order_by=AuditEvent.chain_seq.desc(),
+            )
+            .label("position"),
+        )
+        .where(
+            tuple_(AuditEvent.target_type, AuditEvent.target_id).in_(keys),
+            AuditEvent.chain_seq.is_not(None),
+        )
+        .subquery()
+    )
+    rows = conn.execute(
+        select(ranked.c.target_type, ranked.c.target_id, ranked.c.after_hash).where(ranked.c.position == 1)
+    )
+    return {(target_type, target_id): after_hash for target_type, target_id, after_hash in rows}
+
+
+def append_audit_events(conn, rows: list[dict], *, skip_existing: bool = False) -> list[dict]:
+    if skip_existing and rows:
+        existing = set(conn.scalars(select(AuditEvent.id).where(AuditEvent.id.in_([row["id"] for row in rows]))))
+        rows = [row for row in rows if row["id"] not in existing]
+    if not rows:
+        return []
+
+    first_seq, previous = reserve_sequence(conn, len(rows))
+    # Looked up after the reservation: holding the head row means no other writer can chain an
+    # event for these targets in between.
+    unresolved = {(row["target_type"], row["target_id"]) for row in rows if row.get("before_hash") is None}
+    latest_after: dict[tuple[str, str], Optional[str]] = _previous_after_hashes(conn, sorted(unresolved))
+    chained: list[dict] = []
+    for offset, row in enumerate(rows):
+        row = dict(row)
+        if isinstance(row.get("occurred_at"), str):
+            row["occurred_at"] = datetime.fromisoformat(row["occurred_at"])
+        elif row.get("occurred_at") is None:
+            row["occurred_at"] = datetime.now(timezone.utc)
+        key = (row["target_type"], row["target_id"])
+        if row.get("before_hash") is None:
+            row["before_hash"] = latest_after.get(key)
+        latest_after[key] = row.get("after_hash")
+        row["chain_seq"] = first_seq + offset
+        row["chain_hash"] = chain_hash(previous, row)
+        previous = row["chain_hash"]
+        chained.append(row)
+
+    conn.execute(insert(AuditEvent.__table__), chained)
+    conn.execute(
+        text("UPDATE audit_chain_heads SET last_hash = :hash WHERE name = :name"),
+        {"hash": previous, "name": CHAIN_NAME},
+    )
+    return chained
+
+
+@dataclass
+class ChainCheck:
+    first_seq: int
+    last_seq: int
+    checked: int = 0
+    ok: bool = True
+    anchored: bool = True
+    broken_seq: Optional[int] = None
+    reason: Optional[str] = None
+
+    def fail(self, seq: Optional[int], reason: str) -> "ChainCheck":
+        self.ok = False
+        self.broken_seq = seq
+        self.reason = reason
+        return self
+
+
+def verify_chain_range(conn, first_seq: int, last_seq: int, *, batch_size: int = 2000) -> ChainCheck:
+    result = ChainCheck(first_seq=first_seq, last_seq=last_seq)
+    if first_seq > last_seq:
+        return result
+    previous: Optional[str] = GENESIS_HASH
+    if first_seq > 1:
+        previous = conn.execute(
+            select(AuditEvent.chain_hash).where(AuditEvent.chain_seq == first_seq - 1)
+        ).scalar()
+        if previous is None:
+            # The predecessor was archived/detached; the first row in range becomes the anchor.
+            result.anchored = False
+
+    columns = [getattr(AuditEvent, name) for name in CHAINED_FIELDS] + [AuditEvent.chain_hash]
+    stream = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+        select(*columns)
+        .where(AuditEvent.chain_seq >= first_seq, AuditEvent.chain_seq <= last_seq)
+        .order_by(AuditEvent.chain_seq.asc())
+    )
+    expected = first_seq
+    for row in stream:
+        if row.chain_seq != expected:
+            if expected == first_seq and not result.anchored:
+                expected = row.chain_seq
+            else:
+                stream.close()
+                return result.fail(expected, "missing_event")
+        if previous is None:
+            previous = row.chain_hash
+        elif chain_hash(previous, row) != row.chain_hash:
+            stream.close()
+            return result.fail(row.chain_seq, "hash_mismatch")
+        else:
+            previous = row.chain_hash
+        result.checked += 1
+        expected += 1
+    if expected <= last_seq:
+        return result.fail(expected, "missing_event")
+    return result
+
+
+def chain_bounds(conn, since: Optional[datetime] = None, until: Optional[datetime] = None) -> tuple[int, int]:
+    stmt = select(func.min(AuditEvent.chain_seq), func.max(AuditEvent.chain_seq)).where(
+        AuditEvent.chain_seq.is_not(None)
+    )
+    if since is not None:
+        stmt = stmt.where(AuditEvent.occurred_at >= since)
+    if until is not None:
+        stmt = stmt.where(AuditEvent.occurred_at < until)
+    low, high = conn.execute(stmt).one()
+    if low is None:
+        return 1, 0
+    return int(low), int(high)
+
+
+def split_ranges(first_seq: int, last_seq: int, workers: int) -> list[tuple[int, int]]:
+    total = last_seq - first_seq + 1
+    if total <= 0:
+        return []
+    workers = max(1, min(workers, total))
+    size, extra = divmod(total, workers)
+    ranges = []
+    start = first_seq
+    for index in range(workers):
+        end = start + size - 1 + (1 if index < extra else 0)
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def _verify_worker(database_url: str, first_seq: int, last_seq: int, batch_size: int) -> ChainCheck:
+    engine = build_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            return verify_chain_range(conn, first_seq, last_seq, batch_size=batch_size)
+    finally:
+        engine.dispose()
+
+
+def verify_chain(
+    database_url: str,
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    workers: int = 1,
+    batch_size: int = 2000,
+) -> ChainCheck:
+    engine = build_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            first_seq, last_seq = chain_bounds(conn, since, until)
+            head = conn.execute(
+                text("SELECT last_seq, last_hash FROM audit_chain_heads WHERE name = :name"), {"name": CHAIN_NAME}
+            ).first()
+            tail_hash = conn.execute(select(AuditEvent.chain_hash).where(AuditEvent.chain_seq == last_seq)).scalar()
+    finally:
+        engine.dispose()
+
+    ranges = split_ranges(first_seq, last_seq, workers)
+    if len(ranges) <= 1:
+        parts = [_verify_worker(database_url, first, last, batch_size) for first, last in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [pool.submit(_verify_worker, database_url, first, last, batch_size) for first, last in ranges]
+            parts = [future.result() for future in futures]
+
+    summary = ChainCheck(first_seq=first_seq, last_seq=last_seq)
+    for index, part in enumerate(parts):
+        summary.checked += part.checked
+        if index == 0:
+            summary.anchored = part.anchored
+        if not part.ok and summary.ok:
+            summary.fail(part.broken_seq, part.reason or "hash_mismatch")
+    if summary.ok and until is None and head is not None and last_seq > 0:
+        # Rows deleted from the end of the chain leave the head ahead of the table.
+        if head.last_seq != last_seq:
+            summary.fail(last_seq + 1, "missing_tail")
+        elif head.last_hash != tail_hash:
+            summary.fail(last_seq, "head_mismatch")
+    return summary
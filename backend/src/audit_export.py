@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import gzip
+import json
+import re
+import shutil
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+# Columnar chunks are gzip-compressed JSON objects holding one array per column, so a
+# chunk of N rows costs one allocation per column instead of N dicts. The layout maps
+# 1:1 onto a Parquet row group if the files are later converted offline.
+
+COLUMNAR_FORMAT = "afkms-audit-columnar/1"
+EXPORT_ID_PATTERN = re.compile(r"aex_[0-9a-f]{12}")
+CHUNK_FILE_PATTERN = re.compile(r"chunk_[0-9]{5}\.json\.gz")
+
+EXPORT_COLUMNS = (
+    "event_id",
+    "occurred_at",
+    "actor_type",
+    "actor_id",
+    "tool",
+    "action",
+    "target_type",
+    "target_id",
+    "source_refs",
+    "before_hash",
+    "after_hash",
+    "metadata",
+    "chain_seq",
+    "chain_hash",
+)
+
+
+def audit_event_out(row: Any) -> dict:
+    return {
+        "event_id": row.id,
+        "occurred_at": row.occurred_at,
+        "actor": {"type": row.actor_type, "id": row.actor_id},
+        "tool": row.tool,
+        "action": row.action,
+        "target": {"type": row.target_type, "id": row.target_id},
+        "source_refs": row.source_refs_json,
+        "before_hash": row.before_hash,
+        "after_hash": row.after_hash,
+        "metadata": row.metadata_json,
+        "chain_seq": row.chain_seq,
+        "chain_hash": row.chain_hash,
+    }
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"unsupported export value: {type(value).__name__}")
+
+
+def iter_ndjson(rows: Iterable[Any], *, flush_rows: int = 500) -> Iterator[str]:
+    buffer: list[str] = []
+    for row in rows:
+        buffer.append(json.dumps(audit_event_out(row), default=_json_default, ensure_ascii=False))
+        if len(buffer) >= flush_rows:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _empty_columns() -> dict[str, list]:
+    return {name: [] for name in EXPORT_COLUMNS}
+
+
+def _append_row(columns: dict[str, list], row: Any) -> None:
+    columns["event_id"].append(row.id)
+    columns["occurred_at"].append(row.occurred_at)
+    columns["actor_type"].append(row.actor_type)
+    columns["actor_id"].append(row.actor_id)
+    columns["tool"].append(row.tool)
+    columns["action"].append(row.action)
+    columns["target_type"].append(row.target_type)
+    columns["target_id"].append(row.target_id)
+    columns["source_refs"].append(row.source_refs_json)
+    columns["before_hash"].append(row.before_hash)
+    columns["after_hash"].append(row.after_hash)
+    columns["metadata"].append(row.metadata_json)
+    columns["chain_seq"].append(row.chain_seq)
+    columns["chain_hash"].append(row.chain_hash)
+
+
+def _write_chunk(path: Path, columns: dict[str, list]) -> dict:
+    event_ids = columns["event_id"]
+    meta = {
+        "file": path.name,
+        "rows": len(event_ids),
+        "first_event_id": event_ids[0],
+        "last_event_id": event_ids[-1],
+    }
+    body = {"format": COLUMNAR_FORMAT, **meta, "columns": columns}
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+        json.dump(body, handle, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+    tmp_path.replace(path)
+    return meta
+
+
+def new_export_id() -> str:
+    return f"aex_{uuid.uuid4().hex[:12]}"
+
+
+def export_directory(base_dir: Path, export_id: str) -> Path:
+    # Clients only ever see the id; it is resolved against the export root here.
+    if not EXPORT_ID_PATTERN.fullmatch(export_id):
+        raise ValueError("AUDIT_EXPORT_NOT_FOUND")
+    return base_dir / export_id
+
+
+def _write_manifest(directory: Path, manifest: dict) -> None:
+    tmp_path = directory / "manifest.json.tmp"
+    tmp_path.write_text(json.dumps(manifest, default=_json_default, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(directory / "manifest.json")
+
+
+def start_columnar_export(
+    base_dir: Path, export_id: str, *, cursor: Optional[str] = None, filters: Optional[dict] = None
+) -> dict:
+    directory = export_directory(base_dir, export_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "format": COLUMNAR_FORMAT,
+        "export_id": export_id,
+        "status": "running",
+        "columns": list(EXPORT_COLUMNS),
+        "filters": filters or {},
+        "cursor": cursor,
+    }
+    _write_manifest(directory, manifest)
+    return manifest
+
+
+def write_columnar_export(
+    rows: Iterable[Any],
+    base_dir: Path,
+    export_id: str,
+    *,
+    chunk_rows: int,
+    max_rows: int,
+    cursor: Optional[str] = None,
+    filters: Optional[dict] = None,
+) -> dict:
+    # Stops after max_rows; has_more tells the client to resume from next_cursor.
+    directory = export_directory(base_dir, export_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    chunks: list[dict] = []
+    columns = _empty_columns()
+    total = 0
+    iterator = iter(rows)
+    for row in iterator:
+        _append_row(columns, row)
+        total += 1
+        if len(columns["event_id"]) >= chunk_rows:
+            chunks.append(_write_chunk(directory / f"chunk_{len(chunks):05d}.json.gz", columns))
+            columns = _empty_columns()
+        if total >= max_rows:
+            break
+    if columns["event_id"]:
+        chunks.append(_write_chunk(directory / f"chunk_{len(chunks):05d}.json.gz", columns))
+    has_more = total >= max_rows and next(iterator, None) is not None
+
+    manifest = {
+        "format": COLUMNAR_FORMAT,
+        "export_id": export_id,
+        "status": "complete",
+        "columns": list(EXPORT_COLUMNS),
+        "filters": filters or {},
+        "cursor": cursor,
+        "next_cursor": chunks[-1]["last_event_id"] if chunks else cursor,
+        "has_more": has_more,
+        "rows": total,
+        "chunks": chunks,
+    }
+    _write_manifest(directory, manifest)
+    return manifest
+
+
+def fail_columnar_export(base_dir: Path, export_id: str, manifest: dict, error: str) -> None:
+    _write_manifest(export_directory(base_dir, export_id), {**manifest, "status": "failed", "error": error})
+
+
+def read_export_manifest(base_dir: Path, export_id: str) -> dict:
+    path = export_directory(base_dir, export_id) / "manifest.json"
+    if not path.is_file():
+        raise ValueError("AUDIT_EXPORT_NOT_FOUND")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def export_chunk_path(base_dir: Path, export_id: str, file_name: str) -> Path:
+    path = export_directory(base_dir, export_id) / file_name
+    if not CHUNK_FILE_PATTERN.fullmatch(file_name) or not path.is_file():
+        raise ValueError("AUDIT_EXPORT_NOT_FOUND")
+    return path
+
+
+def prune_exports(base_dir: Path, *, max_age_s: float) -> int:
+    # Export directories are removed once their manifest is older than the TTL; a running export
+    # rewrites its manifest when it finishes, so only finished or abandoned ones age out.
+    if not base_dir.is_dir():
+        return 0
+    cutoff = time.time() - max_age_s
+    removed = 0
+    for directory in base_dir.iterdir():
+        if not directory.is_dir() or not EXPORT_ID_PATTERN.fullmatch(directory.name):
+            continue
+        manifest = directory / "manifest.json"
+        stamp = manifest.stat().st_mtime if manifest.exists() else directory.stat().st_mtime
+        if stamp < cutoff:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def read_columnar_chunk(path: Path) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        return json.load(handle)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import text
+
+# Postgres keeps audit_events as a RANGE(occurred_at) partitioned table with one
+# partition per calendar month plus a DEFAULT catch-all. SQLite has no partitioning,
+# so a "detached" month is moved into its own archive database file instead.
+
+DEFAULT_MONTHS_AHEAD = 2
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def audit_partition_name(month: date) -> str:
+    return f"audit_events_p{month.year:04d}{month.month:02d}"
+
+
+def _month_bounds(month: date) -> tuple[str, str]:
+    start = month_start(month)
+    end = add_months(start, 1)
+    return f"{start.isoformat()} 00:00:00+00", f"{end.isoformat()} 00:00:00+00"
+
+
+def partition_pg_audit_events(conn, *, months_ahead: int = DEFAULT_MONTHS_AHEAD) -> None:
+    relkind = conn.execute(
+        text(
+            """
+            SELECT c.relkind
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relname = 'audit_events'
+            """
+        )
+    ).scalar()
+    if relkind == "r":
+        # One-off conversion of the original heap table; rows are copied into monthly partitions.
+        conn.execute(text("ALTER TABLE audit_events RENAME TO audit_events_unpartitioned"))
+        conn.execute(text("ALTER INDEX IF EXISTS audit_events_pkey RENAME TO audit_events_unpartitioned_pkey"))
+        conn.execute(
+            text(
+                """
+                CREATE TABLE audit_events (
+                  LIKE audit_events_unpartitioned INCLUDING DEFAULTS,
+                  PRIMARY KEY (id, occurred_at)
+                ) PARTITION BY RANGE (occurred_at)
+                """
+            )
+        )
+        conn.execute(text("CREATE TABLE IF NOT EXISTS audit_events_default PARTITION OF audit_events DEFAULT"))
+        oldest = conn.execute(text("SELECT MIN(occurred_at) FROM audit_events_unpartitioned")).scalar()
+        ensure_audit_partitions(conn, since=oldest, months_ahead=months_ahead)
+        conn.execute(text("INSERT INTO audit_events SELECT * FROM audit_events_unpartitioned"))
+        conn.execute(text("DROP TABLE audit_events_unpartitioned"))
+    elif relkind == "p":
+        conn.execute(text("CREATE TABLE IF NOT EXISTS audit_events_default PARTITION OF audit_events DEFAULT"))
+        ensure_audit_partitions(conn, months_ahead=months_ahead)
+    else:
+        return
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_audit_events_occurred_at ON audit_events (occurred_at)"))
+    conn.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS ix_audit_events_target
+            ON audit_events (target_type, target_id, occurred_at)
+            """
+        )
+    )
+
+
+def ensure_audit_partitions(
+    conn,
+    *,
+    since: Optional[date | datetime] = None,
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+) -> list[str]:
+    if conn.dialect.name != "postgresql":
+        return []
+    current = month_start(datetime.now(timezone.utc))
+    month = month_start(since) if since is not None else current
+    last = add_months(current, months_ahead)
+    existing = set(list_audit_partitions(conn))
+    created: list[str] = []
+    while month <= last:
+        name = audit_partition_name(month)
+        if name not in existing:
+            _create_pg_partition(conn, month)
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def _create_pg_partition(conn, month: date) -> None:
+    name = audit_partition_name(month)
+    lower, upper = _month_bounds(month)
+    params = {"lower": lower, "upper": upper}
+    # Rows that landed in DEFAULT for this month would block the new partition; move them over.
+    spilled = conn.execute(
+        text(
+            """
+            SELECT 1 FROM audit_events_default
+            WHERE occurred_at >= CAST(:lower AS TIMESTAMPTZ) AND occurred_at < CAST(:upper AS TIMESTAMPTZ)
+            LIMIT 1
+            """
+        ),
+        params,
+    ).first()
+    if spilled:
+        conn.execute(
+            text(
+                """
+                CREATE TEMP TABLE audit_events_spill AS
+                SELECT * FROM audit_events_default
+                WHERE occurred_at >= CAST(:lower AS TIMESTAMPTZ) AND occurred_at < CAST(:upper AS TIMESTAMPTZ)
+                """
+            ),
+            params,
+        )
+        conn.execute(
+            text(
+                """
+                DELETE FROM audit_events_default
+                WHERE occurred_at >= CAST(:lower AS TIMESTAMPTZ) AND occurred_at < CAST(:upper AS TIMESTAMPTZ)
+                """
+            ),
+            params,
+        )
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_events "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+    )
+    if spilled:
+        conn.execute(text("INSERT INTO audit_events SELECT * FROM audit_events_spill"))
+        conn.execute(text("DROP TABLE audit_events_spill"))
+
+
+def list_audit_partitions(conn, archive_dir: Optional[Path] = None) -> list[str]:
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(
+            text(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'audit_events' AND child.relname <> 'audit_events_default'
+                ORDER BY child.relname
+                """
+            )
+        )
+        return [row[0] for row in rows]
+    directory = archive_dir or sqlite_audit_archive_dir(conn)
+    if directory is None or not directory.exists():
+        return []
+    return sorted(path.stem for path in directory.glob("audit_events_p*.sqlite3"))
+
+
+def sqlite_audit_archive_dir(conn) -> Optional[Path]:
+    for _, name, path in conn.execute(text("PRAGMA database_list")):
+        if name == "main" and path:
+            return Path(path).resolve().parent / "audit_archive"
+    return None
+
+
+def _ensure_oldest_month(conn, lower: str, upper: str) -> None:
+    # verify_chain tolerates a missing prefix of the chain, not a hole: only the oldest month may go,
+    # and none of its rows may have been chained after a row that stays behind.
+    bound = "CAST(:{} AS TIMESTAMPTZ)" if conn.dialect.name == "postgresql" else ":{}"
+    lower_sql, upper_sql = bound.format("lower"), bound.format("upper")
+    blocking = conn.execute(
+        text(
+            f"""
+            SELECT 1 FROM audit_events
+            WHERE occurred_at < {lower_sql}
+               OR (
+                 (occurred_at >= {upper_sql})
+                 AND chain_seq < (
+                   SELECT MAX(chain_seq) FROM audit_events
+                   WHERE occurred_at >= {lower_sql} AND occurred_at < {upper_sql}
+                 )
+               )
+            LIMIT 1
+            """
+        ),
+        {"lower": lower, "upper": upper},
+    ).first()
+    if blocking:
+        raise ValueError("AUDIT_PARTITION_NOT_OLDEST")
+
+
+def detach_audit_partition(engine, month: date, *, archive_dir: Optional[Path] = None) -> str:
+    month = month_start(month)
+    name = audit_partition_name(month)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            if name not in list_audit_partitions(conn):
+                raise ValueError("AUDIT_PARTITION_NOT_FOUND")
+            _ensure_oldest_month(conn, *_month_bounds(month))
+            # The detached table keeps its rows; archive it with pg_dump and drop it when done.
+            conn.execute(text(f"ALTER TABLE audit_events DETACH PARTITION {name}"))
+        return name
+
+    lower, upper = _month_bounds(month)
+    lower_naive = lower.replace("+00", "")
+    upper_naive = upper.replace("+00", "")
+    with engine.connect() as conn:
+        directory = archive_dir or sqlite_audit_archive_dir(conn)
+        if directory is None:
+            raise ValueError("AUDIT_ARCHIVE_DIR_REQUIRED")
+        directory.mkdir(parents=True, exist_ok=True)
+        archive_path = directory / f"{name}.sqlite3"
+        conn.exec_driver_sql("ATTACH DATABASE ? AS audit_archive", (str(archive_path),))
+        conn.commit()
+        try:
+            with conn.begin():
+                _ensure_oldest_month(conn, lower_naive, upper_naive)
+                conn.execute(
+                    text(
+                        """
+                        CREATE TABLE IF NOT EXISTS audit_archive.audit_events AS
+                        SELECT * FROM main.audit_events WHERE 0
+                        """
+                    )
+                )
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO audit_archive.audit_events
+                        SELECT * FROM main.audit_events
+                        WHERE occurred_at >= :lower AND occurred_at < :upper
+                        """
+                    ),
+                    {"lower": lower_naive, "upper": upper_naive},
+                )
+                conn.execute(
+                    text("DELETE FROM main.audit_events WHERE occurred_at >= :lower AND occurred_at < :upper"),
+                    {"lower": lower_naive, "upper": upper_naive},
+                )
+        finally:
+            conn.exec_driver_sql("DETACH DATABASE audit_archive")
+    return name
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import event
+
+from src.metrics import record_cache_lookup
+
+_WRITE_RE = re.compile(
+    r"^\s*(INSERT|UPDATE|DELETE|REPLACE|MERGE|UPSERT|CREATE|ALTER|DROP|TRUNCATE)\b", re.IGNORECASE
+)
+
+
+class WriteGeneration:
+    # Bumped after every committed transaction that wrote anything; read-side caches stamp
+    # entries with the generation seen before they queried and ignore entries from older ones.
+    def __init__(self) -> None:
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+write_generation = WriteGeneration()
+
+
+def install_write_tracking(engine, generation: WriteGeneration = write_generation) -> None:
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _mark_write(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+            conn.info["wrote"] = True
+        elif _WRITE_RE.match(statement):
+            conn.info["wrote"] = True
+
+    @event.listens_for(sync_engine, "rollback")
+    def _forget_on_rollback(conn):
+        conn.info.pop("wrote", None)
+
+    # The engine "commit" event fires before the DBAPI commit, when other connections still see
+    # the old rows; a reader stamping a value with a generation bumped there could cache pre-commit
+    # data under the new generation. Bump only once the DBAPI commit has returned.
+    dialect = sync_engine.dialect
+    do_commit = dialect.do_commit
+
+    def _commit_then_bump(dbapi_connection):
+        do_commit(dbapi_connection)
+        if dbapi_connection.info.pop("wrote", False):
+            generation.bump()
+
+    dialect.do_commit = _commit_then_bump
+
+
+class GenerationalLRUCache:
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        *,
+        ttl_s: float = 0,
+        generation: WriteGeneration = write_generation,
+    ):
+        self.name = name
+        self.maxsize = max(0, maxsize)
+        # The generation only sees this process's writes; the TTL bounds staleness when other
+        # workers or scripts write to the same database. 0 keeps entries until the next write.
+        self.ttl_s = max(0.0, ttl_s)
+        self.generation = generation
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[int, float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        CACHES.append(self)
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: Hashable) -> tuple[int, Optional[Any]]:
+        # Returns the generation to stamp a fresh value with, plus the cached value on a hit.
+        generation = self.generation.current()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry is not None and (not self.ttl_s or now - entry[1] < self.ttl_s)
+            if fresh and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                entry = None
+                self.misses += 1
+                hit = False
+        record_cache_lookup(self.name, hit)
+        return generation, (entry[2] if entry is not None else None)
+
+    def put(self, key: Hashable, generation: int, value: Any) -> None:
+        if generation != self.generation.current():
+            # A write committed while the value was being built; it may already be stale.
+            return
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "generation": self.generation.current(),
+        }
+
+
+CACHES: list[GenerationalLRUCache] = []
+
+
+def cache_report() -> dict:
+    return {cache.name: cache.stats() for cache in CACHES}
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, event, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from src.models import ChangeFeedEntry, ChangeFeedHead, Journal, Link, Note, Route, RouteEdge, RouteNode, Task
+
+# Every committed create/update/delete of these entities appends (seq, entity_type, entity_id)
+# to change_feed in the same transaction; readers resolve current state (or a tombstone) at read time.
+# Flushes only collect keys in session.info: the sequence is reserved (and its row lock taken) in
+# before_commit, so concurrent writers serialize on the feed only for the commit itself.
+PENDING_KEYS = "change_feed_keys"
+FEED_MODELS = {Task: "task", Note: "note", Journal: "journal", Route: "route", Link: "link"}
+# Graph edits surface as a change of their route.
+ROUTE_CHILD_MODELS = (RouteNode, RouteEdge)
+
+
+def _feed_key(obj):
+    if isinstance(obj, ROUTE_CHILD_MODELS):
+        return ("route", obj.route_id) if obj.route_id else None
+    entity_type = FEED_MODELS.get(type(obj))
+    if entity_type is None or obj.id is None:
+        return None
+    return (entity_type, obj.id)
+
+
+def reserve_feed_sequence(conn, count: int) -> int:
+    # The UPDATE takes the head-row lock first, so concurrent commits hand out disjoint ranges in commit order.
+    bump = text("UPDATE change_feed_head SET last_seq = last_seq + :count WHERE id = 1")
+    if conn.execute(bump, {"count": count}).rowcount == 0:
+        conn.execute(text("INSERT INTO change_feed_head (id, last_seq) VALUES (1, 0) ON CONFLICT (id) DO NOTHING"))
+        conn.execute(bump, {"count": count})
+    return conn.scalar(select(ChangeFeedHead.last_seq).where(ChangeFeedHead.id == 1)) - count + 1
+
+
+def record_changes(conn, keys: list[tuple[str, str]]) -> None:
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return
+    first_seq = reserve_feed_sequence(conn, len(keys))
+    now = datetime.now(timezone.utc)
+    conn.execute(
+        insert(ChangeFeedEntry.__table__),
+        [
+            {"seq": first_seq + offset, "entity_type": entity_type, "entity_id": entity_id, "occurred_at": now}
+            for offset, (entity_type, entity_id) in enumerate(keys)
+        ],
+    )
+
+
+def prune_change_feed(conn, *, older_than: datetime) -> int:
+    # Drops a prefix of the feed and always keeps the newest entry, so the remaining seqs stay
+    # contiguous and a token from before the cut is recognizably expired.
+    newest = conn.scalar(select(func.max(ChangeFeedEntry.seq)))
+    cutoff = conn.scalar(select(func.max(ChangeFeedEntry.seq)).where(ChangeFeedEntry.occurred_at < older_than))
+    if newest is None or cutoff is None:
+        return 0
+    cutoff = min(cutoff, newest - 1)
+    return conn.execute(delete(ChangeFeedEntry).where(ChangeFeedEntry.seq <= cutoff)).rowcount
+
+
+def _collect(session: Session, keys) -> None:
+    pending = session.info.setdefault(PENDING_KEYS, {})
+    pending.update(dict.fromkeys(key for key in keys if key is not None))
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    keys = []
+    for obj in (*session.new, *session.deleted):
+        keys.append(_feed_key(obj))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            keys.append(_feed_key(obj))
+    _collect(session, keys)
+
+
+def _bulk_statement(orm_execute_state) -> None:
+    # Bulk delete()/update() statements (e.g. dropping a note's links) bypass the flush, so the
+    # affected ids are selected with the same WHERE clause before the statement runs.
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    mapper = orm_execute_state.bind_mapper
+    model = mapper.class_ if mapper is not None else None
+    entity_type = FEED_MODELS.get(model)
+    if entity_type is None:
+        return
+    stmt = orm_execute_state.statement
+    ids = select(model.id)
+    if stmt.whereclause is not None:
+        ids = ids.where(stmt.whereclause)
+    session = orm_execute_state.session
+    _collect(session, [(entity_type, entity_id) for entity_id in session.scalars(ids)])
+
+
+def _before_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    # Session.commit() runs its final flush after this hook; run it here so its keys are included.
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    keys = session.info.pop(PENDING_KEYS, None)
+    if keys:
+        record_changes(session.connection(), list(keys))
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    # Keys from a rolled-back transaction are dropped with it.
+    if transaction.parent is None:
+        session.info.pop(PENDING_KEYS, None)
+
+
+def install_change_feed(session_factory) -> None:
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "do_orm_execute", _bulk_statement)
+    event.listen(session_factory, "before_commit", _before_commit)
+    event.listen(session_factory, "after_transaction_end", _after_transaction_end)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 import os
 from pathlib import Path
+from typing import Optional
 
 
 def _env_bool(name: str, default: bool) -> bool:
@@ -15,6 +16,16 @@ def _env_bool(name: str, default: bool) -> bool:
     raise ValueError(f"invalid boolean value for {name}: {raw!r}")
 
 
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw.strip())
+    except ValueError as exc:
+        raise ValueError(f"invalid integer value for {name}: {raw!r}") from exc
+
+
 def _load_env_file(path: Path) -> None:
     if not path.exists() or not path.is_file():
         return
@@ -49,6 +60,33 @@ class Settings:
     db_password: str = field(default_factory=lambda: os.getenv("AFKMS_DB_PASSWORD", "afkms"))
     require_auth: bool = field(default_factory=lambda: _env_bool("AFKMS_REQUIRE_AUTH", False))
     kms_api_key: str = field(default_factory=lambda: os.getenv("KMS_API_KEY", "").strip())
+    db_async: bool = field(default_factory=lambda: _env_bool("AFKMS_DB_ASYNC", False))
+    db_pool_size: int = field(default_factory=lambda: _env_int("AFKMS_DB_POOL_SIZE", 5))
+    db_max_overflow: int = field(default_factory=lambda: _env_int("AFKMS_DB_MAX_OVERFLOW", 10))
+    db_pool_timeout: int = field(default_factory=lambda: _env_int("AFKMS_DB_POOL_TIMEOUT", 30))
+    db_pool_recycle: int = field(default_factory=lambda: _env_int("AFKMS_DB_POOL_RECYCLE", -1))
+    db_pool_pre_ping: bool = field(default_factory=lambda: _env_bool("AFKMS_DB_POOL_PRE_PING", False))
+    db_statement_timeout_ms: int = field(default_factory=lambda: _env_int("AFKMS_DB_STATEMENT_TIMEOUT_MS", 0))
+    query_debug: bool = field(default_factory=lambda: _env_bool("AFKMS_QUERY_DEBUG", False))
+    query_repeat_threshold: int = field(default_factory=lambda: _env_int("AFKMS_QUERY_REPEAT_THRESHOLD", 3))
+    context_cache_size: int = field(default_factory=lambda: _env_int("AFKMS_CONTEXT_CACHE_SIZE", 256))
+    context_cache_ttl_s: int = field(default_factory=lambda: _env_int("AFKMS_CONTEXT_CACHE_TTL_S", 60))
+    facet_cache_size: int = field(default_factory=lambda: _env_int("AFKMS_FACET_CACHE_SIZE", 256))
+    facet_cache_ttl_s: int = field(default_factory=lambda: _env_int("AFKMS_FACET_CACHE_TTL_S", 60))
+    change_feed_retention_days: int = field(
+        default_factory=lambda: _env_int("AFKMS_CHANGE_FEED_RETENTION_DAYS", 30)
+    )
+    audit_mode: str = field(default_factory=lambda: os.getenv("AFKMS_AUDIT_MODE", "sync").strip().lower())
+    audit_batch_size: int = field(default_factory=lambda: _env_int("AFKMS_AUDIT_BATCH_SIZE", 100))
+    audit_flush_ms: int = field(default_factory=lambda: _env_int("AFKMS_AUDIT_FLUSH_MS", 200))
+    audit_spool_path: str = field(
+        default_factory=lambda: os.getenv("AFKMS_AUDIT_SPOOL_PATH", "data/audit_spool.ndjson").strip()
+    )
+    audit_export_dir: str = field(
+        default_factory=lambda: os.getenv("AFKMS_AUDIT_EXPORT_DIR", "data/audit_exports").strip()
+    )
+    audit_export_max_rows: int = field(default_factory=lambda: _env_int("AFKMS_AUDIT_EXPORT_MAX_ROWS", 1_000_000))
+    audit_export_ttl_hours: int = field(default_factory=lambda: _env_int("AFKMS_AUDIT_EXPORT_TTL_HOURS", 24))
 
     @property
     def database_url(self) -> str:
@@ -71,6 +109,44 @@ class Settings:
             f"{self.db_backend!r}; expected 'sqlite' or 'postgres'"
         )
 
+    @property
+    def pool_options(self) -> dict:
+        if self.db_pool_size < 1 or self.db_max_overflow < 0 or self.db_pool_timeout < 0:
+            raise ValueError(
+                "invalid AFKMS_DB_POOL_* values: pool size must be >= 1, overflow and timeout >= 0"
+            )
+        return {
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_max_overflow,
+            "pool_timeout": self.db_pool_timeout,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_pre_ping": self.db_pool_pre_ping,
+        }
+
+    @property
+    def audit_buffered(self) -> bool:
+        if self.audit_mode not in {"sync", "buffered"}:
+            raise ValueError(
+                f"unsupported AFKMS_AUDIT_MODE value: {self.audit_mode!r}; expected 'sync' or 'buffered'"
+            )
+        return self.audit_mode == "buffered"
+
+    @property
+    def audit_spool_file(self) -> Optional[Path]:
+        if not self.audit_spool_path:
+            return None
+        spool = Path(self.audit_spool_path).expanduser()
+        if not spool.is_absolute():
+            spool = (_project_root / spool).resolve()
+        return spool
+
+    @property
+    def audit_export_path(self) -> Path:
+        export_dir = Path(self.audit_export_dir or "data/audit_exports").expanduser()
+        if not export_dir.is_absolute():
+            export_dir = (_project_root / export_dir).resolve()
+        return export_dir
+
     @property
     def is_sqlite(self) -> bool:
         return self.database_url.startswith("sqlite")
@@ -1,17 +1,43 @@
-from collections.abc import Generator
+import json
+from collections.abc import AsyncGenerator, Generator
 
-from sqlalchemy import create_engine, event, text
+from sqlalchemy import JSON, column, create_engine, event, inspect, table, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from src.audit_partitions import partition_pg_audit_events
+from src.config import settings
+from src.db_metrics import TimedAsyncQueuePool, TimedQueuePool
+
 Base = declarative_base()
 
 
+def _is_memory_sqlite(database_url: str) -> bool:
+    return ":memory:" in database_url or database_url.rstrip("/") in {"sqlite:", "sqlite+pysqlite:"}
+
+
+def _pool_kwargs(database_url: str) -> dict:
+    if database_url.startswith("sqlite") and _is_memory_sqlite(database_url):
+        return {}
+    return dict(settings.pool_options)
+
+
+def _postgres_connect_args() -> dict:
+    if settings.db_statement_timeout_ms > 0:
+        return {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return {}
+
+
 def build_engine(database_url: str):
+    pool_kwargs = _pool_kwargs(database_url)
+    if pool_kwargs:
+        pool_kwargs["poolclass"] = TimedQueuePool
     if database_url.startswith("sqlite"):
         engine = create_engine(
             database_url,
             future=True,
             connect_args={"check_same_thread": False},
+            **pool_kwargs,
         )
 
         @event.listens_for(engine, "connect")
@@ -22,11 +48,17 @@ def build_engine(database_url: str):
 
         return engine
 
-    return create_engine(database_url, future=True)
+    return create_engine(database_url, future=True, connect_args=_postgres_connect_args(), **pool_kwargs)
 
 
 def build_session_local(engine):
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    from src.change_feed import install_change_feed
+    from src.task_views import install_task_view_counters
+
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    install_change_feed(session_local)
+    install_task_view_counters(session_local)
+    return session_local
 
 
 def get_db(session_local) -> Generator:
@@ -37,11 +69,160 @@ def get_db(session_local) -> Generator:
         db.close()
 
 
-def ensure_runtime_schema(engine) -> None:
-    if engine.dialect.name == "sqlite":
-        _ensure_runtime_schema_sqlite(engine)
+def async_database_url(database_url: str) -> str:
+    if database_url.startswith("sqlite+pysqlite:"):
+        return "sqlite+aiosqlite:" + database_url[len("sqlite+pysqlite:") :]
+    if database_url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + database_url[len("sqlite:") :]
+    # postgresql+psycopg picks psycopg's async connection class under create_async_engine.
+    return database_url
+
+
+def build_async_engine(database_url: str):
+    url = async_database_url(database_url)
+    pool_kwargs = _pool_kwargs(url)
+    if pool_kwargs:
+        # Without an explicit pool, SQLAlchemy gives aiosqlite file databases a NullPool that reopens the file per request.
+        pool_kwargs["poolclass"] = TimedAsyncQueuePool
+    if url.startswith("sqlite"):
+        engine = create_async_engine(url, **pool_kwargs)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_sqlite_pragma(dbapi_connection, _connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+        return engine
+
+    return create_async_engine(url, connect_args=_postgres_connect_args(), **pool_kwargs)
+
+
+def build_async_session_local(engine):
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db(session_local) -> AsyncGenerator:
+    async with session_local() as db:
+        yield db
+
+
+SCHEMA_LOCK_KEY = 0x6166_6B6D_7300  # pg_advisory lock id shared by every process running migrations
+
+
+def _migrate_baseline(conn) -> None:
+    if conn.dialect.name == "sqlite":
+        _migrate_baseline_sqlite(conn)
+    else:
+        _migrate_baseline_postgres(conn)
+
+
+def _migrate_audit_partitions(conn) -> None:
+    if conn.dialect.name == "postgresql":
+        partition_pg_audit_events(conn)
         return
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_audit_events_occurred_at ON audit_events (occurred_at)"))
+    conn.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS ix_audit_events_target
+            ON audit_events (target_type, target_id, occurred_at)
+            """
+        )
+    )
+
+
+def _migrate_audit_hash_chain(conn) -> None:
+    if conn.dialect.name == "sqlite":
+        _sqlite_add_column_if_missing(conn, "audit_events", "chain_seq BIGINT")
+        _sqlite_add_column_if_missing(conn, "audit_events", "chain_hash VARCHAR(64)")
+    else:
+        conn.execute(text("ALTER TABLE audit_events ADD COLUMN IF NOT EXISTS chain_seq BIGINT"))
+        conn.execute(text("ALTER TABLE audit_events ADD COLUMN IF NOT EXISTS chain_hash VARCHAR(64)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_audit_events_chain_seq ON audit_events (chain_seq)"))
+
+
+# Append-only. Every step must be idempotent: databases that predate schema_version
+# start at 0 and replay the whole list once.
+MIGRATIONS = [
+    (1, "runtime_baseline", _migrate_baseline),
+    (2, "unique_links", lambda conn: _ensure_unique_links(conn)),
+    (3, "audit_partitions", _migrate_audit_partitions),
+    (4, "audit_hash_chain", _migrate_audit_hash_chain),
+    (5, "entity_history", lambda conn: _backfill_entity_history(conn)),
+    # change_feed comes from create_all and starts empty: tokens only cover writes made after this step.
+    (6, "change_feed", lambda conn: None),
+    (7, "task_view_counters", lambda conn: _build_task_view_counters(conn)),
+    (8, "orphan_entity_logs", lambda conn: _purge_orphan_entity_logs(conn)),
+    (9, "change_feed_head", lambda conn: _move_change_feed_head(conn)),
+]
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def current_schema_version(conn) -> int:
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return int(conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar() or 0)
+
 
+def _lock_schema(conn) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+              version INTEGER PRIMARY KEY,
+              name VARCHAR(80) NOT NULL,
+              applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+    )
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+    else:
+        # Any write takes SQLite's RESERVED lock, which serializes concurrent migrators.
+        conn.execute(text("DELETE FROM schema_version WHERE version < 0"))
+
+
+def migrate_schema(engine) -> list[int]:
+    import src.models  # noqa: F401  (registers every table on Base.metadata)
+
+    applied: list[int] = []
+    with engine.begin() as conn:
+        _lock_schema(conn)
+        current = current_schema_version(conn)
+        pending = [step for step in MIGRATIONS if step[0] > current]
+        if not pending:
+            return applied
+        Base.metadata.create_all(bind=conn)
+        for version, name, apply in pending:
+            apply(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+                {"version": version, "name": name},
+            )
+            applied.append(version)
+    return applied
+
+
+def reapply_migration(engine, version: int) -> None:
+    steps = {step[0]: step for step in MIGRATIONS}
+    if version not in steps:
+        raise ValueError("SCHEMA_MIGRATION_NOT_FOUND")
+    with engine.begin() as conn:
+        _lock_schema(conn)
+        steps[version][2](conn)
+
+
+def ensure_runtime_schema(engine) -> None:
+    # Boot fast path: one catalog probe plus one SELECT when the schema is already current.
+    with engine.connect() as conn:
+        if current_schema_version(conn) >= LATEST_SCHEMA_VERSION:
+            return
+    migrate_schema(engine)
+
+
+def _migrate_baseline_postgres(conn) -> None:
     statements = [
         """
         CREATE TABLE IF NOT EXISTS topics (
@@ -144,15 +325,76 @@ def ensure_runtime_schema(engine) -> None:
           actor_type VARCHAR(20) NOT NULL DEFAULT 'human',
           actor_id VARCHAR(80) NOT NULL DEFAULT 'local',
           content TEXT NOT NULL,
+          log_type VARCHAR(20) NOT NULL DEFAULT 'note',
+          source_ref TEXT,
           created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
           updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
         )
         """,
+        "ALTER TABLE entity_logs ADD COLUMN IF NOT EXISTS log_type VARCHAR(20) NOT NULL DEFAULT 'note'",
+        "ALTER TABLE entity_logs ADD COLUMN IF NOT EXISTS source_ref TEXT",
         """
         CREATE INDEX IF NOT EXISTS ix_entity_logs_route_entity
         ON entity_logs (route_id, entity_type, entity_id, created_at DESC)
         """,
         "CREATE INDEX IF NOT EXISTS ix_entity_logs_route_id ON entity_logs (route_id)",
+        """
+        CREATE INDEX IF NOT EXISTS ix_entity_logs_entity
+        ON entity_logs (entity_type, entity_id, created_at DESC)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_links_to
+        ON links (to_type, to_id, relation, from_type, from_id)
+        """,
+        # node_logs is folded into entity_logs: backfill the legacy table once,
+        # park it as node_logs_legacy and expose a read-only compatibility view.
+        """
+        DO $$
+        BEGIN
+          IF EXISTS (
+            SELECT 1 FROM information_schema.tables
+            WHERE table_schema = current_schema()
+              AND table_name = 'node_logs'
+              AND table_type = 'BASE TABLE'
+          ) THEN
+            ALTER TABLE node_logs ADD COLUMN IF NOT EXISTS log_type VARCHAR(20);
+            ALTER TABLE node_logs ADD COLUMN IF NOT EXISTS source_ref TEXT;
+            INSERT INTO entity_logs (
+              id, route_id, entity_type, entity_id, actor_type, actor_id,
+              content, log_type, source_ref, created_at, updated_at
+            )
+            SELECT
+              nl.id, rn.route_id, 'route_node', nl.node_id, nl.actor_type, nl.actor_id,
+              nl.content, COALESCE(nl.log_type, 'note'), nl.source_ref, nl.created_at, nl.created_at
+            FROM node_logs nl
+            JOIN route_nodes rn ON rn.id = nl.node_id
+            ON CONFLICT (id) DO UPDATE
+            SET log_type = EXCLUDED.log_type,
+                source_ref = EXCLUDED.source_ref;
+            IF to_regclass('node_logs_legacy') IS NULL THEN
+              ALTER TABLE node_logs RENAME TO node_logs_legacy;
+            ELSE
+              DROP TABLE node_logs;
+            END IF;
+          END IF;
+        END $$;
+        """,
+        """
+        CREATE OR REPLACE VIEW node_logs AS
+        SELECT
+          id,
+          entity_id AS node_id,
+          actor_type,
+          actor_id,
+          content,
+          log_type,
+          source_ref,
+          created_at,
+          route_id,
+          updated_at
+        FROM entity_logs
+        WHERE entity_type = 'route_node'
+        """,
         "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS description TEXT",
         "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS acceptance_criteria TEXT",
         "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS topic_id VARCHAR(40)",
@@ -164,8 +406,6 @@ def ensure_runtime_schema(engine) -> None:
         "ALTER TABLE routes ADD COLUMN IF NOT EXISTS parent_route_id VARCHAR(40)",
         "ALTER TABLE route_nodes ADD COLUMN IF NOT EXISTS parent_node_id VARCHAR(40)",
         "ALTER TABLE route_edges ADD COLUMN IF NOT EXISTS description TEXT",
-        "ALTER TABLE node_logs ADD COLUMN IF NOT EXISTS log_type VARCHAR(20)",
-        "ALTER TABLE node_logs ADD COLUMN IF NOT EXISTS source_ref TEXT",
         "ALTER TABLE notes ADD COLUMN IF NOT EXISTS topic_id VARCHAR(40)",
         "ALTER TABLE notes ADD COLUMN IF NOT EXISTS status VARCHAR(20)",
         "ALTER TABLE notes ADD COLUMN IF NOT EXISTS category VARCHAR(40)",
@@ -194,7 +434,6 @@ def ensure_runtime_schema(engine) -> None:
         "UPDATE tasks SET description = '' WHERE description IS NULL",
         "UPDATE tasks SET acceptance_criteria = '' WHERE acceptance_criteria IS NULL",
         "UPDATE route_edges SET description = '' WHERE description IS NULL",
-        "UPDATE node_logs SET log_type = 'note' WHERE log_type IS NULL",
         """
         INSERT INTO topics (id, name, name_en, name_zh, kind, status, summary)
         VALUES (
@@ -332,8 +571,6 @@ def ensure_runtime_schema(engine) -> None:
         "ALTER TABLE notes ALTER COLUMN category SET NOT NULL",
         "ALTER TABLE route_edges ALTER COLUMN description SET DEFAULT ''",
         "ALTER TABLE route_edges ALTER COLUMN description SET NOT NULL",
-        "ALTER TABLE node_logs ALTER COLUMN log_type SET DEFAULT 'note'",
-        "ALTER TABLE node_logs ALTER COLUMN log_type SET NOT NULL",
         """
         DO $$
         BEGIN
@@ -493,12 +730,11 @@ def ensure_runtime_schema(engine) -> None:
         END $$;
         """,
     ]
-    with engine.begin() as conn:
-        for stmt in statements:
-            conn.execute(text(stmt))
+    for stmt in statements:
+        conn.execute(text(stmt))
 
 
-def _ensure_runtime_schema_sqlite(engine) -> None:
+def _migrate_baseline_sqlite(conn) -> None:
     statements = [
         """
         INSERT INTO topics (id, name, name_en, name_zh, kind, status, summary)
@@ -519,94 +755,356 @@ def _ensure_runtime_schema_sqlite(engine) -> None:
             summary = excluded.summary
         """,
     ]
-    with engine.begin() as conn:
-        conn.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS entity_logs (
-                  id VARCHAR(40) PRIMARY KEY,
-                  route_id VARCHAR(40) NOT NULL REFERENCES routes(id) ON DELETE CASCADE,
-                  entity_type VARCHAR(20) NOT NULL,
-                  entity_id VARCHAR(40) NOT NULL,
-                  actor_type VARCHAR(20) NOT NULL DEFAULT 'human',
-                  actor_id VARCHAR(80) NOT NULL DEFAULT 'local',
-                  content TEXT NOT NULL,
-                  created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                  updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                  CHECK (entity_type IN ('route_node', 'route_edge'))
-                )
-                """
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS entity_logs (
+              id VARCHAR(40) PRIMARY KEY,
+              route_id VARCHAR(40) NOT NULL REFERENCES routes(id) ON DELETE CASCADE,
+              entity_type VARCHAR(20) NOT NULL,
+              entity_id VARCHAR(40) NOT NULL,
+              actor_type VARCHAR(20) NOT NULL DEFAULT 'human',
+              actor_id VARCHAR(80) NOT NULL DEFAULT 'local',
+              content TEXT NOT NULL,
+              log_type VARCHAR(20) NOT NULL DEFAULT 'note',
+              source_ref TEXT,
+              created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+              updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+              CHECK (entity_type IN ('route_node', 'route_edge'))
             )
+            """
         )
-        conn.execute(
-            text(
-                """
-                CREATE INDEX IF NOT EXISTS ix_entity_logs_route_entity
-                ON entity_logs (route_id, entity_type, entity_id, created_at DESC)
-                """
+    )
+    conn.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS ix_entity_logs_route_entity
+            ON entity_logs (route_id, entity_type, entity_id, created_at DESC)
+            """
+        )
+    )
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_entity_logs_route_id ON entity_logs (route_id)"))
+    _sqlite_add_column_if_missing(conn, "entity_logs", "log_type VARCHAR(20) NOT NULL DEFAULT 'note'")
+    _sqlite_add_column_if_missing(conn, "entity_logs", "source_ref TEXT")
+    conn.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS ix_entity_logs_entity
+            ON entity_logs (entity_type, entity_id, created_at DESC)
+            """
+        )
+    )
+    _sqlite_fold_node_logs_into_entity_logs(conn)
+    conn.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS ix_links_to
+            ON links (to_type, to_id, relation, from_type, from_id)
+            """
+        )
+    )
+    _sqlite_add_column_if_missing(conn, "ideas", "task_id VARCHAR(40)")
+    _sqlite_add_column_if_missing(conn, "routes", "task_id VARCHAR(40)")
+    _sqlite_add_column_if_missing(conn, "routes", "parent_route_id VARCHAR(40)")
+    _sqlite_add_column_if_missing(conn, "route_nodes", "parent_node_id VARCHAR(40)")
+    _sqlite_add_column_if_missing(conn, "route_edges", "description TEXT NOT NULL DEFAULT ''")
+    _sqlite_add_column_if_missing(conn, "notes", "category VARCHAR(40) NOT NULL DEFAULT 'mechanism_spec'")
+    conn.execute(text("UPDATE route_edges SET description = '' WHERE description IS NULL"))
+    conn.execute(text("UPDATE notes SET category = 'mechanism_spec' WHERE category IS NULL"))
+    conn.execute(
+        text(
+            """
+            UPDATE route_nodes
+            SET status = CASE
+              WHEN status = 'todo' THEN 'waiting'
+              WHEN status = 'in_progress' THEN 'execute'
+              WHEN status IN ('cancelled', 'removed') THEN 'done'
+              ELSE status
+            END
+            WHERE status IN ('todo', 'in_progress', 'cancelled', 'removed')
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE route_nodes
+            SET status = 'waiting'
+            WHERE status NOT IN ('waiting', 'execute', 'done')
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE route_nodes
+            SET status = 'done'
+            WHERE node_type = 'start' AND status <> 'done'
+            """
+        )
+    )
+    _sqlite_rebuild_tasks_table_if_needed(conn)
+    for stmt in statements:
+        conn.execute(text(stmt))
+
+
+def _sqlite_add_column_if_missing(conn, table_name: str, column_ddl: str) -> None:
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name = :table_name"),
+        {"table_name": table_name},
+    ).fetchone()
+    if exists is None:
+        return
+    column_name = column_ddl.split(" ", 1)[0].strip()
+    info = conn.execute(text(f"PRAGMA table_info({table_name})")).fetchall()
+    if any(row[1] == column_name for row in info):
+        return
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_ddl}"))
+
+
+_LINK_EDGE_COLUMNS = "from_type, from_id, to_type, to_id, relation"
+
+
+def _ensure_unique_links(conn) -> None:
+    # uq_links_edge leads with (from_type, from_id) and so also serves forward lookups.
+    _compact_duplicate_links(conn)
+    conn.execute(
+        text(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_links_edge
+            ON links (from_type, from_id, relation, to_type, to_id)
+            """
+        )
+    )
+    conn.execute(text("DROP INDEX IF EXISTS ix_links_from"))
+
+
+def _compact_duplicate_links(conn) -> None:
+    duplicate_groups = conn.execute(
+        text(
+            f"""
+            SELECT {_LINK_EDGE_COLUMNS}
+            FROM links
+            GROUP BY {_LINK_EDGE_COLUMNS}
+            HAVING COUNT(*) > 1
+            """
+        )
+    ).fetchall()
+    if not duplicate_groups:
+        return
+
+    survivor_by_id: dict[str, str] = {}
+    for from_type, from_id, to_type, to_id, relation in duplicate_groups:
+        ids = [
+            row[0]
+            for row in conn.execute(
+                text(
+                    """
+                    SELECT id FROM links
+                    WHERE from_type = :from_type AND from_id = :from_id
+                      AND to_type = :to_type AND to_id = :to_id AND relation = :relation
+                    ORDER BY created_at ASC, id ASC
+                    """
+                ),
+                {
+                    "from_type": from_type,
+                    "from_id": from_id,
+                    "to_type": to_type,
+                    "to_id": to_id,
+                    "relation": relation,
+                },
             )
+        ]
+        for duplicate_id in ids[1:]:
+            survivor_by_id[duplicate_id] = ids[0]
+
+    for duplicate_id in survivor_by_id:
+        conn.execute(text("DELETE FROM links WHERE id = :id"), {"id": duplicate_id})
+
+    # Point committed change actions at the surviving row so undo never deletes a link
+    # that another commit still owns, and never re-inserts a compacted duplicate.
+    change_actions = table("change_actions", column("id"), column("action_type"), column("apply_result_json", JSON))
+    rows = conn.execute(
+        change_actions.select().where(
+            change_actions.c.action_type.in_(["link_entities", "create_link", "delete_link", "delete_knowledge"]),
+            change_actions.c.apply_result_json.is_not(None),
         )
-        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_entity_logs_route_id ON entity_logs (route_id)"))
-        _sqlite_add_column_if_missing(conn, "ideas", "task_id VARCHAR(40)")
-        _sqlite_add_column_if_missing(conn, "routes", "task_id VARCHAR(40)")
-        _sqlite_add_column_if_missing(conn, "routes", "parent_route_id VARCHAR(40)")
-        _sqlite_add_column_if_missing(conn, "route_nodes", "parent_node_id VARCHAR(40)")
-        _sqlite_add_column_if_missing(conn, "route_edges", "description TEXT NOT NULL DEFAULT ''")
-        _sqlite_add_column_if_missing(conn, "node_logs", "log_type VARCHAR(20) NOT NULL DEFAULT 'note'")
-        _sqlite_add_column_if_missing(conn, "node_logs", "source_ref TEXT")
-        _sqlite_add_column_if_missing(conn, "notes", "category VARCHAR(40) NOT NULL DEFAULT 'mechanism_spec'")
-        conn.execute(text("UPDATE route_edges SET description = '' WHERE description IS NULL"))
-        conn.execute(text("UPDATE node_logs SET log_type = 'note' WHERE log_type IS NULL"))
-        conn.execute(text("UPDATE notes SET category = 'mechanism_spec' WHERE category IS NULL"))
+    ).fetchall()
+    for row in rows:
+        result = row.apply_result_json
+        if isinstance(result, str):
+            result = json.loads(result)
+        if not isinstance(result, dict):
+            continue
+        updated = _remap_link_result(row.action_type, result, survivor_by_id)
+        if updated is not None:
+            conn.execute(
+                change_actions.update().where(change_actions.c.id == row.id).values(apply_result_json=updated)
+            )
+
+
+def _remap_link_result(action_type: str, result: dict, survivor_by_id: dict[str, str]):
+    changed = False
+    result = dict(result)
+    if action_type in {"link_entities", "create_link"}:
+        link_id = result.get("entity_id")
+        if link_id in survivor_by_id:
+            result["entity_id"] = survivor_by_id[link_id]
+            result["created"] = False
+            result["deduplicated_from"] = link_id
+            changed = True
+    before = result.get("before")
+    if action_type == "delete_link" and isinstance(before, dict) and before.get("id") in survivor_by_id:
+        result["before"] = {**before, "id": survivor_by_id[before["id"]]}
+        changed = True
+    before_links = result.get("before_links")
+    if isinstance(before_links, list):
+        compacted = []
+        seen: set[str] = set()
+        for item in before_links:
+            if isinstance(item, dict) and item.get("id") in survivor_by_id:
+                item = {**item, "id": survivor_by_id[item["id"]]}
+                changed = True
+            item_id = item.get("id") if isinstance(item, dict) else None
+            if item_id in seen:
+                changed = True
+                continue
+            if item_id:
+                seen.add(item_id)
+            compacted.append(item)
+        result["before_links"] = compacted
+    return result if changed else None
+
+
+def _build_task_view_counters(conn) -> None:
+    from src.task_views import rebuild_counters, utc_today
+
+    rebuild_counters(conn, today=utc_today())
+
+
+def _move_change_feed_head(conn) -> None:
+    # The feed used to reserve from a "change_feed" row of audit_chain_heads; carry its position over
+    # to change_feed_head so existing tokens stay valid, then drop the borrowed row.
+    last_seq = max(
+        int(conn.execute(text("SELECT MAX(last_seq) FROM audit_chain_heads WHERE name = 'change_feed'")).scalar() or 0),
+        int(conn.execute(text("SELECT MAX(seq) FROM change_feed")).scalar() or 0),
+        int(conn.execute(text("SELECT MAX(last_seq) FROM change_feed_head")).scalar() or 0),
+    )
+    conn.execute(text("DELETE FROM change_feed_head"))
+    conn.execute(text("INSERT INTO change_feed_head (id, last_seq) VALUES (1, :last_seq)"), {"last_seq": last_seq})
+    conn.execute(text("DELETE FROM audit_chain_heads WHERE name = 'change_feed'"))
+
+
+def _purge_orphan_entity_logs(conn) -> None:
+    # Node and edge deletes used to leave their logs behind; they now delete them in the same transaction.
+    for entity_type, table_name in (("route_node", "route_nodes"), ("route_edge", "route_edges")):
         conn.execute(
             text(
+                f"""
+                DELETE FROM entity_logs
+                WHERE entity_type = :entity_type
+                  AND NOT EXISTS (SELECT 1 FROM {table_name} WHERE {table_name}.id = entity_logs.entity_id)
                 """
-                UPDATE route_nodes
-                SET status = CASE
-                  WHEN status = 'todo' THEN 'waiting'
-                  WHEN status = 'in_progress' THEN 'execute'
-                  WHEN status IN ('cancelled', 'removed') THEN 'done'
-                  ELSE status
-                END
-                WHERE status IN ('todo', 'in_progress', 'cancelled', 'removed')
-                """
+            ),
+            {"entity_type": entity_type},
+        )
+
+
+def _backfill_entity_history(conn) -> None:
+    # One-off: index audit events written before entity_history existed. Later writes index themselves.
+    if conn.execute(text("SELECT 1 FROM entity_history LIMIT 1")).first() is not None:
+        return
+    if conn.dialect.name == "postgresql":
+        commit_expr = "COALESCE(metadata_json->>'revert_commit_id', metadata_json->>'commit_id')"
+        action_expr = "metadata_json->>'action_id'"
+    else:
+        commit_expr = (
+            "COALESCE(json_extract(metadata_json, '$.revert_commit_id'), "
+            "json_extract(metadata_json, '$.commit_id'))"
+        )
+        action_expr = "json_extract(metadata_json, '$.action_id')"
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO entity_history (audit_id, entity_type, entity_id, occurred_at, action, commit_id, action_id)
+            SELECT
+              id,
+              CASE WHEN target_type = 'knowledge' THEN 'note' ELSE target_type END,
+              target_id,
+              occurred_at,
+              action,
+              {commit_expr},
+              {action_expr}
+            FROM audit_events
+            WHERE target_type IN (
+              'task', 'note', 'knowledge', 'inbox', 'journal', 'idea', 'route',
+              'route_node', 'route_edge', 'node_log', 'link', 'topic', 'cycle'
             )
+            """
         )
+    )
+
+
+def _sqlite_fold_node_logs_into_entity_logs(conn) -> None:
+    legacy = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name = 'node_logs'")
+    ).fetchone()
+    if legacy is not None:
+        _sqlite_add_column_if_missing(conn, "node_logs", "log_type VARCHAR(20)")
+        _sqlite_add_column_if_missing(conn, "node_logs", "source_ref TEXT")
         conn.execute(
             text(
                 """
-                UPDATE route_nodes
-                SET status = 'waiting'
-                WHERE status NOT IN ('waiting', 'execute', 'done')
+                INSERT OR IGNORE INTO entity_logs (
+                  id, route_id, entity_type, entity_id, actor_type, actor_id,
+                  content, log_type, source_ref, created_at, updated_at
+                )
+                SELECT
+                  nl.id, rn.route_id, 'route_node', nl.node_id, nl.actor_type, nl.actor_id,
+                  nl.content, COALESCE(nl.log_type, 'note'), nl.source_ref, nl.created_at, nl.created_at
+                FROM node_logs nl
+                JOIN route_nodes rn ON rn.id = nl.node_id
                 """
             )
         )
         conn.execute(
             text(
                 """
-                UPDATE route_nodes
-                SET status = 'done'
-                WHERE node_type = 'start' AND status <> 'done'
+                UPDATE entity_logs
+                SET
+                  log_type = COALESCE((SELECT nl.log_type FROM node_logs nl WHERE nl.id = entity_logs.id), 'note'),
+                  source_ref = (SELECT nl.source_ref FROM node_logs nl WHERE nl.id = entity_logs.id)
+                WHERE id IN (SELECT id FROM node_logs)
                 """
             )
         )
-        _sqlite_rebuild_tasks_table_if_needed(conn)
-        for stmt in statements:
-            conn.execute(text(stmt))
-
-
-def _sqlite_add_column_if_missing(conn, table_name: str, column_ddl: str) -> None:
-    exists = conn.execute(
-        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name = :table_name"),
-        {"table_name": table_name},
-    ).fetchone()
-    if exists is None:
-        return
-    column_name = column_ddl.split(" ", 1)[0].strip()
-    info = conn.execute(text(f"PRAGMA table_info({table_name})")).fetchall()
-    if any(row[1] == column_name for row in info):
-        return
-    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_ddl}"))
+        renamed = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name = 'node_logs_legacy'")
+        ).fetchone()
+        if renamed is None:
+            conn.execute(text("ALTER TABLE node_logs RENAME TO node_logs_legacy"))
+        else:
+            conn.execute(text("DROP TABLE node_logs"))
+    conn.execute(
+        text(
+            """
+            CREATE VIEW IF NOT EXISTS node_logs AS
+            SELECT
+              id,
+              entity_id AS node_id,
+              actor_type,
+              actor_id,
+              content,
+              log_type,
+              source_ref,
+              created_at,
+              route_id,
+              updated_at
+            FROM entity_logs
+            WHERE entity_type = 'route_node'
+            """
+        )
+    )
 
 
 def _sqlite_rebuild_tasks_table_if_needed(conn) -> None:
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (ms) shared by every latency histogram reported from the backend.
+LATENCY_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+_IN_LIST_RE = re.compile(r"\bIN \((?:\s*(?:\?|%\([^)]*\)s|%s|\$\d+|:\w+)\s*,?)+\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    # Expanding IN lists render one placeholder per value; fold them so the same query for 3 and 30 ids matches.
+    return _IN_LIST_RE.sub("IN (...)", " ".join(statement.split()))
+
+
+@dataclass
+class RequestQueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    # Only collected in query-debug mode: statement shape -> executions in this request.
+    shapes: Optional[Counter] = None
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        if not self.shapes:
+            return []
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+# Set per HTTP request by the metrics middleware. Sync handlers run in the threadpool with a
+# copy of the context, which still points at the same mutable stats object.
+current_request_queries: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "current_request_queries", default=None
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            total = self.sum
+        cumulative = []
+        running = 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+            running += bucket_count
+            cumulative.append({"le": bound, "count": running})
+        return {"count": count, "sum_ms": round(total, 3), "buckets": cumulative}
+
+
+class SlowQueryLog:
+    # Two rotating windows, so "slowest recent" survives a rotation but old outliers age out.
+    def __init__(self, size: int = 10, window_s: float = 300.0, max_statement_chars: int = 500):
+        self.size = size
+        self.window_s = window_s
+        self.max_statement_chars = max_statement_chars
+        self._current: list[tuple[float, int, dict]] = []
+        self._previous: list[tuple[float, int, dict]] = []
+        self._window_started = time.monotonic()
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _rotate(self, now: float) -> None:
+        if now - self._window_started >= self.window_s:
+            self._previous = self._current if now - self._window_started < 2 * self.window_s else []
+            self._current = []
+            self._window_started = now
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._rotate(now)
+            if len(self._current) >= self.size and duration_ms <= self._current[0][0]:
+                return
+            self._seq += 1
+            entry = {
+                "statement": " ".join(statement.split())[: self.max_statement_chars],
+                "duration_ms": round(duration_ms, 3),
+                "at": time.time(),
+            }
+            item = (duration_ms, self._seq, entry)
+            if len(self._current) < self.size:
+                heapq.heappush(self._current, item)
+            else:
+                heapq.heapreplace(self._current, item)
+
+    def slowest(self) -> list[dict]:
+        with self._lock:
+            self._rotate(time.monotonic())
+            items = self._current + self._previous
+        return [entry for _, _, entry in heapq.nlargest(self.size, items)]
+
+
+class DatabaseTelemetry:
+    def __init__(self, *, slow_queries: int = 10):
+        self.checkout_wait = Histogram()
+        self.query_latency = Histogram()
+        self.slow_queries = SlowQueryLog(size=slow_queries)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+
+    def record_wait(self, wait_ms: float, *, timed_out: bool = False) -> None:
+        self.checkout_wait.observe(wait_ms)
+        self.checkouts += 1
+        if timed_out:
+            self.checkout_timeouts += 1
+
+    def record_query(self, statement: str, duration_ms: float) -> None:
+        self.query_latency.observe(duration_ms)
+        self.slow_queries.record(statement, duration_ms)
+
+
+class _TimedCheckoutMixin:
+    # SQLAlchemy has no "before checkout" event, so the wait is measured around the pool's own _do_get.
+    telemetry: Optional[DatabaseTelemetry] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            if self.telemetry is not None:
+                self.telemetry.record_wait((time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        if self.telemetry is not None:
+            self.telemetry.record_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def install_telemetry(engine, telemetry: Optional[DatabaseTelemetry] = None) -> DatabaseTelemetry:
+    telemetry = telemetry or DatabaseTelemetry()
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if isinstance(sync_engine.pool, _TimedCheckoutMixin):
+        sync_engine.pool.telemetry = telemetry
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append((context, time.perf_counter()))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed(exception_context):
+        # A failing statement never reaches after_cursor_execute; drop its start so the stack stays balanced.
+        conn = exception_context.connection
+        started = conn.info.get("query_started") if conn is not None else None
+        context = exception_context.execution_context
+        if started and context is not None and started[-1][0] is context:
+            started.pop()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()[1]
+        telemetry.record_query(statement, elapsed * 1000)
+        stats = current_request_queries.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+            if stats.shapes is not None:
+                stats.shapes[statement_shape(statement)] += 1
+
+    return telemetry
+
+
+def pool_status(engine) -> dict:
+    pool = getattr(engine, "sync_engine", engine).pool
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout_s=pool.timeout(),
+        )
+    return status
+
+
+def telemetry_report(engine, telemetry: Optional[DatabaseTelemetry]) -> dict:
+    report = {"pool": pool_status(engine)}
+    if telemetry is not None:
+        report["checkout"] = {
+            "total": telemetry.checkouts,
+            "timeouts": telemetry.checkout_timeouts,
+            "wait_ms": telemetry.checkout_wait.snapshot(),
+        }
+        report["queries"] = {
+            "latency_ms": telemetry.query_latency.snapshot(),
+            "slowest_recent": telemetry.slow_queries.slowest(),
+        }
+    return report
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import case, func, literal, select, true, union_all
+from sqlalchemy.orm import Session
+
+from src.cache import GenerationalLRUCache
+from src.config import settings
+
+# Facet counts for the current filter set, in one statement: GROUPING SETS (plus a json_array_elements
+# branch for tags) on Postgres, one scan of the facet columns counted in Python elsewhere.
+facet_cache = GenerationalLRUCache("search_facets", settings.facet_cache_size, ttl_s=settings.facet_cache_ttl_s)
+
+
+def filter_hash(entity: str, filters: dict[str, Any]) -> str:
+    normalized = json.dumps({"entity": entity, **filters}, sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _buckets(counts: Counter) -> list[dict[str, Any]]:
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0] is None, str(item[0])))
+    return [{"value": value, "count": count} for value, count in ordered]
+
+
+def _postgres_statement(clauses: list, columns: dict[str, Any], tags_column):
+    groupings = {name: func.grouping(column) for name, column in columns.items()}
+    facet = case(*((grouping == 0, literal(name)) for name, grouping in groupings.items()))
+    value = case(*((groupings[name] == 0, column) for name, column in columns.items()))
+    grouped = (
+        select(facet.label("facet"), value.label("value"), func.count().label("count"))
+        .where(*clauses)
+        .group_by(func.grouping_sets(*columns.values()))
+    )
+    if tags_column is None:
+        return grouped
+    tag = func.json_array_elements_text(tags_column).table_valued("value").alias("tag")
+    tags = (
+        select(literal("tag").label("facet"), tag.c.value.label("value"), func.count().label("count"))
+        .select_from(tags_column.table.join(tag, true()))
+        .where(*clauses)
+        .group_by(tag.c.value)
+    )
+    return union_all(grouped, tags)
+
+
+def compute_facets(
+    db: Session,
+    clauses: list,
+    columns: dict[str, Any],
+    *,
+    tags_column=None,
+) -> dict[str, list[dict[str, Any]]]:
+    counts: dict[str, Counter] = {name: Counter() for name in columns}
+    if tags_column is not None:
+        counts["tag"] = Counter()
+    if db.get_bind().dialect.name == "postgresql":
+        for facet, value, count in db.execute(_postgres_statement(clauses, columns, tags_column)):
+            counts[facet][value] += int(count)
+    else:
+        names = list(columns)
+        selected = [*columns.values(), *([tags_column] if tags_column is not None else [])]
+        for row in db.execute(select(*selected).where(*clauses)):
+            for name, value in zip(names, row):
+                counts[name][value] += 1
+            if tags_column is not None:
+                for tag in set(row[-1] or []):
+                    counts["tag"][tag] += 1
+    return {name: _buckets(counter) for name, counter in counts.items()}
+
+
+def cached_facets(
+    db: Session,
+    entity: str,
+    filters: dict[str, Any],
+    clauses: list,
+    columns: dict[str, Any],
+    *,
+    tags_column=None,
+) -> tuple[str, dict[str, list[dict[str, Any]]], Optional[bool]]:
+    # Returns (filter hash, facets, cache hit); the hit flag is None while the cache is disabled.
+    key_hash = filter_hash(entity, filters)
+    if not facet_cache.enabled:
+        return key_hash, compute_facets(db, clauses, columns, tags_column=tags_column), None
+    # Date-relative filters (views, stale_days) move at midnight (UTC), so the date is part of the key.
+    key = (
+        db.get_bind().url.render_as_string(hide_password=True),
+        datetime.now(timezone.utc).date().isoformat(),
+        key_hash,
+    )
+    generation, facets = facet_cache.get(key)
+    if facets is not None:
+        return key_hash, facets, True
+    facets = compute_facets(db, clauses, columns, tags_column=tags_column)
+    facet_cache.put(key, generation, facets)
+    return key_hash, facets, False
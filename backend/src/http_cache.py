@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+# Conditional GET for read endpoints that clients poll (topics, routes, route graphs). The
+# ETag is a hash of the serialized body, so it is exact without per-table version tracking; a
+# match still runs the query but skips sending and re-parsing the payload.
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def conditional_json(request: Request, model: type[BaseModel], payload: Any) -> Response:
+    body = json.dumps(
+        model.model_validate(payload).model_dump(mode="json"), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    etag = _etag(body)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
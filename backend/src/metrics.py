@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import Counter as ShapeCounter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.db_metrics import Histogram, RequestQueryStats, current_request_queries
+
+# In-process registry rendered in the Prometheus text format at /metrics; no client library
+# or push gateway involved. Durations are recorded in seconds, as Prometheus expects.
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_REPEATS_HEADER = "X-Query-Repeats"
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class LabeledHistogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = SECONDS_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def series(self, **labels: str) -> Histogram:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        histogram = self._series.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._series.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, value: float, **labels: str) -> None:
+        self.series(**labels).observe(value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for key, histogram in items:
+            lines.extend(render_histogram(self.name, self.labelnames, key, histogram))
+        return lines
+
+
+def render_histogram(
+    name: str,
+    labelnames: tuple[str, ...],
+    values: tuple[str, ...],
+    histogram: Histogram,
+    *,
+    scale: float = 1.0,
+) -> list[str]:
+    # `scale` converts histograms recorded in other units (the ms-based pool telemetry) to seconds.
+    with histogram._lock:
+        counts = list(histogram.counts)
+        count = histogram.count
+        total = histogram.sum
+    lines = []
+    running = 0
+    for bound, bucket_count in zip((*histogram.buckets, math.inf), counts):
+        running += bucket_count
+        le = f'le="{_number(bound * scale if not math.isinf(bound) else bound)}"'
+        lines.append(f"{name}_bucket{_labels(labelnames, values, le)} {running}")
+    lines.append(f"{name}_sum{_labels(labelnames, values)} {_number(total * scale)}")
+    lines.append(f"{name}_count{_labels(labelnames, values)} {count}")
+    return lines
+
+
+HTTP_REQUEST_SECONDS = LabeledHistogram(
+    "afkms_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DB_QUERIES = LabeledHistogram(
+    "afkms_http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ("method", "route"),
+    COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = LabeledHistogram(
+    "afkms_http_request_db_seconds",
+    "Time spent executing SQL per HTTP request.",
+    ("method", "route"),
+)
+CHANGESET_SECONDS = LabeledHistogram(
+    "afkms_changeset_duration_seconds",
+    "Change-set dry-run, commit, undo and dedupe-lookup duration.",
+    ("operation",),
+)
+CHANGESET_ACTION_SECONDS = LabeledHistogram(
+    "afkms_changeset_action_duration_seconds",
+    "Per-action validation (dry_run), apply (commit) and rollback (undo) duration.",
+    ("operation", "action_type"),
+)
+AUDIT_EVENTS_WRITTEN = Counter(
+    "afkms_audit_events_written_total",
+    "Audit events inserted, by write path.",
+    ("mode",),
+)
+CACHE_REQUESTS = Counter(
+    "afkms_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss).",
+    ("cache", "result"),
+)
+
+REGISTRY = (
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DB_SECONDS,
+    CHANGESET_SECONDS,
+    CHANGESET_ACTION_SECONDS,
+    AUDIT_EVENTS_WRITTEN,
+    CACHE_REQUESTS,
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _render_runtime(runtime) -> list[str]:
+    lines = []
+    gauges = {"size": [], "checked_out": [], "overflow": []}
+    histograms = {"checkout": [], "query": []}
+    for kind, engine, telemetry in runtime.engines():
+        pool = getattr(engine, "sync_engine", engine).pool
+        if hasattr(pool, "checkedout"):
+            gauges["size"].append((kind, pool.size()))
+            gauges["checked_out"].append((kind, pool.checkedout()))
+            gauges["overflow"].append((kind, max(pool.overflow(), 0)))
+        histograms["checkout"].append((kind, telemetry.checkout_wait))
+        histograms["query"].append((kind, telemetry.query_latency))
+    for key, help_text in (
+        ("size", "Configured pool size."),
+        ("checked_out", "Connections currently checked out."),
+        ("overflow", "Overflow connections currently open."),
+    ):
+        name = f"afkms_db_pool_{key}"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{engine="{kind}"}} {value}' for kind, value in gauges[key]]
+    for key, name, help_text in (
+        ("checkout", "afkms_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection."),
+        ("query", "afkms_db_query_duration_seconds", "SQL statement execution time."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for kind, histogram in histograms[key]:
+            lines += render_histogram(name, ("engine",), (kind,), histogram, scale=0.001)
+    return lines
+
+
+def render_metrics(runtime=None) -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    if runtime is not None:
+        lines.extend(_render_runtime(runtime))
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, *, query_debug: bool = False, repeat_threshold: int = 3):
+        self.app = app
+        self.query_debug = query_debug
+        self.repeat_threshold = max(2, repeat_threshold)
+        self._templates: dict[int, str] = {}
+
+    def _route_template(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            # Unmatched paths share one series so random URLs cannot blow up label cardinality.
+            return "unmatched"
+        template = self._templates.get(id(endpoint))
+        if template is None:
+            for route in getattr(scope.get("app"), "routes", ()):
+                if getattr(route, "endpoint", None) is endpoint:
+                    template = route.path
+                    break
+            template = template or "unmatched"
+            self._templates[id(endpoint)] = template
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestQueryStats(shapes=ShapeCounter() if self.query_debug else None)
+        token = current_request_queries.set(stats)
+        status: Optional[int] = None
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.query_debug:
+                    # Counted when the headers go out; a streamed body may still run more statements.
+                    headers = MutableHeaders(scope=message)
+                    headers.append(QUERY_COUNT_HEADER, str(stats.count))
+                    headers.append(QUERY_REPEATS_HEADER, str(len(stats.repeated(self.repeat_threshold))))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_queries.reset(token)
+            route = self._route_template(scope)
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=method, route=route, status=str(status or 500))
+            HTTP_REQUEST_DB_QUERIES.observe(stats.count, method=method, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(stats.seconds, method=method, route=route)
+            if self.query_debug:
+                for shape, count in stats.repeated(self.repeat_threshold):
+                    logger.warning("possible N+1 on %s %s: %d x %s", method, route, count, shape[:300])
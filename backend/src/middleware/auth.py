@@ -1,36 +1,48 @@
 from __future__ import annotations
 
-import uuid
+import hmac
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from src.middleware.error_handler import REQUEST_ID_HEADER, ensure_request_id
 
-class ApiKeyAuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, api_key: str):
-        super().__init__(app)
-        self.api_key = api_key
+# /health itself stays open for probes; the details and metrics views expose SQL text and pool state.
+PROTECTED_PREFIXES = ("/api/v1", "/health/details", "/metrics")
 
-    async def dispatch(self, request: Request, call_next):
-        if not getattr(request.state, "request_id", ""):
-            request.state.request_id = f"req_{uuid.uuid4().hex[:12]}"
-        if not request.url.path.startswith("/api/v1"):
-            return await call_next(request)
-        if request.method == "OPTIONS":
-            return await call_next(request)
 
-        auth = request.headers.get("Authorization", "")
-        expected = f"Bearer {self.api_key}"
-        if auth != expected:
-            return JSONResponse(
+class ApiKeyAuthMiddleware:
+    def __init__(self, app: ASGIApp, api_key: str):
+        self.app = app
+        self.expected = f"Bearer {api_key}".encode("utf-8")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = ensure_request_id(scope)
+        if not scope["path"].startswith(PROTECTED_PREFIXES) or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        provided = b""
+        for key, value in scope.get("headers", ()):
+            if key == b"authorization":
+                provided = value
+                break
+        # compare_digest keeps the comparison time independent of how many leading bytes match.
+        if not hmac.compare_digest(provided, self.expected):
+            response = JSONResponse(
                 status_code=401,
                 content={
                     "error": {
                         "code": "UNAUTHORIZED",
                         "message": "invalid or missing api key",
-                        "request_id": getattr(request.state, "request_id", ""),
+                        "request_id": request_id,
                     }
                 },
+                headers={REQUEST_ID_HEADER: request_id},
             )
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -1,18 +1,56 @@
 from __future__ import annotations
 
+import re
 import uuid
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+REQUEST_ID_HEADER = "X-Request-Id"
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request.state.request_id = f"req_{uuid.uuid4().hex[:12]}"
-        return await call_next(request)
+
+def ensure_request_id(scope: Scope) -> str:
+    # `request.state` is backed by scope["state"], so handlers and both middlewares see the same id.
+    state = scope.setdefault("state", {})
+    request_id = state.get("request_id")
+    if request_id:
+        return request_id
+    for key, value in scope.get("headers", ()):
+        if key == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if _REQUEST_ID_RE.match(candidate):
+                request_id = candidate
+            break
+    if not request_id:
+        request_id = f"req_{uuid.uuid4().hex[:12]}"
+    state["request_id"] = request_id
+    return request_id
+
+
+class RequestIdMiddleware:
+    # Plain ASGI instead of BaseHTTPMiddleware: no extra task per request and streamed bodies pass straight through.
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = ensure_request_id(scope)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if REQUEST_ID_HEADER not in headers:
+                    headers.append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
 
 
 def install_error_handlers(app: FastAPI) -> None:
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import CheckConstraint, JSON, Date, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import BigInteger, CheckConstraint, JSON, Date, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db import Base
@@ -130,6 +130,9 @@ class KnowledgeEvidence(Base):
 
 class Link(Base):
     __tablename__ = "links"
+    __table_args__ = (
+        Index("uq_links_edge", "from_type", "from_id", "relation", "to_type", "to_id", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(String(40), primary_key=True)
     from_type: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -218,6 +221,69 @@ class AuditEvent(Base):
     before_hash: Mapped[Optional[str]] = mapped_column(String(128))
     after_hash: Mapped[Optional[str]] = mapped_column(String(128))
     metadata_json: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    chain_seq: Mapped[Optional[int]] = mapped_column(BigInteger)
+    chain_hash: Mapped[Optional[str]] = mapped_column(String(64))
+
+
+class EntityHistory(Base):
+    __tablename__ = "entity_history"
+    __table_args__ = (Index("ix_entity_history_entity", "entity_type", "entity_id", "occurred_at"),)
+
+    audit_id: Mapped[str] = mapped_column(String(40), primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(40), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(40), nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    action: Mapped[str] = mapped_column(String(80), nullable=False)
+    commit_id: Mapped[Optional[str]] = mapped_column(String(40))
+    action_id: Mapped[Optional[str]] = mapped_column(String(40))
+
+
+class ChangeFeedEntry(Base):
+    __tablename__ = "change_feed"
+
+    # Reserved from change_feed_head just before the writing transaction
+    # commits, so seq order is commit order and `seq > token` never skips a late commit.
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(40), nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class TaskViewCounter(Base):
+    __tablename__ = "task_view_counters"
+
+    view: Mapped[str] = mapped_column(String(20), primary_key=True)
+    topic_id: Mapped[str] = mapped_column(String(40), primary_key=True)
+    # "" for tasks without a cycle, so the key stays NOT NULL.
+    cycle_id: Mapped[str] = mapped_column(String(40), primary_key=True, default="")
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class TaskViewCounterState(Base):
+    __tablename__ = "task_view_counter_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    # UTC date the date-dependent counters were computed for.
+    as_of: Mapped[date] = mapped_column(Date, nullable=False)
+
+
+class ChangeFeedHead(Base):
+    __tablename__ = "change_feed_head"
+
+    # Single row (id 1): the last change_feed seq handed out.
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class AuditChainHead(Base):
+    __tablename__ = "audit_chain_heads"
+
+    name: Mapped[str] = mapped_column(String(40), primary_key=True)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
 
 
 class Cycle(Base):
@@ -436,23 +502,6 @@ class RouteEdge(Base):
     )
 
 
-class NodeLog(Base):
-    __tablename__ = "node_logs"
-
-    id: Mapped[str] = mapped_column(String(40), primary_key=True)
-    node_id: Mapped[str] = mapped_column(
-        String(40), ForeignKey("route_nodes.id", ondelete="CASCADE"), nullable=False
-    )
-    actor_type: Mapped[str] = mapped_column(String(20), nullable=False, default="human")
-    actor_id: Mapped[str] = mapped_column(String(80), nullable=False, default="local")
-    content: Mapped[str] = mapped_column(Text, nullable=False)
-    log_type: Mapped[str] = mapped_column(String(20), nullable=False, default="note")
-    source_ref: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
-    )
-
-
 class EntityLog(Base):
     __tablename__ = "entity_logs"
     __table_args__ = (
@@ -471,6 +520,8 @@ class EntityLog(Base):
     actor_type: Mapped[str] = mapped_column(String(20), nullable=False, default="human")
     actor_id: Mapped[str] = mapped_column(String(80), nullable=False, default="local")
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    log_type: Mapped[str] = mapped_column(String(20), nullable=False, default="note")
+    source_ref: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Optional
+
+# `fields=` on list endpoints: a named projection ("compact", "full") or a comma-separated list of
+# field names. None means the full row, so callers that never pass `fields` see no change.
+FULL = "full"
+COMPACT = "compact"
+
+
+def parse_fields(
+    raw: Optional[str],
+    *,
+    available: tuple[str, ...],
+    compact: tuple[str, ...],
+    error_code: str,
+) -> Optional[tuple[str, ...]]:
+    value = (raw or "").strip()
+    if not value or value == FULL:
+        return None
+    if value == COMPACT:
+        return compact
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names or any(name not in available for name in names):
+        raise ValueError(error_code)
+    # The id is always returned so sparse rows can still be addressed.
+    return tuple(dict.fromkeys(["id", *names]))
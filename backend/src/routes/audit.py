@@ -1,21 +1,49 @@
 from __future__ import annotations
 
+import logging
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from src.services.audit_service import list_audit_events
+from src.audit_export import (
+    audit_event_out,
+    export_chunk_path,
+    fail_columnar_export,
+    iter_ndjson,
+    new_export_id,
+    prune_exports,
+    read_export_manifest,
+    start_columnar_export,
+    write_columnar_export,
+)
+from src.config import settings
+from src.services.audit_service import (
+    ensure_audit_cursor,
+    iter_audit_events,
+    list_audit_events,
+    list_audit_events_async,
+)
 
+logger = logging.getLogger(__name__)
 
-def build_router(get_db_dep):
+
+def _raise_from_code(code: str) -> None:
+    status_code = 422
+    if code == "AUDIT_EXPORT_CURSOR_INVALID":
+        status_code = 400
+    elif code == "AUDIT_EXPORT_NOT_FOUND":
+        status_code = 404
+    raise HTTPException(status_code=status_code, detail={"code": code, "message": code.lower()})
+
+
+def build_router(get_db_dep, get_async_db_dep=None):
     router = APIRouter(prefix="/api/v1/audit", tags=["audit"])
 
-    @router.get("/events")
-    def list_events(
-        page: int = Query(default=1, ge=1),
-        page_size: int = Query(default=20, ge=1, le=100),
+    def event_filters(
         actor_type: Optional[str] = None,
         actor_id: Optional[str] = None,
         tool: Optional[str] = None,
@@ -24,36 +52,139 @@ def build_router(get_db_dep):
         target_id: Optional[str] = None,
         occurred_from: Optional[datetime] = None,
         occurred_to: Optional[datetime] = None,
+    ) -> dict:
+        return {
+            "actor_type": actor_type,
+            "actor_id": actor_id,
+            "tool": tool,
+            "action": action,
+            "target_type": target_type,
+            "target_id": target_id,
+            "occurred_from": occurred_from,
+            "occurred_to": occurred_to,
+        }
+
+    if get_async_db_dep is None:
+
+        @router.get("/events")
+        def list_events(
+            page: int = Query(default=1, ge=1),
+            page_size: int = Query(default=20, ge=1, le=100),
+            filters: dict = Depends(event_filters),
+            db: Session = Depends(get_db_dep),
+        ):
+            rows, total = list_audit_events(db, page=page, page_size=page_size, **filters)
+            items = [audit_event_out(r) for r in rows]
+            return {"items": items, "page": page, "page_size": page_size, "total": total}
+
+    else:
+
+        @router.get("/events")
+        async def list_events_async(
+            page: int = Query(default=1, ge=1),
+            page_size: int = Query(default=20, ge=1, le=100),
+            filters: dict = Depends(event_filters),
+            db=Depends(get_async_db_dep),
+        ):
+            rows, total = await list_audit_events_async(db, page=page, page_size=page_size, **filters)
+            items = [audit_event_out(r) for r in rows]
+            return {"items": items, "page": page, "page_size": page_size, "total": total}
+
+    def run_columnar_export(
+        engine,
+        export_id: str,
+        manifest: dict,
+        *,
+        cursor: Optional[str],
+        batch_size: int,
+        chunk_rows: int,
+        max_rows: int,
+        filters: dict,
+    ) -> None:
+        base_dir = settings.audit_export_path
+        try:
+            with Session(engine) as export_db:
+                rows = iter_audit_events(export_db, cursor=cursor, batch_size=batch_size, **filters)
+                write_columnar_export(
+                    rows,
+                    base_dir,
+                    export_id,
+                    chunk_rows=chunk_rows,
+                    max_rows=max_rows,
+                    cursor=cursor,
+                    filters=manifest["filters"],
+                )
+        except Exception:
+            logger.exception("columnar audit export %s failed", export_id)
+            fail_columnar_export(base_dir, export_id, manifest, "AUDIT_EXPORT_FAILED")
+
+    @router.get("/export")
+    def export_events(
+        background_tasks: BackgroundTasks,
+        format: Literal["ndjson", "columnar"] = "ndjson",
+        cursor: Optional[str] = None,
+        batch_size: int = Query(default=1000, ge=1, le=10000),
+        chunk_rows: int = Query(default=10000, ge=1, le=200000),
+        max_rows: Optional[int] = Query(default=None, ge=1),
+        filters: dict = Depends(event_filters),
         db: Session = Depends(get_db_dep),
     ):
-        rows, total = list_audit_events(
-            db,
-            page=page,
-            page_size=page_size,
-            actor_type=actor_type,
-            actor_id=actor_id,
-            tool=tool,
-            action=action,
-            target_type=target_type,
-            target_id=target_id,
-            occurred_from=occurred_from,
-            occurred_to=occurred_to,
-        )
-        items = [
-            {
-                "event_id": r.id,
-                "occurred_at": r.occurred_at,
-                "actor": {"type": r.actor_type, "id": r.actor_id},
-                "tool": r.tool,
-                "action": r.action,
-                "target": {"type": r.target_type, "id": r.target_id},
-                "source_refs": r.source_refs_json,
-                "before_hash": r.before_hash,
-                "after_hash": r.after_hash,
-                "metadata": r.metadata_json,
-            }
-            for r in rows
-        ]
-        return {"items": items, "page": page, "page_size": page_size, "total": total}
+        try:
+            ensure_audit_cursor(db, cursor)
+        except ValueError as exc:
+            _raise_from_code(str(exc))
+
+        if format == "columnar":
+            # Written by a background job after the response; poll /audit/exports/{export_id}.
+            base_dir = settings.audit_export_path
+            prune_exports(base_dir, max_age_s=settings.audit_export_ttl_hours * 3600)
+            export_id = new_export_id()
+            manifest = start_columnar_export(
+                base_dir,
+                export_id,
+                cursor=cursor,
+                filters={key: value for key, value in filters.items() if value is not None},
+            )
+            background_tasks.add_task(
+                run_columnar_export,
+                db.get_bind(),
+                export_id,
+                manifest,
+                cursor=cursor,
+                batch_size=batch_size,
+                chunk_rows=chunk_rows,
+                max_rows=min(max_rows or settings.audit_export_max_rows, settings.audit_export_max_rows),
+                filters=filters,
+            )
+            return JSONResponse(jsonable_encoder(manifest), status_code=202)
+
+        bind = db.get_bind()
+
+        def ndjson_stream():
+            # Rows are pulled lazily, batch_size at a time, while the response is written. The request's
+            # Session is torn down before the body is sent, so the stream reads through its own.
+            stream_db = Session(bind)
+            try:
+                rows = iter_audit_events(stream_db, cursor=cursor, batch_size=batch_size, **filters)
+                yield from iter_ndjson(rows, flush_rows=min(batch_size, 500))
+            finally:
+                stream_db.close()
+
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+    @router.get("/exports/{export_id}")
+    def get_export(export_id: str):
+        try:
+            return read_export_manifest(settings.audit_export_path, export_id)
+        except ValueError as exc:
+            _raise_from_code(str(exc))
+
+    @router.get("/exports/{export_id}/{file_name}")
+    def get_export_chunk(export_id: str, file_name: str):
+        try:
+            path = export_chunk_path(settings.audit_export_path, export_id, file_name)
+        except ValueError as exc:
+            _raise_from_code(str(exc))
+        return FileResponse(path, media_type="application/gzip", filename=file_name)
 
     return router
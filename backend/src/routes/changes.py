@@ -11,6 +11,8 @@ from src.schemas import (
     ChangeSetListOut,
     CommitIn,
     CommitOut,
+    DedupeLookupIn,
+    DedupeLookupOut,
     DryRunIn,
     DryRunOut,
     RejectOut,
@@ -50,6 +52,10 @@ def build_router(get_db_dep):
             "status": "proposed",
         }
 
+    @router.post("/changes/dedupe-lookup", response_model=DedupeLookupOut)
+    def dedupe_lookup(payload: DedupeLookupIn, db: Session = Depends(get_db_dep)):
+        return ChangeService(db).dedupe_lookup(payload)
+
     @router.post("/changes/{change_set_id}/commit", response_model=CommitOut)
     def commit(change_set_id: str, payload: CommitIn, db: Session = Depends(get_db_dep)):
         try:
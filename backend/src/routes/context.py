@@ -2,18 +2,26 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from src.schemas import ContextBundleOut
-from src.services.context_service import ContextService
+from src.schemas import ContextBundleOut, ContextChangesOut
+from src.services.context_service import AsyncContextService, ContextService
 
 
-def build_router(get_db_dep):
+def _raise_from_code(code: str) -> None:
+    status_code = 422
+    if code == "CHANGE_TOKEN_INVALID":
+        status_code = 400
+    elif code == "CHANGE_TOKEN_EXPIRED":
+        status_code = 410
+    raise HTTPException(status_code=status_code, detail={"code": code, "message": code.lower()})
+
+
+def build_router(get_db_dep, get_async_db_dep=None):
     router = APIRouter(prefix="/api/v1/context", tags=["context"])
 
-    @router.get("/bundle", response_model=ContextBundleOut)
-    def get_context_bundle(
+    def bundle_params(
         intent: str = Query(min_length=1),
         window_days: int = Query(default=14, ge=1, le=90),
         topic_id: Optional[list[str]] = Query(default=None),
@@ -21,16 +29,46 @@ def build_router(get_db_dep):
         tasks_limit: int = Query(default=20, ge=1, le=200),
         notes_limit: int = Query(default=20, ge=1, le=200),
         journals_limit: int = Query(default=14, ge=1, le=200),
+        rank: bool = False,
+        max_chars: Optional[int] = Query(default=None, ge=200, le=500_000),
+        max_tokens: Optional[int] = Query(default=None, ge=50, le=125_000),
+        snippet_chars: int = Query(default=240, ge=60, le=4000),
+    ) -> dict:
+        return {
+            "intent": intent,
+            "window_days": window_days,
+            "topic_ids": topic_id,
+            "include_done": include_done,
+            "tasks_limit": tasks_limit,
+            "notes_limit": notes_limit,
+            "journals_limit": journals_limit,
+            "rank": rank,
+            "max_chars": max_chars,
+            "max_tokens": max_tokens,
+            "snippet_chars": snippet_chars,
+        }
+
+    if get_async_db_dep is None:
+
+        @router.get("/bundle", response_model=ContextBundleOut)
+        def get_context_bundle(params: dict = Depends(bundle_params), db: Session = Depends(get_db_dep)):
+            return ContextService(db).bundle(**params)
+
+    else:
+
+        @router.get("/bundle", response_model=ContextBundleOut)
+        async def get_context_bundle_async(params: dict = Depends(bundle_params), db=Depends(get_async_db_dep)):
+            return await AsyncContextService(db).bundle(**params)
+
+    @router.get("/changes", response_model=ContextChangesOut)
+    def get_context_changes(
+        since: Optional[str] = Query(default=None, max_length=20),
+        limit: int = Query(default=500, ge=1, le=2000),
         db: Session = Depends(get_db_dep),
     ):
-        return ContextService(db).bundle(
-            intent=intent,
-            window_days=window_days,
-            topic_ids=topic_id,
-            include_done=include_done,
-            tasks_limit=tasks_limit,
-            notes_limit=notes_limit,
-            journals_limit=journals_limit,
-        )
+        try:
+            return ContextService(db).changes(since=since, limit=limit)
+        except ValueError as exc:
+            _raise_from_code(str(exc))
 
     return router
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from src.schemas import EntityHistoryOut
+from src.services.history_service import HistoryService
+
+
+def _raise_from_code(code: str) -> None:
+    status_code = 404 if code == "HISTORY_ENTITY_UNSUPPORTED" else 422
+    raise HTTPException(status_code=status_code, detail={"code": code, "message": code.lower()})
+
+
+def build_router(get_db_dep):
+    router = APIRouter(prefix="/api/v1", tags=["history"])
+
+    @router.get("/{entity}/{entity_id}/history", response_model=EntityHistoryOut)
+    def get_entity_history(entity: str, entity_id: str, db: Session = Depends(get_db_dep)):
+        try:
+            entity_type, items = HistoryService(db).list(entity, entity_id)
+        except ValueError as exc:
+            _raise_from_code(str(exc))
+        return {"entity_type": entity_type, "entity_id": entity_id, "items": items}
+
+    return router
@@ -5,7 +5,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
-from src.schemas import LinkCreate, LinkListOut, LinkOut
+from src.schemas import LinkCreate, LinkDirection, LinkEntityType, LinkListOut, LinkNeighborsOut, LinkOut
 from src.services.link_service import LinkService
 
 
@@ -34,6 +34,27 @@ def build_router(get_db_dep):
         )
         return {"items": items, "page": page, "page_size": page_size, "total": total}
 
+    @router.get("/neighbors", response_model=LinkNeighborsOut)
+    def list_link_neighbors(
+        entity_type: LinkEntityType,
+        entity_id: str = Query(min_length=1),
+        depth: int = Query(default=1, ge=1, le=4),
+        direction: LinkDirection = "both",
+        relation: Optional[list[str]] = Query(default=None),
+        types: Optional[list[LinkEntityType]] = Query(default=None),
+        max_nodes: int = Query(default=50, ge=1, le=500),
+        db: Session = Depends(get_db_dep),
+    ):
+        return LinkService(db).neighbors(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            depth=depth,
+            direction=direction,
+            relations=relation,
+            types=types,
+            max_nodes=max_nodes,
+        )
+
     @router.post("", response_model=LinkOut, status_code=201)
     def create_link(payload: LinkCreate, db: Session = Depends(get_db_dep)):
         return LinkService(db).create(payload)
@@ -9,24 +9,25 @@ from src.schemas import (
     NoteAppend,
     NoteBatchClassifyIn,
     NoteBatchClassifyOut,
+    NoteFacetsOut,
     NoteListOut,
     NoteOut,
     NotePatch,
     NoteSourceListOut,
     NoteTopicSummaryOut,
 )
-from src.services.note_service import NoteService
+from src.projections import parse_fields
+from src.services.note_service import NOTE_COMPACT_FIELDS, NOTE_FIELDS, AsyncNoteService, NoteService
 
 
-def build_router(get_db_dep):
+def build_router(get_db_dep, get_async_db_dep=None):
     router = APIRouter(prefix="/api/v1/notes", tags=["notes"])
 
     @router.post("/append", response_model=NoteOut, status_code=201)
     def append_note(payload: NoteAppend, db: Session = Depends(get_db_dep)):
         return NoteService(db).append(payload)
 
-    @router.get("/search", response_model=NoteListOut)
-    def search_notes(
+    def search_params(
         page: int = Query(default=1, ge=1),
         page_size: int = Query(default=20, ge=1, le=100),
         topic_id: Optional[str] = None,
@@ -34,18 +35,43 @@ def build_router(get_db_dep):
         status: str = "active",
         q: Optional[str] = None,
         tag: Optional[str] = None,
-        db: Session = Depends(get_db_dep),
-    ):
-        items, total = NoteService(db).search(
-            page=page,
-            page_size=page_size,
-            topic_id=topic_id,
-            unclassified=unclassified,
-            status=status,
-            q=q,
-            tag=tag,
-        )
-        return {"items": items, "page": page, "page_size": page_size, "total": total}
+        fields: Optional[str] = None,
+    ) -> dict:
+        try:
+            selected = parse_fields(
+                fields, available=NOTE_FIELDS, compact=NOTE_COMPACT_FIELDS, error_code="NOTE_FIELDS_INVALID"
+            )
+        except ValueError as exc:
+            code = str(exc)
+            raise HTTPException(status_code=422, detail={"code": code, "message": code.lower()}) from exc
+        return {
+            "page": page,
+            "page_size": page_size,
+            "topic_id": topic_id,
+            "unclassified": unclassified,
+            "status": status,
+            "q": q,
+            "tag": tag,
+            "fields": selected,
+        }
+
+    @router.get("/facets", response_model=NoteFacetsOut)
+    def note_facets(params: dict = Depends(search_params), db: Session = Depends(get_db_dep)):
+        return NoteService(db).facets(**params)
+
+    if get_async_db_dep is None:
+
+        @router.get("/search", response_model=NoteListOut)
+        def search_notes(params: dict = Depends(search_params), db: Session = Depends(get_db_dep)):
+            items, total = NoteService(db).search(**params)
+            return {"items": items, "page": params["page"], "page_size": params["page_size"], "total": total}
+
+    else:
+
+        @router.get("/search", response_model=NoteListOut)
+        async def search_notes_async(params: dict = Depends(search_params), db=Depends(get_async_db_dep)):
+            items, total = await AsyncNoteService(db).search(**params)
+            return {"items": items, "page": params["page"], "page_size": params["page_size"], "total": total}
 
     @router.patch("/{note_id}", response_model=NoteOut)
     def patch_note(note_id: str, payload: NotePatch, db: Session = Depends(get_db_dep)):
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import time
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from src.http_cache import conditional_json
 from src.schemas import (
     EntityLogCreate,
     EntityLogListOut,
@@ -25,7 +30,13 @@ from src.schemas import (
     RouteOut,
     RoutePatch,
 )
-from src.services.route_service import RouteGraphService, RouteService
+from src.services.route_service import (
+    AsyncRouteGraphService,
+    RouteGraphService,
+    RouteService,
+    route_log_listener,
+    wait_for_route_log,
+)
 
 
 def _raise_from_code(code: str) -> None:
@@ -58,7 +69,19 @@ def _raise_from_code(code: str) -> None:
     raise HTTPException(status_code=status_code, detail={"code": code, "message": code.lower()})
 
 
-def build_router(get_db_dep):
+def _log_page(items: list, limit: Optional[int]) -> dict:
+    # Callers fetch limit + 1 rows so the presence of a next page is known without a count query.
+    if limit is None or len(items) <= limit:
+        return {"items": items, "next_cursor": None}
+    items = items[:limit]
+    return {"items": items, "next_cursor": items[-1].id}
+
+
+def _sse_event(log_id: str, data: str, event: str = "log") -> str:
+    return f"id: {log_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+def build_router(get_db_dep, get_async_db_dep=None):
     router = APIRouter(prefix="/api/v1/routes", tags=["routes"])
 
     @router.post("", response_model=RouteOut, status_code=201)
@@ -70,6 +93,7 @@ def build_router(get_db_dep):
 
     @router.get("", response_model=RouteListOut)
     def list_routes(
+        request: Request,
         page: int = Query(default=1, ge=1),
         page_size: int = Query(default=20, ge=1, le=100),
         task_id: Optional[str] = None,
@@ -78,7 +102,9 @@ def build_router(get_db_dep):
         db: Session = Depends(get_db_dep),
     ):
         items, total = RouteService(db).list(page=page, page_size=page_size, task_id=task_id, status=status, q=q)
-        return {"items": items, "page": page, "page_size": page_size, "total": total}
+        return conditional_json(
+            request, RouteListOut, {"items": items, "page": page, "page_size": page_size, "total": total}
+        )
 
     @router.patch("/{route_id}", response_model=RouteOut)
     def patch_route(route_id: str, payload: RoutePatch, db: Session = Depends(get_db_dep)):
@@ -156,13 +182,25 @@ def build_router(get_db_dep):
             )
         return Response(status_code=204)
 
-    @router.get("/{route_id}/graph", response_model=RouteGraphOut)
-    def get_route_graph(route_id: str, db: Session = Depends(get_db_dep)):
-        try:
-            nodes, edges = RouteGraphService(db).get_graph(route_id)
-        except ValueError as exc:
-            _raise_from_code(str(exc))
-        return {"route_id": route_id, "nodes": nodes, "edges": edges}
+    if get_async_db_dep is None:
+
+        @router.get("/{route_id}/graph", response_model=RouteGraphOut)
+        def get_route_graph(route_id: str, request: Request, db: Session = Depends(get_db_dep)):
+            try:
+                nodes, edges = RouteGraphService(db).get_graph(route_id)
+            except ValueError as exc:
+                _raise_from_code(str(exc))
+            return conditional_json(request, RouteGraphOut, {"route_id": route_id, "nodes": nodes, "edges": edges})
+
+    else:
+
+        @router.get("/{route_id}/graph", response_model=RouteGraphOut)
+        async def get_route_graph_async(route_id: str, request: Request, db=Depends(get_async_db_dep)):
+            try:
+                nodes, edges = await AsyncRouteGraphService(db).get_graph(route_id)
+            except ValueError as exc:
+                _raise_from_code(str(exc))
+            return conditional_json(request, RouteGraphOut, {"route_id": route_id, "nodes": nodes, "edges": edges})
 
     @router.post("/{route_id}/nodes/{node_id}/logs", response_model=NodeLogOut, status_code=201)
     def append_node_log(route_id: str, node_id: str, payload: NodeLogCreate, db: Session = Depends(get_db_dep)):
@@ -172,12 +210,27 @@ def build_router(get_db_dep):
             _raise_from_code(str(exc))
 
     @router.get("/{route_id}/nodes/{node_id}/logs", response_model=NodeLogListOut)
-    def list_node_logs(route_id: str, node_id: str, db: Session = Depends(get_db_dep)):
+    def list_node_logs(
+        route_id: str,
+        node_id: str,
+        limit: Optional[int] = Query(default=None, ge=1, le=500),
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        db: Session = Depends(get_db_dep),
+    ):
         try:
-            items = RouteGraphService(db).list_node_logs(route_id, node_id)
+            items = RouteGraphService(db).list_node_logs(
+                route_id,
+                node_id,
+                limit=None if limit is None else limit + 1,
+                cursor=cursor,
+                since=since,
+                until=until,
+            )
         except ValueError as exc:
             _raise_from_code(str(exc))
-        return {"items": items}
+        return _log_page(items, limit)
 
     @router.patch("/{route_id}/nodes/{node_id}/logs/{log_id}", response_model=NodeLogOut)
     def patch_node_log(
@@ -210,12 +263,28 @@ def build_router(get_db_dep):
             _raise_from_code(str(exc))
 
     @router.get("/{route_id}/edges/{edge_id}/logs", response_model=EntityLogListOut)
-    def list_edge_logs(route_id: str, edge_id: str, db: Session = Depends(get_db_dep)):
+    def list_edge_logs(
+        route_id: str,
+        edge_id: str,
+        limit: Optional[int] = Query(default=None, ge=1, le=500),
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        db: Session = Depends(get_db_dep),
+    ):
         try:
-            items = RouteGraphService(db).list_entity_logs(route_id, "route_edge", edge_id)
+            items = RouteGraphService(db).list_entity_logs(
+                route_id,
+                "route_edge",
+                edge_id,
+                limit=None if limit is None else limit + 1,
+                cursor=cursor,
+                since=since,
+                until=until,
+            )
         except ValueError as exc:
             _raise_from_code(str(exc))
-        return {"items": items}
+        return _log_page(items, limit)
 
     @router.patch("/{route_id}/edges/{edge_id}/logs/{log_id}", response_model=EntityLogOut)
     def patch_edge_log(
@@ -238,4 +307,80 @@ def build_router(get_db_dep):
             _raise_from_code(str(exc))
         return Response(status_code=204)
 
+    @router.get("/{route_id}/logs/stream")
+    async def stream_route_logs(
+        route_id: str,
+        since: Optional[datetime] = None,
+        last_event_id: Optional[str] = Header(default=None),
+        poll_seconds: float = Query(default=5.0, ge=0.05, le=30.0),
+        timeout_seconds: float = Query(default=300.0, gt=0, le=3600.0),
+        db: Session = Depends(get_db_dep),
+    ):
+        bind = db.get_bind()
+
+        def fetch(
+            session: Session, after: Optional[str], floor_id: Optional[str], exclude_ids: set[str]
+        ) -> list[tuple[str, datetime, str]]:
+            logs = RouteGraphService(session).tail_route_logs(
+                route_id, after=after, after_floor_id=floor_id, exclude_ids=exclude_ids, since=since
+            )
+            return [(log.id, log.created_at, EntityLogOut.model_validate(log).model_dump_json()) for log in logs]
+
+        def poll(
+            after: Optional[str], floor_id: Optional[str], exclude_ids: set[str]
+        ) -> list[tuple[str, datetime, str]]:
+            # The request's Session is torn down before the body is sent, so each poll opens (and
+            # closes) its own on the worker thread that runs it; nothing is held between polls.
+            with Session(bind) as poll_db:
+                return fetch(poll_db, after, floor_id, exclude_ids)
+
+        def open_stream() -> tuple[list[tuple[str, datetime, str]], Optional[datetime]]:
+            backlog = fetch(db, last_event_id, last_event_id, set())
+            anchor = RouteGraphService(db).route_log_created_at(route_id, last_event_id) if last_event_id else None
+            return backlog, anchor
+
+        try:
+            backlog, anchor_created_at = await run_in_threadpool(open_stream)
+        except ValueError as exc:
+            _raise_from_code(str(exc))
+
+        async def event_stream():
+            # Only the short tail queries take a threadpool thread; waiting between them is a
+            # plain await on the event loop.
+            deadline = time.monotonic() + timeout_seconds
+            pending = backlog
+            after = last_event_id
+            floor_id = last_event_id
+            instant = anchor_created_at
+            delivered: set[str] = set()
+            with route_log_listener() as appended:
+                while True:
+                    for log_id, created_at, data in pending:
+                        if created_at != instant:
+                            instant = created_at
+                            floor_id = None
+                            delivered = set()
+                        delivered.add(log_id)
+                        after = log_id
+                        yield _sse_event(log_id, data)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    if not pending:
+                        yield ": keepalive\n\n"
+                    await wait_for_route_log(appended, min(poll_seconds, remaining))
+                    # Cleared before the query, so a log committed while it runs wakes the next wait.
+                    appended.clear()
+                    try:
+                        pending = await run_in_threadpool(poll, after, floor_id, delivered)
+                    except ValueError as exc:
+                        yield f"event: error\ndata: {str(exc)}\n\n"
+                        return
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     return router
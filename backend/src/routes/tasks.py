@@ -4,6 +4,8 @@ from datetime import date, datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from src.schemas import (
@@ -12,13 +14,15 @@ from src.schemas import (
     TaskBatchUpdateIn,
     TaskBatchUpdateOut,
     TaskCreate,
+    TaskFacetsOut,
     TaskListOut,
     TaskOut,
     TaskPatch,
     TaskSourceListOut,
     TaskViewsSummaryOut,
 )
-from src.services.task_service import TaskService
+from src.projections import parse_fields
+from src.services.task_service import TASK_COMPACT_FIELDS, TASK_FIELDS, TaskService
 from src.validators.task_validator import ensure_patch_has_fields
 
 
@@ -36,8 +40,7 @@ def build_router(get_db_dep):
                 detail={"code": code, "message": code.lower()},
             ) from exc
 
-    @router.get("", response_model=TaskListOut)
-    def list_tasks(
+    def list_params(
         page: int = Query(default=1, ge=1),
         page_size: int = Query(default=20, ge=1, le=100),
         status: Optional[str] = None,
@@ -50,23 +53,46 @@ def build_router(get_db_dep):
         updated_before: Optional[datetime] = None,
         view: Optional[str] = None,
         q: Optional[str] = None,
-        db: Session = Depends(get_db_dep),
-    ):
-        items, total = TaskService(db).list(
-            page=page,
-            page_size=page_size,
-            status=status,
-            priority=priority,
-            archived=archived,
-            topic_id=topic_id,
-            cycle_id=cycle_id,
-            stale_days=stale_days,
-            due_before=due_before,
-            updated_before=updated_before,
-            view=view,
-            q=q,
-        )
-        return {"items": items, "page": page, "page_size": page_size, "total": total}
+        fields: Optional[str] = None,
+    ) -> dict:
+        try:
+            selected = parse_fields(
+                fields, available=TASK_FIELDS, compact=TASK_COMPACT_FIELDS, error_code="TASK_FIELDS_INVALID"
+            )
+        except ValueError as exc:
+            code = str(exc)
+            raise HTTPException(status_code=422, detail={"code": code, "message": code.lower()}) from exc
+        return {
+            "page": page,
+            "page_size": page_size,
+            "status": status,
+            "priority": priority,
+            "archived": archived,
+            "topic_id": topic_id,
+            "cycle_id": cycle_id,
+            "stale_days": stale_days,
+            "due_before": due_before,
+            "updated_before": updated_before,
+            "view": view,
+            "q": q,
+            "fields": selected,
+        }
+
+    @router.get("", response_model=TaskListOut)
+    def list_tasks(params: dict = Depends(list_params), db: Session = Depends(get_db_dep)):
+        items, total = TaskService(db).list(**params)
+        body = {"items": items, "page": params["page"], "page_size": params["page_size"], "total": total}
+        if params["fields"] is not None:
+            # Sparse items do not fit TaskOut, so they skip response_model validation.
+            return JSONResponse(jsonable_encoder(body))
+        return body
+
+    @router.get("/facets", response_model=TaskFacetsOut)
+    def task_facets(params: dict = Depends(list_params), db: Session = Depends(get_db_dep)):
+        body = TaskService(db).facets(**params)
+        if params["fields"] is not None:
+            return JSONResponse(jsonable_encoder(body))
+        return body
 
     @router.patch("/{task_id}", response_model=TaskOut)
     def patch_task(task_id: str, payload: TaskPatch, db: Session = Depends(get_db_dep)):
@@ -110,8 +136,12 @@ def build_router(get_db_dep):
         return {"items": items}
 
     @router.get("/views/summary", response_model=TaskViewsSummaryOut)
-    def task_views_summary(db: Session = Depends(get_db_dep)):
-        return TaskService(db).views_summary()
+    def task_views_summary(
+        topic_id: Optional[str] = None,
+        cycle_id: Optional[str] = None,
+        db: Session = Depends(get_db_dep),
+    ):
+        return TaskService(db).views_summary(topic_id=topic_id, cycle_id=cycle_id)
 
     @router.delete("/{task_id}", status_code=204)
     def delete_task(task_id: str, db: Session = Depends(get_db_dep)):
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
+from src.http_cache import conditional_json
 from src.schemas import TopicCreate, TopicListOut, TopicOut
 from src.services.task_service import TopicService
 
@@ -28,8 +29,8 @@ def build_router(get_db_dep):
             ) from exc
 
     @router.get("", response_model=TopicListOut)
-    def list_topics(db: Session = Depends(get_db_dep)):
+    def list_topics(request: Request, db: Session = Depends(get_db_dep)):
         items = TopicService(db).list()
-        return {"items": items}
+        return conditional_json(request, TopicListOut, {"items": items})
 
     return router
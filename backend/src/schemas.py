@@ -14,6 +14,8 @@ TopicStatus = Literal["active", "watch", "archived"]
 NoteStatus = Literal["active", "archived"]
 KnowledgeStatus = Literal["active", "archived"]
 KnowledgeCategory = Literal["ops_manual", "mechanism_spec", "decision_record"]
+LinkEntityType = Literal["note", "task"]
+LinkDirection = Literal["out", "in", "both"]
 
 
 class TaskCreate(BaseModel):
@@ -73,6 +75,18 @@ class TaskListOut(BaseModel):
     total: int
 
 
+class FacetBucketOut(BaseModel):
+    value: Optional[str]
+    count: int
+
+
+class TaskFacetsOut(TaskListOut):
+    # status, priority, topic, cycle -> buckets, most frequent first; a null value counts rows without one.
+    facets: dict[str, list[FacetBucketOut]]
+    filter_hash: str
+    cached: Optional[bool]
+
+
 class TaskBatchUpdateIn(BaseModel):
     model_config = ConfigDict(extra="forbid")
     task_ids: list[str] = Field(min_length=1)
@@ -259,6 +273,17 @@ class NoteOut(BaseModel):
     updated_at: datetime
 
 
+class NoteFacetsOut(BaseModel):
+    items: list[dict[str, Any]]
+    page: int
+    page_size: int
+    total: int
+    # status, topic, category, tag -> buckets, most frequent first.
+    facets: dict[str, list[FacetBucketOut]]
+    filter_hash: str
+    cached: Optional[bool]
+
+
 class NotePatch(BaseModel):
     model_config = ConfigDict(extra="forbid")
     title: Optional[str] = Field(default=None, min_length=1, max_length=200)
@@ -343,9 +368,9 @@ class KnowledgeListOut(BaseModel):
 
 class LinkCreate(BaseModel):
     model_config = ConfigDict(extra="forbid")
-    from_type: Literal["note", "task"]
+    from_type: LinkEntityType
     from_id: str = Field(min_length=1)
-    to_type: Literal["note", "task"]
+    to_type: LinkEntityType
     to_id: str = Field(min_length=1)
     relation: str = Field(min_length=1)
 
@@ -367,6 +392,58 @@ class LinkListOut(BaseModel):
     total: int
 
 
+class LinkNeighborOut(BaseModel):
+    type: LinkEntityType
+    id: str
+    depth: int
+    title: Optional[str] = None
+    status: Optional[str] = None
+
+
+class LinkNeighborsOut(BaseModel):
+    origin_type: LinkEntityType
+    origin_id: str
+    depth: int
+    nodes: list[LinkNeighborOut]
+    edges: list[LinkOut]
+    truncated: bool
+
+
+class HistoryFieldChangeOut(BaseModel):
+    field: str
+    before: Any = None
+    after: Any = None
+
+
+class HistoryActorOut(BaseModel):
+    type: str
+    id: str
+
+
+class EntityHistoryItemOut(BaseModel):
+    audit_id: str
+    occurred_at: datetime
+    action: str
+    # True once the audit row was detached/archived; tool, actor, source_refs and hashes are then empty.
+    audit_archived: bool = False
+    tool: Optional[str] = None
+    actor: Optional[HistoryActorOut] = None
+    commit_id: Optional[str] = None
+    action_id: Optional[str] = None
+    change_set_id: Optional[str] = None
+    action_type: Optional[str] = None
+    source_refs: list = Field(default_factory=list)
+    before_hash: Optional[str] = None
+    after_hash: Optional[str] = None
+    changes: list[HistoryFieldChangeOut] = Field(default_factory=list)
+
+
+class EntityHistoryOut(BaseModel):
+    entity_type: str
+    entity_id: str
+    items: list[EntityHistoryItemOut]
+
+
 class TaskSourceOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -426,6 +503,18 @@ class DryRunIn(BaseModel):
     tool: str = Field(min_length=1)
 
 
+class DedupeLookupIn(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    task_titles: list[str] = Field(default_factory=list, max_length=200)
+    note_titles: list[str] = Field(default_factory=list, max_length=200)
+
+
+class DedupeLookupOut(BaseModel):
+    # Keyed by the requested title; None when no active task/note has the same normalized title.
+    tasks: dict[str, Optional[TaskOut]]
+    notes: dict[str, Optional[NoteOut]]
+
+
 class DryRunOut(BaseModel):
     change_set_id: str
     summary: dict[str, int]
@@ -511,6 +600,20 @@ class ContextBundleOut(BaseModel):
     tasks: list[dict[str, Any]]
     notes: list[dict[str, Any]]
     journals: list[dict[str, Any]]
+    ranking: Optional[dict[str, Any]] = None
+
+
+class ContextChangesOut(BaseModel):
+    since: Optional[str]
+    next_token: str
+    has_more: bool
+    summary: dict[str, int]
+    tasks: list[dict[str, Any]]
+    notes: list[dict[str, Any]]
+    journals: list[dict[str, Any]]
+    routes: list[dict[str, Any]]
+    links: list[dict[str, Any]]
+    deleted: list[dict[str, str]]
 
 
 IdeaStatus = Literal["captured", "triage", "discovery", "ready", "rejected"]
@@ -691,20 +794,21 @@ class NodeLogCreate(BaseModel):
 class NodeLogOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
-    node_id: str
+    node_id: str = Field(validation_alias="entity_id")
     entity_type: Literal["route_node"] = "route_node"
-    entity_id: str = Field(validation_alias="node_id")
+    entity_id: str
     actor_type: RouteAssigneeType
     actor_id: str
     content: str
     log_type: NodeLogType
     source_ref: Optional[str]
     created_at: datetime
-    updated_at: datetime = Field(validation_alias="created_at")
+    updated_at: datetime
 
 
 class NodeLogListOut(BaseModel):
     items: list[NodeLogOut]
+    next_cursor: Optional[str] = None
 
 
 class EntityLogCreate(BaseModel):
@@ -728,12 +832,15 @@ class EntityLogOut(BaseModel):
     actor_type: RouteAssigneeType
     actor_id: str
     content: str
+    log_type: NodeLogType = "note"
+    source_ref: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
 
 class EntityLogListOut(BaseModel):
     items: list[EntityLogOut]
+    next_cursor: Optional[str] = None
 
 
 class IdeaPromoteIn(BaseModel):
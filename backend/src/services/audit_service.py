@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Iterator, Optional
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import and_, desc, event, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.audit_chain import append_audit_events, target_state_hash
+from src.metrics import AUDIT_EVENTS_WRITTEN
 from src.models import AuditEvent
+from src.services.audit_writer import event_row, get_audit_writer
+from src.services.history_service import record_entity_history
+
+PENDING_AUDIT_EVENTS = "pending_audit_events"
 
 
 def log_audit_event(
@@ -25,8 +32,14 @@ def log_audit_event(
     metadata: Optional[dict] = None,
     auto_commit: bool = True,
 ) -> AuditEvent:
+    if not auto_commit:
+        # Change-set audits hash the target as staged in the caller's transaction.
+        db.flush()
+    if after_hash is None:
+        after_hash = target_state_hash(db, target_type, target_id)
     event = AuditEvent(
         id=f"aud_{uuid.uuid4().hex[:12]}",
+        occurred_at=datetime.now(timezone.utc),
         actor_type=actor_type,
         actor_id=actor_id,
         tool=tool,
@@ -38,20 +51,45 @@ def log_audit_event(
         after_hash=after_hash,
         metadata_json=metadata or {},
     )
-    db.add(event)
+    # Change-set audits stay in the caller's transaction; direct writes may go through the buffer.
+    writer = get_audit_writer(db.get_bind()) if auto_commit else None
+    if writer is not None:
+        writer.submit(event_row(event))
+        return event
+    # Chained in before_commit, so the audit_chain_heads row lock is held for the commit only,
+    # not from the first audited action of a change set onwards.
+    db.info.setdefault(PENDING_AUDIT_EVENTS, []).append(event)
     if auto_commit:
         db.commit()
-        db.refresh(event)
-    else:
-        db.flush()
     return event
 
 
-def list_audit_events(
-    db: Session,
+@event.listens_for(Session, "before_commit")
+def _chain_pending_audit_events(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop(PENDING_AUDIT_EVENTS, None)
+    if not pending:
+        return
+    conn = session.connection()
+    chained = append_audit_events(conn, [event_row(audit) for audit in pending])
+    record_entity_history(conn, chained)
+    AUDIT_EVENTS_WRITTEN.inc(len(chained), mode="sync")
+    for audit, row in zip(pending, chained):
+        audit.before_hash = row["before_hash"]
+        audit.chain_seq = row["chain_seq"]
+        audit.chain_hash = row["chain_hash"]
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending_audit_events(session: Session, transaction) -> None:
+    # Events of a rolled-back transaction are dropped with it.
+    if transaction.parent is None:
+        session.info.pop(PENDING_AUDIT_EVENTS, None)
+
+
+def _audit_conditions(
     *,
-    page: int,
-    page_size: int,
     actor_type: Optional[str] = None,
     actor_id: Optional[str] = None,
     tool: Optional[str] = None,
@@ -60,36 +98,99 @@ def list_audit_events(
     target_id: Optional[str] = None,
     occurred_from: Optional[datetime] = None,
     occurred_to: Optional[datetime] = None,
-) -> tuple[list[AuditEvent], int]:
-    stmt = select(AuditEvent)
-    count_stmt = select(func.count()).select_from(AuditEvent)
-
+) -> list:
+    conditions = []
     if actor_type:
-        stmt = stmt.where(AuditEvent.actor_type == actor_type)
-        count_stmt = count_stmt.where(AuditEvent.actor_type == actor_type)
+        conditions.append(AuditEvent.actor_type == actor_type)
     if actor_id:
-        stmt = stmt.where(AuditEvent.actor_id == actor_id)
-        count_stmt = count_stmt.where(AuditEvent.actor_id == actor_id)
+        conditions.append(AuditEvent.actor_id == actor_id)
     if tool:
-        stmt = stmt.where(AuditEvent.tool == tool)
-        count_stmt = count_stmt.where(AuditEvent.tool == tool)
+        conditions.append(AuditEvent.tool == tool)
     if action:
-        stmt = stmt.where(AuditEvent.action == action)
-        count_stmt = count_stmt.where(AuditEvent.action == action)
+        conditions.append(AuditEvent.action == action)
     if target_type:
-        stmt = stmt.where(AuditEvent.target_type == target_type)
-        count_stmt = count_stmt.where(AuditEvent.target_type == target_type)
+        conditions.append(AuditEvent.target_type == target_type)
     if target_id:
-        stmt = stmt.where(AuditEvent.target_id == target_id)
-        count_stmt = count_stmt.where(AuditEvent.target_id == target_id)
+        conditions.append(AuditEvent.target_id == target_id)
     if occurred_from:
-        stmt = stmt.where(AuditEvent.occurred_at >= occurred_from)
-        count_stmt = count_stmt.where(AuditEvent.occurred_at >= occurred_from)
+        conditions.append(AuditEvent.occurred_at >= occurred_from)
     if occurred_to:
-        stmt = stmt.where(AuditEvent.occurred_at <= occurred_to)
-        count_stmt = count_stmt.where(AuditEvent.occurred_at <= occurred_to)
+        conditions.append(AuditEvent.occurred_at <= occurred_to)
+    return conditions
 
-    stmt = stmt.order_by(desc(AuditEvent.occurred_at)).offset((page - 1) * page_size).limit(page_size)
+
+def list_audit_events(
+    db: Session,
+    *,
+    page: int,
+    page_size: int,
+    actor_type: Optional[str] = None,
+    actor_id: Optional[str] = None,
+    tool: Optional[str] = None,
+    action: Optional[str] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    occurred_from: Optional[datetime] = None,
+    occurred_to: Optional[datetime] = None,
+) -> tuple[list[AuditEvent], int]:
+    conditions = _audit_conditions(
+        actor_type=actor_type,
+        actor_id=actor_id,
+        tool=tool,
+        action=action,
+        target_type=target_type,
+        target_id=target_id,
+        occurred_from=occurred_from,
+        occurred_to=occurred_to,
+    )
+    stmt, count_stmt = _list_statements(conditions, page=page, page_size=page_size)
     items = list(db.scalars(stmt))
     total = int(db.scalar(count_stmt) or 0)
     return items, total
+
+
+async def list_audit_events_async(
+    db: AsyncSession, *, page: int, page_size: int, **filters
+) -> tuple[list[AuditEvent], int]:
+    stmt, count_stmt = _list_statements(_audit_conditions(**filters), page=page, page_size=page_size)
+    items = list(await db.scalars(stmt))
+    total = int(await db.scalar(count_stmt) or 0)
+    return items, total
+
+
+def _list_statements(conditions: list, *, page: int, page_size: int):
+    stmt = select(AuditEvent).where(*conditions)
+    count_stmt = select(func.count()).select_from(AuditEvent).where(*conditions)
+    stmt = stmt.order_by(desc(AuditEvent.occurred_at)).offset((page - 1) * page_size).limit(page_size)
+    return stmt, count_stmt
+
+
+def ensure_audit_cursor(db: Session, cursor: Optional[str]) -> None:
+    if cursor and db.get(AuditEvent, cursor) is None:
+        raise ValueError("AUDIT_EXPORT_CURSOR_INVALID")
+
+
+def iter_audit_events(
+    db: Session,
+    *,
+    cursor: Optional[str] = None,
+    batch_size: int = 1000,
+    **filters,
+) -> Iterator:
+    conditions = _audit_conditions(**filters)
+    if cursor:
+        # Compare against the stored value so SQLite's second-resolution defaults stay comparable.
+        anchor = select(AuditEvent.occurred_at).where(AuditEvent.id == cursor).scalar_subquery()
+        conditions.append(
+            or_(
+                AuditEvent.occurred_at > anchor,
+                and_(AuditEvent.occurred_at == anchor, AuditEvent.id > cursor),
+            )
+        )
+    stmt = (
+        select(*AuditEvent.__table__.columns)
+        .where(*conditions)
+        .order_by(AuditEvent.occurred_at.asc(), AuditEvent.id.asc())
+    )
+    # yield_per streams through a server-side cursor on Postgres instead of buffering the result.
+    yield from db.execute(stmt, execution_options={"yield_per": batch_size})
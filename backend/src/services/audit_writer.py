@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from src.audit_chain import append_audit_events
+from src.metrics import AUDIT_EVENTS_WRITTEN
+from src.models import AuditEvent
+from src.services.history_service import record_entity_history
+
+logger = logging.getLogger(__name__)
+
+AUDIT_COLUMNS = (
+    "id",
+    "occurred_at",
+    "actor_type",
+    "actor_id",
+    "tool",
+    "action",
+    "target_type",
+    "target_id",
+    "source_refs_json",
+    "before_hash",
+    "after_hash",
+    "metadata_json",
+)
+
+_writers: dict[Any, "BufferedAuditWriter"] = {}
+_writers_lock = threading.Lock()
+
+
+def register_audit_writer(engine, writer: "BufferedAuditWriter") -> None:
+    with _writers_lock:
+        previous = _writers.get(engine)
+        _writers[engine] = writer
+    if previous is not None and previous is not writer:
+        previous.close()
+
+
+def get_audit_writer(engine) -> Optional["BufferedAuditWriter"]:
+    return _writers.get(engine)
+
+
+def unregister_audit_writer(engine) -> None:
+    with _writers_lock:
+        writer = _writers.pop(engine, None)
+    if writer is not None:
+        writer.close()
+
+
+class _Segment:
+    # One spool file and the number of its events not yet in the database.
+    __slots__ = ("path", "rows", "pending")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows = 0
+        self.pending = 0
+
+
+class BufferedAuditWriter:
+    def __init__(
+        self,
+        engine,
+        *,
+        batch_size: int = 100,
+        flush_interval_ms: int = 200,
+        spool_path: Optional[Path] = None,
+        segment_events: int = 1000,
+    ):
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_interval_ms) / 1000.0
+        self.spool_path = spool_path
+        self.segment_events = max(1, segment_events)
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self._queue: queue.Queue[Optional[tuple[Optional[_Segment], dict]]] = queue.Queue()
+        self._lock = threading.Lock()
+        self._retry: list[tuple[Optional[_Segment], dict]] = []
+        self._closed = False
+        self._spool = None
+        self._segment: Optional[_Segment] = None
+        self._segment_seq = 0
+        # Group commit: submit() only appends to the spool; the sync thread fsyncs once per flush
+        # window (or sooner after batch_size appends), covering every event written since the last one.
+        self._unsynced = 0
+        self._unsynced_fds: list[int] = []
+        self._sync_wakeup = threading.Event()
+        self._sync_thread: Optional[threading.Thread] = None
+        if spool_path is not None:
+            spool_path.parent.mkdir(parents=True, exist_ok=True)
+            self._replay_spool()
+            self._segment = _Segment(spool_path)
+            self._spool = open(spool_path, "a", encoding="utf-8")
+            self._sync_thread = threading.Thread(target=self._sync_loop, name="audit-spool-sync", daemon=True)
+            self._sync_thread.start()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row: dict) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("audit writer is closed")
+            segment = self._segment
+            if segment is not None:
+                self._spool.write(json.dumps(row, default=_json_default, ensure_ascii=False) + "\n")
+                self._spool.flush()
+                segment.rows += 1
+                segment.pending += 1
+                self._unsynced += 1
+                if self._unsynced >= self.batch_size:
+                    self._sync_wakeup.set()
+            self._queue.put((segment, row))
+            if segment is not None and segment.rows >= self.segment_events:
+                self._rotate()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+        if self._sync_thread is not None:
+            self._sync_wakeup.set()
+            self._sync_thread.join(timeout)
+            self._sync_spool()
+        if self._spool is not None:
+            self._spool.close()
+        atexit.unregister(self.close)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize(),
+            "retrying": len(self._retry),
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+        }
+
+    def _sync_loop(self) -> None:
+        while not self._closed:
+            self._sync_wakeup.wait(self.flush_interval)
+            self._sync_wakeup.clear()
+            try:
+                self._sync_spool()
+            except OSError:
+                logger.exception("audit spool fsync failed")
+
+    def _sync_spool(self) -> None:
+        # The descriptors are duplicated under the lock and synced outside it, so submit() never
+        # waits on the disk; a rotated segment's descriptor is queued by _rotate() before it closes.
+        with self._lock:
+            fds, self._unsynced_fds = self._unsynced_fds, []
+            if self._unsynced and self._spool is not None and not self._spool.closed:
+                fds.append(os.dup(self._spool.fileno()))
+            self._unsynced = 0
+        for fd in fds:
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch and not self._write_with_retry(batch):
+                # Keep the batch (and its spool segment) and try again before anything newer.
+                self._retry = batch
+        # Drain anything submitted before close() raced with the sentinel.
+        leftovers, self._retry = self._retry, []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.task_done()
+            else:
+                leftovers.append(item)
+        for start in range(0, len(leftovers), self.batch_size):
+            batch = leftovers[start : start + self.batch_size]
+            if not self._write_with_retry(batch):
+                # Still in the spool: replayed on the next start.
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _next_batch(self) -> tuple[list[tuple[Optional[_Segment], dict]], bool]:
+        batch, self._retry = self._retry, []
+        if not batch:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                return [], True
+            batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.task_done()
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write_with_retry(self, batch: list[tuple[Optional[_Segment], dict]], attempts: int = 3) -> bool:
+        rows = [row for _, row in batch]
+        for attempt in range(attempts):
+            try:
+                self._write(rows)
+            except Exception:
+                self.failures += 1
+                logger.exception("audit batch write failed (attempt %s/%s)", attempt + 1, attempts)
+                time.sleep(self.flush_interval * (2**attempt))
+                continue
+            self._mark_flushed(batch)
+            for _ in batch:
+                self._queue.task_done()
+            return True
+        return False
+
+    def _write(self, batch: list[dict]) -> None:
+        # At-least-once delivery: a spooled event replayed after a crash may already be stored.
+        with self.engine.begin() as conn:
+            chained = append_audit_events(conn, batch, skip_existing=True)
+            record_entity_history(conn, chained)
+        AUDIT_EVENTS_WRITTEN.inc(len(chained), mode="buffered")
+        self.written += len(batch)
+        self.batches += 1
+
+    def _rotate(self) -> None:
+        # Called with the lock held: seal the active file under a numbered name and start a new one,
+        # so the spool stays bounded even when the writer never catches up completely.
+        self._unsynced_fds.append(os.dup(self._spool.fileno()))
+        self._spool.close()
+        self._segment_seq += 1
+        sealed = self.spool_path.with_name(f"{self.spool_path.name}.{self._segment_seq:06d}")
+        os.replace(self.spool_path, sealed)
+        self._segment.path = sealed
+        self._segment = _Segment(self.spool_path)
+        self._spool = open(self.spool_path, "a", encoding="utf-8")
+
+    def _mark_flushed(self, batch: list[tuple[Optional[_Segment], dict]]) -> None:
+        with self._lock:
+            for segment, count in Counter(segment for segment, _ in batch).items():
+                if segment is None:
+                    continue
+                segment.pending -= count
+                if segment.pending:
+                    continue
+                if segment is self._segment:
+                    if not self._spool.closed:
+                        self._spool.truncate(0)
+                        self._spool.seek(0)
+                        segment.rows = 0
+                else:
+                    segment.path.unlink(missing_ok=True)
+
+    def _segment_files(self) -> list[Path]:
+        assert self.spool_path is not None
+        prefix = f"{self.spool_path.name}."
+        sealed = [
+            path
+            for path in self.spool_path.parent.glob(f"{self.spool_path.name}.*")
+            if path.name[len(prefix) :].isdigit()
+        ]
+        return sorted(sealed, key=lambda path: int(path.name[len(prefix) :]))
+
+    def _replay_spool(self) -> None:
+        assert self.spool_path is not None
+        for path in [*self._segment_files(), self.spool_path]:
+            if not path.exists():
+                continue
+            try:
+                self._replay_segment(path)
+            except Exception:
+                # Boot must not depend on one bad segment: set it aside for inspection and go on.
+                quarantined = path.with_name(f"{path.name}.{int(time.time())}.corrupt")
+                logger.exception("audit spool segment %s could not be replayed; moved aside", path.name)
+                os.replace(path, quarantined)
+                continue
+            if path != self.spool_path:
+                path.unlink(missing_ok=True)
+        self.spool_path.write_text("", encoding="utf-8")
+
+    def _replay_segment(self, path: Path) -> None:
+        rows = []
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write.
+                    logger.warning("skipping unreadable audit spool line in %s", path.name)
+        for start in range(0, len(rows), self.batch_size):
+            self._write(rows[start : start + self.batch_size])
+
+def event_row(event: AuditEvent) -> dict:
+    return {column: getattr(event, column) for column in AUDIT_COLUMNS}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"unsupported audit value: {type(value).__name__}")
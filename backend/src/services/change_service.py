@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timezone
+import functools
+import re
 import uuid
 from typing import Any, Optional
 
@@ -9,15 +11,16 @@ from sqlalchemy import and_, delete, desc, func, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from src.metrics import CHANGESET_ACTION_SECONDS, CHANGESET_SECONDS
 from src.models import (
     ChangeAction,
     ChangeSet,
     Commit,
+    EntityLog,
     Idea,
     InboxItem,
     Journal,
     Link,
-    NodeLog,
     Note,
     NoteSource,
     Route,
@@ -29,6 +32,7 @@ from src.models import (
 )
 from src.schemas import (
     CommitIn,
+    DedupeLookupIn,
     DryRunIn,
     IdeaCreate,
     IdeaPatch,
@@ -54,7 +58,14 @@ from src.schemas import (
 from src.services.audit_service import log_audit_event
 from src.services.idea_service import IDEA_TRANSITIONS
 from src.services.knowledge_category import infer_knowledge_category
-from src.services.route_service import ROUTE_TRANSITIONS, RouteGraphService, RouteService
+from src.services.link_service import LinkService
+from src.services.route_service import (
+    ROUTE_TRANSITIONS,
+    RouteGraphService,
+    RouteService,
+    delete_route_entity_logs,
+    notify_route_log_appended,
+)
 from src.services.task_service import TaskService
 
 TASK_DATE_FIELDS = {"due"}
@@ -87,6 +98,40 @@ UPDATE_ACTIONS = {
     "archive_knowledge",
 }
 
+ACTIVE_TASK_STATUSES = ("todo", "in_progress")
+# Payload keys whose ids dry-run validation looks up, batch-loaded per model before the per-action checks.
+DRY_RUN_REF_MODELS = {
+    "topic_id": Topic,
+    "task_id": Task,
+    "note_id": Note,
+    "item_id": Note,
+    "idea_id": Idea,
+    "route_id": Route,
+    "parent_route_id": Route,
+    "node_id": RouteNode,
+    "parent_node_id": RouteNode,
+    "from_node_id": RouteNode,
+    "to_node_id": RouteNode,
+}
+_TITLE_SEPARATORS = re.compile(r"[^0-9a-zA-Z\u4e00-\u9fff]+")
+
+
+def normalize_title(value: str) -> str:
+    # Same folding the skills apply before deciding a proposal duplicates an existing entity.
+    return " ".join(_TITLE_SEPARATORS.sub(" ", value.lower()).split())
+
+
+def _timed(operation: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with CHANGESET_SECONDS.time(operation=operation):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
 
 class ChangeService:
     def __init__(self, db: Session):
@@ -171,9 +216,55 @@ class ChangeService:
         self.db.commit()
         return change_set_id
 
+    @_timed("dedupe_lookup")
+    def dedupe_lookup(self, payload: DedupeLookupIn) -> dict:
+        # One query per entity type for a whole batch of proposals: candidates contain every word of
+        # some requested title, and are then matched on the full normalized title.
+        tasks = self._match_titles(
+            payload.task_titles,
+            select(Task).where(Task.archived_at.is_(None), Task.status.in_(ACTIVE_TASK_STATUSES)),
+            Task.title,
+            Task.updated_at,
+        )
+        notes = self._match_titles(
+            payload.note_titles, select(Note).where(Note.status == "active"), Note.title, Note.updated_at
+        )
+        return {"tasks": tasks, "notes": notes}
+
+    def _match_titles(self, titles: list[str], stmt, title_column, updated_column) -> dict:
+        wanted = {title: normalize_title(title) for title in titles}
+        normalized = sorted({value for value in wanted.values() if value})
+        by_title: dict[str, Any] = {}
+        if normalized:
+            stmt = stmt.where(
+                or_(*(and_(*(title_column.ilike(f"%{word}%") for word in value.split())) for value in normalized))
+            )
+            for row in self.db.scalars(stmt.order_by(updated_column.desc())):
+                # Most recently updated wins, as with the newest-first per-title search.
+                by_title.setdefault(normalize_title(row.title), row)
+        return {title: by_title.get(value) if value else None for title, value in wanted.items()}
+
+    def _preload_dry_run_refs(self, actions) -> list:
+        # One IN query per referenced model for the whole batch; the per-action checks below then hit
+        # the identity map with db.get(). The returned list keeps the (weakly held) rows alive.
+        wanted: dict[type, set[str]] = {}
+        for action in actions:
+            for key, model in DRY_RUN_REF_MODELS.items():
+                value = action.payload.get(key)
+                if isinstance(value, str) and value:
+                    wanted.setdefault(model, set()).add(value)
+        loaded: list = []
+        for model, ids in wanted.items():
+            loaded.extend(self.db.scalars(select(model).where(model.id.in_(sorted(ids)))))
+        return loaded
+
+    @_timed("dry_run")
     def dry_run(self, payload: DryRunIn) -> ChangeSet:
+        refs = self._preload_dry_run_refs(payload.actions)
         for action in payload.actions:
-            self._prevalidate_dry_run_action(action.type, action.payload)
+            with CHANGESET_ACTION_SECONDS.time(operation="dry_run", action_type=action.type):
+                self._prevalidate_dry_run_action(action.type, action.payload)
+        refs.clear()
 
         creates = sum(1 for a in payload.actions if a.type in CREATE_ACTIONS)
         updates = sum(1 for a in payload.actions if a.type in UPDATE_ACTIONS)
@@ -587,6 +678,7 @@ class ChangeService:
             InboxCapture.model_validate(payload)
             return
 
+    @_timed("commit")
     def commit(self, change_set_id: str, payload: CommitIn) -> tuple[Optional[Commit], Optional[ChangeSet]]:
         change_set = self.db.get(ChangeSet, change_set_id)
         if not change_set:
@@ -633,7 +725,8 @@ class ChangeService:
 
         try:
             for action in actions:
-                action.apply_result_json = self._apply_action(action)
+                with CHANGESET_ACTION_SECONDS.time(operation="commit", action_type=action.action_type):
+                    action.apply_result_json = self._apply_action(action)
                 self.db.add(action)
                 applied = action.apply_result_json or {}
                 target_type = str(applied.get("entity") or "unknown")
@@ -676,8 +769,11 @@ class ChangeService:
                     idem_change_set = self.db.get(ChangeSet, idem_commit.change_set_id)
                     return idem_commit, idem_change_set
             raise
+        if any(action.action_type == "append_route_node_log" for action in actions):
+            notify_route_log_appended()
         return commit, change_set
 
+    @_timed("undo")
     def undo_last(self, payload: UndoIn) -> Optional[tuple[str, str]]:
         if payload.client_request_id:
             idempotent = self._find_undo_commit_by_client_request_id(payload.client_request_id)
@@ -737,7 +833,8 @@ class ChangeService:
         )
         try:
             for action in actions:
-                self._rollback_action(action)
+                with CHANGESET_ACTION_SECONDS.time(operation="undo", action_type=action.action_type):
+                    self._rollback_action(action)
                 applied = action.apply_result_json or {}
                 target_type = str(applied.get("entity") or "unknown")
                 target_id = str(applied.get("entity_id") or target_change_set.id)
@@ -1185,20 +1282,25 @@ class ChangeService:
 
     def _apply_link(self, payload: dict) -> dict:
         model = LinkCreate.model_validate(payload)
-        link = Link(
-            id=f"lnk_{uuid.uuid4().hex[:12]}",
-            from_type=model.from_type,
-            from_id=model.from_id,
-            to_type=model.to_type,
-            to_id=model.to_id,
-            relation=model.relation,
-        )
-        self.db.add(link)
+        link = LinkService(self.db).find_existing(model)
+        created = link is None
+        if link is None:
+            link = Link(
+                id=f"lnk_{uuid.uuid4().hex[:12]}",
+                from_type=model.from_type,
+                from_id=model.from_id,
+                to_type=model.to_type,
+                to_id=model.to_id,
+                relation=model.relation,
+            )
+            self.db.add(link)
+            self.db.flush()
         return {
             "status": "applied",
             "action_type": "link_entities",
             "entity": "link",
             "entity_id": link.id,
+            "created": created,
         }
 
     def _apply_delete_link(self, payload: dict) -> dict:
@@ -1528,6 +1630,8 @@ class ChangeService:
             "created_at": self._json_safe(node.created_at),
             "updated_at": self._json_safe(node.updated_at),
         }
+        before_logs = self._entity_log_snapshot("route_node", node_id)
+        delete_route_entity_logs(self.db, node_ids=[node_id])
         self.db.delete(node)
         return {
             "status": "applied",
@@ -1535,6 +1639,7 @@ class ChangeService:
             "entity": "route_node",
             "entity_id": node_id,
             "before": before,
+            "before_logs": before_logs,
         }
 
     def _apply_create_route_edge(self, payload: dict) -> dict:
@@ -1635,6 +1740,8 @@ class ChangeService:
             "description": edge.description,
             "created_at": self._json_safe(edge.created_at),
         }
+        before_logs = self._entity_log_snapshot("route_edge", edge_id)
+        delete_route_entity_logs(self.db, edge_ids=[edge_id])
         self.db.delete(edge)
         return {
             "status": "applied",
@@ -1642,6 +1749,7 @@ class ChangeService:
             "entity": "route_edge",
             "entity_id": edge_id,
             "before": before,
+            "before_logs": before_logs,
         }
 
     def _apply_append_route_node_log(self, payload: dict) -> dict:
@@ -1653,9 +1761,11 @@ class ChangeService:
             raise ValueError("ROUTE_NODE_ID_REQUIRED")
         RouteGraphService(self.db)._ensure_node_in_route(route_id, node_id)
         model = NodeLogCreate.model_validate({k: v for k, v in payload.items() if k not in {"route_id", "node_id"}})
-        log = NodeLog(
+        log = EntityLog(
             id=f"nlg_{uuid.uuid4().hex[:12]}",
-            node_id=node_id,
+            route_id=route_id,
+            entity_type="route_node",
+            entity_id=node_id,
             actor_type=model.actor_type,
             actor_id=model.actor_id,
             content=model.content,
@@ -2000,6 +2110,8 @@ class ChangeService:
         link_id = result.get("entity_id")
         if not isinstance(link_id, str) or not link_id:
             raise ValueError("CHANGE_ACTION_RESULT_MISSING_ENTITY_ID")
+        if result.get("created") is False:
+            return
         link = self.db.get(Link, link_id)
         if link:
             self.db.delete(link)
@@ -2011,18 +2123,85 @@ class ChangeService:
         link_id = before.get("id")
         if not isinstance(link_id, str) or not link_id:
             raise ValueError("CHANGE_ACTION_RESULT_MISSING_ENTITY_ID")
+        self._restore_link(before)
+
+    def _entity_log_snapshot(self, entity_type: str, entity_id: str) -> list[dict]:
+        return [
+            {
+                "id": log.id,
+                "route_id": log.route_id,
+                "entity_type": log.entity_type,
+                "entity_id": log.entity_id,
+                "actor_type": log.actor_type,
+                "actor_id": log.actor_id,
+                "content": log.content,
+                "log_type": log.log_type,
+                "source_ref": log.source_ref,
+                "created_at": self._json_safe(log.created_at),
+                "updated_at": self._json_safe(log.updated_at),
+            }
+            for log in self.db.scalars(
+                select(EntityLog).where(EntityLog.entity_type == entity_type, EntityLog.entity_id == entity_id)
+            )
+        ]
+
+    def _restore_entity_logs(self, before_logs) -> None:
+        if not isinstance(before_logs, list):
+            return
+        for log_payload in before_logs:
+            if not isinstance(log_payload, dict):
+                continue
+            log_id = log_payload.get("id")
+            if not isinstance(log_id, str) or not log_id or self.db.get(EntityLog, log_id) is not None:
+                continue
+            self.db.add(
+                EntityLog(
+                    id=log_id,
+                    route_id=str(log_payload.get("route_id") or ""),
+                    entity_type=str(log_payload.get("entity_type") or ""),
+                    entity_id=str(log_payload.get("entity_id") or ""),
+                    actor_type=str(log_payload.get("actor_type") or "human"),
+                    actor_id=str(log_payload.get("actor_id") or "local"),
+                    content=str(log_payload.get("content") or ""),
+                    log_type=str(log_payload.get("log_type") or "note"),
+                    source_ref=log_payload.get("source_ref"),
+                    created_at=self._datetime_from_json(log_payload.get("created_at")),
+                    updated_at=self._datetime_from_json(log_payload.get("updated_at")),
+                )
+            )
+
+    def _restore_link(self, before: dict) -> None:
+        link_id = str(before.get("id") or "")
         if self.db.get(Link, link_id) is not None:
             return
-        link = Link(
-            id=link_id,
-            from_type=str(before.get("from_type") or ""),
-            from_id=str(before.get("from_id") or ""),
-            to_type=str(before.get("to_type") or ""),
-            to_id=str(before.get("to_id") or ""),
-            relation=str(before.get("relation") or ""),
-            created_at=self._datetime_from_json(before.get("created_at")),
+        from_type = str(before.get("from_type") or "")
+        from_id = str(before.get("from_id") or "")
+        to_type = str(before.get("to_type") or "")
+        to_id = str(before.get("to_id") or "")
+        relation = str(before.get("relation") or "")
+        equivalent = self.db.scalar(
+            select(Link.id).where(
+                Link.from_type == from_type,
+                Link.from_id == from_id,
+                Link.relation == relation,
+                Link.to_type == to_type,
+                Link.to_id == to_id,
+            )
+        )
+        if equivalent is not None:
+            return
+        self.db.add(
+            Link(
+                id=link_id,
+                from_type=from_type,
+                from_id=from_id,
+                to_type=to_type,
+                to_id=to_id,
+                relation=relation,
+                created_at=self._datetime_from_json(before.get("created_at")),
+            )
         )
-        self.db.add(link)
+        self.db.flush()
 
     def _rollback_create_idea(self, result: dict) -> None:
         idea_id = result.get("entity_id")
@@ -2052,6 +2231,7 @@ class ChangeService:
             raise ValueError("CHANGE_ACTION_RESULT_MISSING_ENTITY_ID")
         node = self.db.get(RouteNode, node_id)
         if node:
+            delete_route_entity_logs(self.db, node_ids=[node_id])
             self.db.delete(node)
 
     def _rollback_create_route(self, result: dict) -> None:
@@ -2060,6 +2240,7 @@ class ChangeService:
             raise ValueError("CHANGE_ACTION_RESULT_MISSING_ENTITY_ID")
         route = self.db.get(Route, route_id)
         if route:
+            delete_route_entity_logs(self.db, route_ids=[route_id])
             self.db.delete(route)
         task_id = result.get("task_id")
         before_status = result.get("task_before_status")
@@ -2096,6 +2277,7 @@ class ChangeService:
             raise ValueError("CHANGE_ACTION_RESULT_MISSING_ENTITY_ID")
         node = self.db.get(RouteNode, node_id)
         if node:
+            delete_route_entity_logs(self.db, node_ids=[node_id])
             self.db.delete(node)
 
     def _rollback_patch_route_node(self, result: dict) -> None:
@@ -2136,6 +2318,7 @@ class ChangeService:
             updated_at=self._datetime_from_json(before.get("updated_at")),
         )
         self.db.add(node)
+        self._restore_entity_logs(result.get("before_logs"))
 
     def _rollback_create_route_edge(self, result: dict) -> None:
         edge_id = result.get("entity_id")
@@ -2143,6 +2326,7 @@ class ChangeService:
             raise ValueError("CHANGE_ACTION_RESULT_MISSING_ENTITY_ID")
         edge = self.db.get(RouteEdge, edge_id)
         if edge:
+            delete_route_entity_logs(self.db, edge_ids=[edge_id])
             self.db.delete(edge)
 
     def _rollback_patch_route_edge(self, result: dict) -> None:
@@ -2177,12 +2361,13 @@ class ChangeService:
             created_at=self._datetime_from_json(before.get("created_at")),
         )
         self.db.add(edge)
+        self._restore_entity_logs(result.get("before_logs"))
 
     def _rollback_append_route_node_log(self, result: dict) -> None:
         log_id = result.get("entity_id")
         if not isinstance(log_id, str) or not log_id:
             raise ValueError("CHANGE_ACTION_RESULT_MISSING_ENTITY_ID")
-        log = self.db.get(NodeLog, log_id)
+        log = self.db.get(EntityLog, log_id)
         if log:
             self.db.delete(log)
 
@@ -2267,17 +2452,7 @@ class ChangeService:
                 link_id = link_payload.get("id")
                 if not isinstance(link_id, str) or not link_id:
                     continue
-                self.db.add(
-                    Link(
-                        id=link_id,
-                        from_type=str(link_payload.get("from_type") or ""),
-                        from_id=str(link_payload.get("from_id") or ""),
-                        to_type=str(link_payload.get("to_type") or ""),
-                        to_id=str(link_payload.get("to_id") or ""),
-                        relation=str(link_payload.get("relation") or ""),
-                        created_at=self._datetime_from_json(link_payload.get("created_at")),
-                    )
-                )
+                self._restore_link(link_payload)
 
     def _rollback_capture_inbox(self, result: dict) -> None:
         inbox_id = result.get("entity_id")
@@ -1,101 +1,537 @@
 from __future__ import annotations
 
+import json
+import math
+import re
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Optional
 
-from sqlalchemy import select
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.models import Journal, Note, Task
+from src.cache import GenerationalLRUCache
+from src.config import settings
+from src.models import ChangeFeedEntry, Journal, Link, Note, Route, Task
+
+# Ranked bundles score a bounded candidate pool per kind; budgets are counted in serialized item chars.
+CANDIDATE_LIMIT = 200
+CHARS_PER_TOKEN = 4
+RECENCY_HALF_LIFE_DAYS = 14.0
+MIN_SNIPPET_CHARS = 60
+_WEIGHTS = {"text": 0.65, "recency": 0.2, "links": 0.15}
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with",
+}
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+bundle_cache = GenerationalLRUCache(
+    "context_bundle", settings.context_cache_size, ttl_s=settings.context_cache_ttl_s
+)
 
 
 class ContextService:
     def __init__(self, db: Session):
         self.db = db
 
-    def bundle(
-        self,
-        *,
-        intent: str,
-        window_days: int,
-        topic_ids: Optional[list[str]],
-        include_done: bool,
-        tasks_limit: int,
-        notes_limit: int,
-        journals_limit: int,
-    ) -> dict:
-        since = datetime.now(timezone.utc).date() - timedelta(days=max(window_days - 1, 0))
-        topics = [topic_id for topic_id in (topic_ids or []) if topic_id]
-
-        tasks_stmt = select(Task).where(Task.archived_at.is_(None))
-        if not include_done:
-            tasks_stmt = tasks_stmt.where(Task.status.notin_(["done", "cancelled"]))
-        if topics:
-            tasks_stmt = tasks_stmt.where(Task.topic_id.in_(topics))
-        tasks_stmt = tasks_stmt.order_by(Task.updated_at.desc()).limit(tasks_limit)
+    def bundle(self, **params) -> dict:
+        params = _normalized(params)
+        if not bundle_cache.enabled:
+            return self._build(params)
+        key = _cache_key(self.db.get_bind(), params)
+        generation, payload = bundle_cache.get(key)
+        if payload is None:
+            payload = self._build(params)
+            bundle_cache.put(key, generation, payload)
+        return payload
+
+    def _build(self, params: dict) -> dict:
+        tasks_stmt, notes_stmt, journals_stmt = _bundle_statements(**params)
         task_rows = list(self.db.scalars(tasks_stmt))
+        note_rows = list(self.db.scalars(notes_stmt))
+        journal_rows = list(self.db.scalars(journals_stmt))
+        if not _is_ranked(params):
+            return _bundle_payload(params, task_rows, note_rows, journal_rows)
+        links = []
+        links_stmt = _links_stmt(task_rows, note_rows, journal_rows)
+        if links_stmt is not None:
+            links = list(self.db.execute(links_stmt))
+        return _ranked_payload(params, task_rows, note_rows, journal_rows, links)
+
+
+    def changes(self, *, since: Optional[str], limit: int) -> dict:
+        since_seq = _parse_change_token(since)
+        rows = []
+        if since_seq is not None:
+            rows = list(
+                self.db.execute(
+                    select(ChangeFeedEntry.seq, ChangeFeedEntry.entity_type, ChangeFeedEntry.entity_id)
+                    .where(ChangeFeedEntry.seq > since_seq)
+                    .order_by(ChangeFeedEntry.seq.asc())
+                    .limit(limit + 1)
+                )
+            )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            # Seqs are contiguous, so a gap right after the token means it was pruned.
+            if rows[0].seq > since_seq + 1:
+                raise ValueError("CHANGE_TOKEN_EXPIRED")
+            next_seq = rows[-1].seq
+        else:
+            oldest, newest = self.db.execute(
+                select(func.min(ChangeFeedEntry.seq), func.max(ChangeFeedEntry.seq))
+            ).one()
+            next_seq = newest or 0
+            if since_seq is not None:
+                if since_seq > next_seq:
+                    # Issued by another database (or before a restore); the client must re-fetch the bundle.
+                    raise ValueError("CHANGE_TOKEN_INVALID")
+                if oldest is not None and since_seq < oldest - 1:
+                    raise ValueError("CHANGE_TOKEN_EXPIRED")
+                # Anything past the token committed after the query above: pick it up next poll.
+                next_seq = since_seq
+        touched: dict[str, list[str]] = {}
+        for row in rows:
+            ids = touched.setdefault(row.entity_type, [])
+            if row.entity_id not in ids:
+                ids.append(row.entity_id)
+        payload = {
+            "since": since,
+            "next_token": str(next_seq),
+            "has_more": has_more,
+            "deleted": [],
+        }
+        for entity_type, (key, model, shape) in CHANGE_KINDS.items():
+            ids = touched.get(entity_type, [])
+            found = {}
+            if ids:
+                found = {row.id: row for row in self.db.scalars(select(model).where(model.id.in_(ids)))}
+            payload[key] = [shape(found[entity_id]) for entity_id in ids if entity_id in found]
+            payload["deleted"] += [{"type": entity_type, "id": entity_id} for entity_id in ids if entity_id not in found]
+        payload["summary"] = {key: len(payload[key]) for key, _, _ in CHANGE_KINDS.values()}
+        payload["summary"]["deleted"] = len(payload["deleted"])
+        return payload
+
+
+class AsyncContextService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def bundle(self, **params) -> dict:
+        params = _normalized(params)
+        if not bundle_cache.enabled:
+            return await self._build(params)
+        key = _cache_key(self.db.bind, params)
+        generation, payload = bundle_cache.get(key)
+        if payload is None:
+            payload = await self._build(params)
+            bundle_cache.put(key, generation, payload)
+        return payload
+
+    async def _build(self, params: dict) -> dict:
+        tasks_stmt, notes_stmt, journals_stmt = _bundle_statements(**params)
+        task_rows = list(await self.db.scalars(tasks_stmt))
+        note_rows = list(await self.db.scalars(notes_stmt))
+        journal_rows = list(await self.db.scalars(journals_stmt))
+        if not _is_ranked(params):
+            return _bundle_payload(params, task_rows, note_rows, journal_rows)
+        links = []
+        links_stmt = _links_stmt(task_rows, note_rows, journal_rows)
+        if links_stmt is not None:
+            links = list(await self.db.execute(links_stmt))
+        return _ranked_payload(params, task_rows, note_rows, journal_rows, links)
+
+
+def _normalized(params: dict) -> dict:
+    return dict(params, intent=" ".join(params["intent"].split()), topic_ids=_topics(params))
+
+
+def _cache_key(bind, params: dict) -> tuple:
+    # The date is part of the key: the journal window and recency scores move at midnight (UTC).
+    return (
+        bind.url.render_as_string(hide_password=True),
+        datetime.now(timezone.utc).date().isoformat(),
+        tuple(sorted(params.items())),
+    )
+
+
+def _topics(params: dict) -> tuple[str, ...]:
+    return tuple(sorted({topic_id for topic_id in (params["topic_ids"] or []) if topic_id}))
+
+
+def _is_ranked(params: dict) -> bool:
+    return bool(params.get("rank") or params.get("max_chars") or params.get("max_tokens"))
 
-        notes_stmt = select(Note).where(Note.status == "active")
-        if topics:
-            notes_stmt = notes_stmt.where(Note.topic_id.in_(topics))
+
+def intent_terms(intent: str) -> list[str]:
+    terms = []
+    for term in _TERM_RE.findall(intent.lower()):
+        if len(term) > 1 and term not in _STOPWORDS and term not in terms:
+            terms.append(term)
+    return terms[:12]
+
+
+def _match_any(columns: tuple, terms: list[str]):
+    return or_(*[column.ilike(f"%{term}%") for term in terms for column in columns])
+
+
+def _bundle_statements(
+    *,
+    intent: str,
+    window_days: int,
+    topic_ids: Optional[list[str]],
+    include_done: bool,
+    tasks_limit: int,
+    notes_limit: int,
+    journals_limit: int,
+    rank: bool = False,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    snippet_chars: int = 240,
+) -> tuple:
+    since = datetime.now(timezone.utc).date() - timedelta(days=max(window_days - 1, 0))
+    topics = list(_topics({"topic_ids": topic_ids}))
+    ranked = bool(rank or max_chars or max_tokens)
+    terms = intent_terms(intent) if ranked else []
+
+    tasks_stmt = select(Task).where(Task.archived_at.is_(None))
+    if not include_done:
+        tasks_stmt = tasks_stmt.where(Task.status.notin_(["done", "cancelled"]))
+    if topics:
+        tasks_stmt = tasks_stmt.where(Task.topic_id.in_(topics))
+    if ranked:
+        # No full-text index in the schema: intent matches are pulled to the front of a bounded
+        # candidate pool (recent items fill the rest) and scored in Python.
+        tasks_stmt = _candidate_order(
+            tasks_stmt, (Task.title, Task.description, Task.acceptance_criteria), terms, Task.updated_at
+        )
+    else:
+        tasks_stmt = tasks_stmt.order_by(Task.updated_at.desc()).limit(tasks_limit)
+
+    notes_stmt = select(Note).where(Note.status == "active")
+    if topics:
+        notes_stmt = notes_stmt.where(Note.topic_id.in_(topics))
+    if ranked:
+        notes_stmt = _candidate_order(notes_stmt, (Note.title, Note.body), terms, Note.updated_at)
+    else:
         notes_stmt = notes_stmt.order_by(Note.updated_at.desc()).limit(notes_limit)
-        note_rows = list(self.db.scalars(notes_stmt))
 
-        journals_stmt = (
-            select(Journal)
-            .where(Journal.journal_date >= since)
-            .order_by(Journal.journal_date.desc(), Journal.updated_at.desc())
-            .limit(journals_limit)
+    journals_stmt = select(Journal).where(Journal.journal_date >= since)
+    if ranked:
+        journals_stmt = _candidate_order(
+            journals_stmt, (Journal.raw_content, Journal.digest), terms, Journal.journal_date
         )
-        journal_rows = list(self.db.scalars(journals_stmt))
+    else:
+        journals_stmt = journals_stmt.order_by(
+            Journal.journal_date.desc(), Journal.updated_at.desc()
+        ).limit(journals_limit)
+    return tasks_stmt, notes_stmt, journals_stmt
 
-        return {
-            "intent": intent,
-            "window_days": window_days,
-            "filters": {
-                "topic_ids": topics,
-                "include_done": include_done,
-                "tasks_limit": tasks_limit,
-                "notes_limit": notes_limit,
-                "journals_limit": journals_limit,
-            },
-            "summary": {
-                "tasks": len(task_rows),
-                "notes": len(note_rows),
-                "journals": len(journal_rows),
+
+def _candidate_order(stmt, columns: tuple, terms: list[str], recency_column):
+    if terms:
+        stmt = stmt.order_by(case((_match_any(columns, terms), 0), else_=1), recency_column.desc())
+    else:
+        stmt = stmt.order_by(recency_column.desc())
+    return stmt.limit(CANDIDATE_LIMIT)
+
+
+def _links_stmt(task_rows: list, note_rows: list, journal_rows: list):
+    ids = [row.id for row in (*task_rows, *note_rows, *journal_rows)]
+    if not ids:
+        return None
+    return select(Link.from_id, Link.to_id).where(or_(Link.from_id.in_(ids), Link.to_id.in_(ids)))
+
+
+def _bundle_payload(params: dict, task_rows: list, note_rows: list, journal_rows: list) -> dict:
+    return {
+        "intent": params["intent"],
+        "window_days": params["window_days"],
+        "filters": _filters(params),
+        "summary": {
+            "tasks": len(task_rows),
+            "notes": len(note_rows),
+            "journals": len(journal_rows),
+        },
+        "tasks": [_task_item(row) for row in task_rows],
+        "notes": [_note_item(row) for row in note_rows],
+        "journals": [_journal_item(row) for row in journal_rows],
+    }
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _task_item(row: Task) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "status": row.status,
+        "priority": row.priority,
+        "topic_id": row.topic_id,
+        "due": _iso(row.due),
+        "updated_at": _iso(row.updated_at),
+    }
+
+
+def _note_item(row: Note) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "topic_id": row.topic_id,
+        "status": row.status,
+        "updated_at": _iso(row.updated_at),
+        "tags": row.tags_json,
+    }
+
+
+def _journal_item(row: Journal) -> dict:
+    return {
+        "id": row.id,
+        "journal_date": row.journal_date.isoformat(),
+        "raw_content": row.raw_content,
+        "digest": row.digest,
+        "triage_status": row.triage_status,
+        "updated_at": _iso(row.updated_at),
+    }
+
+
+def _route_item(row: Route) -> dict:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "status": row.status,
+        "priority": row.priority,
+        "task_id": row.task_id,
+        "parent_route_id": row.parent_route_id,
+        "updated_at": _iso(row.updated_at),
+    }
+
+
+def _link_item(row: Link) -> dict:
+    return {
+        "id": row.id,
+        "from_type": row.from_type,
+        "from_id": row.from_id,
+        "to_type": row.to_type,
+        "to_id": row.to_id,
+        "relation": row.relation,
+        "created_at": _iso(row.created_at),
+    }
+
+
+def _changed_task_item(row: Task) -> dict:
+    # Deltas also carry archived tasks, which the bundle never lists; the client drops them.
+    return {**_task_item(row), "archived_at": _iso(row.archived_at)}
+
+
+CHANGE_KINDS = {
+    "task": ("tasks", Task, _changed_task_item),
+    "note": ("notes", Note, _note_item),
+    "journal": ("journals", Journal, _journal_item),
+    "route": ("routes", Route, _route_item),
+    "link": ("links", Link, _link_item),
+}
+
+
+def _parse_change_token(token: Optional[str]) -> Optional[int]:
+    if token is None:
+        return None
+    if not token.isdigit():
+        raise ValueError("CHANGE_TOKEN_INVALID")
+    return int(token)
+
+
+def _filters(params: dict) -> dict:
+    return {
+        "topic_ids": list(_topics(params)),
+        "include_done": params["include_done"],
+        "tasks_limit": params["tasks_limit"],
+        "notes_limit": params["notes_limit"],
+        "journals_limit": params["journals_limit"],
+    }
+
+
+def _char_budget(params: dict) -> Optional[int]:
+    limits = []
+    if params.get("max_chars"):
+        limits.append(params["max_chars"])
+    if params.get("max_tokens"):
+        limits.append(params["max_tokens"] * CHARS_PER_TOKEN)
+    return min(limits) if limits else None
+
+
+def _term_counts(text: str, terms: list[str]) -> dict[str, int]:
+    lowered = text.lower()
+    return {term: lowered.count(term) for term in terms}
+
+
+def _saturate(count: float) -> float:
+    return count / (count + 1.2)
+
+
+def _text_scores(candidates: list[dict], terms: list[str]) -> None:
+    if not terms or not candidates:
+        for candidate in candidates:
+            candidate["text"] = 0.0
+        return
+    for candidate in candidates:
+        candidate["title_counts"] = _term_counts(candidate["title"], terms)
+        candidate["body_counts"] = _term_counts(candidate["body"], terms)
+    total = len(candidates)
+    idf = {}
+    for term in terms:
+        df = sum(1 for c in candidates if c["title_counts"][term] or c["body_counts"][term])
+        idf[term] = math.log(1 + (total - df + 0.5) / (df + 0.5))
+    raw = []
+    for candidate in candidates:
+        score = 0.0
+        for term in terms:
+            # Title hits weigh three body hits; both saturate so a long body cannot dominate.
+            tf = 3 * candidate["title_counts"][term] + candidate["body_counts"][term]
+            score += idf[term] * _saturate(tf)
+        raw.append(score)
+    top = max(raw) or 1.0
+    for candidate, score in zip(candidates, raw):
+        candidate["text"] = score / top
+
+
+def _recency(moment: Any, now: datetime) -> float:
+    if moment is None:
+        return 0.0
+    if isinstance(moment, datetime):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        age_days = (now - moment).total_seconds() / 86400
+    else:
+        age_days = (now.date() - moment).days
+    return 0.5 ** (max(age_days, 0.0) / RECENCY_HALF_LIFE_DAYS)
+
+
+def _link_scores(candidates: list[dict], links: list) -> None:
+    # Link proximity: how many intent-matching candidates an item is directly linked to.
+    matched = {c["id"] for c in candidates if c["text"] > 0}
+    neighbours: dict[str, set[str]] = {}
+    for from_id, to_id in links:
+        neighbours.setdefault(from_id, set()).add(to_id)
+        neighbours.setdefault(to_id, set()).add(from_id)
+    for candidate in candidates:
+        hits = len((neighbours.get(candidate["id"], set()) - {candidate["id"]}) & matched)
+        candidate["links"] = min(hits / 2, 1.0)
+
+
+def snippet(text: str, terms: list[str], limit: int) -> str:
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    start = max(min(positions) - limit // 4, 0) if positions else 0
+    start = min(start, len(text) - limit)
+    piece = text[start : start + limit - 2].strip()
+    return ("…" if start > 0 else "") + piece + "…"
+
+
+def _candidate(kind: str, row, title: str, body: str, moment: Any) -> dict:
+    return {"kind": kind, "row": row, "id": row.id, "title": title, "body": body, "moment": moment}
+
+
+def _ranked_item(candidate: dict, terms: list[str], snippet_chars: int) -> dict:
+    row = candidate["row"]
+    text = snippet(candidate["body"], terms, snippet_chars)
+    if candidate["kind"] == "tasks":
+        item = _task_item(row)
+    elif candidate["kind"] == "notes":
+        item = _note_item(row)
+    else:
+        item = _journal_item(row)
+        del item["raw_content"]
+        item["digest"] = snippet(row.digest, terms, snippet_chars)
+    item["snippet"] = text
+    item["score"] = round(candidate["score"], 4)
+    return item
+
+
+def _item_chars(item: dict) -> int:
+    return len(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+
+
+def _ranked_payload(
+    params: dict, task_rows: list, note_rows: list, journal_rows: list, links: list
+) -> dict:
+    started = time.perf_counter()
+    terms = intent_terms(params["intent"])
+    now = datetime.now(timezone.utc)
+    candidates = (
+        [
+            _candidate("tasks", row, row.title, f"{row.description}\n{row.acceptance_criteria}", row.updated_at)
+            for row in task_rows
+        ]
+        + [_candidate("notes", row, row.title, row.body, row.updated_at) for row in note_rows]
+        + [_candidate("journals", row, "", row.raw_content, row.journal_date) for row in journal_rows]
+    )
+    _text_scores(candidates, terms)
+    _link_scores(candidates, links)
+    for candidate in candidates:
+        candidate["score"] = (
+            _WEIGHTS["text"] * candidate["text"]
+            + _WEIGHTS["recency"] * _recency(candidate["moment"], now)
+            + _WEIGHTS["links"] * candidate["links"]
+        )
+    candidates.sort(key=lambda c: (-c["score"], c["id"]))
+    scoring_ms = (time.perf_counter() - started) * 1000
+
+    snippet_chars = params.get("snippet_chars") or 240
+    limits = {"tasks": params["tasks_limit"], "notes": params["notes_limit"], "journals": params["journals_limit"]}
+    budget = _char_budget(params)
+    used = 0
+    dropped = 0
+    shortened = 0
+    packed: dict[str, list[dict]] = {"tasks": [], "notes": [], "journals": []}
+    for candidate in candidates:
+        kind = candidate["kind"]
+        if len(packed[kind]) >= limits[kind]:
+            continue
+        item = _ranked_item(candidate, terms, snippet_chars)
+        size = _item_chars(item)
+        if budget is not None and used + size > budget:
+            # Shrink the snippet to whatever is left before giving up on the item.
+            room = len(item["snippet"]) - (used + size - budget)
+            if room < MIN_SNIPPET_CHARS:
+                dropped += 1
+                continue
+            item = _ranked_item(candidate, terms, room)
+            size = _item_chars(item)
+            if used + size > budget:
+                dropped += 1
+                continue
+            shortened += 1
+        packed[kind].append(item)
+        used += size
+
+    return {
+        "intent": params["intent"],
+        "window_days": params["window_days"],
+        "filters": _filters(params),
+        "summary": {kind: len(items) for kind, items in packed.items()},
+        "tasks": packed["tasks"],
+        "notes": packed["notes"],
+        "journals": packed["journals"],
+        "ranking": {
+            "terms": terms,
+            "candidates": {"tasks": len(task_rows), "notes": len(note_rows), "journals": len(journal_rows)},
+            "weights": _WEIGHTS,
+            "scoring_ms": round(scoring_ms, 3),
+            "budget": {
+                "max_chars": budget,
+                "used_chars": used,
+                "dropped": dropped,
+                "shortened": shortened,
             },
-            "tasks": [
-                {
-                    "id": row.id,
-                    "title": row.title,
-                    "status": row.status,
-                    "priority": row.priority,
-                    "topic_id": row.topic_id,
-                    "due": row.due.isoformat() if row.due else None,
-                    "updated_at": row.updated_at.isoformat() if row.updated_at else None,
-                }
-                for row in task_rows
-            ],
-            "notes": [
-                {
-                    "id": row.id,
-                    "title": row.title,
-                    "topic_id": row.topic_id,
-                    "status": row.status,
-                    "updated_at": row.updated_at.isoformat() if row.updated_at else None,
-                    "tags": row.tags_json,
-                }
-                for row in note_rows
-            ],
-            "journals": [
-                {
-                    "id": row.id,
-                    "journal_date": row.journal_date.isoformat(),
-                    "raw_content": row.raw_content,
-                    "digest": row.digest,
-                    "triage_status": row.triage_status,
-                    "updated_at": row.updated_at.isoformat() if row.updated_at else None,
-                }
-                for row in journal_rows
-            ],
-        }
+        },
+    }
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from src.audit_chain import TARGET_MODELS
+from src.models import AuditEvent, ChangeAction, EntityHistory
+
+# Knowledge items are note-backed, so both audit target types share one timeline.
+ENTITY_TYPE_ALIASES = {"knowledge": "note"}
+
+HISTORY_ENTITY_TYPES = {ENTITY_TYPE_ALIASES.get(name, name) for name in TARGET_MODELS}
+
+ENTITY_PATHS = {
+    "tasks": "task",
+    "notes": "note",
+    "knowledge": "note",
+    "inbox": "inbox",
+    "journals": "journal",
+    "ideas": "idea",
+    "routes": "route",
+    "route-nodes": "route_node",
+    "route-edges": "route_edge",
+    "links": "link",
+    "topics": "topic",
+    "cycles": "cycle",
+}
+
+
+def history_rows(audit_rows: list[dict]) -> list[dict]:
+    rows = []
+    for audit in audit_rows:
+        entity_type = ENTITY_TYPE_ALIASES.get(audit["target_type"], audit["target_type"])
+        if entity_type not in HISTORY_ENTITY_TYPES:
+            continue
+        metadata = audit.get("metadata_json") or {}
+        rows.append(
+            {
+                "audit_id": audit["id"],
+                "entity_type": entity_type,
+                "entity_id": audit["target_id"],
+                "occurred_at": audit["occurred_at"],
+                "action": audit["action"],
+                "commit_id": metadata.get("revert_commit_id") or metadata.get("commit_id"),
+                "action_id": metadata.get("action_id"),
+            }
+        )
+    return rows
+
+
+def record_entity_history(conn, audit_rows: list[dict]) -> None:
+    rows = history_rows(audit_rows)
+    if rows:
+        conn.execute(insert(EntityHistory.__table__), rows)
+
+
+def _field_changes(result: Optional[dict], *, undo: bool) -> list[dict]:
+    if not isinstance(result, dict):
+        return []
+    before = result.get("before")
+    after = result.get("after")
+    if not isinstance(before, dict) and not isinstance(after, dict):
+        return []
+    before = before if isinstance(before, dict) else {}
+    after = after if isinstance(after, dict) else {}
+    if undo:
+        before, after = after, before
+    changes = []
+    for field in sorted(set(before) | set(after)):
+        if before.get(field) == after.get(field):
+            continue
+        changes.append({"field": field, "before": before.get(field), "after": after.get(field)})
+    return changes
+
+
+class HistoryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list(self, entity_path: str, entity_id: str) -> tuple[str, list[dict[str, Any]]]:
+        entity_type = ENTITY_PATHS.get(entity_path)
+        if entity_type is None:
+            raise ValueError("HISTORY_ENTITY_UNSUPPORTED")
+        stmt = (
+            select(
+                EntityHistory,
+                AuditEvent,
+                ChangeAction.change_set_id,
+                ChangeAction.action_type,
+                ChangeAction.apply_result_json,
+            )
+            # Outer join: entries whose audit month was detached/archived stay in the timeline.
+            .outerjoin(AuditEvent, AuditEvent.id == EntityHistory.audit_id)
+            .outerjoin(ChangeAction, ChangeAction.id == EntityHistory.action_id)
+            .where(EntityHistory.entity_type == entity_type, EntityHistory.entity_id == entity_id)
+            .order_by(EntityHistory.occurred_at.asc(), EntityHistory.audit_id.asc())
+        )
+        items = []
+        for history, audit, change_set_id, action_type, apply_result in self.db.execute(stmt):
+            item = {
+                "audit_id": history.audit_id,
+                "occurred_at": history.occurred_at,
+                "action": history.action,
+                "audit_archived": audit is None,
+                "tool": None,
+                "actor": None,
+                "commit_id": history.commit_id,
+                "action_id": history.action_id,
+                "change_set_id": change_set_id,
+                "action_type": action_type,
+                "source_refs": [],
+                "before_hash": None,
+                "after_hash": None,
+                "changes": _field_changes(apply_result, undo=history.action == "changes_undo_action"),
+            }
+            if audit is not None:
+                item.update(
+                    tool=audit.tool,
+                    actor={"type": audit.actor_type, "id": audit.actor_id},
+                    source_refs=audit.source_refs_json,
+                    before_hash=audit.before_hash,
+                    after_hash=audit.after_hash,
+                )
+            items.append(item)
+        return entity_type, items
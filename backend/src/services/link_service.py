@@ -3,10 +3,11 @@ from __future__ import annotations
 import uuid
 from typing import Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import Integer, String, and_, cast, func, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from src.models import Link
+from src.models import Link, Note, Task
 from src.schemas import LinkCreate
 
 from src.services.audit_service import log_audit_event
@@ -16,6 +17,9 @@ class LinkService:
         self.db = db
 
     def create(self, payload: LinkCreate) -> Link:
+        existing = self.find_existing(payload)
+        if existing is not None:
+            return existing
         link = Link(
             id=f"lnk_{uuid.uuid4().hex[:12]}",
             from_type=payload.from_type,
@@ -25,7 +29,15 @@ class LinkService:
             relation=payload.relation,
         )
         self.db.add(link)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent writer inserted the same edge between lookup and commit.
+            self.db.rollback()
+            existing = self.find_existing(payload)
+            if existing is None:
+                raise
+            return existing
         self.db.refresh(link)
         log_audit_event(
             self.db,
@@ -38,6 +50,17 @@ class LinkService:
         )
         return link
 
+    def find_existing(self, payload: LinkCreate) -> Optional[Link]:
+        return self.db.scalar(
+            select(Link).where(
+                Link.from_type == payload.from_type,
+                Link.from_id == payload.from_id,
+                Link.relation == payload.relation,
+                Link.to_type == payload.to_type,
+                Link.to_id == payload.to_id,
+            )
+        )
+
     def list(
         self,
         *,
@@ -78,3 +101,120 @@ class LinkService:
         self.db.delete(link)
         self.db.commit()
         return link
+
+    def neighbors(
+        self,
+        *,
+        entity_type: str,
+        entity_id: str,
+        depth: int = 1,
+        direction: str = "both",
+        relations: Optional[list[str]] = None,
+        types: Optional[list[str]] = None,
+        max_nodes: int = 50,
+    ) -> dict:
+        # Each hop follows links as (a -> b) pairs; "both" walks the reverse side too.
+        hops = []
+        if direction in {"out", "both"}:
+            hops.append(
+                select(
+                    Link.from_type.label("a_type"),
+                    Link.from_id.label("a_id"),
+                    Link.to_type.label("b_type"),
+                    Link.to_id.label("b_id"),
+                    Link.relation.label("relation"),
+                )
+            )
+        if direction in {"in", "both"}:
+            hops.append(
+                select(
+                    Link.to_type.label("a_type"),
+                    Link.to_id.label("a_id"),
+                    Link.from_type.label("b_type"),
+                    Link.from_id.label("b_id"),
+                    Link.relation.label("relation"),
+                )
+            )
+        if not hops:
+            raise ValueError("LINK_DIRECTION_INVALID")
+        if relations:
+            hops = [hop.where(Link.relation.in_(relations)) for hop in hops]
+        edges = (hops[0] if len(hops) == 1 else union_all(*hops)).subquery("edges")
+
+        walk = select(
+            cast(literal(entity_type), String).label("node_type"),
+            cast(literal(entity_id), String).label("node_id"),
+            cast(literal(0), Integer).label("depth"),
+        ).cte("walk", recursive=True)
+        step = (
+            select(
+                cast(edges.c.b_type, String),
+                cast(edges.c.b_id, String),
+                cast(walk.c.depth + 1, Integer),
+            )
+            .select_from(walk)
+            .join(edges, and_(edges.c.a_type == walk.c.node_type, edges.c.a_id == walk.c.node_id))
+            .where(walk.c.depth < depth)
+        )
+        if types:
+            step = step.where(edges.c.b_type.in_(types))
+        # UNION (not UNION ALL) keeps at most one row per node per depth, bounding the walk on cyclic graphs.
+        walk = walk.union(step)
+
+        # No GROUP BY/ORDER BY over the walk: both SQLite and Postgres produce a recursive CTE breadth
+        # first and only as far as it is fetched, so streaming the rows and closing the result once
+        # max_nodes + 1 distinct nodes are seen stops the traversal itself at the node budget.
+        result = self.db.execute(
+            select(walk.c.node_type, walk.c.node_id, walk.c.depth)
+            .where(walk.c.depth > 0)
+            .execution_options(stream_results=True, yield_per=max_nodes + 1)
+        )
+        first_seen: dict[tuple[str, str], int] = {}
+        try:
+            for node_type, node_id, node_depth in result:
+                key = (node_type, node_id)
+                if key == (entity_type, entity_id) or key in first_seen:
+                    continue
+                first_seen[key] = int(node_depth)
+                if len(first_seen) > max_nodes:
+                    break
+        finally:
+            result.close()
+        truncated = len(first_seen) > max_nodes
+        ordered = sorted(first_seen.items(), key=lambda item: (item[1], item[0]))[:max_nodes]
+        nodes = [{"type": key[0], "id": key[1], "depth": node_depth} for key, node_depth in ordered]
+        self._hydrate_neighbors(nodes)
+
+        reached = {(entity_type, entity_id)} | {(node["type"], node["id"]) for node in nodes}
+        ids = sorted({node_id for _, node_id in reached})
+        edge_stmt = select(Link).where(Link.from_id.in_(ids), Link.to_id.in_(ids))
+        if relations:
+            edge_stmt = edge_stmt.where(Link.relation.in_(relations))
+        links = [
+            link
+            for link in self.db.scalars(edge_stmt.order_by(Link.created_at.asc(), Link.id.asc()))
+            if (link.from_type, link.from_id) in reached and (link.to_type, link.to_id) in reached
+        ]
+        return {
+            "origin_type": entity_type,
+            "origin_id": entity_id,
+            "depth": depth,
+            "nodes": nodes,
+            "edges": links,
+            "truncated": truncated,
+        }
+
+    def _hydrate_neighbors(self, nodes: list[dict]) -> None:
+        note_ids = [node["id"] for node in nodes if node["type"] == "note"]
+        task_ids = [node["id"] for node in nodes if node["type"] == "task"]
+        details: dict[tuple[str, str], tuple[str, str]] = {}
+        if note_ids:
+            for row in self.db.execute(select(Note.id, Note.title, Note.status).where(Note.id.in_(note_ids))):
+                details[("note", row.id)] = (row.title, row.status)
+        if task_ids:
+            for row in self.db.execute(select(Task.id, Task.title, Task.status).where(Task.id.in_(task_ids))):
+                details[("task", row.id)] = (row.title, row.status)
+        for node in nodes:
+            title, status = details.get((node["type"], node["id"]), (None, None))
+            node["title"] = title
+            node["status"] = status
@@ -4,13 +4,44 @@ import uuid
 from typing import Optional
 
 from sqlalchemy import Text, and_, case, delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.facets import cached_facets
 from src.models import Link, Note, NoteSource, Topic
 from src.schemas import NoteAppend, NotePatch
 
 from src.services.audit_service import log_audit_event
 
+NOTE_COLUMNS = {
+    "id": Note.id,
+    "title": Note.title,
+    "body": Note.body,
+    "tags": Note.tags_json,
+    "topic_id": Note.topic_id,
+    "status": Note.status,
+    "created_at": Note.created_at,
+    "updated_at": Note.updated_at,
+}
+# source_count, sources and linked_* each cost a follow-up query; they are skipped unless requested.
+NOTE_FIELDS = (
+    "id",
+    "title",
+    "body",
+    "tags",
+    "topic_id",
+    "status",
+    "source_count",
+    "sources",
+    "linked_task_ids",
+    "linked_note_ids",
+    "created_at",
+    "updated_at",
+)
+NOTE_COMPACT_FIELDS = ("id", "title", "tags", "topic_id", "status", "updated_at")
+
+NOTE_FACET_COLUMNS = {"status": Note.status, "topic": Note.topic_id, "category": Note.category}
+
 FIXED_TOPIC_ORDER = [
     "top_fx_product_strategy",
     "top_fx_engineering_arch",
@@ -64,64 +95,37 @@ class NoteService:
         )
         return note
 
-    def search(
-        self,
-        *,
-        page: int,
-        page_size: int,
-        topic_id: Optional[str] = None,
-        unclassified: bool = False,
-        status: str = "active",
-        q: Optional[str] = None,
-        tag: Optional[str] = None,
-    ):
-        stmt = select(Note)
-        count_stmt = select(func.count()).select_from(Note)
-
-        if status:
-            stmt = stmt.where(Note.status == status)
-            count_stmt = count_stmt.where(Note.status == status)
-        if unclassified:
-            stmt = stmt.where(Note.topic_id.is_(None))
-            count_stmt = count_stmt.where(Note.topic_id.is_(None))
-        elif topic_id:
-            stmt = stmt.where(Note.topic_id == topic_id)
-            count_stmt = count_stmt.where(Note.topic_id == topic_id)
-        if q:
-            like = f"%{q}%"
-            stmt = stmt.where(or_(Note.title.ilike(like), Note.body.ilike(like)))
-            count_stmt = count_stmt.where(or_(Note.title.ilike(like), Note.body.ilike(like)))
-        if tag:
-            # tags_json is a JSON array; text match is sufficient for MVP filter.
-            tag_like = f'%"{tag}"%'
-            stmt = stmt.where(Note.tags_json.cast(Text).ilike(tag_like))
-            count_stmt = count_stmt.where(Note.tags_json.cast(Text).ilike(tag_like))
-
-        stmt = stmt.order_by(Note.updated_at.desc()).offset((page - 1) * page_size).limit(page_size)
-        items = list(self.db.scalars(stmt))
+    def search(self, *, fields: Optional[tuple[str, ...]] = None, **params):
+        stmt, count_stmt = _search_statements(fields=fields, **params)
         total = int(self.db.scalar(count_stmt) or 0)
+        return self._page_rows(stmt, fields), total
+
+    def facets(self, *, page: int, page_size: int, fields: Optional[tuple[str, ...]] = None, **filters) -> dict:
+        # The page plus counts by status/topic/category/tag; the total is the sum of the status counts.
+        clauses = _search_clauses(**filters)
+        items = self._page_rows(_page_statement(clauses, page=page, page_size=page_size, fields=fields), fields)
+        key_hash, facets, cache_hit = cached_facets(
+            self.db, "notes", filters, clauses, NOTE_FACET_COLUMNS, tags_column=Note.tags_json
+        )
+        return {
+            "items": items,
+            "page": page,
+            "page_size": page_size,
+            "total": sum(bucket["count"] for bucket in facets["status"]),
+            "facets": facets,
+            "filter_hash": key_hash,
+            "cached": cache_hit,
+        }
+
+    def _page_rows(self, stmt, fields: Optional[tuple[str, ...]]) -> list[dict]:
+        items = list(self.db.scalars(stmt) if fields is None else self.db.execute(stmt))
         note_ids = [n.id for n in items]
-        source_count_map = self._build_source_count_map(note_ids)
-        source_items_map = self._build_source_items_map(note_ids)
-        linked_map = self._build_linked_map(note_ids)
-        rows = [
-            {
-                "id": n.id,
-                "title": n.title,
-                "body": n.body,
-                "tags": n.tags_json,
-                "topic_id": n.topic_id,
-                "status": n.status,
-                "source_count": source_count_map.get(n.id, 0),
-                "sources": source_items_map.get(n.id, []),
-                "linked_task_ids": linked_map.get(n.id, {}).get("task_ids", []),
-                "linked_note_ids": linked_map.get(n.id, {}).get("note_ids", []),
-                "created_at": n.created_at.isoformat() if n.created_at else None,
-                "updated_at": n.updated_at.isoformat() if n.updated_at else None,
-            }
-            for n in items
-        ]
-        return rows, total
+        source_count_map = self._build_source_count_map(note_ids) if _needs(fields, "source_count") else {}
+        source_items_map = self._build_source_items_map(note_ids) if _needs(fields, "sources") else {}
+        linked_map = (
+            self._build_linked_map(note_ids) if _needs(fields, "linked_task_ids", "linked_note_ids") else {}
+        )
+        return _search_rows(items, source_count_map, source_items_map, linked_map, fields)
 
     def patch(self, note_id: str, payload: NotePatch) -> Optional[Note]:
         note = self.db.get(Note, note_id)
@@ -259,63 +263,185 @@ class NoteService:
     def _build_source_count_map(self, note_ids: list[str]) -> dict[str, int]:
         if not note_ids:
             return {}
-        rows = list(
-            self.db.execute(
-                select(NoteSource.note_id, func.count())
-                .where(NoteSource.note_id.in_(note_ids))
-                .group_by(NoteSource.note_id)
-            ).all()
-        )
-        return {row[0]: int(row[1]) for row in rows}
+        return _fold_source_counts(self.db.execute(_source_count_stmt(note_ids)).all())
 
     def _build_source_items_map(self, note_ids: list[str]) -> dict[str, list[dict[str, str]]]:
         if not note_ids:
             return {}
-        rows = list(
-            self.db.execute(
-                select(NoteSource.note_id, NoteSource.source_type, NoteSource.source_value)
-                .where(NoteSource.note_id.in_(note_ids))
-                .order_by(NoteSource.note_id.asc())
-            ).all()
-        )
-        mapped: dict[str, list[dict[str, str]]] = {note_id: [] for note_id in note_ids}
-        for note_id, source_type, source_value in rows:
-            mapped.setdefault(note_id, []).append({"type": source_type, "value": source_value})
-        return mapped
+        return _fold_source_items(note_ids, self.db.execute(_source_items_stmt(note_ids)).all())
 
     def _build_linked_map(self, note_ids: list[str]) -> dict[str, dict[str, list[str]]]:
         if not note_ids:
             return {}
-        rows = list(
-            self.db.scalars(
-                select(Link).where(
-                    or_(
-                        and_(Link.from_type == "note", Link.from_id.in_(note_ids)),
-                        and_(Link.to_type == "note", Link.to_id.in_(note_ids)),
-                    )
-                )
-            )
-        )
-        mapped: dict[str, dict[str, list[str]]] = {
-            note_id: {"task_ids": [], "note_ids": []} for note_id in note_ids
-        }
-        for row in rows:
-            if row.from_type == "note":
-                note_id = row.from_id
-                other_type = row.to_type
-                other_id = row.to_id
-            else:
-                note_id = row.to_id
-                other_type = row.from_type
-                other_id = row.from_id
-            if note_id not in mapped:
-                continue
-            if other_type == "task":
-                mapped[note_id]["task_ids"].append(other_id)
-            elif other_type == "note":
-                mapped[note_id]["note_ids"].append(other_id)
-        return mapped
+        return _fold_linked(note_ids, self.db.scalars(_linked_stmt(note_ids)))
 
     def _validate_topic(self, topic_id: str) -> None:
         if self.db.get(Topic, topic_id) is None:
             raise ValueError("TOPIC_NOT_FOUND")
+
+
+class AsyncNoteService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(self, *, fields: Optional[tuple[str, ...]] = None, **params):
+        stmt, count_stmt = _search_statements(fields=fields, **params)
+        items = list(await self.db.scalars(stmt) if fields is None else await self.db.execute(stmt))
+        total = int(await self.db.scalar(count_stmt) or 0)
+        note_ids = [n.id for n in items]
+        source_count_map: dict[str, int] = {}
+        source_items_map: dict[str, list[dict[str, str]]] = {}
+        linked_map: dict[str, dict[str, list[str]]] = {}
+        if note_ids and _needs(fields, "source_count"):
+            source_count_map = _fold_source_counts((await self.db.execute(_source_count_stmt(note_ids))).all())
+        if note_ids and _needs(fields, "sources"):
+            source_items_map = _fold_source_items(
+                note_ids, (await self.db.execute(_source_items_stmt(note_ids))).all()
+            )
+        if note_ids and _needs(fields, "linked_task_ids", "linked_note_ids"):
+            linked_map = _fold_linked(note_ids, await self.db.scalars(_linked_stmt(note_ids)))
+        return _search_rows(items, source_count_map, source_items_map, linked_map, fields), total
+
+
+def _search_clauses(
+    *,
+    topic_id: Optional[str] = None,
+    unclassified: bool = False,
+    status: str = "active",
+    q: Optional[str] = None,
+    tag: Optional[str] = None,
+) -> list:
+    clauses = []
+    if status:
+        clauses.append(Note.status == status)
+    if unclassified:
+        clauses.append(Note.topic_id.is_(None))
+    elif topic_id:
+        clauses.append(Note.topic_id == topic_id)
+    if q:
+        like = f"%{q}%"
+        clauses.append(or_(Note.title.ilike(like), Note.body.ilike(like)))
+    if tag:
+        # tags_json is a JSON array; text match is sufficient for MVP filter.
+        clauses.append(Note.tags_json.cast(Text).ilike(f'%"{tag}"%'))
+    return clauses
+
+
+def _page_statement(clauses: list, *, page: int, page_size: int, fields: Optional[tuple[str, ...]] = None):
+    stmt = (
+        select(Note)
+        .where(*clauses)
+        .order_by(Note.updated_at.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+    if fields is not None:
+        stmt = stmt.with_only_columns(*(NOTE_COLUMNS[name] for name in fields if name in NOTE_COLUMNS))
+    return stmt
+
+
+def _search_statements(*, page: int, page_size: int, fields: Optional[tuple[str, ...]] = None, **filters):
+    clauses = _search_clauses(**filters)
+    count_stmt = select(func.count()).select_from(Note).where(*clauses)
+    return _page_statement(clauses, page=page, page_size=page_size, fields=fields), count_stmt
+
+
+def _needs(fields: Optional[tuple[str, ...]], *names: str) -> bool:
+    return fields is None or any(name in fields for name in names)
+
+
+def _sparse_row(n, fields, source_count_map, source_items_map, linked_map) -> dict:
+    row = {}
+    for name in fields:
+        if name in NOTE_COLUMNS:
+            value = getattr(n, NOTE_COLUMNS[name].key)
+            if name in {"created_at", "updated_at"} and value:
+                value = value.isoformat()
+            row[name] = value
+        elif name == "source_count":
+            row[name] = source_count_map.get(n.id, 0)
+        elif name == "sources":
+            row[name] = source_items_map.get(n.id, [])
+        else:
+            row[name] = linked_map.get(n.id, {}).get(name.removeprefix("linked_"), [])
+    return row
+
+
+def _search_rows(items, source_count_map, source_items_map, linked_map, fields=None) -> list[dict]:
+    if fields is not None:
+        return [_sparse_row(n, fields, source_count_map, source_items_map, linked_map) for n in items]
+    return [
+        {
+            "id": n.id,
+            "title": n.title,
+            "body": n.body,
+            "tags": n.tags_json,
+            "topic_id": n.topic_id,
+            "status": n.status,
+            "source_count": source_count_map.get(n.id, 0),
+            "sources": source_items_map.get(n.id, []),
+            "linked_task_ids": linked_map.get(n.id, {}).get("task_ids", []),
+            "linked_note_ids": linked_map.get(n.id, {}).get("note_ids", []),
+            "created_at": n.created_at.isoformat() if n.created_at else None,
+            "updated_at": n.updated_at.isoformat() if n.updated_at else None,
+        }
+        for n in items
+    ]
+
+
+def _source_count_stmt(note_ids: list[str]):
+    return (
+        select(NoteSource.note_id, func.count())
+        .where(NoteSource.note_id.in_(note_ids))
+        .group_by(NoteSource.note_id)
+    )
+
+
+def _source_items_stmt(note_ids: list[str]):
+    return (
+        select(NoteSource.note_id, NoteSource.source_type, NoteSource.source_value)
+        .where(NoteSource.note_id.in_(note_ids))
+        .order_by(NoteSource.note_id.asc())
+    )
+
+
+def _linked_stmt(note_ids: list[str]):
+    return select(Link).where(
+        or_(
+            and_(Link.from_type == "note", Link.from_id.in_(note_ids)),
+            and_(Link.to_type == "note", Link.to_id.in_(note_ids)),
+        )
+    )
+
+
+def _fold_source_counts(rows) -> dict[str, int]:
+    return {row[0]: int(row[1]) for row in rows}
+
+
+def _fold_source_items(note_ids: list[str], rows) -> dict[str, list[dict[str, str]]]:
+    mapped: dict[str, list[dict[str, str]]] = {note_id: [] for note_id in note_ids}
+    for note_id, source_type, source_value in rows:
+        mapped.setdefault(note_id, []).append({"type": source_type, "value": source_value})
+    return mapped
+
+
+def _fold_linked(note_ids: list[str], rows) -> dict[str, dict[str, list[str]]]:
+    mapped: dict[str, dict[str, list[str]]] = {
+        note_id: {"task_ids": [], "note_ids": []} for note_id in note_ids
+    }
+    for row in rows:
+        if row.from_type == "note":
+            note_id = row.from_id
+            other_type = row.to_type
+            other_id = row.to_id
+        else:
+            note_id = row.to_id
+            other_type = row.from_type
+            other_id = row.from_id
+        if note_id not in mapped:
+            continue
+        if other_type == "task":
+            mapped[note_id]["task_ids"].append(other_id)
+        elif other_type == "note":
+            mapped[note_id]["note_ids"].append(other_id)
+    return mapped
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import threading
 import uuid
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.models import EntityLog, NodeLog, Route, RouteEdge, RouteNode, Task
+from src.models import EntityLog, Route, RouteEdge, RouteNode, Task
 from src.schemas import (
     EntityLogCreate,
     EntityLogPatch,
@@ -21,6 +27,65 @@ from src.schemas import (
 from src.services.audit_service import log_audit_event
 
 
+# Open log streams, woken from the (threadpool) thread that committed a new route log.
+_route_log_listeners: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+_route_log_listeners_lock = threading.Lock()
+
+
+def notify_route_log_appended() -> None:
+    with _route_log_listeners_lock:
+        listeners = list(_route_log_listeners)
+    for loop, appended in listeners:
+        try:
+            loop.call_soon_threadsafe(appended.set)
+        except RuntimeError:
+            # The stream's event loop has already shut down.
+            pass
+
+
+@contextmanager
+def route_log_listener() -> Iterator[asyncio.Event]:
+    listener = (asyncio.get_running_loop(), asyncio.Event())
+    with _route_log_listeners_lock:
+        _route_log_listeners.add(listener)
+    try:
+        yield listener[1]
+    finally:
+        with _route_log_listeners_lock:
+            _route_log_listeners.discard(listener)
+
+
+async def wait_for_route_log(appended: asyncio.Event, timeout: float) -> None:
+    try:
+        await asyncio.wait_for(appended.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+def delete_route_entity_logs(
+    db: Session,
+    *,
+    route_ids: Collection[str] = (),
+    node_ids: Collection[str] = (),
+    edge_ids: Collection[str] = (),
+) -> None:
+    # entity_logs.entity_id has no foreign key: logs are deleted with their node, edge or route, in the
+    # same transaction. A node takes along the logs of the edges its deletion cascades to.
+    conditions = []
+    if route_ids:
+        conditions.append(EntityLog.route_id.in_(route_ids))
+    if node_ids:
+        cascaded_edges = select(RouteEdge.id).where(
+            or_(RouteEdge.from_node_id.in_(node_ids), RouteEdge.to_node_id.in_(node_ids))
+        )
+        conditions.append(and_(EntityLog.entity_type == "route_node", EntityLog.entity_id.in_(node_ids)))
+        conditions.append(and_(EntityLog.entity_type == "route_edge", EntityLog.entity_id.in_(cascaded_edges)))
+    if edge_ids:
+        conditions.append(and_(EntityLog.entity_type == "route_edge", EntityLog.entity_id.in_(edge_ids)))
+    if conditions:
+        db.execute(delete(EntityLog).where(or_(*conditions)))
+
+
 ROUTE_TRANSITIONS = {
     "candidate": {"active", "parked", "cancelled"},
     "active": {"parked", "completed", "cancelled"},
@@ -265,6 +330,7 @@ class RouteGraphService:
         if int(has_successor or 0) > 0:
             raise ValueError("ROUTE_NODE_HAS_SUCCESSORS")
 
+        delete_route_entity_logs(self.db, node_ids=[node_id])
         self.db.delete(node)
         self.db.commit()
         log_audit_event(
@@ -377,6 +443,7 @@ class RouteGraphService:
         if edge is None:
             return False
 
+        delete_route_entity_logs(self.db, edge_ids=[edge_id])
         self.db.delete(edge)
         self.db.commit()
         log_audit_event(
@@ -393,53 +460,19 @@ class RouteGraphService:
 
     def get_graph(self, route_id: str) -> tuple[list[RouteNode], list[RouteEdge]]:
         self._ensure_route(route_id)
-        nodes = list(
-            self.db.scalars(
-                select(RouteNode)
-                .where(RouteNode.route_id == route_id)
-                .order_by(RouteNode.order_hint.asc(), RouteNode.created_at.asc())
-            )
-        )
-        edges = list(
-            self.db.scalars(
-                select(RouteEdge)
-                .where(RouteEdge.route_id == route_id)
-                .order_by(RouteEdge.created_at.asc())
-            )
-        )
+        nodes = list(self.db.scalars(_graph_nodes_stmt(route_id)))
+        edges = list(self.db.scalars(_graph_edges_stmt(route_id)))
         node_ids = [node.id for node in nodes]
         edge_ids = [edge.id for edge in edges]
 
         node_has_logs: set[str] = set()
         edge_has_logs: set[str] = set()
         if node_ids:
-            node_has_logs = set(
-                self.db.scalars(
-                    select(EntityLog.entity_id)
-                    .where(
-                        EntityLog.route_id == route_id,
-                        EntityLog.entity_type == "route_node",
-                        EntityLog.entity_id.in_(node_ids),
-                    )
-                    .distinct()
-                )
-            )
+            node_has_logs = set(self.db.scalars(_entities_with_logs_stmt(route_id, "route_node", node_ids)))
         if edge_ids:
-            edge_has_logs = set(
-                self.db.scalars(
-                    select(EntityLog.entity_id)
-                    .where(
-                        EntityLog.route_id == route_id,
-                        EntityLog.entity_type == "route_edge",
-                        EntityLog.entity_id.in_(edge_ids),
-                    )
-                    .distinct()
-                )
-            )
-        for node in nodes:
-            setattr(node, "has_logs", node.id in node_has_logs)
-        for edge in edges:
-            setattr(edge, "has_logs", edge.id in edge_has_logs)
+            edge_has_logs = set(self.db.scalars(_entities_with_logs_stmt(route_id, "route_edge", edge_ids)))
+        _mark_has_logs(nodes, node_has_logs)
+        _mark_has_logs(edges, edge_has_logs)
         return nodes, edges
 
     def append_entity_log(
@@ -462,20 +495,23 @@ class RouteGraphService:
         self.db.add(log)
         self.db.commit()
         self.db.refresh(log)
+        notify_route_log_appended()
         return log
 
-    def list_entity_logs(self, route_id: str, entity_type: str, entity_id: str) -> list[EntityLog]:
+    def list_entity_logs(
+        self,
+        route_id: str,
+        entity_type: str,
+        entity_id: str,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> list[EntityLog]:
         self._ensure_entity_in_route(route_id=route_id, entity_type=entity_type, entity_id=entity_id)
-        return list(
-            self.db.scalars(
-                select(EntityLog)
-                .where(
-                    EntityLog.route_id == route_id,
-                    EntityLog.entity_type == entity_type,
-                    EntityLog.entity_id == entity_id,
-                )
-                .order_by(EntityLog.created_at.desc())
-            )
+        return self._list_logs(
+            route_id, entity_type, entity_id, limit=limit, cursor=cursor, since=since, until=until
         )
 
     def patch_entity_log(
@@ -524,34 +560,26 @@ class RouteGraphService:
         self.db.commit()
         return True
 
-    def append_node_log(self, route_id: str, node_id: str, payload: NodeLogCreate) -> NodeLog:
+    def append_node_log(self, route_id: str, node_id: str, payload: NodeLogCreate) -> EntityLog:
         node = self._ensure_node_in_route(route_id, node_id)
         content = payload.content.strip()
         if not content:
             raise ValueError("ROUTE_LOG_CONTENT_EMPTY")
-        log_id = f"nlg_{uuid.uuid4().hex[:12]}"
-        log = NodeLog(
-            id=log_id,
-            node_id=node.id,
-            actor_type=payload.actor_type,
-            actor_id=payload.actor_id,
-            content=content,
-            log_type=payload.log_type,
-            source_ref=payload.source_ref,
-        )
-        entity_log = EntityLog(
-            id=log_id,
+        log = EntityLog(
+            id=f"nlg_{uuid.uuid4().hex[:12]}",
             route_id=route_id,
             entity_type="route_node",
             entity_id=node.id,
             actor_type=payload.actor_type,
             actor_id=payload.actor_id,
             content=content,
+            log_type=payload.log_type,
+            source_ref=payload.source_ref,
         )
         self.db.add(log)
-        self.db.add(entity_log)
         self.db.commit()
         self.db.refresh(log)
+        notify_route_log_appended()
         log_audit_event(
             self.db,
             actor_type="user",
@@ -564,60 +592,116 @@ class RouteGraphService:
         )
         return log
 
-    def list_node_logs(self, route_id: str, node_id: str) -> list[NodeLog]:
+    def list_node_logs(
+        self,
+        route_id: str,
+        node_id: str,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> list[EntityLog]:
         self._ensure_node_in_route(route_id, node_id)
-        return list(
-            self.db.scalars(
-                select(NodeLog).where(NodeLog.node_id == node_id).order_by(NodeLog.created_at.desc())
-            )
+        return self._list_logs(
+            route_id, "route_node", node_id, limit=limit, cursor=cursor, since=since, until=until
+        )
+
+    def tail_route_logs(
+        self,
+        route_id: str,
+        *,
+        after: Optional[str] = None,
+        after_floor_id: Optional[str] = None,
+        exclude_ids: Collection[str] = (),
+        since: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> list[EntityLog]:
+        self._ensure_route(route_id)
+        stmt = select(EntityLog).where(EntityLog.route_id == route_id)
+        if after:
+            # Logs sharing the anchor's timestamp are told apart by id floor and by ids already delivered.
+            anchor_created_at = self._log_anchor_created_at(route_id, after)
+            same_instant = [EntityLog.created_at == anchor_created_at, EntityLog.id != after]
+            if after_floor_id:
+                same_instant.append(EntityLog.id > after_floor_id)
+            if exclude_ids:
+                same_instant.append(EntityLog.id.not_in(list(exclude_ids)))
+            stmt = stmt.where(or_(EntityLog.created_at > anchor_created_at, and_(*same_instant)))
+        if since is not None:
+            stmt = stmt.where(EntityLog.created_at >= since)
+        stmt = stmt.order_by(EntityLog.created_at.asc(), EntityLog.id.asc()).limit(limit)
+        return list(self.db.scalars(stmt))
+
+    def route_log_created_at(self, route_id: str, log_id: str) -> datetime:
+        created_at = self.db.scalar(
+            select(EntityLog.created_at).where(EntityLog.id == log_id, EntityLog.route_id == route_id)
         )
+        if created_at is None:
+            raise ValueError("ROUTE_LOG_CURSOR_INVALID")
+        return created_at
 
-    def patch_node_log(self, route_id: str, node_id: str, log_id: str, payload: EntityLogPatch) -> NodeLog:
+    def _list_logs(
+        self,
+        route_id: str,
+        entity_type: str,
+        entity_id: str,
+        *,
+        limit: Optional[int],
+        cursor: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> list[EntityLog]:
+        stmt = select(EntityLog).where(
+            EntityLog.route_id == route_id,
+            EntityLog.entity_type == entity_type,
+            EntityLog.entity_id == entity_id,
+        )
+        if since is not None:
+            stmt = stmt.where(EntityLog.created_at >= since)
+        if until is not None:
+            stmt = stmt.where(EntityLog.created_at <= until)
+        if cursor:
+            anchor_created_at = self._log_anchor_created_at(route_id, cursor)
+            stmt = stmt.where(
+                or_(
+                    EntityLog.created_at < anchor_created_at,
+                    and_(EntityLog.created_at == anchor_created_at, EntityLog.id < cursor),
+                )
+            )
+        stmt = stmt.order_by(EntityLog.created_at.desc(), EntityLog.id.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return list(self.db.scalars(stmt))
+
+    def _log_anchor_created_at(self, route_id: str, log_id: str):
+        # Compare against the stored value so cursors stay exact regardless of
+        # how the backend serialises timestamps.
+        self.route_log_created_at(route_id, log_id)
+        return select(EntityLog.created_at).where(EntityLog.id == log_id).scalar_subquery()
+
+    def patch_node_log(self, route_id: str, node_id: str, log_id: str, payload: EntityLogPatch) -> EntityLog:
         self._ensure_node_in_route(route_id, node_id)
         content = payload.content.strip()
         if not content:
             raise ValueError("ROUTE_LOG_CONTENT_EMPTY")
 
-        log = self.db.scalar(select(NodeLog).where(NodeLog.id == log_id, NodeLog.node_id == node_id))
-        if log is None:
-            raise ValueError("ROUTE_ENTITY_LOG_NOT_FOUND")
-
+        log = self._get_node_log(route_id, node_id, log_id)
         log.content = content
         self.db.add(log)
-
-        entity_log = self.db.scalar(
-            select(EntityLog).where(
-                EntityLog.id == log_id,
-                EntityLog.route_id == route_id,
-                EntityLog.entity_type == "route_node",
-                EntityLog.entity_id == node_id,
-            )
-        )
-        if entity_log is None:
-            entity_log = EntityLog(
-                id=log_id,
-                route_id=route_id,
-                entity_type="route_node",
-                entity_id=node_id,
-                actor_type=log.actor_type,
-                actor_id=log.actor_id,
-                content=content,
-            )
-        else:
-            entity_log.content = content
-        self.db.add(entity_log)
-
         self.db.commit()
         self.db.refresh(log)
         return log
 
     def delete_node_log(self, route_id: str, node_id: str, log_id: str) -> bool:
         self._ensure_node_in_route(route_id, node_id)
-        log = self.db.scalar(select(NodeLog).where(NodeLog.id == log_id, NodeLog.node_id == node_id))
-        if log is None:
-            raise ValueError("ROUTE_ENTITY_LOG_NOT_FOUND")
+        log = self._get_node_log(route_id, node_id, log_id)
+        self.db.delete(log)
+        self.db.commit()
+        return True
 
-        entity_log = self.db.scalar(
+    def _get_node_log(self, route_id: str, node_id: str, log_id: str) -> EntityLog:
+        log = self.db.scalar(
             select(EntityLog).where(
                 EntityLog.id == log_id,
                 EntityLog.route_id == route_id,
@@ -625,11 +709,9 @@ class RouteGraphService:
                 EntityLog.entity_id == node_id,
             )
         )
-        if entity_log is not None:
-            self.db.delete(entity_log)
-        self.db.delete(log)
-        self.db.commit()
-        return True
+        if log is None:
+            raise ValueError("ROUTE_ENTITY_LOG_NOT_FOUND")
+        return log
 
     def _ensure_entity_in_route(self, *, route_id: str, entity_type: str, entity_id: str) -> None:
         self._ensure_route(route_id)
@@ -653,8 +735,8 @@ class RouteGraphService:
 
     def _ensure_node_in_route(self, route_id: str, node_id: str) -> RouteNode:
         self._ensure_route(route_id)
-        node = self.db.scalar(select(RouteNode).where(RouteNode.id == node_id, RouteNode.route_id == route_id))
-        if node is None:
+        node = self.db.get(RouteNode, node_id)
+        if node is None or node.route_id != route_id:
             raise ValueError("ROUTE_NODE_NOT_FOUND")
         return node
 
@@ -695,3 +777,55 @@ class RouteGraphService:
                 )
             )
         return False
+
+
+class AsyncRouteGraphService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_graph(self, route_id: str) -> tuple[list[RouteNode], list[RouteEdge]]:
+        if await self.db.get(Route, route_id) is None:
+            raise ValueError("ROUTE_NOT_FOUND")
+        nodes = list(await self.db.scalars(_graph_nodes_stmt(route_id)))
+        edges = list(await self.db.scalars(_graph_edges_stmt(route_id)))
+        node_ids = [node.id for node in nodes]
+        edge_ids = [edge.id for edge in edges]
+
+        node_has_logs: set[str] = set()
+        edge_has_logs: set[str] = set()
+        if node_ids:
+            node_has_logs = set(await self.db.scalars(_entities_with_logs_stmt(route_id, "route_node", node_ids)))
+        if edge_ids:
+            edge_has_logs = set(await self.db.scalars(_entities_with_logs_stmt(route_id, "route_edge", edge_ids)))
+        _mark_has_logs(nodes, node_has_logs)
+        _mark_has_logs(edges, edge_has_logs)
+        return nodes, edges
+
+
+def _graph_nodes_stmt(route_id: str):
+    return (
+        select(RouteNode)
+        .where(RouteNode.route_id == route_id)
+        .order_by(RouteNode.order_hint.asc(), RouteNode.created_at.asc())
+    )
+
+
+def _graph_edges_stmt(route_id: str):
+    return select(RouteEdge).where(RouteEdge.route_id == route_id).order_by(RouteEdge.created_at.asc())
+
+
+def _entities_with_logs_stmt(route_id: str, entity_type: str, entity_ids: list[str]):
+    return (
+        select(EntityLog.entity_id)
+        .where(
+            EntityLog.route_id == route_id,
+            EntityLog.entity_type == entity_type,
+            EntityLog.entity_id.in_(entity_ids),
+        )
+        .distinct()
+    )
+
+
+def _mark_has_logs(entities: list, with_logs: set[str]) -> None:
+    for entity in entities:
+        setattr(entity, "has_logs", entity.id in with_logs)
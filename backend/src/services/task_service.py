@@ -4,12 +4,34 @@ from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 import uuid
 
-from sqlalchemy import and_, case, false, func, select
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
 from src.models import Cycle, Task, TaskSource, Topic
 from src.schemas import TopicCreate, TaskCreate, TaskPatch
 from src.services.audit_service import log_audit_event
+from src.facets import cached_facets
+from src.task_views import counter_summary, view_clause
+
+TASK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "acceptance_criteria",
+    "topic_id",
+    "status",
+    "cancelled_reason",
+    "priority",
+    "due",
+    "source",
+    "cycle_id",
+    "archived_at",
+    "created_at",
+    "updated_at",
+)
+TASK_FACET_COLUMNS = {"status": Task.status, "priority": Task.priority, "topic": Task.topic_id, "cycle": Task.cycle_id}
+# What list and kanban views render; leaves out the free-text columns.
+TASK_COMPACT_FIELDS = ("id", "title", "status", "priority", "due", "topic_id", "cycle_id", "updated_at")
 
 FIXED_TOPIC_ORDER = [
     "top_fx_product_strategy",
@@ -63,6 +85,40 @@ class TaskService:
         *,
         page: int,
         page_size: int,
+        fields: Optional[tuple[str, ...]] = None,
+        **filters,
+    ) -> tuple[list, int]:
+        clauses = self._list_clauses(**filters)
+        items = self._page(clauses, page=page, page_size=page_size, fields=fields)
+        total = int(self.db.scalar(select(func.count()).select_from(Task).where(*clauses)) or 0)
+        return items, total
+
+    def facets(
+        self,
+        *,
+        page: int,
+        page_size: int,
+        fields: Optional[tuple[str, ...]] = None,
+        **filters,
+    ) -> dict:
+        # The page plus counts by status/priority/topic/cycle under the same filters; the total is
+        # the sum of the status counts, so no separate COUNT(*) runs.
+        clauses = self._list_clauses(**filters)
+        items = self._page(clauses, page=page, page_size=page_size, fields=fields)
+        key_hash, facets, cache_hit = cached_facets(self.db, "tasks", filters, clauses, TASK_FACET_COLUMNS)
+        return {
+            "items": items,
+            "page": page,
+            "page_size": page_size,
+            "total": sum(bucket["count"] for bucket in facets["status"]),
+            "facets": facets,
+            "filter_hash": key_hash,
+            "cached": cache_hit,
+        }
+
+    def _list_clauses(
+        self,
+        *,
         status: Optional[str] = None,
         priority: Optional[str] = None,
         archived: Optional[bool] = None,
@@ -73,50 +129,47 @@ class TaskService:
         updated_before: Optional[datetime] = None,
         view: Optional[str] = None,
         q: Optional[str] = None,
-    ) -> tuple[list[Task], int]:
+    ) -> list:
         show_archived = archived is True
-        archived_clause = Task.archived_at.is_not(None) if show_archived else Task.archived_at.is_(None)
-        stmt = select(Task).where(archived_clause)
-        count_stmt = select(func.count()).select_from(Task).where(archived_clause)
+        clauses = [Task.archived_at.is_not(None) if show_archived else Task.archived_at.is_(None)]
         now = datetime.now(timezone.utc)
         today = now.date()
 
         if status:
-            stmt = stmt.where(Task.status == status)
-            count_stmt = count_stmt.where(Task.status == status)
+            clauses.append(Task.status == status)
         if priority:
-            stmt = stmt.where(Task.priority == priority)
-            count_stmt = count_stmt.where(Task.priority == priority)
+            clauses.append(Task.priority == priority)
         if topic_id:
-            stmt = stmt.where(Task.topic_id == topic_id)
-            count_stmt = count_stmt.where(Task.topic_id == topic_id)
+            clauses.append(Task.topic_id == topic_id)
         if cycle_id:
-            stmt = stmt.where(Task.cycle_id == cycle_id)
-            count_stmt = count_stmt.where(Task.cycle_id == cycle_id)
+            clauses.append(Task.cycle_id == cycle_id)
         if stale_days:
-            stale_before = now - timedelta(days=stale_days)
-            stmt = stmt.where(Task.updated_at <= stale_before)
-            count_stmt = count_stmt.where(Task.updated_at <= stale_before)
+            clauses.append(Task.updated_at <= now - timedelta(days=stale_days))
         if due_before:
-            stmt = stmt.where(Task.due <= due_before)
-            count_stmt = count_stmt.where(Task.due <= due_before)
+            clauses.append(Task.due <= due_before)
         if updated_before:
-            stmt = stmt.where(Task.updated_at <= updated_before)
-            count_stmt = count_stmt.where(Task.updated_at <= updated_before)
+            clauses.append(Task.updated_at <= updated_before)
         if q:
-            like = f"%{q}%"
-            stmt = stmt.where(Task.title.ilike(like))
-            count_stmt = count_stmt.where(Task.title.ilike(like))
+            clauses.append(Task.title.ilike(f"%{q}%"))
         if view:
-            clause = self._build_view_clause(view, today=today)
+            clause = view_clause(view, today=today)
             if clause is not None:
-                stmt = stmt.where(clause)
-                count_stmt = count_stmt.where(clause)
+                clauses.append(clause)
+        return clauses
 
-        stmt = stmt.order_by(Task.updated_at.desc()).offset((page - 1) * page_size).limit(page_size)
-        items = list(self.db.scalars(stmt))
-        total = int(self.db.scalar(count_stmt) or 0)
-        return items, total
+    def _page(self, clauses: list, *, page: int, page_size: int, fields: Optional[tuple[str, ...]]) -> list:
+        stmt = (
+            select(Task)
+            .where(*clauses)
+            .order_by(Task.updated_at.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        if fields is None:
+            return list(self.db.scalars(stmt))
+        # Sparse rows come from a core select of just those columns, as plain dicts.
+        stmt = stmt.with_only_columns(*(getattr(Task, name) for name in fields))
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
 
     def patch(self, task_id: str, payload: TaskPatch) -> Optional[Task]:
         task = self.db.get(Task, task_id)
@@ -254,17 +307,8 @@ class TaskService:
             )
         )
 
-    def views_summary(self) -> dict[str, int]:
-        today = datetime.now(timezone.utc).date()
-        views = ["today", "overdue", "this_week", "backlog", "blocked", "done"]
-        summary: dict[str, int] = {}
-        for view in views:
-            clause = self._build_view_clause(view, today=today)
-            count_stmt = select(func.count()).select_from(Task).where(Task.archived_at.is_(None))
-            if clause is not None:
-                count_stmt = count_stmt.where(clause)
-            summary[view] = int(self.db.scalar(count_stmt) or 0)
-        return summary
+    def views_summary(self, *, topic_id: Optional[str] = None, cycle_id: Optional[str] = None) -> dict[str, int]:
+        return counter_summary(self.db, topic_id=topic_id, cycle_id=cycle_id)
 
     def _validate_topic(self, topic_id: str) -> None:
         if self.db.get(Topic, topic_id) is None:
@@ -318,23 +362,6 @@ class TaskService:
         if not reason or not str(reason).strip():
             raise ValueError("TASK_CANCEL_REASON_REQUIRED")
 
-    def _build_view_clause(self, view: str, *, today: date):
-        active = Task.status.notin_(["done", "cancelled"])
-        if view == "today":
-            return and_(Task.due == today, active)
-        if view == "overdue":
-            return and_(Task.due.is_not(None), Task.due < today, active)
-        if view == "this_week":
-            week_end = today + timedelta(days=6)
-            return and_(Task.due.is_not(None), Task.due >= today, Task.due <= week_end, active)
-        if view == "backlog":
-            return and_(Task.status == "todo", Task.due.is_(None))
-        if view == "blocked":
-            return false()
-        if view == "done":
-            return Task.status == "done"
-        return None
-
 
 class CycleService:
     def __init__(self, db: Session):
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, case, delete, event, false, func, inspect, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from src.models import Task, TaskViewCounter, TaskViewCounterState
+
+# Counts per (view, topic, cycle) for the dashboard summary, kept in task_view_counters by the
+# writing transaction. today/overdue/this_week depend on the date, so the whole table is rebuilt
+# once per UTC day: by scripts/task_view_counters.py at midnight, or by the first summary read.
+VIEWS = ("today", "overdue", "this_week", "backlog", "blocked", "done")
+DATE_VIEWS = ("today", "overdue", "this_week")
+NO_CYCLE = ""
+CLOSED_STATUSES = ("done", "cancelled")
+
+_UPSERT = text(
+    """
+    INSERT INTO task_view_counters (view, topic_id, cycle_id, count)
+    VALUES (:view, :topic_id, :cycle_id, :delta)
+    ON CONFLICT (view, topic_id, cycle_id) DO UPDATE SET count = task_view_counters.count + excluded.count
+    """
+)
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def view_clause(view: str, *, today: date):
+    active = Task.status.notin_(CLOSED_STATUSES)
+    if view == "today":
+        return and_(Task.due == today, active)
+    if view == "overdue":
+        return and_(Task.due.is_not(None), Task.due < today, active)
+    if view == "this_week":
+        week_end = today + timedelta(days=6)
+        return and_(Task.due.is_not(None), Task.due >= today, Task.due <= week_end, active)
+    if view == "backlog":
+        return and_(Task.status == "todo", Task.due.is_(None))
+    if view == "blocked":
+        return false()
+    if view == "done":
+        return Task.status == "done"
+    return None
+
+
+def task_views(status: Optional[str], due: Optional[date], archived: bool, *, today: date) -> tuple[str, ...]:
+    # Python twin of view_clause for a single row; archived tasks are in no view.
+    if status is None or archived:
+        return ()
+    views = []
+    active = status not in CLOSED_STATUSES
+    if active and due is not None:
+        if due == today:
+            views.append("today")
+        if due < today:
+            views.append("overdue")
+        if today <= due <= today + timedelta(days=6):
+            views.append("this_week")
+    if status == "todo" and due is None:
+        views.append("backlog")
+    if status == "done":
+        views.append("done")
+    return tuple(views)
+
+
+def view_sums(today: date):
+    # One pass over tasks: a conditional SUM per view instead of one COUNT(*) each.
+    return [func.coalesce(func.sum(case((view_clause(view, today=today), 1), else_=0)), 0).label(view) for view in VIEWS]
+
+
+def aggregate_summary(db: Session, *, today: date, topic_id: Optional[str] = None, cycle_id: Optional[str] = None):
+    stmt = select(*view_sums(today)).select_from(Task).where(Task.archived_at.is_(None))
+    if topic_id:
+        stmt = stmt.where(Task.topic_id == topic_id)
+    if cycle_id:
+        stmt = stmt.where(Task.cycle_id == cycle_id)
+    row = db.execute(stmt).one()
+    return {view: int(row._mapping[view]) for view in VIEWS}
+
+
+def rebuild_counters(conn, *, today: date) -> None:
+    conn.execute(delete(TaskViewCounter))
+    grouped = (
+        select(Task.topic_id, func.coalesce(Task.cycle_id, NO_CYCLE).label("cycle_key"), *view_sums(today))
+        .where(Task.archived_at.is_(None))
+        .group_by(Task.topic_id, func.coalesce(Task.cycle_id, NO_CYCLE))
+    )
+    rows = [
+        {"view": view, "topic_id": row.topic_id, "cycle_id": row.cycle_key, "count": int(row._mapping[view])}
+        for row in conn.execute(grouped)
+        for view in VIEWS
+        if row._mapping[view]
+    ]
+    if rows:
+        conn.execute(insert(TaskViewCounter), rows)
+    if conn.execute(update(TaskViewCounterState).where(TaskViewCounterState.id == 1).values(as_of=today)).rowcount == 0:
+        conn.execute(insert(TaskViewCounterState).values(id=1, as_of=today))
+
+
+def roll_over(conn, *, today: date) -> bool:
+    # Claims the day with a conditional UPDATE so concurrent callers rebuild at most once.
+    claimed = conn.execute(
+        update(TaskViewCounterState)
+        .where(TaskViewCounterState.id == 1, TaskViewCounterState.as_of != today)
+        .values(as_of=today)
+    ).rowcount
+    missing = not claimed and conn.execute(select(TaskViewCounterState.as_of)).first() is None
+    if not (claimed or missing):
+        return False
+    rebuild_counters(conn, today=today)
+    return True
+
+
+def counter_summary(db: Session, *, topic_id: Optional[str] = None, cycle_id: Optional[str] = None) -> dict[str, int]:
+    today = utc_today()
+    if db.scalar(select(TaskViewCounterState.as_of)) != today:
+        roll_over(db.connection(), today=today)
+        db.commit()
+    stmt = select(TaskViewCounter.view, func.sum(TaskViewCounter.count)).group_by(TaskViewCounter.view)
+    if topic_id:
+        stmt = stmt.where(TaskViewCounter.topic_id == topic_id)
+    if cycle_id:
+        stmt = stmt.where(TaskViewCounter.cycle_id == cycle_id)
+    counts = {view: int(total or 0) for view, total in db.execute(stmt)}
+    return {view: counts.get(view, 0) for view in VIEWS}
+
+
+def _apply(conn, deltas: Counter) -> None:
+    params = [
+        {"view": view, "topic_id": topic_id, "cycle_id": cycle_id, "delta": delta}
+        for (view, topic_id, cycle_id), delta in sorted(deltas.items())
+        if delta
+    ]
+    if params:
+        conn.execute(_UPSERT, params)
+
+
+def _add(deltas: Counter, sign: int, topic_id, cycle_id, status, due, archived, today: date) -> None:
+    if topic_id is None:
+        return
+    for view in task_views(status, due, archived, today=today):
+        deltas[(view, topic_id, cycle_id or NO_CYCLE)] += sign
+
+
+def _committed(task: Task, name: str):
+    history = inspect(task).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(task, name)
+
+
+_FIELDS = ("topic_id", "cycle_id", "status", "due", "archived_at")
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    today = utc_today()
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Task):
+            _add(deltas, 1, obj.topic_id, obj.cycle_id, obj.status, obj.due, obj.archived_at is not None, today)
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            old = [_committed(obj, name) for name in _FIELDS]
+            _add(deltas, -1, *old[:4], old[4] is not None, today)
+    for obj in session.dirty:
+        if isinstance(obj, Task) and session.is_modified(obj, include_collections=False):
+            old = [_committed(obj, name) for name in _FIELDS]
+            _add(deltas, -1, *old[:4], old[4] is not None, today)
+            _add(deltas, 1, obj.topic_id, obj.cycle_id, obj.status, obj.due, obj.archived_at is not None, today)
+    _apply(session.connection(), deltas)
+
+
+def _row_deltas(session: Session, ids: list[str], sign: int, deltas: Counter, today: date) -> None:
+    if not ids:
+        return
+    rows = session.execute(
+        select(Task.topic_id, Task.cycle_id, Task.status, Task.due, Task.archived_at).where(Task.id.in_(ids))
+    )
+    for topic_id, cycle_id, status, due, archived_at in rows:
+        _add(deltas, sign, topic_id, cycle_id, status, due, archived_at is not None, today)
+
+
+def _bulk_statement(orm_execute_state):
+    # Bulk update()/delete() on tasks skip the flush: count the matched rows out before the
+    # statement and, for updates, back in afterwards.
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not Task:
+        return None
+    session = orm_execute_state.session
+    stmt = orm_execute_state.statement
+    ids_stmt = select(Task.id)
+    if stmt.whereclause is not None:
+        ids_stmt = ids_stmt.where(stmt.whereclause)
+    ids = list(session.scalars(ids_stmt))
+    today = utc_today()
+    deltas: Counter = Counter()
+    _row_deltas(session, ids, -1, deltas, today)
+    result = orm_execute_state.invoke_statement()
+    if orm_execute_state.is_update:
+        _row_deltas(session, ids, 1, deltas, today)
+    _apply(session.connection(), deltas)
+    return result
+
+
+def install_task_view_counters(session_factory) -> None:
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "do_orm_execute", _bulk_statement)
@@ -18,13 +18,23 @@ def database_url() -> str:
     return runtime_settings.database_url
 
 
-def make_client(*, require_auth: bool = False, api_key: Optional[str] = None) -> TestClient:
+def make_client(
+    *, require_auth: bool = False, api_key: Optional[str] = None, query_debug: Optional[bool] = None
+) -> TestClient:
     from src.app import create_app
 
-    app = create_app(database_url(), require_auth=require_auth, api_key=api_key)
+    app = create_app(database_url(), require_auth=require_auth, api_key=api_key, query_debug=query_debug)
     return TestClient(app)
 
 
+def assert_query_budget(response, max_queries: int, *, max_repeated_shapes: int = 0) -> None:
+    # Needs a make_client(query_debug=True) client; the middleware reports counts in response headers.
+    count = int(response.headers["X-Query-Count"])
+    repeated = int(response.headers["X-Query-Repeats"])
+    assert count <= max_queries, f"{response.request.url.path}: {count} SQL statements, budget {max_queries}"
+    assert repeated <= max_repeated_shapes, f"{response.request.url.path}: {repeated} repeated statement shapes"
+
+
 def fixed_topic_id(client: TestClient, preferred_id: str = "top_fx_engineering_arch") -> str:
     listed = client.get("/api/v1/topics")
     assert listed.status_code == 200
@@ -1,4 +1,17 @@
-from tests.helpers import fixed_topic_id, make_client, uniq
+import gzip
+import json
+import os
+import time
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from src.audit_chain import split_ranges, verify_chain, verify_chain_range
+from src.audit_export import new_export_id, prune_exports, read_columnar_chunk, start_columnar_export
+from src.audit_partitions import audit_partition_name, detach_audit_partition, list_audit_partitions, month_start
+from src.db import build_engine
+from tests.helpers import database_url, fixed_topic_id, make_client, uniq
 
 
 def test_audit_events_contains_write_trace():
@@ -102,3 +115,426 @@ def test_changes_commit_audit_contains_chain_metadata():
         and item.get("metadata", {}).get("request_id") == client_request_id
     ]
     assert matched
+
+
+def test_audit_partitions_cover_current_month_and_archive_old_months(tmp_path):
+    client = make_client()
+    engine = build_engine(database_url())
+    old_month = date(2001, 1, 1)
+    event_id = f"aud_{uniq('old')[-12:]}"
+    older_id = f"aud_{uniq('older')[-12:]}"
+    with engine.begin() as conn:
+        for probe_id, occurred_at in (
+            (event_id, datetime(2001, 1, 15, tzinfo=timezone.utc)),
+            (older_id, datetime(2000, 12, 15, tzinfo=timezone.utc)),
+        ):
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO audit_events (
+                      id, occurred_at, actor_type, actor_id, tool, action, target_type, target_id,
+                      source_refs_json, metadata_json
+                    )
+                    VALUES (
+                      :id, :occurred_at, 'user', 'local', 'api', 'archive_probe', 'task', 'tsk_archive', '[]', '{}'
+                    )
+                    """
+                ),
+                {"id": probe_id, "occurred_at": occurred_at},
+            )
+
+    in_range = client.get(
+        "/api/v1/audit/events",
+        params={
+            "action": "archive_probe",
+            "occurred_from": "2001-01-01T00:00:00Z",
+            "occurred_to": "2001-02-01T00:00:00Z",
+        },
+    )
+    assert in_range.status_code == 200
+    assert event_id in {item["event_id"] for item in in_range.json()["items"]}
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            current = audit_partition_name(month_start(datetime.now(timezone.utc)))
+            assert current in list_audit_partitions(conn)
+            conn.execute(
+                text("DELETE FROM audit_events WHERE id IN (:id, :older)"), {"id": event_id, "older": older_id}
+            )
+        return
+
+    # A month in the middle would leave a hole in the chain; the oldest one has to go first.
+    with pytest.raises(ValueError, match="AUDIT_PARTITION_NOT_OLDEST"):
+        detach_audit_partition(engine, old_month, archive_dir=tmp_path)
+    assert detach_audit_partition(engine, date(2000, 12, 1), archive_dir=tmp_path) == "audit_events_p200012"
+    name = detach_audit_partition(engine, old_month, archive_dir=tmp_path)
+    assert name == "audit_events_p200101"
+    with engine.connect() as conn:
+        assert list_audit_partitions(conn, archive_dir=tmp_path) == ["audit_events_p200012", name]
+        remaining = conn.execute(text("SELECT COUNT(*) FROM audit_events WHERE id = :id"), {"id": event_id})
+        assert remaining.scalar_one() == 0
+    archive = create_engine(f"sqlite:///{tmp_path / f'{name}.sqlite3'}", future=True)
+    with archive.connect() as conn:
+        archived = conn.execute(text("SELECT action FROM audit_events WHERE id = :id"), {"id": event_id})
+        assert archived.scalar_one() == "archive_probe"
+
+
+def test_buffered_audit_mode_batches_direct_writes_and_replays_spool(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from src.app import create_app
+
+    spool = tmp_path / "audit_spool.ndjson"
+    replayed_id = f"aud_{uniq('spool')[-12:]}"
+    spool.write_text(
+        json.dumps(
+            {
+                "id": replayed_id,
+                "occurred_at": "2026-01-02T03:04:05+00:00",
+                "actor_type": "user",
+                "actor_id": "local",
+                "tool": "api",
+                "action": "spool_probe",
+                "target_type": "task",
+                "target_id": "tsk_spool",
+                "source_refs_json": [],
+                "before_hash": None,
+                "after_hash": None,
+                "metadata_json": {},
+            }
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+
+    app = create_app(database_url(), audit_mode="buffered", audit_spool_path=spool)
+    writer = app.state.audit_writer
+    assert writer is not None
+    assert spool.read_text(encoding="utf-8") == ""
+
+    with TestClient(app) as client:
+        replayed = client.get("/api/v1/audit/events", params={"action": "spool_probe", "target_id": "tsk_spool"})
+        assert replayed_id in {item["event_id"] for item in replayed.json()["items"]}
+
+        topic_id = fixed_topic_id(client)
+        created = client.post(
+            "/api/v1/tasks",
+            json={
+                "title": f"Buffered audit {uniq('audit')}",
+                "status": "todo",
+                "priority": "P2",
+                "source": "test://audit-buffered",
+                "topic_id": topic_id,
+            },
+        )
+        assert created.status_code == 201
+        task_id = created.json()["id"]
+
+        assert writer.flush(timeout=5)
+        audit = client.get("/api/v1/audit/events", params={"action": "create_task", "target_id": task_id})
+        assert audit.status_code == 200
+        assert audit.json()["total"] == 1
+        assert writer.stats()["written"] >= 2
+        assert spool.read_text(encoding="utf-8") == ""
+
+    with pytest.raises(RuntimeError):
+        writer.submit({})
+
+
+def test_buffered_audit_writer_requeues_failed_batches_and_rotates_spool(tmp_path, monkeypatch):
+    import threading
+
+    import src.services.audit_writer as audit_writer
+    from src.app import get_runtime
+    from src.services.audit_writer import BufferedAuditWriter
+
+    fsync = audit_writer.os.fsync
+    synced_on = []
+
+    def recording_fsync(fd):
+        synced_on.append(threading.current_thread().name)
+        fsync(fd)
+
+    monkeypatch.setattr(audit_writer.os, "fsync", recording_fsync)
+    engine = get_runtime(database_url()).engine
+    spool = tmp_path / "audit_spool.ndjson"
+    writer = BufferedAuditWriter(engine, batch_size=2, flush_interval_ms=1, spool_path=spool, segment_events=2)
+    write = writer._write
+    calls = {"n": 0}
+
+    def flaky_write(batch):
+        calls["n"] += 1
+        if calls["n"] <= 4:
+            raise RuntimeError("database unavailable")
+        write(batch)
+
+    writer._write = flaky_write
+    target_id = f"tsk_{uniq('retry')[-12:]}"
+    ids = [f"aud_{uniq('retry')[-12:]}_{index}" for index in range(5)]
+    try:
+        for event_id in ids:
+            writer.submit(
+                {
+                    "id": event_id,
+                    "occurred_at": datetime.now(timezone.utc),
+                    "actor_type": "user",
+                    "actor_id": "local",
+                    "tool": "api",
+                    "action": "retry_probe",
+                    "target_type": "task",
+                    "target_id": target_id,
+                    "source_refs_json": [],
+                    "before_hash": None,
+                    "after_hash": None,
+                    "metadata_json": {},
+                }
+            )
+        submit_syncs = list(synced_on)
+        assert writer.flush(timeout=10)
+    finally:
+        writer.close()
+
+    assert writer.failures == 4
+    assert writer.stats()["retrying"] == 0
+    # Group commit: submit() never fsyncs; the sync thread does, once per flush window.
+    assert threading.current_thread().name not in submit_syncs
+    assert "audit-spool-sync" in synced_on
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT id FROM audit_events WHERE target_id = :target"), {"target": target_id})
+        assert set(stored.scalars()) == set(ids)
+    # Sealed segments are deleted once all their events are stored; the active file is emptied.
+    assert [path.name for path in tmp_path.iterdir()] == [spool.name]
+    assert spool.read_text(encoding="utf-8") == ""
+
+
+def test_buffered_audit_writer_quarantines_unreadable_spool_segment(tmp_path):
+    from src.app import get_runtime
+    from src.services.audit_writer import BufferedAuditWriter
+
+    spool = tmp_path / "audit_spool.ndjson"
+    spool.write_text("", encoding="utf-8")
+    (tmp_path / "audit_spool.ndjson.000001").write_bytes(b"\xff\xfe not utf-8\n")
+
+    writer = BufferedAuditWriter(get_runtime(database_url()).engine, spool_path=spool)
+    writer.close()
+
+    quarantined = [path.name for path in tmp_path.iterdir() if path.name.endswith(".corrupt")]
+    assert len(quarantined) == 1
+    assert quarantined[0].startswith("audit_spool.ndjson.000001.")
+    assert spool.read_text(encoding="utf-8") == ""
+
+
+def test_audit_events_are_hash_chained_and_verifiable():
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    created = client.post(
+        "/api/v1/tasks",
+        json={
+            "title": f"Chained audit {uniq('audit')}",
+            "status": "todo",
+            "priority": "P2",
+            "source": "test://audit-chain",
+            "topic_id": topic_id,
+        },
+    )
+    assert created.status_code == 201
+    task_id = created.json()["id"]
+    assert client.patch(f"/api/v1/tasks/{task_id}", json={"status": "in_progress"}).status_code == 200
+
+    listed = client.get("/api/v1/audit/events", params={"target_type": "task", "target_id": task_id})
+    assert listed.status_code == 200
+    events = sorted(listed.json()["items"], key=lambda item: item["chain_seq"])
+    assert [item["action"] for item in events] == ["create_task", "update_task"]
+    create_event, update_event = events
+    assert create_event["before_hash"] is None
+    assert create_event["after_hash"] and update_event["after_hash"]
+    assert update_event["before_hash"] == create_event["after_hash"]
+    assert update_event["after_hash"] != create_event["after_hash"]
+    assert update_event["chain_seq"] > create_event["chain_seq"]
+
+    engine = build_engine(database_url())
+    first_seq = create_event["chain_seq"]
+    last_seq = update_event["chain_seq"]
+    with engine.connect() as conn:
+        result = verify_chain_range(conn, first_seq, last_seq, batch_size=1)
+    assert result.ok
+    assert result.checked == last_seq - first_seq + 1
+
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE audit_events SET actor_id = 'intruder' WHERE id = :id"), {"id": create_event["event_id"]}
+        )
+    try:
+        with engine.connect() as conn:
+            tampered = verify_chain_range(conn, first_seq, last_seq)
+        assert not tampered.ok
+        assert tampered.broken_seq == first_seq
+        assert tampered.reason == "hash_mismatch"
+    finally:
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE audit_events SET actor_id = :actor_id WHERE id = :id"),
+                {"actor_id": create_event["actor"]["id"], "id": create_event["event_id"]},
+            )
+
+    assert split_ranges(1, 10, 3) == [(1, 4), (5, 7), (8, 10)]
+    summary = verify_chain(database_url(), since=datetime(2000, 1, 1, tzinfo=timezone.utc), workers=1)
+    assert summary.ok
+
+
+def test_change_set_audits_are_chained_at_commit_with_one_hash_lookup():
+    from sqlalchemy import event as sa_event
+
+    from src.app import get_runtime
+    from src.models import AuditChainHead, AuditEvent
+    from src.services.audit_service import PENDING_AUDIT_EVENTS, log_audit_event
+
+    runtime = get_runtime(database_url())
+    targets = [f"tsk_{uniq('defer')[-12:]}_{index}" for index in range(3)]
+    with runtime.session_local() as db:
+        for target_id in targets:
+            log_audit_event(
+                db,
+                actor_type="user",
+                actor_id="local",
+                tool="api",
+                action="defer_probe",
+                target_type="task",
+                target_id=target_id,
+                after_hash=f"first-{target_id}",
+            )
+        head = db.scalar(select(AuditChainHead.last_seq).where(AuditChainHead.name == "audit_events"))
+        for target_id in targets:
+            log_audit_event(
+                db,
+                actor_type="user",
+                actor_id="local",
+                tool="api",
+                action="defer_probe",
+                target_type="task",
+                target_id=target_id,
+                after_hash=f"second-{target_id}",
+                auto_commit=False,
+            )
+        # Nothing is reserved until the commit: the head row is untouched while the transaction runs.
+        assert len(db.info[PENDING_AUDIT_EVENTS]) == 3
+        assert db.scalar(select(AuditChainHead.last_seq).where(AuditChainHead.name == "audit_events")) == head
+
+        lookups = []
+
+        def count_lookups(conn, cursor, statement, parameters, context, executemany):
+            if "row_number()" in statement.lower() and "audit_events" in statement:
+                lookups.append(statement)
+
+        sa_event.listen(runtime.engine, "before_cursor_execute", count_lookups)
+        try:
+            db.commit()
+        finally:
+            sa_event.remove(runtime.engine, "before_cursor_execute", count_lookups)
+        assert len(lookups) == 1
+
+        rows = db.execute(
+            select(AuditEvent.target_id, AuditEvent.before_hash, AuditEvent.chain_seq)
+            .where(AuditEvent.target_id.in_(targets), AuditEvent.after_hash.like("second-%"))
+            .order_by(AuditEvent.chain_seq)
+        ).all()
+    assert [row.before_hash for row in rows] == [f"first-{target_id}" for target_id in targets]
+    assert [row.chain_seq for row in rows] == [head + 1, head + 2, head + 3]
+
+
+def test_audit_export_streams_ndjson_and_writes_columnar_chunks(tmp_path, monkeypatch):
+    from src.config import settings
+
+    client = make_client()
+    engine = build_engine(database_url())
+    action = uniq("export_probe")
+    event_ids = [f"aud_{uniq('exp')[-12:]}" for _ in range(5)]
+    with engine.begin() as conn:
+        for index, event_id in enumerate(event_ids):
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO audit_events (
+                      id, occurred_at, actor_type, actor_id, tool, action, target_type, target_id,
+                      source_refs_json, metadata_json
+                    )
+                    VALUES (:id, :occurred_at, 'user', 'local', 'api', :action, 'task', 'tsk_export', '[]', '{}')
+                    """
+                ),
+                {
+                    "id": event_id,
+                    "occurred_at": datetime(2026, 2, 1, 0, 0, index, tzinfo=timezone.utc),
+                    "action": action,
+                },
+            )
+
+    streamed = client.get("/api/v1/audit/export", params={"action": action, "batch_size": 2})
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [line["event_id"] for line in lines] == event_ids
+    assert lines[0]["target"] == {"type": "task", "id": "tsk_export"}
+
+    resumed = client.get("/api/v1/audit/export", params={"action": action, "cursor": event_ids[1]})
+    assert [json.loads(line)["event_id"] for line in resumed.text.splitlines()] == event_ids[2:]
+
+    invalid = client.get("/api/v1/audit/export", params={"cursor": "aud_missing"})
+    assert invalid.status_code == 400
+    assert invalid.json()["error"]["code"] == "AUDIT_EXPORT_CURSOR_INVALID"
+
+    monkeypatch.setattr(settings, "audit_export_dir", str(tmp_path))
+    columnar = client.get(
+        "/api/v1/audit/export", params={"action": action, "format": "columnar", "chunk_rows": 2}
+    )
+    assert columnar.status_code == 202
+    started = columnar.json()
+    assert started["status"] == "running"
+    assert "directory" not in started
+    manifest = client.get(f"/api/v1/audit/exports/{started['export_id']}").json()
+    assert manifest["status"] == "complete"
+    assert "directory" not in manifest
+    assert manifest["rows"] == 5
+    assert manifest["has_more"] is False
+    assert manifest["next_cursor"] == event_ids[-1]
+    assert [chunk["rows"] for chunk in manifest["chunks"]] == [2, 2, 1]
+    export_dir = tmp_path / manifest["export_id"]
+    assert (export_dir / "manifest.json").exists()
+    first_chunk = read_columnar_chunk(export_dir / manifest["chunks"][0]["file"])
+    assert first_chunk["columns"]["event_id"] == event_ids[:2]
+    assert first_chunk["columns"]["action"] == [action, action]
+
+    chunk_url = f"/api/v1/audit/exports/{manifest['export_id']}/{manifest['chunks'][0]['file']}"
+    downloaded = client.get(chunk_url)
+    assert downloaded.status_code == 200
+    chunk_bytes = (export_dir / manifest["chunks"][0]["file"]).read_bytes()
+    assert gzip.decompress(downloaded.content) == gzip.decompress(chunk_bytes)
+    assert client.get(f"/api/v1/audit/exports/{manifest['export_id']}/manifest.json").status_code == 404
+    missing = client.get("/api/v1/audit/exports/..")
+    assert missing.status_code == 404
+    assert client.get("/api/v1/audit/exports/aex_000000000000").json()["error"]["code"] == "AUDIT_EXPORT_NOT_FOUND"
+
+    bounded = client.get(
+        "/api/v1/audit/export", params={"action": action, "format": "columnar", "chunk_rows": 2, "max_rows": 3}
+    )
+    bounded_manifest = client.get(f"/api/v1/audit/exports/{bounded.json()['export_id']}").json()
+    assert bounded_manifest["rows"] == 3
+    assert bounded_manifest["has_more"] is True
+    assert bounded_manifest["next_cursor"] == event_ids[2]
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM audit_events WHERE action = :action"), {"action": action})
+
+
+def test_prune_exports_removes_only_expired_export_directories(tmp_path):
+    expired = new_export_id()
+    fresh = new_export_id()
+    start_columnar_export(tmp_path, expired)
+    start_columnar_export(tmp_path, fresh)
+    (tmp_path / "unrelated").mkdir()
+    old = time.time() - 7200
+    os.utime(tmp_path / expired / "manifest.json", (old, old))
+
+    assert prune_exports(tmp_path, max_age_s=3600) == 1
+    assert not (tmp_path / expired).exists()
+    assert (tmp_path / fresh / "manifest.json").exists()
+    assert (tmp_path / "unrelated").exists()
@@ -44,3 +44,43 @@ def test_options_preflight_allows_localhost_custom_port():
 def test_auth_enabled_requires_api_key():
     with pytest.raises(RuntimeError, match="KMS_API_KEY"):
         create_app(database_url="sqlite+pysqlite:////tmp/memlineage-auth-test.db", require_auth=True, api_key="")
+
+
+def test_request_id_is_echoed_and_accepts_passthrough_header():
+    client = make_client(require_auth=True, api_key="secret")
+
+    generated = client.get("/health")
+    assert generated.status_code == 200
+    assert generated.headers["x-request-id"].startswith("req_")
+
+    passed = client.get("/api/v1/tasks", headers={"X-Request-Id": "trace-abc.123"})
+    assert passed.status_code == 401
+    assert passed.headers["x-request-id"] == "trace-abc.123"
+    assert passed.json()["error"]["request_id"] == "trace-abc.123"
+
+    wrong_length = client.get(
+        "/api/v1/tasks", headers={"Authorization": "Bearer secret-but-longer", "X-Request-Id": "bad id!"}
+    )
+    assert wrong_length.status_code == 401
+    request_id = wrong_length.json()["error"]["request_id"]
+    assert request_id.startswith("req_")
+    assert wrong_length.headers["x-request-id"] == request_id
+
+    ok = client.get("/api/v1/tasks", headers={"Authorization": "Bearer secret", "X-Request-Id": "trace-ok"})
+    assert ok.status_code == 200
+    assert ok.headers["x-request-id"] == "trace-ok"
+
+
+def test_health_details_reports_pool_and_requires_api_key():
+    client = make_client(require_auth=True, api_key="secret")
+    assert client.get("/health").status_code == 200
+    assert client.get("/health/details").status_code == 401
+
+    headers = {"Authorization": "Bearer secret"}
+    assert client.get("/api/v1/topics", headers=headers).status_code == 200
+    details = client.get("/health/details", headers=headers)
+    assert details.status_code == 200
+    database = details.json()["database"]
+    assert database["ready"] is True
+    assert database["sync"]["pool"]["checked_out"] == 0
+    assert database["sync"]["queries"]["latency_ms"]["count"] >= 1
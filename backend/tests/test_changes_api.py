@@ -870,3 +870,107 @@ def test_commit_upsert_journal_append_and_undo_removes_created_journal():
 
     fetched_after = client.get(f"/api/v1/journals/{journal_date}")
     assert fetched_after.status_code == 404
+
+
+def test_dedupe_lookup_matches_normalized_titles_in_one_call():
+    client = make_client(query_debug=True)
+    topic_id = fixed_topic_id(client)
+    task_title = uniq("Dedupe Task")
+    note_title = uniq("Dedupe Note")
+    task = client.post(
+        "/api/v1/tasks",
+        json={"title": task_title, "status": "todo", "source": "test://dedupe", "topic_id": topic_id},
+    )
+    assert task.status_code == 201
+    note = client.post(
+        "/api/v1/notes/append",
+        json={"title": note_title, "body": "b", "sources": [{"type": "text", "value": "test://dedupe"}]},
+    )
+    assert note.status_code == 201
+
+    missing = uniq("no such title")
+    resp = client.post(
+        "/api/v1/changes/dedupe-lookup",
+        json={"task_titles": [f"  {task_title.upper()}!", missing], "note_titles": [note_title]},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["tasks"][f"  {task_title.upper()}!"]["id"] == task.json()["id"]
+    assert body["tasks"][missing] is None
+    assert body["notes"][note_title]["id"] == note.json()["id"]
+    assert int(resp.headers["X-Query-Count"]) <= 4
+
+    done = client.patch(f"/api/v1/tasks/{task.json()['id']}", json={"status": "done"})
+    assert done.status_code == 200
+    resp = client.post("/api/v1/changes/dedupe-lookup", json={"task_titles": [task_title]})
+    assert resp.json() == {"tasks": {task_title: None}, "notes": {}}
+
+
+def test_skill_proposal_batch_folds_repeated_titles_into_one_dedupe_lookup():
+    import sys
+    from pathlib import Path
+
+    repo_root = Path(__file__).resolve().parents[2]
+    if str(repo_root) not in sys.path:
+        sys.path.append(str(repo_root))
+    from skill.openclaw_skill import KmsClient, ProposalBatch
+
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    existing_title = f"skill_batch_existing_{uniq('task')}"
+    existing = client.post(
+        "/api/v1/tasks",
+        json={
+            "title": existing_title,
+            "status": "todo",
+            "priority": "P2",
+            "source": "test://skill-batch",
+            "topic_id": topic_id,
+        },
+    )
+    assert existing.status_code == 201
+
+    kms = KmsClient(base_url="http://testserver", api_key="dummy", cache_ttl_sec=300)
+    kms._client = client
+    sent = []
+    client.event_hooks["request"].append(lambda request: sent.append((request.method, request.url.path)))
+    default_topic_calls = []
+    default_topic_id = kms._default_topic_id
+
+    def counting_default_topic_id():
+        default_topic_calls.append(1)
+        return default_topic_id()
+
+    kms._default_topic_id = counting_default_topic_id  # type: ignore[method-assign]
+    kms.list_topics()
+
+    new_title = f"skill_batch_new_{uniq('task')}"
+    other_title = f"skill_batch_other_{uniq('task')}"
+    note_title = f"skill_batch_note_{uniq('note')}"
+    batch = ProposalBatch(kms, actor={"type": "agent", "id": "openclaw"}, tool="openclaw-skill")
+    batch.record_todo(title=new_title, source="test://skill-batch")
+    batch.record_todo(title=f"  {new_title.upper()}!", source="test://skill-batch", priority="P1")
+    batch.record_todo(title=existing_title, source="test://skill-batch", priority="P1")
+    batch.upsert_knowledge(title=note_title, body_increment="first", source="test://skill-batch")
+    batch.upsert_knowledge(title=note_title, body_increment="second", source="test://skill-batch")
+    batch.record_todo(title=other_title, source="test://skill-batch")
+
+    sent.clear()
+    actions = batch.actions()
+    # The dedupe lookup is the only request: it must not invalidate the cached topic list.
+    assert sent == [("POST", "/api/v1/changes/dedupe-lookup")]
+    assert len(default_topic_calls) == 1
+    assert [action["type"] for action in actions] == ["create_task", "update_task", "append_note", "create_task"]
+    created, updated, note, other = actions
+    # The differently spelled repeat folds into the first create instead of creating a twin.
+    assert created["payload"]["title"] == new_title
+    assert created["payload"]["priority"] == "P1"
+    assert updated["payload"]["task_id"] == existing.json()["id"]
+    assert note["payload"]["body"] == "first\n\nsecond"
+    assert other["payload"]["title"] == other_title
+    assert created["payload"]["topic_id"] == other["payload"]["topic_id"]
+
+    result = batch.submit()
+    assert result["summary"]["task_create"] == 2
+    assert result["summary"]["task_update"] == 1
+    assert result["summary"]["note_append"] == 1
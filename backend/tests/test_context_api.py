@@ -1,6 +1,11 @@
 from datetime import date
 
-from tests.helpers import fixed_topic_id, make_client, uniq
+from sqlalchemy import event, func, select, text
+
+from src.cache import GenerationalLRUCache
+from src.models import Task
+
+from tests.helpers import create_test_task, fixed_topic_id, make_client, uniq
 
 
 def _future_date_seed() -> date:
@@ -164,3 +169,303 @@ def test_context_bundle_supports_topic_filter():
     assert task_b_id not in task_ids
     assert note_a_id in note_ids
     assert note_b_id not in note_ids
+
+
+def test_context_bundle_ranks_by_intent_and_packs_into_budget():
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    marker = uniq("ctxrank")
+
+    def note(title: str, body: str) -> str:
+        resp = client.post(
+            "/api/v1/notes/append",
+            json={
+                "title": title,
+                "body": body,
+                "topic_id": topic_id,
+                "sources": [{"type": "text", "value": f"test://context/{marker}/{title}"}],
+                "tags": [],
+            },
+        )
+        assert resp.status_code == 201
+        return resp.json()["id"]
+
+    task = client.post(
+        "/api/v1/tasks",
+        json={
+            "title": f"ship {marker} rollout",
+            "status": "todo",
+            "priority": "P1",
+            "source": f"test://context/{marker}/task",
+            "topic_id": topic_id,
+        },
+    )
+    assert task.status_code == 201
+    task_id = task.json()["id"]
+    matched_id = note("matched", "filler " * 200 + f"the {marker} plan lives here " + "tail " * 200)
+    linked_id = note("linked", "unrelated body")
+    link = client.post(
+        "/api/v1/links",
+        json={"from_type": "note", "from_id": linked_id, "to_type": "task", "to_id": task_id, "relation": "supports"},
+    )
+    assert link.status_code == 201
+    plain_id = note("plain", "unrelated body")
+
+    base = f"/api/v1/context/bundle?intent=review+the+{marker}&window_days=90&include_done=true"
+    recent = client.get(f"{base}&notes_limit=200")
+    assert recent.status_code == 200
+    assert recent.json()["ranking"] is None
+
+    ranked = client.get(f"{base}&rank=true&notes_limit=200&snippet_chars=120")
+    assert ranked.status_code == 200
+    payload = ranked.json()
+    assert payload["ranking"]["terms"] == ["review", marker]
+    assert payload["ranking"]["scoring_ms"] >= 0
+    assert payload["tasks"][0]["id"] == task_id
+    note_ids = [item["id"] for item in payload["notes"]]
+    assert note_ids.index(matched_id) < note_ids.index(linked_id) < note_ids.index(plain_id)
+    matched = payload["notes"][note_ids.index(matched_id)]
+    assert marker in matched["snippet"] and len(matched["snippet"]) <= 120
+    assert all("raw_content" not in item for item in payload["journals"])
+
+    budgeted = client.get(f"{base}&max_tokens=150&notes_limit=200")
+    assert budgeted.status_code == 200
+    budget = budgeted.json()["ranking"]["budget"]
+    assert budget["max_chars"] == 600
+    assert 0 < budget["used_chars"] <= 600
+    assert budgeted.json()["tasks"][0]["id"] == task_id
+
+
+def test_context_bundle_is_cached_until_the_next_write():
+    client = make_client(query_debug=True)
+    topic_id = fixed_topic_id(client)
+    marker = uniq("ctxcache")
+    url = f"/api/v1/context/bundle?intent={marker}&topic_id={topic_id}&window_days=30"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    again = client.get(f"/api/v1/context/bundle?intent=++{marker}+&window_days=30&topic_id={topic_id}&topic_id=")
+    assert again.status_code == 200
+    assert again.headers["X-Query-Count"] == "0"
+    assert again.json() == first.json()
+
+    created = client.post(
+        "/api/v1/tasks",
+        json={
+            "title": f"context_cache_{marker}",
+            "status": "todo",
+            "priority": "P2",
+            "source": f"test://context/{marker}/task",
+            "topic_id": topic_id,
+        },
+    )
+    assert created.status_code == 201
+    after_write = client.get(url)
+    assert int(after_write.headers["X-Query-Count"]) > 0
+    assert created.json()["id"] in {item["id"] for item in after_write.json()["tasks"]}
+
+    caches = client.get("/health/details").json()["caches"]
+    assert caches["context_bundle"]["hits"] >= 1
+
+
+def _changes(client, token: str) -> dict:
+    resp = client.get(f"/api/v1/context/changes?since={token}")
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def test_cache_value_read_during_commit_is_not_served_afterwards():
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    runtime = client.app.state.runtime
+    cache = GenerationalLRUCache("test_commit_race", 4)
+
+    def count_tasks():
+        with runtime.session_local() as reader:
+            return reader.scalar(select(func.count()).select_from(Task))
+
+    def read_through():
+        generation, value = cache.get("tasks")
+        if value is None:
+            value = count_tasks()
+            cache.put("tasks", generation, value)
+        return value
+
+    def read_during_commit(conn):
+        # Runs after the write is flushed but before the DBAPI commit, so it sees the old rows.
+        read_through()
+
+    before = read_through()
+    event.listen(runtime.engine, "commit", read_during_commit)
+    try:
+        with runtime.session_local() as writer:
+            writer.add(
+                Task(
+                    id=f"tsk_{uniq('race')[-10:]}",
+                    title=uniq("commit_race"),
+                    status="todo",
+                    source="test://commit-race",
+                    topic_id=topic_id,
+                )
+            )
+            writer.commit()
+    finally:
+        event.remove(runtime.engine, "commit", read_during_commit)
+    assert read_through() == before + 1 == count_tasks()
+
+
+def test_context_changes_returns_deltas_and_tombstones():
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    marker = uniq("ctxdelta")
+
+    start = client.get("/api/v1/context/changes")
+    assert start.status_code == 200
+    token = start.json()["next_token"]
+    assert start.json()["tasks"] == [] and start.json()["deleted"] == []
+
+    task_id = create_test_task(client, prefix=marker)
+    note = client.post(
+        "/api/v1/notes/append",
+        json={
+            "title": f"context_delta_{marker}",
+            "body": "delta body",
+            "topic_id": topic_id,
+            "sources": [{"type": "text", "value": f"test://context/{marker}/note"}],
+            "tags": [],
+        },
+    )
+    assert note.status_code == 201
+    note_id = note.json()["id"]
+    link = client.post(
+        "/api/v1/links",
+        json={"from_type": "note", "from_id": note_id, "to_type": "task", "to_id": task_id, "relation": "supports"},
+    )
+    assert link.status_code == 201
+    link_id = link.json()["id"]
+
+    delta = _changes(client, token)
+    assert [item["id"] for item in delta["tasks"]] == [task_id]
+    assert [item["id"] for item in delta["notes"]] == [note_id]
+    assert [item["id"] for item in delta["links"]] == [link_id]
+    assert delta["deleted"] == []
+    assert delta["summary"] == {"tasks": 1, "notes": 1, "journals": 0, "routes": 0, "links": 1, "deleted": 0}
+    token = delta["next_token"]
+    assert _changes(client, token)["summary"]["tasks"] == 0
+
+    # Deleting the note also drops its links through a bulk DELETE.
+    assert client.delete(f"/api/v1/notes/{note_id}").status_code == 204
+    assert client.patch(f"/api/v1/tasks/{task_id}", json={"priority": "P0"}).status_code == 200
+    delta = _changes(client, token)
+    assert delta["tasks"][0]["priority"] == "P0"
+    assert {(item["type"], item["id"]) for item in delta["deleted"]} == {("note", note_id), ("link", link_id)}
+
+    paged = client.get(f"/api/v1/context/changes?since={token}&limit=1").json()
+    assert paged["has_more"] is True
+    assert int(paged["next_token"]) < int(delta["next_token"])
+
+    assert client.get("/api/v1/context/changes?since=abc").json()["error"]["code"] == "CHANGE_TOKEN_INVALID"
+    future = client.get(f"/api/v1/context/changes?since={int(delta['next_token']) + 1000}")
+    assert future.status_code == 400
+
+
+def test_context_changes_track_change_set_commit_and_undo():
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    token = client.get("/api/v1/context/changes").json()["next_token"]
+    title = uniq("ctxdelta_cs")
+
+    dry = client.post(
+        "/api/v1/changes/dry-run",
+        json={
+            "actions": [
+                {
+                    "type": "create_task",
+                    "payload": {"title": title, "status": "todo", "source": "test://context/delta", "topic_id": topic_id},
+                }
+            ],
+            "actor": {"type": "agent", "id": "openclaw"},
+            "tool": "openclaw-skill",
+        },
+    )
+    assert dry.status_code == 200
+    commit = client.post(
+        f"/api/v1/changes/{dry.json()['change_set_id']}/commit",
+        json={"approved_by": {"type": "user", "id": "usr_1"}},
+    )
+    assert commit.status_code == 200
+    created = _changes(client, token)
+    assert [item["title"] for item in created["tasks"]] == [title]
+    task_id = created["tasks"][0]["id"]
+
+    undo = client.post(
+        "/api/v1/commits/undo-last",
+        json={"requested_by": {"type": "user", "id": "usr_1"}, "reason": "delta test"},
+    )
+    assert undo.status_code == 200
+    after_undo = _changes(client, created["next_token"])
+    assert after_undo["deleted"] == [{"type": "task", "id": task_id}]
+    # From the original token the task was created and removed again: only the tombstone remains.
+    assert _changes(client, token)["tasks"] == []
+
+
+def test_change_feed_reserves_at_commit_and_expires_pruned_tokens(tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    from fastapi.testclient import TestClient
+
+    from src.app import create_app
+    from src.change_feed import PENDING_KEYS, prune_change_feed
+    from src.models import AuditChainHead, ChangeFeedEntry, ChangeFeedHead
+
+    # A database of its own: pruning the shared one would expire other tests' tokens.
+    client = TestClient(create_app(f"sqlite+pysqlite:///{tmp_path / 'feed.sqlite3'}"))
+    topic_id = fixed_topic_id(client)
+    runtime = client.app.state.runtime
+    token = client.get("/api/v1/context/changes").json()["next_token"]
+
+    def feed_head(session) -> int:
+        return session.scalar(select(ChangeFeedHead.last_seq).where(ChangeFeedHead.id == 1)) or 0
+
+    with runtime.session_local() as writer:
+        head = feed_head(writer)
+        task = Task(
+            id=f"tsk_{uniq('feed')[-12:]}",
+            title=uniq("feed_commit"),
+            status="todo",
+            priority="P2",
+            source="test://context/feed",
+            topic_id=topic_id,
+        )
+        writer.add(task)
+        writer.flush()
+        # A flush only collects keys: no sequence (and no head-row lock) until commit.
+        assert writer.info[PENDING_KEYS] == {("task", task.id): None}
+        assert feed_head(writer) == head
+        writer.commit()
+        assert PENDING_KEYS not in writer.info
+        assert writer.scalar(select(ChangeFeedEntry.entity_id).where(ChangeFeedEntry.seq == feed_head(writer))) == task.id
+    assert [item["id"] for item in _changes(client, token)["tasks"]] == [task.id]
+
+    create_test_task(client, prefix="feed_prune")
+    with runtime.engine.begin() as conn:
+        assert prune_change_feed(conn, older_than=datetime.now(timezone.utc) + timedelta(days=1)) > 0
+    expired = client.get(f"/api/v1/context/changes?since={token}")
+    assert expired.status_code == 410
+    assert expired.json()["error"]["code"] == "CHANGE_TOKEN_EXPIRED"
+    # The newest entry is always kept, so a current token still works.
+    latest = client.get("/api/v1/context/changes").json()["next_token"]
+    assert _changes(client, latest)["tasks"] == []
+
+    # Databases from before change_feed_head carry the borrowed audit_chain_heads position over.
+    from src.db import reapply_migration
+
+    with runtime.engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO audit_chain_heads (name, last_seq, last_hash) VALUES ('change_feed', :seq, :hash)"),
+            {"seq": int(latest) + 100, "hash": "0" * 64},
+        )
+    reapply_migration(runtime.engine, 9)
+    with runtime.session_local() as session:
+        assert feed_head(session) == int(latest) + 100
+        assert session.scalar(select(AuditChainHead.name).where(AuditChainHead.name == "change_feed")) is None
@@ -57,3 +57,99 @@ def test_auth_rejects_invalid_bool(monkeypatch):
     monkeypatch.setenv("AFKMS_REQUIRE_AUTH", "invalid")
     with pytest.raises(ValueError, match="AFKMS_REQUIRE_AUTH"):
         Settings()
+
+
+def test_audit_mode_settings(monkeypatch):
+    monkeypatch.delenv("AFKMS_AUDIT_MODE", raising=False)
+    monkeypatch.delenv("AFKMS_AUDIT_BATCH_SIZE", raising=False)
+    settings = Settings()
+    assert settings.audit_buffered is False
+    assert settings.audit_batch_size == 100
+
+    monkeypatch.setenv("AFKMS_AUDIT_MODE", "buffered")
+    monkeypatch.setenv("AFKMS_AUDIT_BATCH_SIZE", "25")
+    monkeypatch.setenv("AFKMS_AUDIT_SPOOL_PATH", "data/custom_spool.ndjson")
+    settings = Settings()
+    assert settings.audit_buffered is True
+    assert settings.audit_batch_size == 25
+    assert str(settings.audit_spool_file).endswith("/data/custom_spool.ndjson")
+
+    monkeypatch.setenv("AFKMS_AUDIT_MODE", "async")
+    with pytest.raises(ValueError):
+        Settings().audit_buffered
+
+
+def test_schema_migrations_run_once_and_boot_only_checks_version(tmp_path, monkeypatch):
+    from sqlalchemy import text
+
+    from src import db as db_module
+
+    engine = db_module.build_engine(f"sqlite+pysqlite:///{tmp_path / 'fresh.sqlite3'}")
+    migrate_schema = db_module.migrate_schema
+    assert migrate_schema(engine) == [version for version, _, _ in db_module.MIGRATIONS]
+    with engine.connect() as conn:
+        assert db_module.current_schema_version(conn) == db_module.LATEST_SCHEMA_VERSION
+        assert conn.execute(text("SELECT COUNT(*) FROM topics WHERE id LIKE 'top_fx_%'")).scalar_one() == 7
+    assert migrate_schema(engine) == []
+
+    def fail(_engine):
+        raise AssertionError("boot must not re-run migrations once the schema is current")
+
+    monkeypatch.setattr(db_module, "migrate_schema", fail)
+    db_module.ensure_runtime_schema(engine)
+
+    with pytest.raises(ValueError):
+        db_module.reapply_migration(engine, 999)
+
+
+def test_pool_settings_from_env_reach_engine_and_telemetry(tmp_path, monkeypatch):
+    from sqlalchemy import text
+
+    import src.db as db_module
+    from src.db_metrics import DatabaseTelemetry, SlowQueryLog, install_telemetry, telemetry_report
+
+    monkeypatch.setenv("AFKMS_DB_POOL_SIZE", "3")
+    monkeypatch.setenv("AFKMS_DB_MAX_OVERFLOW", "1")
+    monkeypatch.setenv("AFKMS_DB_POOL_TIMEOUT", "2")
+    monkeypatch.setenv("AFKMS_DB_POOL_RECYCLE", "600")
+    monkeypatch.setenv("AFKMS_DB_POOL_PRE_PING", "true")
+    monkeypatch.setenv("AFKMS_DB_STATEMENT_TIMEOUT_MS", "1500")
+    pool_settings = Settings()
+    assert pool_settings.pool_options == {
+        "pool_size": 3,
+        "max_overflow": 1,
+        "pool_timeout": 2,
+        "pool_recycle": 600,
+        "pool_pre_ping": True,
+    }
+    assert pool_settings.db_statement_timeout_ms == 1500
+
+    monkeypatch.setattr(db_module, "settings", pool_settings)
+    assert db_module._postgres_connect_args() == {"options": "-c statement_timeout=1500"}
+    engine = db_module.build_engine(f"sqlite+pysqlite:///{tmp_path / 'pool.sqlite3'}")
+    telemetry = install_telemetry(engine, DatabaseTelemetry())
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        report = telemetry_report(engine, telemetry)
+    assert report["pool"]["size"] == 3
+    assert report["pool"]["max_overflow"] == 1
+    assert report["pool"]["checked_out"] == 1
+    assert report["checkout"]["total"] == 1
+    assert report["checkout"]["wait_ms"]["buckets"][-1] == {"le": "+Inf", "count": 1}
+    assert report["queries"]["slowest_recent"][0]["statement"] == "SELECT 1"
+    with engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["query_started"] == []
+        conn.execute(text("SELECT 2"))
+        assert conn.info["query_started"] == []
+    engine.dispose()
+
+    log = SlowQueryLog(size=2)
+    for duration in (5.0, 1.0, 9.0, 3.0):
+        log.record(f"q{duration}", duration)
+    assert [entry["duration_ms"] for entry in log.slowest()] == [9.0, 5.0]
+
+    monkeypatch.setenv("AFKMS_DB_POOL_SIZE", "0")
+    with pytest.raises(ValueError, match="AFKMS_DB_POOL"):
+        Settings().pool_options
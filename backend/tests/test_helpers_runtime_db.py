@@ -1,5 +1,5 @@
 from src.config import Settings
-from tests.helpers import database_url
+from tests.helpers import create_test_task, database_url, make_client, uniq
 
 
 def test_database_url_follows_runtime_settings_by_default(monkeypatch):
@@ -19,3 +19,67 @@ def test_database_url_uses_postgres_on_github_actions_when_backend_unset(monkeyp
     monkeypatch.setenv("AFKMS_DB_USER", "afkms")
     monkeypatch.setenv("AFKMS_DB_PASSWORD", "afkms")
     assert database_url() == Settings().postgres_url
+
+
+def test_create_app_builds_runtime_lazily_and_shares_it_per_url(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from src.app import create_app
+
+    url = f"sqlite+pysqlite:///{tmp_path / 'lazy.sqlite3'}"
+    first = create_app(url)
+    second = create_app(url)
+    runtime = first.state.runtime
+    assert second.state.runtime is runtime
+    assert not runtime.ready
+
+    client = TestClient(second)
+    assert client.get("/health").status_code == 200
+    assert not runtime.ready
+
+    topics = client.get("/api/v1/topics")
+    assert topics.status_code == 200
+    assert runtime.ready
+    assert topics.json()["items"]
+    runtime.engine.dispose()
+
+
+def test_async_read_endpoints_match_sync_handlers():
+    from fastapi.testclient import TestClient
+
+    from src.app import create_app
+    from src.db import async_database_url
+
+    assert async_database_url("sqlite+pysqlite:////tmp/a.db") == "sqlite+aiosqlite:////tmp/a.db"
+    assert async_database_url("postgresql+psycopg://u:p@h/db") == "postgresql+psycopg://u:p@h/db"
+
+    sync_client = make_client()
+    task_id = create_test_task(sync_client, prefix="async_reads")
+    route = sync_client.post(
+        "/api/v1/routes",
+        json={"task_id": task_id, "name": f"async_route_{uniq('r')}", "goal": "compare handlers"},
+    )
+    assert route.status_code == 201, route.text
+    route_id = route.json()["id"]
+    node = sync_client.post(
+        f"/api/v1/routes/{route_id}/nodes",
+        json={"node_type": "goal", "title": "root", "description": ""},
+    )
+    assert node.status_code == 201, node.text
+
+    requests = [
+        ("/api/v1/context/bundle", {"intent": "compare", "tasks_limit": 5}),
+        ("/api/v1/notes/search", {"page_size": 10}),
+        ("/api/v1/audit/events", {"page_size": 10, "target_id": route_id}),
+        (f"/api/v1/routes/{route_id}/graph", {}),
+        ("/api/v1/routes/rte_missing/graph", {}),
+    ]
+    with TestClient(create_app(database_url(), db_async=True)) as async_client:
+        for path, params in requests:
+            expected = sync_client.get(path, params=params)
+            actual = async_client.get(path, params=params)
+            assert actual.status_code == expected.status_code, path
+            if expected.status_code == 200:
+                assert actual.json() == expected.json(), path
+            else:
+                assert actual.json()["error"]["code"] == expected.json()["error"]["code"]
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from tests.helpers import database_url, fixed_topic_id, make_client, uniq
+
+
+def test_task_history_merges_direct_writes_commits_and_undo():
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    created = client.post(
+        "/api/v1/tasks",
+        json={
+            "title": f"history_task_{uniq('hist')}",
+            "status": "todo",
+            "priority": "P2",
+            "source": f"test://{uniq('history')}",
+            "topic_id": topic_id,
+        },
+    )
+    assert created.status_code == 201
+    task_id = created.json()["id"]
+
+    dry = client.post(
+        "/api/v1/changes/dry-run",
+        json={
+            "actions": [{"type": "update_task", "payload": {"task_id": task_id, "priority": "P1"}}],
+            "actor": {"type": "agent", "id": "openclaw"},
+            "tool": "openclaw-skill",
+        },
+    )
+    assert dry.status_code == 200
+    chg_id = dry.json()["change_set_id"]
+    commit = client.post(f"/api/v1/changes/{chg_id}/commit", json={"approved_by": {"type": "user", "id": "usr_1"}})
+    assert commit.status_code == 200
+    commit_id = commit.json()["commit_id"]
+
+    undo = client.post(
+        "/api/v1/commits/undo-last",
+        json={"requested_by": {"type": "user", "id": "usr_1"}, "reason": "history test"},
+    )
+    assert undo.status_code == 200
+
+    history = client.get(f"/api/v1/tasks/{task_id}/history")
+    assert history.status_code == 200
+    body = history.json()
+    assert body["entity_type"] == "task"
+    assert body["entity_id"] == task_id
+    items = body["items"]
+    assert [item["action"] for item in items] == ["create_task", "changes_apply_action", "changes_undo_action"]
+
+    created_item, applied, undone = items
+    assert created_item["commit_id"] is None
+    assert created_item["changes"] == []
+    assert applied["commit_id"] == commit_id
+    assert applied["change_set_id"] == chg_id
+    assert applied["action_type"] == "update_task"
+    assert applied["changes"] == [{"field": "priority", "before": "P2", "after": "P1"}]
+    assert undone["commit_id"] not in {None, commit_id}
+    assert undone["changes"] == [{"field": "priority", "before": "P1", "after": "P2"}]
+    assert applied["before_hash"] == created_item["after_hash"]
+    assert created_item["audit_archived"] is False
+    assert created_item["actor"] == {"type": "user", "id": "local"}
+
+
+def test_history_keeps_entries_whose_audit_row_was_archived():
+    from src.app import get_runtime
+
+    client = make_client()
+    task_id = f"tsk_{uniq('arch')[-12:]}"
+    archived_id = f"aud_{uniq('arch')[-12:]}"
+    with get_runtime(database_url()).engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO entity_history (audit_id, entity_type, entity_id, occurred_at, action)
+                VALUES (:audit_id, 'task', :task_id, :occurred_at, 'create_task')
+                """
+            ),
+            {"audit_id": archived_id, "task_id": task_id, "occurred_at": datetime(2001, 1, 2, tzinfo=timezone.utc)},
+        )
+
+    history = client.get(f"/api/v1/tasks/{task_id}/history")
+    assert history.status_code == 200
+    [item] = history.json()["items"]
+    assert item["audit_id"] == archived_id
+    assert item["action"] == "create_task"
+    assert item["audit_archived"] is True
+    assert item["tool"] is None
+    assert item["actor"] is None
+
+
+def test_history_rejects_unknown_entity_paths():
+    client = make_client()
+    missing = client.get("/api/v1/widgets/wdg_1/history")
+    assert missing.status_code == 404
+    assert missing.json()["error"]["code"] == "HISTORY_ENTITY_UNSUPPORTED"
+
+    empty = client.get(f"/api/v1/notes/{uniq('nte')}/history")
+    assert empty.status_code == 200
+    assert empty.json()["items"] == []
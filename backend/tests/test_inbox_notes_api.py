@@ -166,3 +166,60 @@ def test_batch_classify_and_topic_summary():
     assert "items" in payload
     assert any(item["topic_id"] == topic_id for item in payload["items"])
     assert any(item["topic_id"] is None for item in payload["items"])
+
+
+def test_search_notes_sparse_fields_skip_follow_up_queries():
+    client = make_client(query_debug=True)
+    title = uniq("Sparse Note")
+    created = client.post(
+        "/api/v1/notes/append",
+        json={"title": title, "body": "long body " * 50, "sources": [{"type": "text", "value": "test://sparse"}]},
+    )
+    assert created.status_code == 201
+
+    full = client.get("/api/v1/notes/search", params={"q": title})
+    compact = client.get("/api/v1/notes/search", params={"q": title, "fields": "compact"})
+    assert compact.status_code == 200
+    assert set(compact.json()["items"][0]) == {"id", "title", "tags", "topic_id", "status", "updated_at"}
+    assert compact.json()["items"][0]["updated_at"] == full.json()["items"][0]["updated_at"]
+    assert int(compact.headers["X-Query-Count"]) == 2
+    assert int(full.headers["X-Query-Count"]) == 5
+
+    picked = client.get("/api/v1/notes/search", params={"q": title, "fields": "title,source_count"})
+    assert picked.json()["items"] == [{"id": created.json()["id"], "title": title, "source_count": 1}]
+    assert int(picked.headers["X-Query-Count"]) == 3
+
+    bad = client.get("/api/v1/notes/search", params={"fields": "title,secret"})
+    assert bad.status_code == 422
+    assert bad.json()["error"]["code"] == "NOTE_FIELDS_INVALID"
+
+
+def test_note_facets_count_status_topic_category_and_tags():
+    client = make_client(query_debug=True)
+    marker = uniq("Facet Note")
+    for index, tags in enumerate((["alpha", "beta"], ["alpha"], [])):
+        resp = client.post(
+            "/api/v1/notes/append",
+            json={
+                "title": f"{marker} {index}",
+                "body": "facet body",
+                "sources": [{"type": "text", "value": "test://facets"}],
+                "tags": tags,
+            },
+        )
+        assert resp.status_code == 201
+
+    resp = client.get("/api/v1/notes/facets", params={"q": marker, "fields": "compact"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total"] == 3
+    assert len(body["items"]) == 3
+    assert body["facets"]["status"] == [{"value": "active", "count": 3}]
+    assert body["facets"]["tag"] == [{"value": "alpha", "count": 2}, {"value": "beta", "count": 1}]
+    assert sum(bucket["count"] for bucket in body["facets"]["category"]) == 3
+    assert sum(bucket["count"] for bucket in body["facets"]["topic"]) == 3
+    assert int(resp.headers["X-Query-Count"]) == 2
+
+    tagged = client.get("/api/v1/notes/facets", params={"q": marker, "tag": "beta"})
+    assert tagged.json()["total"] == 1
+    assert tagged.json()["facets"]["tag"] == [{"value": "alpha", "count": 1}, {"value": "beta", "count": 1}]
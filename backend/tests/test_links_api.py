@@ -1,4 +1,11 @@
-from tests.helpers import fixed_topic_id, make_client
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from src.db import build_engine, reapply_migration
+from tests.helpers import create_test_task, database_url, fixed_topic_id, make_client, uniq
 
 
 def test_create_and_delete_link():
@@ -40,3 +47,240 @@ def test_create_and_delete_link():
 
     deleted = client.delete(f"/api/v1/links/{link_id}")
     assert deleted.status_code == 204
+
+
+def _append_note(client, title: str) -> str:
+    note = client.post(
+        "/api/v1/notes/append",
+        json={
+            "title": title,
+            "body": "B",
+            "sources": [{"type": "text", "value": "test://links"}],
+        },
+    )
+    assert note.status_code == 201
+    return note.json()["id"]
+
+
+def _link(client, from_type: str, from_id: str, to_type: str, to_id: str, relation: str) -> str:
+    created = client.post(
+        "/api/v1/links",
+        json={
+            "from_type": from_type,
+            "from_id": from_id,
+            "to_type": to_type,
+            "to_id": to_id,
+            "relation": relation,
+        },
+    )
+    assert created.status_code == 201
+    return created.json()["id"]
+
+
+def test_link_neighbors_k_hop_traversal():
+    client = make_client()
+    task_id = create_test_task(client, prefix="link_neighbors_task")
+    spec_id = _append_note(client, f"neighbors_spec_{uniq('note')}")
+    detail_id = _append_note(client, f"neighbors_detail_{uniq('note')}")
+    other_id = _append_note(client, f"neighbors_other_{uniq('note')}")
+
+    _link(client, "note", spec_id, "task", task_id, "supports")
+    _link(client, "task", task_id, "note", detail_id, "references")
+    _link(client, "note", detail_id, "note", other_id, "supports")
+
+    one_hop = client.get("/api/v1/links/neighbors", params={"entity_type": "task", "entity_id": task_id})
+    assert one_hop.status_code == 200
+    body = one_hop.json()
+    assert {(node["id"], node["depth"]) for node in body["nodes"]} == {(spec_id, 1), (detail_id, 1)}
+    assert body["truncated"] is False
+    assert len(body["edges"]) == 2
+    spec_node = next(node for node in body["nodes"] if node["id"] == spec_id)
+    assert spec_node["type"] == "note"
+    assert spec_node["title"].startswith("neighbors_spec_")
+
+    two_hop = client.get(
+        "/api/v1/links/neighbors",
+        params={"entity_type": "note", "entity_id": spec_id, "depth": 2},
+    )
+    assert two_hop.status_code == 200
+    depths = {node["id"]: node["depth"] for node in two_hop.json()["nodes"]}
+    assert depths == {task_id: 1, detail_id: 2}
+
+    outgoing = client.get(
+        "/api/v1/links/neighbors",
+        params={"entity_type": "task", "entity_id": task_id, "direction": "out", "depth": 3},
+    )
+    assert {node["id"] for node in outgoing.json()["nodes"]} == {detail_id, other_id}
+
+    by_relation = client.get(
+        "/api/v1/links/neighbors",
+        params={"entity_type": "task", "entity_id": task_id, "depth": 3, "relation": "supports"},
+    )
+    assert {node["id"] for node in by_relation.json()["nodes"]} == {spec_id}
+
+    tasks_only = client.get(
+        "/api/v1/links/neighbors",
+        params={"entity_type": "note", "entity_id": detail_id, "depth": 2, "types": "task"},
+    )
+    assert {node["id"] for node in tasks_only.json()["nodes"]} == {task_id}
+
+    budgeted = client.get(
+        "/api/v1/links/neighbors",
+        params={"entity_type": "task", "entity_id": task_id, "depth": 3, "max_nodes": 1},
+    )
+    assert budgeted.status_code == 200
+    assert len(budgeted.json()["nodes"]) == 1
+    assert budgeted.json()["truncated"] is True
+
+
+def test_link_neighbors_budget_keeps_the_nearest_nodes_of_a_hub():
+    client = make_client()
+    hub_id = create_test_task(client, prefix="link_hub_task")
+    spokes = [_append_note(client, f"hub_spoke_{index}_{uniq('note')}") for index in range(4)]
+    for spoke_id in spokes:
+        _link(client, "task", hub_id, "note", spoke_id, "references")
+        _link(client, "note", spoke_id, "note", _append_note(client, f"hub_leaf_{uniq('note')}"), "supports")
+
+    budgeted = client.get(
+        "/api/v1/links/neighbors",
+        params={"entity_type": "task", "entity_id": hub_id, "depth": 4, "max_nodes": 3},
+    )
+    assert budgeted.status_code == 200
+    body = budgeted.json()
+    assert body["truncated"] is True
+    assert [node["depth"] for node in body["nodes"]] == [1, 1, 1]
+    assert {node["id"] for node in body["nodes"]} < set(spokes)
+
+
+def test_create_link_is_idempotent_per_edge():
+    client = make_client()
+    task_id = create_test_task(client, prefix="link_upsert_task")
+    note_id = _append_note(client, f"link_upsert_{uniq('note')}")
+
+    first = _link(client, "note", note_id, "task", task_id, "supports")
+    second = _link(client, "note", note_id, "task", task_id, "supports")
+    assert first == second
+
+    other_relation = _link(client, "note", note_id, "task", task_id, "blocks")
+    assert other_relation != first
+
+    listed = client.get("/api/v1/links", params={"from_id": note_id, "to_id": task_id})
+    assert listed.status_code == 200
+    assert listed.json()["total"] == 2
+
+
+def _commit_link_change_set(client, note_id: str, task_id: str) -> dict:
+    dry = client.post(
+        "/api/v1/changes/dry-run",
+        json={
+            "actions": [
+                {
+                    "type": "link_entities",
+                    "payload": {
+                        "from_type": "note",
+                        "from_id": note_id,
+                        "to_type": "task",
+                        "to_id": task_id,
+                        "relation": "supports",
+                    },
+                }
+            ],
+            "actor": {"type": "agent", "id": "openclaw"},
+            "tool": "openclaw-skill",
+        },
+    )
+    assert dry.status_code == 200
+    committed = client.post(
+        f"/api/v1/changes/{dry.json()['change_set_id']}/commit",
+        json={"approved_by": {"type": "user", "id": "usr_1"}},
+    )
+    assert committed.status_code == 200
+    detail = client.get(f"/api/v1/changes/{dry.json()['change_set_id']}")
+    assert detail.status_code == 200
+    return detail.json()["actions"][0]["apply_result"]
+
+
+def test_change_set_link_reuses_existing_edge_and_undo_keeps_it():
+    client = make_client()
+    task_id = create_test_task(client, prefix="link_change_upsert_task")
+    note_id = _append_note(client, f"link_change_upsert_{uniq('note')}")
+    link_id = _link(client, "note", note_id, "task", task_id, "supports")
+
+    result = _commit_link_change_set(client, note_id, task_id)
+    assert result["entity_id"] == link_id
+    assert result["created"] is False
+
+    undo = client.post(
+        "/api/v1/commits/undo-last",
+        json={"requested_by": {"type": "user", "id": "usr_1"}, "reason": "revert reused link"},
+    )
+    assert undo.status_code == 200
+    listed = client.get("/api/v1/links", params={"from_id": note_id, "to_id": task_id})
+    assert [item["id"] for item in listed.json()["items"]] == [link_id]
+
+
+def test_duplicate_link_compaction_repoints_change_actions():
+    client = make_client()
+    task_id = create_test_task(client, prefix="link_dedupe_task")
+    note_id = _append_note(client, f"link_dedupe_{uniq('note')}")
+    result = _commit_link_change_set(client, note_id, task_id)
+    duplicate_id = result["entity_id"]
+    assert result["created"] is True
+
+    survivor_id = f"lnk_{uniq('old')[-12:]}"
+    engine = build_engine(database_url())
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS uq_links_edge"))
+        conn.execute(
+            text(
+                """
+                INSERT INTO links (id, from_type, from_id, to_type, to_id, relation, created_at)
+                VALUES (:id, 'note', :note_id, 'task', :task_id, 'supports', :created_at)
+                """
+            ),
+            {
+                "id": survivor_id,
+                "note_id": note_id,
+                "task_id": task_id,
+                "created_at": datetime(2000, 1, 1, tzinfo=timezone.utc),
+            },
+        )
+    reapply_migration(engine, 2)
+
+    listed = client.get("/api/v1/links", params={"from_id": note_id, "to_id": task_id})
+    assert [item["id"] for item in listed.json()["items"]] == [survivor_id]
+
+    with engine.connect() as conn:
+        raw = conn.execute(
+            text("SELECT apply_result_json FROM change_actions WHERE CAST(apply_result_json AS TEXT) LIKE :needle"),
+            {"needle": f"%{duplicate_id}%"},
+        ).scalar_one()
+    remapped = json.loads(raw) if isinstance(raw, str) else raw
+    assert remapped["entity_id"] == survivor_id
+    assert remapped["created"] is False
+    assert remapped["deduplicated_from"] == duplicate_id
+
+    undo = client.post(
+        "/api/v1/commits/undo-last",
+        json={"requested_by": {"type": "user", "id": "usr_1"}, "reason": "revert compacted link"},
+    )
+    assert undo.status_code == 200
+    listed = client.get("/api/v1/links", params={"from_id": note_id, "to_id": task_id})
+    assert [item["id"] for item in listed.json()["items"]] == [survivor_id]
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO links (id, from_type, from_id, to_type, to_id, relation)
+                    VALUES (:id, 'note', :note_id, 'task', :task_id, 'supports')
+                    """
+                ),
+                {"id": f"lnk_{uniq('dup')[-12:]}", "note_id": note_id, "task_id": task_id},
+            )
+    except IntegrityError:
+        rejected = True
+    else:
+        rejected = False
+    assert rejected
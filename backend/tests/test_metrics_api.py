@@ -0,0 +1,69 @@
+import re
+
+from src.metrics import record_cache_lookup
+from tests.helpers import fixed_topic_id, make_client, uniq
+
+SAMPLE_LINE = re.compile(r'^[a-z_]+(\{([a-z_]+="[^"]*",?)*\})? ([0-9.e+-]+|\+Inf)$')
+
+
+def _samples(text: str) -> dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        assert SAMPLE_LINE.match(line), line
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+    return samples
+
+
+def test_metrics_endpoint_exports_route_db_changeset_audit_and_cache_series():
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    dry = client.post(
+        "/api/v1/changes/dry-run",
+        json={
+            "actions": [
+                {
+                    "type": "create_task",
+                    "payload": {
+                        "title": f"metrics_task_{uniq('t')}",
+                        "status": "todo",
+                        "priority": "P2",
+                        "source": "test://metrics",
+                        "topic_id": topic_id,
+                    },
+                }
+            ],
+            "actor": {"type": "agent", "id": "openclaw"},
+            "tool": "openclaw-skill",
+        },
+    )
+    assert dry.status_code == 200
+    commit = client.post(
+        f"/api/v1/changes/{dry.json()['change_set_id']}/commit",
+        json={"approved_by": {"type": "user", "id": "usr_1"}},
+    )
+    assert commit.status_code == 200
+    record_cache_lookup("metrics_test", hit=True)
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(resp.text)
+
+    commit_route = 'method="POST",route="/api/v1/changes/{change_set_id}/commit"'
+    assert samples[f'afkms_http_request_duration_seconds_count{{{commit_route},status="200"}}'] >= 1
+    assert samples[f"afkms_http_request_db_queries_sum{{{commit_route}}}"] >= 1
+    assert samples['afkms_changeset_duration_seconds_count{operation="dry_run"}'] >= 1
+    assert samples['afkms_changeset_duration_seconds_count{operation="commit"}'] >= 1
+    assert samples['afkms_changeset_action_duration_seconds_count{operation="dry_run",action_type="create_task"}'] >= 1
+    assert samples['afkms_changeset_action_duration_seconds_count{operation="commit",action_type="create_task"}'] >= 1
+    assert samples['afkms_audit_events_written_total{mode="sync"}'] >= 1
+    assert samples['afkms_cache_requests_total{cache="metrics_test",result="hit"}'] >= 1
+    assert samples['afkms_db_pool_checked_out{engine="sync"}'] >= 0
+    assert samples['afkms_db_query_duration_seconds_bucket{engine="sync",le="+Inf"}'] >= 1
+
+    unknown_path = f"/api/v1/{uniq('nowhere')}/x/y/z"
+    assert client.get(unknown_path).status_code == 404
+    assert unknown_path not in client.get("/metrics").text
@@ -0,0 +1,76 @@
+import pytest
+
+from src.db_metrics import statement_shape
+from tests.helpers import assert_query_budget, create_test_task, fixed_topic_id, make_client, uniq
+
+# Max SQL statements per request. Lower a budget when a path gets cheaper; raising one needs a reason.
+GET_BUDGETS = [
+    ("/api/v1/tasks?page_size=50", 2),
+    ("/api/v1/tasks/views/summary", 2),
+    ("/api/v1/notes/search?page_size=50", 5),
+    ("/api/v1/context/bundle?intent=budget", 3),
+    ("/api/v1/context/changes?since=0&limit=200", 6),
+    ("/api/v1/topics", 1),
+    ("/api/v1/audit/events?page_size=50", 2),
+    ("/api/v1/changes?page_size=50", 3),
+    ("/api/v1/knowledge", 2),
+    ("/api/v1/inbox", 2),
+    ("/api/v1/journals", 2),
+    ("/api/v1/ideas", 2),
+    ("/api/v1/routes", 2),
+    ("/api/v1/links", 2),
+]
+
+
+@pytest.mark.parametrize("path,budget", GET_BUDGETS)
+def test_read_endpoints_stay_within_query_budget(path, budget):
+    client = make_client(query_debug=True)
+    resp = client.get(path)
+    assert resp.status_code == 200, resp.text
+    assert_query_budget(resp, budget)
+
+
+def test_route_graph_and_dry_run_query_budgets():
+    client = make_client(query_debug=True)
+    task_id = create_test_task(client, prefix="budget")
+    route = client.post("/api/v1/routes", json={"task_id": task_id, "name": f"budget_{uniq('r')}"})
+    assert route.status_code == 201
+    route_id = route.json()["id"]
+    for index in range(3):
+        node = client.post(f"/api/v1/routes/{route_id}/nodes", json={"node_type": "idea", "title": f"n{index}"})
+        assert node.status_code == 201
+
+    graph = client.get(f"/api/v1/routes/{route_id}/graph")
+    assert graph.status_code == 200
+    assert_query_budget(graph, 4)
+
+    topic_id = fixed_topic_id(client)
+    actions = [
+        {
+            "type": "create_task",
+            "payload": {
+                "title": f"budget_task_{index}",
+                "status": "todo",
+                "priority": "P2",
+                "source": "test://budget",
+                "topic_id": topic_id,
+            },
+        }
+        for index in range(5)
+    ]
+    dry = client.post(
+        "/api/v1/changes/dry-run",
+        json={"actions": actions, "actor": {"type": "agent", "id": "budget"}, "tool": "budget-test"},
+    )
+    assert dry.status_code == 200
+    # Referenced topics/entities are loaded with one IN query for the whole batch, not per action.
+    assert_query_budget(dry, 8)
+    assert dry.headers["X-Query-Repeats"] == "0"
+
+
+def test_statement_shape_folds_expanding_in_lists():
+    three = statement_shape("SELECT id FROM notes WHERE id IN (?, ?, ?)")
+    one = statement_shape("SELECT id FROM notes\n WHERE id IN (?)")
+    assert three == one == "SELECT id FROM notes WHERE id IN (...)"
+    nested = "SELECT id FROM notes WHERE id IN (SELECT note_id FROM links)"
+    assert statement_shape(nested) == nested
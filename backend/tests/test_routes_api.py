@@ -1,3 +1,5 @@
+from sqlalchemy import text
+
 from src.db import build_engine, build_session_local
 from src.schemas import EntityLogCreate, EntityLogPatch
 from src.services.route_service import RouteGraphService
@@ -334,6 +336,76 @@ def test_node_log_compatibility_get_still_readable():
     assert item["source_ref"] == "https://example.com/compat"
 
 
+def test_change_set_node_log_lands_in_unified_log_store():
+    client = make_client()
+    task_id = create_test_task(client, prefix="node_log_change_set_task")
+
+    route = client.post(
+        "/api/v1/routes",
+        json={
+            "task_id": task_id,
+            "name": f"route_test_{uniq('node_log_change_set')}",
+            "goal": "change-set node logs",
+            "status": "candidate",
+        },
+    )
+    assert route.status_code == 201
+    route_id = route.json()["id"]
+
+    node = client.post(
+        f"/api/v1/routes/{route_id}/nodes",
+        json={"node_type": "goal", "title": "Change Set Node", "description": ""},
+    )
+    assert node.status_code == 201
+    node_id = node.json()["id"]
+
+    dry = client.post(
+        "/api/v1/changes/dry-run",
+        json={
+            "actions": [
+                {
+                    "type": "append_route_node_log",
+                    "payload": {
+                        "route_id": route_id,
+                        "node_id": node_id,
+                        "content": f"agent-log-{uniq('entry')}",
+                        "log_type": "decision",
+                        "actor_type": "agent",
+                        "actor_id": "openclaw",
+                    },
+                }
+            ],
+            "actor": {"type": "agent", "id": "openclaw"},
+            "tool": "openclaw-skill",
+        },
+    )
+    assert dry.status_code == 200
+    commit = client.post(
+        f"/api/v1/changes/{dry.json()['change_set_id']}/commit",
+        json={"approved_by": {"type": "user", "id": "usr_1"}},
+    )
+    assert commit.status_code == 200
+
+    node_logs = client.get(f"/api/v1/routes/{route_id}/nodes/{node_id}/logs")
+    assert node_logs.status_code == 200
+    assert len(node_logs.json()["items"]) == 1
+    log_id = node_logs.json()["items"][0]["id"]
+    assert node_logs.json()["items"][0]["log_type"] == "decision"
+
+    graph = client.get(f"/api/v1/routes/{route_id}/graph")
+    assert graph.status_code == 200
+    graph_node = next(item for item in graph.json()["nodes"] if item["id"] == node_id)
+    assert graph_node["has_logs"] is True
+
+    undo = client.post(
+        "/api/v1/commits/undo-last",
+        json={"requested_by": {"type": "user", "id": "usr_1"}, "reason": "revert node log"},
+    )
+    assert undo.status_code == 200
+    after_undo = client.get(f"/api/v1/routes/{route_id}/nodes/{node_id}/logs")
+    assert all(item["id"] != log_id for item in after_undo.json()["items"])
+
+
 def test_node_log_compatibility_snapshot_include_logs_survives_fetch_error():
     import sys
     from pathlib import Path
@@ -368,6 +440,24 @@ def test_node_log_compatibility_snapshot_include_logs_survives_fetch_error():
     assert selected["n2"][0]["id"] == "nlg_ok"
 
 
+def test_skill_response_cache_only_keys_exact_read_paths():
+    import sys
+    from pathlib import Path
+
+    repo_root = Path(__file__).resolve().parents[2]
+    if str(repo_root) not in sys.path:
+        sys.path.append(str(repo_root))
+    from skill.openclaw_skill import ResponseCache
+
+    cache = ResponseCache(ttl_sec=30)
+    assert cache.key("/api/v1/topics", None) is not None
+    assert cache.key("/api/v1/routes", {"task_id": "tsk_a"}) is not None
+    assert cache.key("/api/v1/routes/rte_a/graph", None) is not None
+    assert cache.key("/api/v1/routes/rte_a/nodes/rnd_a/logs", None) is None
+    assert cache.key("/api/v1/routes/rte_a/logs/stream", None) is None
+    assert cache.key("/api/v1/topics/top_a", None) is None
+
+
 def test_route_edge_logs_crud_placeholder_fails_initially():
     client = make_client()
     task_id = create_test_task(client, prefix="route_edge_log_placeholder_task")
@@ -1036,3 +1126,272 @@ def test_patch_route_edge_description():
     )
     assert not_found.status_code == 404
     assert not_found.json()["error"]["code"] == "ROUTE_EDGE_NOT_FOUND"
+
+
+def _create_route_with_node(client, prefix: str) -> tuple[str, str]:
+    task_id = create_test_task(client, prefix=f"{prefix}_task")
+    route = client.post(
+        "/api/v1/routes",
+        json={
+            "task_id": task_id,
+            "name": f"route_test_{uniq(prefix)}",
+            "goal": prefix,
+            "status": "candidate",
+        },
+    )
+    assert route.status_code == 201
+    route_id = route.json()["id"]
+    node = client.post(
+        f"/api/v1/routes/{route_id}/nodes",
+        json={"node_type": "goal", "title": f"{prefix} node", "description": ""},
+    )
+    assert node.status_code == 201
+    return route_id, node.json()["id"]
+
+
+def test_deleting_a_node_deletes_its_logs_and_migration_purges_orphans():
+    from src.db import reapply_migration
+
+    client = make_client()
+    route_id, first_id = _create_route_with_node(client, "node_delete_logs")
+    second = client.post(
+        f"/api/v1/routes/{route_id}/nodes",
+        json={"node_type": "goal", "title": "leaf", "description": ""},
+    )
+    assert second.status_code == 201
+    second_id = second.json()["id"]
+    edge = client.post(
+        f"/api/v1/routes/{route_id}/edges",
+        json={"from_node_id": first_id, "to_node_id": second_id, "relation": "handoff"},
+    )
+    assert edge.status_code == 201
+    edge_id = edge.json()["id"]
+    for path in (f"nodes/{first_id}", f"nodes/{second_id}", f"edges/{edge_id}"):
+        logged = client.post(
+            f"/api/v1/routes/{route_id}/{path}/logs",
+            json={"content": f"log on {path}", "actor_type": "human", "actor_id": "tester"},
+        )
+        assert logged.status_code == 201
+
+    engine = build_engine(database_url())
+
+    def logged_entities() -> set[str]:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT entity_id FROM entity_logs WHERE route_id = :route_id"), {"route_id": route_id}
+            )
+            return set(rows.scalars())
+
+    # The leaf's incoming edge goes with it (FK cascade), and so do both sets of logs.
+    assert client.delete(f"/api/v1/routes/{route_id}/nodes/{second_id}").status_code == 204
+    assert logged_entities() == {first_id}
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO entity_logs (id, route_id, entity_type, entity_id, actor_type, actor_id, content, log_type) "
+                "VALUES (:id, :route_id, 'route_node', 'rnd_gone', 'human', 'tester', 'orphan', 'note')"
+            ),
+            {"id": f"nlg_{uniq('orphan')[-12:]}", "route_id": route_id},
+        )
+    reapply_migration(engine, 8)
+    assert logged_entities() == {first_id}
+    engine.dispose()
+
+
+def test_change_set_node_delete_removes_logs_and_undo_restores_them():
+    client = make_client()
+    route_id, node_id = _create_route_with_node(client, "node_delete_undo")
+    logged = client.post(
+        f"/api/v1/routes/{route_id}/nodes/{node_id}/logs",
+        json={"content": "kept across undo", "actor_type": "human", "actor_id": "tester"},
+    )
+    assert logged.status_code == 201
+
+    dry = client.post(
+        "/api/v1/changes/dry-run",
+        json={
+            "actions": [{"type": "delete_route_node", "payload": {"route_id": route_id, "node_id": node_id}}],
+            "actor": {"type": "agent", "id": "openclaw"},
+            "tool": "openclaw-skill",
+        },
+    )
+    assert dry.status_code == 200
+    commit = client.post(
+        f"/api/v1/changes/{dry.json()['change_set_id']}/commit",
+        json={"approved_by": {"type": "user", "id": "usr_1"}},
+    )
+    assert commit.status_code == 200
+    engine = build_engine(database_url())
+    with engine.connect() as conn:
+        remaining = conn.execute(
+            text("SELECT COUNT(*) FROM entity_logs WHERE entity_id = :node_id"), {"node_id": node_id}
+        )
+        assert remaining.scalar_one() == 0
+    engine.dispose()
+
+    undo = client.post(
+        "/api/v1/commits/undo-last",
+        json={"requested_by": {"type": "user", "id": "usr_1"}, "reason": "restore node"},
+    )
+    assert undo.status_code == 200
+    logs = client.get(f"/api/v1/routes/{route_id}/nodes/{node_id}/logs")
+    assert logs.status_code == 200
+    assert [item["id"] for item in logs.json()["items"]] == [logged.json()["id"]]
+
+
+def test_node_logs_cursor_pagination_and_time_window():
+    client = make_client()
+    route_id, node_id = _create_route_with_node(client, "node_log_page")
+
+    created_ids = []
+    for index in range(5):
+        appended = client.post(
+            f"/api/v1/routes/{route_id}/nodes/{node_id}/logs",
+            json={"content": f"progress {index}", "actor_type": "agent", "actor_id": "openclaw"},
+        )
+        assert appended.status_code == 201
+        created_ids.append(appended.json()["id"])
+
+    full = client.get(f"/api/v1/routes/{route_id}/nodes/{node_id}/logs")
+    assert full.status_code == 200
+    assert full.json()["next_cursor"] is None
+    expected_order = [item["id"] for item in full.json()["items"]]
+    assert sorted(expected_order) == sorted(created_ids)
+
+    paged_ids = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/api/v1/routes/{route_id}/nodes/{node_id}/logs", params=params)
+        assert page.status_code == 200
+        pages += 1
+        paged_ids.extend(item["id"] for item in page.json()["items"])
+        cursor = page.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == 3
+    assert paged_ids == expected_order
+
+    future = client.get(
+        f"/api/v1/routes/{route_id}/nodes/{node_id}/logs",
+        params={"since": "2999-01-01T00:00:00Z"},
+    )
+    assert future.status_code == 200
+    assert future.json()["items"] == []
+
+    past = client.get(
+        f"/api/v1/routes/{route_id}/nodes/{node_id}/logs",
+        params={"until": "2000-01-01T00:00:00Z"},
+    )
+    assert past.status_code == 200
+    assert past.json()["items"] == []
+
+    bad_cursor = client.get(
+        f"/api/v1/routes/{route_id}/nodes/{node_id}/logs",
+        params={"limit": 2, "cursor": "nlg_missing"},
+    )
+    assert bad_cursor.status_code == 422
+    assert bad_cursor.json()["error"]["code"] == "ROUTE_LOG_CURSOR_INVALID"
+
+
+def test_route_log_stream_replays_backlog_and_resumes_from_last_event_id():
+    client = make_client()
+    route_id, node_id = _create_route_with_node(client, "route_log_stream")
+
+    first = client.post(
+        f"/api/v1/routes/{route_id}/nodes/{node_id}/logs",
+        json={"content": "stream first", "actor_type": "agent", "actor_id": "openclaw"},
+    )
+    assert first.status_code == 201
+    second = client.post(
+        f"/api/v1/routes/{route_id}/nodes/{node_id}/logs",
+        json={"content": "stream second", "actor_type": "agent", "actor_id": "openclaw"},
+    )
+    assert second.status_code == 201
+
+    streamed = client.get(
+        f"/api/v1/routes/{route_id}/logs/stream",
+        params={"timeout_seconds": 0.2, "poll_seconds": 0.05},
+    )
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("text/event-stream")
+    event_ids = [line[len("id: ") :] for line in streamed.text.splitlines() if line.startswith("id: ")]
+    assert sorted(event_ids) == sorted([first.json()["id"], second.json()["id"]])
+    assert "event: log" in streamed.text
+
+    resumed = client.get(
+        f"/api/v1/routes/{route_id}/logs/stream",
+        params={"timeout_seconds": 0.2, "poll_seconds": 0.05},
+        headers={"Last-Event-ID": event_ids[0]},
+    )
+    assert resumed.status_code == 200
+    resumed_ids = [line[len("id: ") :] for line in resumed.text.splitlines() if line.startswith("id: ")]
+    assert event_ids[0] not in resumed_ids
+    assert event_ids[1] in resumed_ids
+
+    missing = client.get("/api/v1/routes/rte_missing/logs/stream", params={"timeout_seconds": 0.1})
+    assert missing.status_code == 404
+
+
+def test_route_log_stream_wakes_on_append_without_polling():
+    import threading
+    import time
+
+    client = make_client()
+    route_id, node_id = _create_route_with_node(client, "route_log_stream_wake")
+    appended: dict = {}
+
+    def append_later():
+        time.sleep(0.3)
+        appended["resp"] = client.post(
+            f"/api/v1/routes/{route_id}/nodes/{node_id}/logs",
+            json={"content": "stream wake", "actor_type": "agent", "actor_id": "openclaw"},
+        )
+
+    writer = threading.Thread(target=append_later)
+    writer.start()
+    # poll_seconds is longer than the whole stream: only the append notification can deliver the log.
+    streamed = client.get(
+        f"/api/v1/routes/{route_id}/logs/stream",
+        params={"timeout_seconds": 1.5, "poll_seconds": 30},
+    )
+    writer.join()
+    assert streamed.status_code == 200
+    assert appended["resp"].status_code == 201
+    event_ids = [line[len("id: ") :] for line in streamed.text.splitlines() if line.startswith("id: ")]
+    assert event_ids == [appended["resp"].json()["id"]]
+
+
+def test_route_graph_and_list_support_conditional_requests():
+    client = make_client()
+    task_id = create_test_task(client, prefix="route_etag_task")
+    route = client.post(
+        "/api/v1/routes",
+        json={"task_id": task_id, "name": f"route_test_{uniq('etag')}", "goal": "etag", "status": "candidate"},
+    )
+    assert route.status_code == 201
+    route_id = route.json()["id"]
+
+    graph = client.get(f"/api/v1/routes/{route_id}/graph")
+    assert graph.status_code == 200
+    etag = graph.headers["ETag"]
+    unchanged = client.get(f"/api/v1/routes/{route_id}/graph", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+    assert unchanged.content == b""
+
+    node = client.post(f"/api/v1/routes/{route_id}/nodes", json={"node_type": "goal", "title": "Goal"})
+    assert node.status_code == 201
+    changed = client.get(f"/api/v1/routes/{route_id}/graph", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [item["id"] for item in changed.json()["nodes"]] == [node.json()["id"]]
+
+    listed = client.get(f"/api/v1/routes?task_id={task_id}")
+    assert listed.status_code == 200
+    again = client.get(f"/api/v1/routes?task_id={task_id}", headers={"If-None-Match": f'W/{listed.headers["ETag"]}'})
+    assert again.status_code == 304
@@ -1,4 +1,11 @@
-from tests.helpers import fixed_topic_id, make_client, uniq
+from datetime import timedelta
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session
+
+from src.models import TaskViewCounterState
+from src.task_views import aggregate_summary, utc_today
+from tests.helpers import database_url, fixed_topic_id, make_client, uniq
 
 
 def test_create_task_rejects_unknown_field():
@@ -148,6 +155,55 @@ def test_task_views_summary():
         assert key in body
 
 
+def test_task_views_summary_counters_follow_writes():
+    client = make_client()
+    topic_id = fixed_topic_id(client)
+    cycle = client.post(
+        "/api/v1/cycles",
+        json={"name": uniq("views"), "start_date": "2026-01-01", "end_date": "2026-12-31", "status": "active"},
+    )
+    assert cycle.status_code == 201
+    cycle_id = cycle.json()["id"]
+    today = utc_today()
+
+    def create(**fields):
+        payload = {"title": uniq("view task"), "status": "todo", "source": "test://views", "topic_id": topic_id}
+        resp = client.post("/api/v1/tasks", json={**payload, "cycle_id": cycle_id, **fields})
+        assert resp.status_code == 201
+        return resp.json()["id"]
+
+    def summary():
+        resp = client.get("/api/v1/tasks/views/summary", params={"cycle_id": cycle_id})
+        assert resp.status_code == 200
+        return resp.json()
+
+    due_today = create(due=today.isoformat())
+    overdue = create(due=(today - timedelta(days=3)).isoformat())
+    backlog = create()
+    create(due=(today + timedelta(days=30)).isoformat())
+    assert summary() == {"today": 1, "overdue": 1, "this_week": 1, "backlog": 1, "blocked": 0, "done": 0}
+
+    assert client.patch(f"/api/v1/tasks/{due_today}", json={"status": "done"}).status_code == 200
+    assert client.patch(f"/api/v1/tasks/{overdue}", json={"due": None}).status_code == 200
+    batch = client.post("/api/v1/tasks/batch-update", json={"task_ids": [backlog], "patch": {"priority": "P1"}})
+    assert batch.status_code == 200
+    assert summary() == {"today": 0, "overdue": 0, "this_week": 0, "backlog": 2, "blocked": 0, "done": 1}
+
+    assert client.post("/api/v1/tasks/archive-selected", json={"task_ids": [due_today]}).status_code == 200
+    assert client.delete(f"/api/v1/tasks/{backlog}").status_code == 204
+    assert summary() == {"today": 0, "overdue": 0, "this_week": 0, "backlog": 1, "blocked": 0, "done": 0}
+
+    with Session(create_engine(database_url(), future=True)) as db:
+        assert aggregate_summary(db, today=today, cycle_id=cycle_id) == summary()
+        assert aggregate_summary(db, today=today) == client.get("/api/v1/tasks/views/summary").json()
+
+        # A missed midnight job: the first read of the new day rebuilds the counters.
+        db.execute(update(TaskViewCounterState).values(as_of=today - timedelta(days=1)))
+        db.commit()
+        assert summary() == {"today": 0, "overdue": 0, "this_week": 0, "backlog": 1, "blocked": 0, "done": 0}
+        assert db.scalar(select(TaskViewCounterState.as_of)) == today
+
+
 def test_patch_task_can_clear_due_with_null():
     client = make_client()
     topic_id = fixed_topic_id(client)
@@ -394,3 +450,85 @@ def test_archive_selected_tasks_archives_done_and_cancelled_only():
     assert cancelled_task_id in archived_ids
     assert done_task_id in archived_ids
     assert todo_task_id not in archived_ids
+
+
+def test_list_tasks_supports_projections_and_sparse_fields():
+    client = make_client(query_debug=True)
+    topic_id = fixed_topic_id(client)
+    title = uniq("Sparse Task")
+    created = client.post(
+        "/api/v1/tasks",
+        json={
+            "title": title,
+            "description": "details " * 100,
+            "status": "todo",
+            "priority": "P1",
+            "due": "2026-03-01",
+            "source": "test://tasks",
+            "topic_id": topic_id,
+        },
+    )
+    assert created.status_code == 201
+
+    compact = client.get("/api/v1/tasks", params={"q": title, "fields": "compact"})
+    assert compact.status_code == 200
+    item = compact.json()["items"][0]
+    assert set(item) == {"id", "title", "status", "priority", "due", "topic_id", "cycle_id", "updated_at"}
+    assert item["due"] == "2026-03-01"
+    assert compact.json()["total"] == 1
+
+    picked = client.get("/api/v1/tasks", params={"q": title, "fields": "title, status"})
+    assert picked.json()["items"] == [{"id": created.json()["id"], "title": title, "status": "todo"}]
+
+    full = client.get("/api/v1/tasks", params={"q": title, "fields": "full"})
+    assert full.json()["items"][0]["description"].startswith("details")
+
+    bad = client.get("/api/v1/tasks", params={"fields": "title,nope"})
+    assert bad.status_code == 422
+    assert bad.json()["error"]["code"] == "TASK_FIELDS_INVALID"
+
+
+def test_task_facets_count_current_filters_and_cache_by_filter_hash():
+    client = make_client(query_debug=True)
+    topic_id = fixed_topic_id(client)
+    marker = uniq("Facet Task")
+    for status, priority in (("todo", "P1"), ("todo", "P2"), ("in_progress", "P1")):
+        resp = client.post(
+            "/api/v1/tasks",
+            json={
+                "title": f"{marker} {status}",
+                "status": status,
+                "priority": priority,
+                "source": "test://facets",
+                "topic_id": topic_id,
+            },
+        )
+        assert resp.status_code == 201
+
+    first = client.get("/api/v1/tasks/facets", params={"q": marker, "page_size": 2, "fields": "compact"})
+    assert first.status_code == 200
+    body = first.json()
+    assert body["total"] == 3
+    assert len(body["items"]) == 2
+    assert body["facets"]["status"] == [{"value": "todo", "count": 2}, {"value": "in_progress", "count": 1}]
+    assert body["facets"]["priority"] == [{"value": "P1", "count": 2}, {"value": "P2", "count": 1}]
+    assert body["facets"]["topic"] == [{"value": topic_id, "count": 3}]
+    assert body["facets"]["cycle"] == [{"value": None, "count": 3}]
+    assert int(first.headers["X-Query-Count"]) == 2
+
+    second = client.get("/api/v1/tasks/facets", params={"q": marker, "page": 2, "page_size": 2})
+    assert second.json()["filter_hash"] == body["filter_hash"]
+    assert second.json()["cached"] is True
+    assert second.json()["facets"] == body["facets"]
+    assert int(second.headers["X-Query-Count"]) == 1
+
+    narrowed = client.get("/api/v1/tasks/facets", params={"q": marker, "priority": "P1"})
+    assert narrowed.json()["filter_hash"] != body["filter_hash"]
+    assert narrowed.json()["facets"]["status"] == [{"value": "in_progress", "count": 1}, {"value": "todo", "count": 1}]
+
+    # A committed write invalidates cached counts.
+    task_id = second.json()["items"][0]["id"]
+    assert client.patch(f"/api/v1/tasks/{task_id}", json={"status": "done"}).status_code == 200
+    after = client.get("/api/v1/tasks/facets", params={"q": marker})
+    assert after.json()["cached"] is False
+    assert {"value": "done", "count": 1} in after.json()["facets"]["status"]
@@ -39,3 +39,16 @@ def test_create_topic_is_blocked_when_taxonomy_locked():
     )
     assert created.status_code == 403
     assert created.json()["error"]["code"] == "TOPIC_TAXONOMY_LOCKED"
+
+
+def test_list_topics_supports_etag_revalidation():
+    client = make_client()
+    listed = client.get("/api/v1/topics")
+    assert listed.status_code == 200
+    assert listed.headers["Cache-Control"] == "private, no-cache"
+
+    revalidated = client.get("/api/v1/topics", headers={"If-None-Match": listed.headers["ETag"]})
+    assert revalidated.status_code == 304
+    stale = client.get("/api/v1/topics", headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+    assert stale.json() == listed.json()
@@ -56,6 +56,7 @@ const skill = {
           updated_before: { type: "string" },
           view: { type: "string" },
           q: { type: "string" },
+          fields: { type: "string", description: "compact, full, or comma-separated field names" },
         },
       },
       handler: async (args, context) => {
@@ -286,6 +287,7 @@ const skill = {
           topic_id: { type: "string" },
           status: { type: "string" },
           unclassified: { type: "boolean" },
+          fields: { type: "string", description: "compact, full, or comma-separated field names" },
         },
       },
       handler: async (args, context) => {
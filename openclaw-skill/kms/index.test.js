@@ -195,3 +195,54 @@ test("getTaskExecutionSnapshot returns disambiguation candidates when task query
     global.fetch = oldFetch;
   }
 });
+
+test("cached reads revalidate with If-None-Match and reuse the body on 304", async () => {
+  const oldBaseUrl = process.env.KMS_BASE_URL;
+  const oldApiKey = process.env.KMS_API_KEY;
+  const oldTtl = process.env.KMS_CACHE_TTL_MS;
+  const oldFetch = global.fetch;
+
+  process.env.KMS_BASE_URL = "http://127.0.0.1:8000";
+  process.env.KMS_API_KEY = "test-key";
+  process.env.KMS_CACHE_TTL_MS = "0";
+  const seen = [];
+  global.fetch = async (url, init) => {
+    const etag = init.headers["If-None-Match"] || null;
+    seen.push({ url, etag });
+    const headers = { get: (name) => (name.toLowerCase() === "etag" ? '"v1"' : null) };
+    if (etag === '"v1"') {
+      return { ok: false, status: 304, headers, json: async () => null, text: async () => "" };
+    }
+    return { ok: true, status: 200, headers, json: async () => ({ items: [{ id: "top_a" }] }), text: async () => "" };
+  };
+
+  try {
+    const client = createKmsClient({});
+    const first = await client.listTopics();
+    const second = await client.listTopics();
+    assert.deepEqual(second, first);
+    assert.deepEqual(
+      seen.map((item) => item.etag),
+      [null, '"v1"']
+    );
+    const stats = client.cacheStats();
+    assert.equal(stats.miss, 1);
+    assert.equal(stats.revalidated, 1);
+    assert.equal(stats.last, "revalidated");
+
+    await client.listTasks({ page: 1 });
+    assert.equal(seen[seen.length - 1].etag, null, "uncacheable paths never send If-None-Match");
+    assert.equal(client.cacheStats().entries, 1);
+
+    await client.getNodeLogs("rte_a", "rnd_a");
+    await client.getNodeLogs("rte_a", "rnd_a");
+    assert.equal(seen[seen.length - 1].etag, null, "node logs under /routes/ are not cached");
+    assert.equal(client.cacheStats().entries, 1);
+  } finally {
+    process.env.KMS_BASE_URL = oldBaseUrl;
+    process.env.KMS_API_KEY = oldApiKey;
+    if (oldTtl === undefined) delete process.env.KMS_CACHE_TTL_MS;
+    else process.env.KMS_CACHE_TTL_MS = oldTtl;
+    global.fetch = oldFetch;
+  }
+});
@@ -145,11 +145,20 @@ function summarizeRouteGraph(graph) {
   };
 }
 
+// Read paths the backend answers with ETags; only these go through the response cache. Exact
+// paths only: node logs and streams under /api/v1/routes/ change without a new ETag.
+const CACHEABLE_PATH = /^\/api\/v1\/(?:topics|routes|routes\/[^/]+\/graph)$/;
+const CACHE_MAX_ENTRIES = 256;
+
 function createKmsClient(context) {
   const config = (context && context.config && context.config.kms) || {};
   const baseUrl = process.env.KMS_BASE_URL || config.baseUrl || "";
   const apiKey = process.env.KMS_API_KEY || config.apiKey || "";
   const actorId = process.env.KMS_ACTOR_ID || config.actorId || "openclaw";
+  // Milliseconds a cached topics/routes/graph response is reused without a request; after that it is
+  // revalidated with If-None-Match. Unset disables the cache.
+  const rawCacheTtl = process.env.KMS_CACHE_TTL_MS || config.cacheTtlMs;
+  const cacheTtlMs = rawCacheTtl === undefined || rawCacheTtl === "" ? null : Number(rawCacheTtl);
 
   if (!baseUrl) {
     throw new Error("KMS_BASE_URL is required");
@@ -174,7 +183,29 @@ function createKmsClient(context) {
     return raw;
   }
 
-  async function request(method, path, payload, params, retries429, retries500) {
+  const cache = new Map();
+  const cacheCounts = { hit: 0, revalidated: 0, miss: 0 };
+  let lastCacheStatus = null;
+
+  function recordCache(status) {
+    cacheCounts[status] += 1;
+    lastCacheStatus = status;
+  }
+
+  function cacheKey(path, params) {
+    if (cacheTtlMs === null || !Number.isFinite(cacheTtlMs)) return null;
+    if (!CACHEABLE_PATH.test(path)) return null;
+    const entries = Object.entries(params || {})
+      .filter(([, v]) => v !== undefined && v !== null)
+      .sort(([a], [b]) => a.localeCompare(b));
+    return `${path}?${new URLSearchParams(entries)}`;
+  }
+
+  function cacheStats() {
+    return { ...cacheCounts, entries: cache.size, last: lastCacheStatus, ttl_ms: cacheTtlMs };
+  }
+
+  async function request(method, path, payload, params, retries429, retries500, cached) {
     const retry429 = Number.isFinite(retries429) ? retries429 : 3;
     const retry500 = Number.isFinite(retries500) ? retries500 : 2;
     const maxAttempts = Math.max(retry429, retry500) + 1;
@@ -185,12 +216,18 @@ function createKmsClient(context) {
     let lastErr;
     for (let attempt = 0; attempt < maxAttempts; attempt += 1) {
       try {
+        const etag = cached && cached.etag;
         const response = await fetch(`${base}${path}${query}`, {
           method,
-          headers,
+          headers: etag ? { ...headers, "If-None-Match": etag } : headers,
           body: payload ? JSON.stringify(payload) : undefined,
         });
 
+        if (response.status === 304 && cached) {
+          cached.notModified = true;
+          return cached.body;
+        }
+
         if (response.status === 429 || response.status === 500) {
           const limit = response.status === 429 ? retry429 : retry500;
           if (attempt < limit) {
@@ -214,7 +251,15 @@ function createKmsClient(context) {
           throw new Error(`${response.status}: ${text}`);
         }
 
-        return response.json();
+        const body = await response.json();
+        if (cached) {
+          cached.etag = (response.headers && response.headers.get && response.headers.get("etag")) || null;
+          cached.body = body;
+        } else if (method !== "GET") {
+          // A write may have changed anything cached; revalidate entries before reusing them.
+          for (const entry of cache.values()) entry.storedAt = -Infinity;
+        }
+        return body;
       } catch (error) {
         lastErr = error;
       }
@@ -224,7 +269,20 @@ function createKmsClient(context) {
   }
 
   async function get(path, params) {
-    return request("GET", path, null, params, 0, 0);
+    const key = cacheKey(path, params);
+    if (key === null) return request("GET", path, null, params, 0, 0);
+    const entry = cache.get(key);
+    if (entry && Date.now() - entry.storedAt < cacheTtlMs) {
+      recordCache("hit");
+      return entry.body;
+    }
+    const pending = { etag: entry ? entry.etag : null, body: entry ? entry.body : undefined, notModified: false };
+    const body = await request("GET", path, null, params, 0, 0, pending);
+    recordCache(pending.notModified ? "revalidated" : "miss");
+    cache.delete(key);
+    if (cache.size >= CACHE_MAX_ENTRIES) cache.delete(cache.keys().next().value);
+    cache.set(key, { etag: pending.etag, body, storedAt: Date.now() });
+    return body;
   }
 
   async function post(path, payload, retries429, retries500) {
@@ -925,6 +983,7 @@ function createKmsClient(context) {
 
   return {
     actorId,
+    cacheStats,
     apiGet,
     listTasks,
     listRoutes,
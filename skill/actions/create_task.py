@@ -4,10 +4,10 @@ from openclaw_skill import KmsClient
 
 
 def run(base_url: str, api_key: str, title: str, source: str):
-    client = KmsClient(base_url=base_url, api_key=api_key)
-    return client.propose_record_todo(
-        title=title,
-        source=source,
-        priority="P2",
-        actor={"type": "agent", "id": "openclaw"},
-    )
+    with KmsClient(base_url=base_url, api_key=api_key) as client:
+        return client.propose_record_todo(
+            title=title,
+            source=source,
+            priority="P2",
+            actor={"type": "agent", "id": "openclaw"},
+        )
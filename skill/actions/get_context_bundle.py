@@ -13,12 +13,12 @@ def run(
     include_done: bool = False,
     topic_id: Optional[list[str]] = None,
 ):
-    client = KmsClient(base_url=base_url, api_key=api_key)
-    params: dict[str, object] = {
-        "intent": intent,
-        "window_days": window_days,
-        "include_done": include_done,
-    }
-    if topic_id:
-        params["topic_id"] = topic_id
-    return client.get_context_bundle(**params)
+    with KmsClient(base_url=base_url, api_key=api_key) as client:
+        params: dict[str, object] = {
+            "intent": intent,
+            "window_days": window_days,
+            "include_done": include_done,
+        }
+        if topic_id:
+            params["topic_id"] = topic_id
+        return client.get_context_bundle(**params)
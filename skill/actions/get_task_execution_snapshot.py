@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from openclaw_skill import KmsClient
+import asyncio
+
+from openclaw_skill import AsyncKmsClient, KmsClient
+
+
+async def _run_concurrent(base_url: str, api_key: str, **params):
+    async with AsyncKmsClient(base_url=base_url, api_key=api_key) as client:
+        return await client.get_task_execution_snapshot(**params)
 
 
 def run(
@@ -10,11 +17,16 @@ def run(
     include_all_routes: bool = True,
     include_logs: bool = False,
     page_size: int = 100,
+    concurrent: bool = False,
 ):
-    client = KmsClient(base_url=base_url, api_key=api_key)
-    return client.get_task_execution_snapshot(
-        task_id=task_id,
-        include_all_routes=include_all_routes,
-        include_logs=include_logs,
-        page_size=page_size,
-    )
+    params = {
+        "task_id": task_id,
+        "include_all_routes": include_all_routes,
+        "include_logs": include_logs,
+        "page_size": page_size,
+    }
+    if concurrent:
+        # Fetches route graphs and node logs in parallel; not callable from inside a running event loop.
+        return asyncio.run(_run_concurrent(base_url, api_key, **params))
+    with KmsClient(base_url=base_url, api_key=api_key) as client:
+        return client.get_task_execution_snapshot(**params)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Any
+
+from openclaw_skill import KmsClient
+
+HANDLERS = {"record_todo", "append_journal", "upsert_knowledge"}
+
+
+def run(base_url: str, api_key: str, intents: list[dict[str, Any]]):
+    # intents: [{"kind": "record_todo", "title": ..., "source": ...}, ...] -> one change set.
+    with KmsClient(base_url=base_url, api_key=api_key) as client:
+        with client.batch(actor={"type": "agent", "id": "openclaw"}) as proposals:
+            for intent in intents:
+                fields = dict(intent)
+                kind = fields.pop("kind")
+                if kind not in HANDLERS:
+                    raise ValueError(f"unsupported intent kind: {kind}")
+                getattr(proposals, kind)(**fields)
+        return proposals.result
@@ -13,11 +13,11 @@ def run(
     source: str,
     topic_id: Optional[str] = None,
 ):
-    client = KmsClient(base_url=base_url, api_key=api_key)
-    return client.propose_upsert_knowledge(
-        title=title,
-        body_increment=body_increment,
-        source=source,
-        topic_id=topic_id,
-        actor={"type": "agent", "id": "openclaw"},
-    )
+    with KmsClient(base_url=base_url, api_key=api_key) as client:
+        return client.propose_upsert_knowledge(
+            title=title,
+            body_increment=body_increment,
+            source=source,
+            topic_id=topic_id,
+            actor={"type": "agent", "id": "openclaw"},
+        )
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from openclaw_skill import AsyncKmsClient, KmsClient
+
+# Stand-in for the KMS API: only the endpoints get_task_execution_snapshot reads, each
+# answering after a fixed delay, served by a separate uvicorn process on a random local port.
+# Needs uvicorn and starlette (both in backend/requirements.txt) besides the skill's httpx.
+
+SKILL_DIR = Path(__file__).resolve().parent
+
+
+class LegacyKmsClient(KmsClient):
+    # The pre-pooling client: a fresh connection for every request.
+    def _get(self, path: str, params: Optional[dict[str, Any]] = None):
+        resp = httpx.get(
+            f"{self.base_url}{path}",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            params=params or {},
+            timeout=self.timeout_sec,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+
+def _stand_in_app(routes: int, nodes: int, latency_s: float):
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    def node(route_id: str, index: int) -> dict:
+        return {
+            "id": f"{route_id}_n{index}",
+            "title": f"node {index}",
+            "node_type": "start" if index == 0 else "goal" if index == nodes - 1 else "idea",
+            "status": "done" if index == 0 else "waiting",
+            "order_hint": index,
+        }
+
+    async def list_routes(request):
+        await asyncio.sleep(latency_s)
+        items = [{"id": f"rte_{i}", "status": "active" if i == 0 else "candidate"} for i in range(routes)]
+        return JSONResponse({"items": items, "page": 1, "page_size": 100, "total": routes})
+
+    async def graph(request):
+        await asyncio.sleep(latency_s)
+        route_id = request.path_params["route_id"]
+        graph_nodes = [node(route_id, i) for i in range(nodes)]
+        edges = [
+            {"id": f"{route_id}_e{i}", "from_node_id": graph_nodes[i]["id"], "to_node_id": graph_nodes[i + 1]["id"]}
+            for i in range(nodes - 1)
+        ]
+        return JSONResponse({"route_id": route_id, "nodes": graph_nodes, "edges": edges})
+
+    async def logs(request):
+        await asyncio.sleep(latency_s)
+        return JSONResponse({"items": [{"id": "log_1", "content": "x" * 200}], "next_cursor": None})
+
+    return Starlette(
+        routes=[
+            Route("/api/v1/routes", list_routes),
+            Route("/api/v1/routes/{route_id}/graph", graph),
+            Route("/api/v1/routes/{route_id}/nodes/{node_id}/logs", logs),
+        ]
+    )
+
+
+def stand_in_from_env():
+    # uvicorn --factory entry point for the server subprocess.
+    return _stand_in_app(
+        int(os.environ["BENCH_ROUTES"]), int(os.environ["BENCH_NODES"]), float(os.environ["BENCH_LATENCY_S"])
+    )
+
+
+def _serve(routes: int, nodes: int, latency_s: float) -> tuple[str, subprocess.Popen]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = dict(os.environ, BENCH_ROUTES=str(routes), BENCH_NODES=str(nodes), BENCH_LATENCY_S=str(latency_s))
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "bench_snapshot:stand_in_from_env", "--factory",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=SKILL_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/api/v1/routes", timeout=1.0)
+            return base_url, server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("stand-in server did not start")
+
+
+def _time_sync(client: KmsClient, rounds: int, params: dict) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        client.get_task_execution_snapshot(**params)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def _time_async(client: AsyncKmsClient, rounds: int, params: dict) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await client.get_task_execution_snapshot(**params)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare get_task_execution_snapshot wall time across clients.")
+    parser.add_argument("--routes", type=int, default=4)
+    parser.add_argument("--nodes", type=int, default=6, help="nodes per route graph")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="stand-in delay per request")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8, help="AsyncKmsClient max_concurrency")
+    parser.add_argument("--no-logs", action="store_true", help="skip node log fetches")
+    args = parser.parse_args()
+
+    base_url, server = _serve(args.routes, args.nodes, args.latency_ms / 1000)
+    params = {"task_id": "tsk_bench", "include_all_routes": True, "include_logs": not args.no_logs}
+    requests_per_snapshot = 1 + args.routes * (1 + (0 if args.no_logs else args.nodes))
+    results = {}
+    try:
+        with LegacyKmsClient(base_url=base_url, api_key="bench") as legacy:
+            results["legacy"] = _time_sync(legacy, args.rounds, params)
+        with KmsClient(base_url=base_url, api_key="bench") as pooled:
+            results["pooled"] = _time_sync(pooled, args.rounds, params)
+
+        async def run_async() -> list[float]:
+            async with AsyncKmsClient(base_url=base_url, api_key="bench", max_concurrency=args.concurrency) as client:
+                return await _time_async(client, args.rounds, params)
+
+        results["async"] = asyncio.run(run_async())
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    report = {
+        "requests_per_snapshot": requests_per_snapshot,
+        "latency_ms": args.latency_ms,
+        "snapshot_ms": {
+            name: {"p50": round(statistics.median(samples), 2), "max": round(max(samples), 2)}
+            for name, samples in results.items()
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
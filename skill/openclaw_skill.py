@@ -1,36 +1,304 @@
 from __future__ import annotations
 
+import asyncio
 import re
 import time
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 import httpx
 
 
+def _headers(api_key: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+
+
+def _limits(max_connections: int) -> httpx.Limits:
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+
+
+def _log_items(logs: Any) -> list[dict[str, Any]]:
+    if not isinstance(logs, dict):
+        return []
+    items = logs.get("items")
+    if not isinstance(items, list):
+        return []
+    return items
+
+
+# Read paths that are safe to serve from the client cache; the backend answers these with ETags.
+# Exact paths only: node logs and streams under /api/v1/routes/ change without a new ETag.
+CACHEABLE_PATHS = re.compile(r"/api/v1/topics|/api/v1/routes|/api/v1/routes/[^/]+/graph")
+
+
 @dataclass
-class KmsClient:
-    base_url: str
-    api_key: str
-    timeout_sec: float = 15.0
+class _CacheEntry:
+    body: Any
+    etag: Optional[str]
+    stored_at: float
+    stale: bool = False
+
+
+class ResponseCache:
+    # TTL + ETag cache for GETs. Within `ttl_sec` an entry is served without a request; after that
+    # (or after this client wrote anything) it is revalidated with If-None-Match, and a 304 keeps it.
+    def __init__(self, ttl_sec: float, paths: re.Pattern = CACHEABLE_PATHS, max_entries: int = 256):
+        self.ttl_sec = ttl_sec
+        self.paths = paths
+        self.max_entries = max_entries
+        self.last_status: Optional[str] = None
+        self._entries: dict[tuple, _CacheEntry] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def key(self, path: str, params: Optional[dict[str, Any]]) -> Optional[tuple]:
+        if not self.paths.fullmatch(path):
+            return None
+        items = []
+        for name, value in sorted((params or {}).items()):
+            if value is not None:
+                items.append((name, tuple(value) if isinstance(value, list) else value))
+        return (path, tuple(items))
+
+    def fresh(self, key: tuple) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and not entry.stale and time.monotonic() - entry.stored_at < self.ttl_sec:
+            return entry
+        return None
 
-    def _headers(self) -> dict[str, str]:
+    def conditional_headers(self, key: tuple) -> dict[str, str]:
+        entry = self._entries.get(key)
+        return {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+
+    def revalidated(self, key: tuple) -> Any:
+        entry = self._entries[key]
+        entry.stored_at = time.monotonic()
+        entry.stale = False
+        return entry.body
+
+    def store(self, key: tuple, body: Any, etag: Optional[str]) -> None:
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = _CacheEntry(body=body, etag=etag, stored_at=time.monotonic())
+
+    def mark_stale(self) -> None:
+        for entry in self._entries.values():
+            entry.stale = True
+
+    def record(self, key: tuple, status: str) -> None:
+        self.last_status = status
+        counts = self._stats.setdefault(key[0], {"hit": 0, "revalidated": 0, "miss": 0})
+        counts[status] += 1
+
+    def stats(self) -> dict[str, Any]:
+        totals = {"hit": 0, "revalidated": 0, "miss": 0}
+        for counts in self._stats.values():
+            for status, count in counts.items():
+                totals[status] += count
         return {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
+            **totals,
+            "entries": len(self._entries),
+            "last": self.last_status,
+            "by_path": {path: dict(counts) for path, counts in self._stats.items()},
         }
 
-    def _post(self, path: str, payload: dict[str, Any], retries_429: int = 3, retries_500: int = 2):
+
+class _RouteSnapshotMixin:
+    def _select_route(self, routes: list[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        active_route = next((route for route in routes if route.get("status") == "active"), None)
+        return active_route or (routes[0] if routes else None)
+
+    def _snapshot_route_ids(
+        self, routes: list[dict[str, Any]], selected_route: dict[str, Any], include_all_routes: bool
+    ) -> list[str]:
+        route_ids = [selected_route["id"]]
+        if include_all_routes and len(routes) > 1:
+            route_ids += [
+                route["id"] for route in routes if route.get("id") and route.get("id") != selected_route.get("id")
+            ]
+        return route_ids
+
+    def _empty_snapshot(self, task_id: str) -> dict[str, Any]:
+        return {
+            "task_id": task_id,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "routes": [],
+            "selected_route_id": None,
+            "selected_route": None,
+            "selected_route_graph": None,
+            "selected_route_state": None,
+            "route_snapshots": [],
+        }
+
+    def _build_snapshot(
+        self,
+        *,
+        task_id: str,
+        routes: list[dict[str, Any]],
+        selected_route: dict[str, Any],
+        graphs: dict[str, dict[str, Any]],
+        node_logs: Optional[dict[str, dict[str, list[dict[str, Any]]]]],
+    ) -> dict[str, Any]:
+        route_by_id = {route.get("id"): route for route in routes}
+        route_snapshots: list[dict[str, Any]] = []
+        for route_id, graph in graphs.items():
+            snapshot: dict[str, Any] = {
+                "route": route_by_id[route_id],
+                "graph": graph,
+                "state": self._summarize_route_graph(graph),
+            }
+            if node_logs is not None:
+                snapshot["node_logs"] = node_logs.get(route_id, {})
+            route_snapshots.append(snapshot)
+        selected = route_snapshots[0]
+        return {
+            "task_id": task_id,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "routes": routes,
+            "selected_route_id": selected_route.get("id"),
+            "selected_route": selected_route,
+            "selected_route_graph": selected["graph"],
+            "selected_route_state": selected["state"],
+            "route_snapshots": route_snapshots,
+        }
+
+    def _normalize_node_status(self, status: Optional[str]) -> str:
+        if status == "todo":
+            return "waiting"
+        if status == "in_progress":
+            return "execute"
+        if status == "cancelled":
+            return "removed"
+        return status or "waiting"
+
+    def _compact_node(self, node: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        if not node:
+            return None
+        return {
+            "id": node.get("id"),
+            "title": node.get("title"),
+            "node_type": node.get("node_type"),
+            "status": node.get("status"),
+            "normalized_status": self._normalize_node_status(node.get("status")),
+            "order_hint": node.get("order_hint"),
+            "assignee_type": node.get("assignee_type"),
+            "assignee_id": node.get("assignee_id"),
+        }
+
+    def _summarize_route_graph(self, graph: dict[str, Any]) -> dict[str, Any]:
+        nodes = sorted(
+            graph.get("nodes", []),
+            key=lambda node: (
+                int(node.get("order_hint") or 0),
+                str(node.get("created_at") or ""),
+                str(node.get("id") or ""),
+            ),
+        )
+        edges = graph.get("edges", [])
+        node_by_id = {str(node.get("id")): node for node in nodes if node.get("id")}
+
+        focus_nodes = [node for node in nodes if node.get("node_type") in {"start", "goal"}] or nodes
+        executing_node = next(
+            (node for node in focus_nodes if self._normalize_node_status(node.get("status")) == "execute"),
+            None,
+        )
+        done_nodes = [node for node in focus_nodes if self._normalize_node_status(node.get("status")) == "done"]
+        last_done_node = done_nodes[-1] if done_nodes else None
+        fallback_node = next((node for node in focus_nodes if node.get("node_type") != "start"), None)
+        if fallback_node is None and focus_nodes:
+            fallback_node = focus_nodes[0]
+        current_node = executing_node or last_done_node or fallback_node
+
+        previous_nodes: list[dict[str, Any]] = []
+        if current_node and current_node.get("id"):
+            for edge in edges:
+                if edge.get("to_node_id") != current_node["id"]:
+                    continue
+                from_node = node_by_id.get(str(edge.get("from_node_id")))
+                if from_node:
+                    previous_nodes.append(from_node)
+
+        return {
+            "node_count": len(nodes),
+            "edge_count": len(edges),
+            "current_node": self._compact_node(current_node),
+            "previous_nodes": [self._compact_node(node) for node in previous_nodes if node],
+            "executing_nodes": [
+                self._compact_node(node)
+                for node in nodes
+                if self._normalize_node_status(node.get("status")) == "execute"
+            ],
+            "done_nodes": [
+                self._compact_node(node)
+                for node in nodes
+                if self._normalize_node_status(node.get("status")) == "done"
+            ],
+            "waiting_nodes": [
+                self._compact_node(node)
+                for node in nodes
+                if self._normalize_node_status(node.get("status")) == "waiting"
+            ],
+        }
+
+
+@dataclass
+class KmsClient(_RouteSnapshotMixin):
+    base_url: str
+    api_key: str
+    timeout_sec: float = 15.0
+    # One keep-alive pool per client; http2=True needs `httpx[http2]` (the h2 package).
+    http2: bool = False
+    max_connections: int = 10
+    # Seconds a cached topics/routes/graph response is served without asking the backend;
+    # None disables the cache.
+    cache_ttl_sec: Optional[float] = None
+    _client: Optional[httpx.Client] = field(default=None, init=False, repr=False)
+    _cache: Optional[ResponseCache] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.cache_ttl_sec is not None:
+            self._cache = ResponseCache(self.cache_ttl_sec)
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                base_url=self.base_url,
+                headers=_headers(self.api_key),
+                timeout=self.timeout_sec,
+                http2=self.http2,
+                limits=_limits(self.max_connections),
+            )
+        return self._client
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self) -> "KmsClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _post(
+        self,
+        path: str,
+        payload: dict[str, Any],
+        retries_429: int = 3,
+        retries_500: int = 2,
+        *,
+        invalidates_cache: bool = True,
+    ):
         last_err: Optional[Exception] = None
         for attempt in range(max(retries_429, retries_500) + 1):
             try:
-                resp = httpx.post(
-                    f"{self.base_url}{path}",
-                    headers=self._headers(),
-                    json=payload,
-                    timeout=self.timeout_sec,
-                )
+                resp = self.client.post(path, json=payload)
                 if resp.status_code in (429, 500):
                     limit = retries_429 if resp.status_code == 429 else retries_500
                     if attempt < limit:
@@ -42,17 +310,37 @@ class KmsClient:
                     time.sleep(0.1)
                     continue
                 resp.raise_for_status()
+                if self._cache is not None and invalidates_cache:
+                    # Our own write may have changed a cached read; revalidate before reuse.
+                    self._cache.mark_stale()
                 return resp.json()
             except Exception as exc:  # pragma: no cover - thin wrapper
                 last_err = exc
         raise RuntimeError(f"request failed after retries: {last_err}")
 
     def _get(self, path: str, params: Optional[dict[str, Any]] = None):
-        resp = httpx.get(
-            f"{self.base_url}{path}", headers=self._headers(), params=params or {}, timeout=self.timeout_sec
-        )
+        cache = self._cache
+        key = cache.key(path, params) if cache is not None else None
+        if key is None:
+            resp = self.client.get(path, params=params or {})
+            resp.raise_for_status()
+            return resp.json()
+        entry = cache.fresh(key)
+        if entry is not None:
+            cache.record(key, "hit")
+            return entry.body
+        resp = self.client.get(path, params=params or {}, headers=cache.conditional_headers(key))
+        if resp.status_code == 304:
+            cache.record(key, "revalidated")
+            return cache.revalidated(key)
         resp.raise_for_status()
-        return resp.json()
+        body = resp.json()
+        cache.store(key, body, resp.headers.get("ETag"))
+        cache.record(key, "miss")
+        return body
+
+    def cache_stats(self) -> Optional[dict[str, Any]]:
+        return self._cache.stats() if self._cache is not None else None
 
     def capture_inbox(self, text: str, source: str):
         return self._post("/api/v1/inbox/captures", {"content": text, "source": source})
@@ -111,20 +399,20 @@ class KmsClient:
     def get_route_graph(self, route_id: str):
         return self._get(f"/api/v1/routes/{route_id}/graph")
 
-    def get_node_logs(self, route_id: str, node_id: str):
-        return self._get(f"/api/v1/routes/{route_id}/nodes/{node_id}/logs")
+    def get_node_logs(self, route_id: str, node_id: str, **params):
+        return self._get(f"/api/v1/routes/{route_id}/nodes/{node_id}/logs", params=params)
 
-    def _safe_get_node_logs(self, route_id: str, node_id: str) -> list[dict[str, Any]]:
+    def _safe_get_node_logs(
+        self, route_id: str, node_id: str, limit: Optional[int] = None
+    ) -> list[dict[str, Any]]:
         try:
-            logs = self.get_node_logs(route_id, node_id)
+            if limit is None:
+                logs = self.get_node_logs(route_id, node_id)
+            else:
+                logs = self.get_node_logs(route_id, node_id, limit=limit)
         except Exception:
             return []
-        if not isinstance(logs, dict):
-            return []
-        items = logs.get("items")
-        if not isinstance(items, list):
-            return []
-        return items
+        return _log_items(logs)
 
     def get_task_execution_snapshot(
         self,
@@ -132,78 +420,28 @@ class KmsClient:
         task_id: str,
         include_all_routes: bool = True,
         include_logs: bool = False,
+        logs_per_node: Optional[int] = None,
         page_size: int = 100,
     ):
         routes_payload = self.list_routes(task_id=task_id, page=1, page_size=page_size)
         routes = routes_payload.get("items") or []
-        active_route = next((route for route in routes if route.get("status") == "active"), None)
-        selected_route = active_route or (routes[0] if routes else None)
-
+        selected_route = self._select_route(routes)
         if not selected_route:
-            return {
-                "task_id": task_id,
-                "fetched_at": datetime.now(timezone.utc).isoformat(),
-                "routes": [],
-                "selected_route_id": None,
-                "selected_route": None,
-                "selected_route_graph": None,
-                "selected_route_state": None,
-                "route_snapshots": [],
-            }
-
-        selected_graph = self.get_route_graph(selected_route["id"])
-        selected_state = self._summarize_route_graph(selected_graph)
-
-        selected_logs: Optional[dict[str, list[dict[str, Any]]]] = None
-        if include_logs:
-            selected_logs = {}
-            for node in selected_graph.get("nodes", []):
-                node_id = node.get("id")
-                if not node_id:
-                    continue
-                selected_logs[node_id] = self._safe_get_node_logs(selected_route["id"], node_id)
-
-        route_snapshots: list[dict[str, Any]] = [
-            {
-                "route": selected_route,
-                "graph": selected_graph,
-                "state": selected_state,
-            }
-        ]
-        if selected_logs is not None:
-            route_snapshots[0]["node_logs"] = selected_logs
-
-        if include_all_routes and len(routes) > 1:
-            for route in routes:
-                route_id = route.get("id")
-                if not route_id or route_id == selected_route.get("id"):
-                    continue
-                graph = self.get_route_graph(route_id)
-                snapshot: dict[str, Any] = {
-                    "route": route,
-                    "graph": graph,
-                    "state": self._summarize_route_graph(graph),
+            return self._empty_snapshot(task_id)
+
+        graphs: dict[str, dict[str, Any]] = {}
+        node_logs: Optional[dict[str, dict[str, list[dict[str, Any]]]]] = {} if include_logs else None
+        for route_id in self._snapshot_route_ids(routes, selected_route, include_all_routes):
+            graphs[route_id] = self.get_route_graph(route_id)
+            if node_logs is not None:
+                node_logs[route_id] = {
+                    node["id"]: self._safe_get_node_logs(route_id, node["id"], logs_per_node)
+                    for node in graphs[route_id].get("nodes", [])
+                    if node.get("id")
                 }
-                if include_logs:
-                    node_logs: dict[str, list[dict[str, Any]]] = {}
-                    for node in graph.get("nodes", []):
-                        node_id = node.get("id")
-                        if not node_id:
-                            continue
-                        node_logs[node_id] = self._safe_get_node_logs(route_id, node_id)
-                    snapshot["node_logs"] = node_logs
-                route_snapshots.append(snapshot)
-
-        return {
-            "task_id": task_id,
-            "fetched_at": datetime.now(timezone.utc).isoformat(),
-            "routes": routes,
-            "selected_route_id": selected_route.get("id"),
-            "selected_route": selected_route,
-            "selected_route_graph": selected_graph,
-            "selected_route_state": selected_state,
-            "route_snapshots": route_snapshots,
-        }
+        return self._build_snapshot(
+            task_id=task_id, routes=routes, selected_route=selected_route, graphs=graphs, node_logs=node_logs
+        )
 
     def propose_record_todo(
         self,
@@ -217,35 +455,15 @@ class KmsClient:
         topic_id: Optional[str] = None,
         tool: str = "openclaw-skill",
     ):
-        payload: dict[str, Any] = {
-            "title": title,
-            "description": description,
-            "status": "todo",
-            "source": source,
-        }
-        if priority:
-            payload["priority"] = priority
-        if due:
-            payload["due"] = due
-        if topic_id:
-            payload["topic_id"] = topic_id
-        else:
-            payload["topic_id"] = self._default_topic_id()
-
-        existing = self._find_active_task_by_title(title)
-        if existing:
-            action = {
-                "type": "update_task",
-                "payload": {
-                    "task_id": existing["id"],
-                    "description": description or existing.get("description", ""),
-                    "priority": priority or existing.get("priority"),
-                    "due": due or existing.get("due"),
-                    "source": source,
-                },
-            }
-        else:
-            action = {"type": "create_task", "payload": payload}
+        action = self._todo_action(
+            self._find_active_task_by_title(title),
+            title=title,
+            source=source,
+            description=description,
+            priority=priority,
+            due=due,
+            topic_id=topic_id,
+        )
         return self.propose_changes(actions=[action], actor=actor, tool=tool)
 
     def propose_append_journal(
@@ -257,10 +475,7 @@ class KmsClient:
         actor: dict[str, str],
         tool: str = "openclaw-skill",
     ):
-        action = {
-            "type": "upsert_journal_append",
-            "payload": {"journal_date": journal_date, "append_text": append_text, "source": source},
-        }
+        action = self._journal_action(journal_date=journal_date, append_text=append_text, source=source)
         return self.propose_changes(actions=[action], actor=actor, tool=tool)
 
     def propose_upsert_knowledge(
@@ -274,7 +489,83 @@ class KmsClient:
         tags: Optional[list[str]] = None,
         tool: str = "openclaw-skill",
     ):
-        existing = self._find_active_note_by_title(title)
+        action = self._knowledge_action(
+            self._find_active_note_by_title(title),
+            title=title,
+            body_increment=body_increment,
+            source=source,
+            topic_id=topic_id,
+            tags=tags,
+        )
+        return self.propose_changes(actions=[action], actor=actor, tool=tool)
+
+    @contextmanager
+    def batch(self, *, actor: dict[str, str], tool: str = "openclaw-skill") -> Iterator["ProposalBatch"]:
+        # Buffers record_todo/append_journal/upsert_knowledge intents and, on a clean exit, submits
+        # them as one change set after a single dedupe lookup. Nothing is sent if the block raises.
+        proposals = ProposalBatch(self, actor=actor, tool=tool)
+        yield proposals
+        proposals.submit()
+
+    def dedupe_lookup(self, *, task_titles: list[str], note_titles: list[str]):
+        # A read over POST: it changes nothing, so the response cache stays valid.
+        return self._post(
+            "/api/v1/changes/dedupe-lookup",
+            {"task_titles": task_titles, "note_titles": note_titles},
+            invalidates_cache=False,
+        )
+
+    def _todo_action(
+        self,
+        existing: Optional[dict[str, Any]],
+        *,
+        title: str,
+        source: str,
+        description: str = "",
+        priority: Optional[str] = None,
+        due: Optional[str] = None,
+        topic_id: Optional[str] = None,
+    ) -> dict[str, Any]:
+        if existing:
+            return {
+                "type": "update_task",
+                "payload": {
+                    "task_id": existing["id"],
+                    "description": description or existing.get("description", ""),
+                    "priority": priority or existing.get("priority"),
+                    "due": due or existing.get("due"),
+                    "source": source,
+                },
+            }
+        payload: dict[str, Any] = {
+            "title": title,
+            "description": description,
+            "status": "todo",
+            "source": source,
+        }
+        if priority:
+            payload["priority"] = priority
+        if due:
+            payload["due"] = due
+        payload["topic_id"] = topic_id or self._default_topic_id()
+        return {"type": "create_task", "payload": payload}
+
+    def _journal_action(self, *, journal_date: str, append_text: str, source: str) -> dict[str, Any]:
+        return {
+            "type": "upsert_journal_append",
+            "payload": {"journal_date": journal_date, "append_text": append_text, "source": source},
+        }
+
+    def _knowledge_action(
+        self,
+        existing: Optional[dict[str, Any]],
+        *,
+        title: str,
+        body_increment: str,
+        source: str,
+        topic_id: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
         if existing:
             action = {
                 "type": "patch_note",
@@ -288,18 +579,16 @@ class KmsClient:
                 action["payload"]["topic_id"] = topic_id
             if tags is not None:
                 action["payload"]["tags"] = tags
-        else:
-            note_payload: dict[str, Any] = {
-                "title": title,
-                "body": body_increment,
-                "sources": [{"type": "text", "value": source}],
-                "tags": tags or [],
-            }
-            if topic_id:
-                note_payload["topic_id"] = topic_id
-            action = {"type": "append_note", "payload": note_payload}
-
-        return self.propose_changes(actions=[action], actor=actor, tool=tool)
+            return action
+        note_payload: dict[str, Any] = {
+            "title": title,
+            "body": body_increment,
+            "sources": [{"type": "text", "value": source}],
+            "tags": tags or [],
+        }
+        if topic_id:
+            note_payload["topic_id"] = topic_id
+        return {"type": "append_note", "payload": note_payload}
 
     def _default_topic_id(self) -> str:
         topics = self.list_topics()
@@ -332,80 +621,194 @@ class KmsClient:
         lowered = re.sub(r"[^0-9a-zA-Z\\u4e00-\\u9fff]+", " ", lowered)
         return re.sub(r"\\s+", " ", lowered).strip()
 
-    def _normalize_node_status(self, status: Optional[str]) -> str:
-        if status == "todo":
-            return "waiting"
-        if status == "in_progress":
-            return "execute"
-        if status == "cancelled":
-            return "removed"
-        return status or "waiting"
 
-    def _compact_node(self, node: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
-        if not node:
+class ProposalBatch:
+    def __init__(self, client: KmsClient, *, actor: dict[str, str], tool: str):
+        self.client = client
+        self.actor = actor
+        self.tool = tool
+        self.result: Optional[dict[str, Any]] = None
+        self._intents: list[tuple[str, dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self._intents)
+
+    def record_todo(self, *, title: str, source: str, **fields) -> None:
+        self._intents.append(("todo", {"title": title, "source": source, **fields}))
+
+    def append_journal(self, *, journal_date: str, append_text: str, source: str) -> None:
+        self._intents.append(("journal", {"journal_date": journal_date, "append_text": append_text, "source": source}))
+
+    def upsert_knowledge(self, *, title: str, body_increment: str, source: str, **fields) -> None:
+        self._intents.append(("knowledge", {"title": title, "body_increment": body_increment, "source": source, **fields}))
+
+    def actions(self) -> list[dict[str, Any]]:
+        client = self.client
+        task_titles = list(dict.fromkeys(fields["title"] for kind, fields in self._intents if kind == "todo"))
+        note_titles = list(dict.fromkeys(fields["title"] for kind, fields in self._intents if kind == "knowledge"))
+        found: dict[str, Any] = {"tasks": {}, "notes": {}}
+        if task_titles or note_titles:
+            found = client.dedupe_lookup(task_titles=task_titles, note_titles=note_titles)
+
+        default_topic: list[str] = []
+
+        def topic_for(fields: dict[str, Any]) -> str:
+            if fields.get("topic_id"):
+                return fields["topic_id"]
+            if not default_topic:
+                default_topic.append(client._default_topic_id())
+            return default_topic[0]
+
+        actions: list[dict[str, Any]] = []
+        # A title repeated inside the batch folds into the first action for it, since a task or
+        # note created by this change set has no id to patch yet.
+        created: dict[tuple[str, str], dict[str, Any]] = {}
+        for kind, fields in self._intents:
+            if kind == "journal":
+                actions.append(client._journal_action(**fields))
+                continue
+            key = (kind, client._norm_title(fields["title"]))
+            if kind == "todo":
+                existing = found["tasks"].get(fields["title"])
+                if existing is None and key in created:
+                    payload = created[key]["payload"]
+                    for name in ("description", "priority", "due"):
+                        if fields.get(name):
+                            payload[name] = fields[name]
+                    continue
+                action = client._todo_action(
+                    existing, **{**fields, "topic_id": topic_for(fields) if existing is None else None}
+                )
+            else:
+                existing = found["notes"].get(fields["title"])
+                if existing is None and key in created:
+                    payload = created[key]["payload"]
+                    payload["body"] = f"{payload['body']}\n\n{fields['body_increment']}"
+                    continue
+                action = client._knowledge_action(existing, **fields)
+            if existing is None:
+                created[key] = action
+            actions.append(action)
+        return actions
+
+    def submit(self) -> Optional[dict[str, Any]]:
+        if not self._intents:
             return None
-        return {
-            "id": node.get("id"),
-            "title": node.get("title"),
-            "node_type": node.get("node_type"),
-            "status": node.get("status"),
-            "normalized_status": self._normalize_node_status(node.get("status")),
-            "order_hint": node.get("order_hint"),
-            "assignee_type": node.get("assignee_type"),
-            "assignee_id": node.get("assignee_id"),
-        }
+        self.result = self.client.propose_changes(actions=self.actions(), actor=self.actor, tool=self.tool)
+        self._intents.clear()
+        return self.result
 
-    def _summarize_route_graph(self, graph: dict[str, Any]) -> dict[str, Any]:
-        nodes = sorted(
-            graph.get("nodes", []),
-            key=lambda node: (
-                int(node.get("order_hint") or 0),
-                str(node.get("created_at") or ""),
-                str(node.get("id") or ""),
-            ),
-        )
-        edges = graph.get("edges", [])
-        node_by_id = {str(node.get("id")): node for node in nodes if node.get("id")}
 
-        focus_nodes = [node for node in nodes if node.get("node_type") in {"start", "goal"}] or nodes
-        executing_node = next(
-            (node for node in focus_nodes if self._normalize_node_status(node.get("status")) == "execute"),
-            None,
-        )
-        done_nodes = [node for node in focus_nodes if self._normalize_node_status(node.get("status")) == "done"]
-        last_done_node = done_nodes[-1] if done_nodes else None
-        fallback_node = next((node for node in focus_nodes if node.get("node_type") != "start"), None)
-        if fallback_node is None and focus_nodes:
-            fallback_node = focus_nodes[0]
-        current_node = executing_node or last_done_node or fallback_node
+@dataclass
+class AsyncKmsClient(_RouteSnapshotMixin):
+    # Read-side client: independent GETs (route graphs, node logs) run concurrently, at most
+    # `max_concurrency` in flight, over one keep-alive pool.
+    base_url: str
+    api_key: str
+    timeout_sec: float = 15.0
+    http2: bool = False
+    max_concurrency: int = 8
+    _client: Optional[httpx.AsyncClient] = field(default=None, init=False, repr=False)
+    _semaphore: Optional[asyncio.Semaphore] = field(default=None, init=False, repr=False)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=_headers(self.api_key),
+                timeout=self.timeout_sec,
+                http2=self.http2,
+                limits=_limits(self.max_concurrency),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncKmsClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _get(self, path: str, params: Optional[dict[str, Any]] = None):
+        client = self.client
+        assert self._semaphore is not None
+        async with self._semaphore:
+            resp = await client.get(path, params=params or {})
+        resp.raise_for_status()
+        return resp.json()
 
-        previous_nodes: list[dict[str, Any]] = []
-        if current_node and current_node.get("id"):
-            for edge in edges:
-                if edge.get("to_node_id") != current_node["id"]:
-                    continue
-                from_node = node_by_id.get(str(edge.get("from_node_id")))
-                if from_node:
-                    previous_nodes.append(from_node)
+    async def search_notes(self, **params):
+        return await self._get("/api/v1/notes/search", params=params)
 
-        return {
-            "node_count": len(nodes),
-            "edge_count": len(edges),
-            "current_node": self._compact_node(current_node),
-            "previous_nodes": [self._compact_node(node) for node in previous_nodes if node],
-            "executing_nodes": [
-                self._compact_node(node)
-                for node in nodes
-                if self._normalize_node_status(node.get("status")) == "execute"
-            ],
-            "done_nodes": [
-                self._compact_node(node)
-                for node in nodes
-                if self._normalize_node_status(node.get("status")) == "done"
-            ],
-            "waiting_nodes": [
-                self._compact_node(node)
-                for node in nodes
-                if self._normalize_node_status(node.get("status")) == "waiting"
-            ],
-        }
+    async def list_tasks(self, **params):
+        return await self._get("/api/v1/tasks", params=params)
+
+    async def list_topics(self):
+        return await self._get("/api/v1/topics")
+
+    async def get_context_bundle(self, **params):
+        return await self._get("/api/v1/context/bundle", params=params)
+
+    async def list_routes(self, **params):
+        return await self._get("/api/v1/routes", params=params)
+
+    async def get_route_graph(self, route_id: str):
+        return await self._get(f"/api/v1/routes/{route_id}/graph")
+
+    async def get_node_logs(self, route_id: str, node_id: str, **params):
+        return await self._get(f"/api/v1/routes/{route_id}/nodes/{node_id}/logs", params=params)
+
+    async def _safe_get_node_logs(
+        self, route_id: str, node_id: str, limit: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        try:
+            if limit is None:
+                logs = await self.get_node_logs(route_id, node_id)
+            else:
+                logs = await self.get_node_logs(route_id, node_id, limit=limit)
+        except Exception:
+            return []
+        return _log_items(logs)
+
+    async def get_task_execution_snapshot(
+        self,
+        *,
+        task_id: str,
+        include_all_routes: bool = True,
+        include_logs: bool = False,
+        logs_per_node: Optional[int] = None,
+        page_size: int = 100,
+    ):
+        routes_payload = await self.list_routes(task_id=task_id, page=1, page_size=page_size)
+        routes = routes_payload.get("items") or []
+        selected_route = self._select_route(routes)
+        if not selected_route:
+            return self._empty_snapshot(task_id)
+
+        route_ids = self._snapshot_route_ids(routes, selected_route, include_all_routes)
+        fetched = await asyncio.gather(*(self.get_route_graph(route_id) for route_id in route_ids))
+        graphs = dict(zip(route_ids, fetched))
+
+        node_logs: Optional[dict[str, dict[str, list[dict[str, Any]]]]] = None
+        if include_logs:
+            targets = [
+                (route_id, node["id"])
+                for route_id, graph in graphs.items()
+                for node in graph.get("nodes", [])
+                if node.get("id")
+            ]
+            items = await asyncio.gather(
+                *(self._safe_get_node_logs(route_id, node_id, logs_per_node) for route_id, node_id in targets)
+            )
+            node_logs = {route_id: {} for route_id in route_ids}
+            for (route_id, node_id), logs in zip(targets, items):
+                node_logs[route_id][node_id] = logs
+        return self._build_snapshot(
+            task_id=task_id, routes=routes, selected_route=selected_route, graphs=graphs, node_logs=node_logs
+        )